@@ -0,0 +1,165 @@
+#------------------------
+# Afinidad Operario-Proceso
+#------------------------
+# Matriz operario x proceso con las participaciones, el tiempo real total y
+# las ejecuciones que cumplen el takt time, armada de una vez desde la tabla
+# de hechos (una fila por ejecución y operario). Con SciPy se guarda en
+# formato disperso (CSR), de modo que cientos de operarios y procesos no
+# ocupan una celda por par; sin SciPy se usa una matriz densa de NumPy.
+#
+# Sobre la matriz se obtienen la tabla para el mapa de calor de la
+# Pestaña 4 y la similitud coseno entre operarios: dos operarios con perfiles
+# de procesos parecidos pueden reemplazarse en esos procesos.
+#------------------------
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+
+MEDIDAS = {
+    'conteo': "Participaciones",
+    'tiempo_total': "Tiempo real total (min)",
+    'cumplimiento': "% Cumplimiento TT",
+}
+
+
+def disponible_disperso():
+    """Indica si SciPy está instalado (matrices dispersas)."""
+    return sparse is not None
+
+
+def _acumular(filas, columnas, pesos, forma):
+    """Suma los pesos por celda (fila, columna); los pares repetidos se acumulan."""
+    if sparse is not None:
+        return sparse.coo_matrix((pesos, (filas, columnas)), shape=forma).tocsr()
+    plano = np.bincount(filas * forma[1] + columnas, weights=pesos, minlength=forma[0] * forma[1])
+    return plano.reshape(forma)
+
+
+def _densa(matriz):
+    return matriz.toarray() if hasattr(matriz, 'toarray') else np.asarray(matriz)
+
+
+class MatrizAfinidad:
+    """Participaciones, tiempo total y cumplimientos por operario (filas) y proceso (columnas)."""
+
+    def __init__(self, operarios, procesos, conteo, tiempo_total, cumple):
+        self.operarios = operarios
+        self.procesos = procesos
+        self.conteo = conteo
+        self.tiempo_total = tiempo_total
+        self.cumple = cumple
+
+    @property
+    def forma(self):
+        return len(self.operarios), len(self.procesos)
+
+    def tabla(self, medida='conteo'):
+        """DataFrame denso operario x proceso de una medida; el cumplimiento es NaN donde no hay participaciones."""
+        if medida == 'cumplimiento':
+            conteo = _densa(self.conteo)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                valores = np.where(conteo > 0, _densa(self.cumple) / conteo * 100, np.nan)
+        elif medida in ('conteo', 'tiempo_total'):
+            valores = _densa(getattr(self, medida))
+        else:
+            raise ValueError(f"Medida desconocida: {medida}")
+        return pd.DataFrame(valores, index=self.operarios, columns=self.procesos)
+
+    def similitud(self, medida='conteo'):
+        """Similitud coseno entre los perfiles de procesos de cada par de operarios (0 a 1)."""
+        if medida == 'cumplimiento':
+            matriz = np.nan_to_num(self.tabla('cumplimiento').to_numpy())
+        else:
+            matriz = getattr(self, medida)
+
+        if hasattr(matriz, 'toarray'):
+            normas = np.sqrt(np.asarray(matriz.multiply(matriz).sum(axis=1)).ravel())
+            inversas = np.divide(1.0, normas, out=np.zeros_like(normas), where=normas > 0)
+            normalizada = matriz.multiply(inversas[:, None]).tocsr()
+            valores = (normalizada @ normalizada.T).toarray()
+        else:
+            matriz = np.asarray(matriz, dtype=float)
+            normas = np.linalg.norm(matriz, axis=1)
+            inversas = np.divide(1.0, normas, out=np.zeros_like(normas), where=normas > 0)
+            normalizada = matriz * inversas[:, None]
+            valores = normalizada @ normalizada.T
+        return pd.DataFrame(np.clip(valores, 0, 1), index=self.operarios, columns=self.operarios)
+
+    def intercambiables(self, umbral=0.3, medida='conteo', max_procesos=3, max_pares=50):
+        """
+        Hasta max_pares pares de operarios con similitud >= umbral, de mayor a
+        menor, con los procesos que ambos ejecutan (los de más participaciones
+        conjuntas primero).
+        """
+        similitud = self.similitud(medida).to_numpy()
+        i, j = np.triu_indices(len(self.operarios), k=1)
+        elegidos = similitud[i, j] >= umbral
+        i, j = i[elegidos], j[elegidos]
+        orden = np.argsort(-similitud[i, j], kind='stable')[:max_pares]
+        i, j = i[orden], j[orden]
+
+        conteo = _densa(self.conteo)
+        procesos = np.asarray(self.procesos)
+        comunes = []
+        for a, b in zip(i, j):
+            compartido = np.minimum(conteo[a], conteo[b])
+            mejores = np.argsort(-compartido, kind='stable')[:max_procesos]
+            comunes.append(", ".join(procesos[mejores[compartido[mejores] > 0]]))
+
+        return pd.DataFrame({
+            'Operario_A': np.asarray(self.operarios)[i],
+            'Operario_B': np.asarray(self.operarios)[j],
+            'Similitud': similitud[i, j],
+            'Procesos_Comunes': comunes,
+        })
+
+    def celdas(self):
+        """Celdas con participaciones en formato largo (para guardar la matriz fuera de la caché)."""
+        conteo = _densa(self.conteo)
+        i, j = np.nonzero(conteo)
+        return pd.DataFrame({
+            'Operario': np.asarray(self.operarios, dtype=object)[i],
+            'Proceso': np.asarray(self.procesos, dtype=object)[j],
+            'Conteo': conteo[i, j],
+            'Tiempo_Total': _densa(self.tiempo_total)[i, j],
+            'Cumple': _densa(self.cumple)[i, j],
+        })
+
+
+def matriz_desde_celdas(operarios, procesos, celdas):
+    """Matriz de afinidad desde MatrizAfinidad.celdas(), con el orden de operarios y procesos original."""
+    filas = pd.Index(operarios).get_indexer(celdas['Operario'])
+    columnas = pd.Index(procesos).get_indexer(celdas['Proceso'])
+    forma = (len(operarios), len(procesos))
+    return MatrizAfinidad(
+        operarios=list(operarios),
+        procesos=list(procesos),
+        conteo=_acumular(filas, columnas, celdas['Conteo'].to_numpy(dtype=float), forma),
+        tiempo_total=_acumular(filas, columnas, celdas['Tiempo_Total'].to_numpy(dtype=float), forma),
+        cumple=_acumular(filas, columnas, celdas['Cumple'].to_numpy(dtype=float), forma),
+    )
+
+
+def construir_matriz(df):
+    """Matriz de afinidad desde el DataFrame de ejecuciones (columna Operarios_list)."""
+    hechos = df[['Operarios_list', 'Proceso', 'T_Real_min', 'Cumple_TT']].explode('Operarios_list')
+    hechos = hechos.dropna(subset=['Operarios_list', 'Proceso'])
+
+    codigos_op, operarios = pd.factorize(hechos['Operarios_list'], sort=True)
+    codigos_proc, procesos = pd.factorize(hechos['Proceso'], sort=True)
+    forma = (len(operarios), len(procesos))
+
+    tiempo = hechos['T_Real_min'].fillna(0).to_numpy(dtype=float)
+    cumple = hechos['Cumple_TT'].astype(bool).to_numpy(dtype=float)
+    return MatrizAfinidad(
+        operarios=list(operarios),
+        procesos=list(procesos),
+        conteo=_acumular(codigos_op, codigos_proc, np.ones(len(hechos)), forma),
+        tiempo_total=_acumular(codigos_op, codigos_proc, tiempo, forma),
+        cumple=_acumular(codigos_op, codigos_proc, cumple, forma),
+    )
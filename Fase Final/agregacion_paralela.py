@@ -0,0 +1,491 @@
+#------------------------
+# Agregados en Paralelo por Particiones
+#------------------------
+# Calcula los agregados de las Pestañas 3, 5 y 6 (los mismos que
+# analitica.calcular_agregados) repartiendo la tabla de hechos entre varios
+# procesos. Las columnas que se necesitan se codifican como arreglos NumPy
+# (textos como códigos enteros) y se copian una vez a memoria compartida;
+# cada proceso lee su tramo de filas sin copiarlo ni serializarlo.
+#
+# Las filas se ordenan por la clave de partición (mes o edificio) y cada tarea
+# toma un grupo de particiones completas. Cada tarea devuelve agregados
+# parciales sumables: conteos y sumas por (tipo de baño, proceso) y por (tipo
+# de baño, operario), más la primera fila de cada baño de su tramo. El proceso
+# principal los suma, se queda con la primera fila de cada baño y arma las
+# mismas tablas que analitica (las medias salen de suma / conteo, por lo que
+# pueden diferir en el último decimal antes de redondear).
+#
+# Con pocos datos (AXIS_PARALELO_MIN_FILAS), un solo proceso (AXIS_PROCESOS)
+# o sin "forkserver" (Windows) se usa directamente analitica.calcular_agregados:
+# arrancar procesos y copiar a memoria compartida cuesta más de lo que ahorra.
+# Si un proceso del pool muere, esa llamada también se calcula con analitica
+# y la siguiente crea un pool nuevo.
+#
+# Hay un solo pool por proceso, de PROCESOS procesos, compartido por todos los
+# hilos (sesiones de Streamlit). Pedir menos procesos no lo achica: reparte el
+# trabajo en menos tareas, y el paralelismo queda limitado por ellas.
+#------------------------
+import atexit
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from analitica import calcular_agregados, banos_por_mes, lead_time_diario
+
+
+#------------------------
+# Configuración
+#------------------------
+PROCESOS = int(os.environ.get("AXIS_PROCESOS", str(os.cpu_count() or 1)))
+MIN_FILAS_PARALELO = int(os.environ.get("AXIS_PARALELO_MIN_FILAS", "500000"))
+TAREAS_POR_PROCESO = 2        # Más tareas que procesos para repartir particiones de distinto tamaño
+PARTICIONES = {'mes': 'AñoMes', 'edificio': 'Edificio'}
+COLUMNAS_OPERARIO = ['Operario_1', 'Operario_2', 'Operario_3']
+#------------------------
+# Fin de Configuración
+#------------------------
+
+
+#------------------------
+# Pool de Procesos
+#------------------------
+_pool = None
+_bloqueo_pool = threading.Lock()
+
+
+def contexto_procesos():
+    """
+    Contexto "forkserver" que solo precarga este módulo, o None si la
+    plataforma no lo tiene (Windows). "fork" no es seguro con los hilos de
+    Streamlit.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return None
+    contexto = multiprocessing.get_context("forkserver")
+    contexto.set_forkserver_preload([__name__])
+    return contexto
+
+
+def _pool_compartido():
+    """
+    Pool de PROCESOS procesos compartido por todo el proceso, creado la primera
+    vez que se usa. Se llama con _bloqueo_pool tomado.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(PROCESOS, mp_context=contexto_procesos())
+    return _pool
+
+
+def descartar_pool(pool):
+    """
+    Suelta un pool roto (un proceso murió, p. ej. por falta de memoria) para
+    que la próxima llamada cree uno nuevo.
+    """
+    global _pool
+    with _bloqueo_pool:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@contextmanager
+def sin_script_principal():
+    """
+    Mientras se arrancan procesos del pool, oculta el archivo del script
+    principal: multiprocessing lo vuelve a ejecutar en cada proceso nuevo, y
+    con Streamlit ese script es el dashboard completo. Las tareas solo
+    necesitan este módulo.
+    """
+    principal = sys.modules['__main__']
+    archivo = getattr(principal, '__file__', None)
+    if archivo is None or getattr(principal.__spec__, 'name', None) is not None:
+        yield
+        return
+    del principal.__file__
+    try:
+        yield
+    finally:
+        principal.__file__ = archivo
+
+
+def mapear_en_pool(funcion, tareas):
+    """
+    funcion(*argumentos) para cada tupla de `tareas` en el pool compartido, con
+    los resultados en orden; corren a la vez a lo más len(tareas). Si un
+    proceso muere, descarta el pool y relanza BrokenProcessPool para que quien
+    llama calcule en este proceso.
+    """
+    try:
+        # Pool y envío bajo el mismo bloqueo: otro hilo no puede cerrarlo entre medio.
+        # El pool arranca sus procesos a medida que recibe tareas
+        with _bloqueo_pool, sin_script_principal():
+            pool = _pool_compartido()
+            futuros = [pool.submit(funcion, *argumentos) for argumentos in tareas]
+        return [futuro.result() for futuro in futuros]
+    except BrokenProcessPool:
+        descartar_pool(pool)
+        raise
+    except CancelledError:
+        # Otro hilo descartó el pool roto con estas tareas todavía en cola
+        raise BrokenProcessPool("El pool se descartó con tareas pendientes")
+
+
+@atexit.register
+def cerrar_pool():
+    global _pool
+    with _bloqueo_pool:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+#------------------------
+# Fin de Pool de Procesos
+#------------------------
+
+
+#------------------------
+# Tabla de Hechos Codificada
+#------------------------
+def codificar(df, particion='mes'):
+    """
+    Columnas de los agregados como arreglos NumPy, con las filas ordenadas por
+    la partición. Devuelve (arreglos, categorías, cortes): cortes son los
+    límites de cada partición en el orden nuevo.
+    """
+    columna = PARTICIONES[particion]
+    if particion == 'mes' and columna not in df.columns:
+        # Datos sin pasar por fuente_datos (benchmarks): el mes sale de Fecha, como número (sin strftime)
+        clave = df['Fecha'].to_numpy(dtype='datetime64[M]').astype(np.int64)
+    else:
+        clave = df[columna].to_numpy()
+    orden = np.argsort(pd.factorize(clave, sort=True)[0], kind='stable')
+
+    codigos_tipo, tipos = pd.factorize(df['Tipo_bano'], sort=True)
+    codigos_proc, procesos = pd.factorize(df['Proceso'], sort=True)
+    # Como drop_duplicates, un Cod_bano vacío cuenta como un baño más
+    codigos_bano, _ = pd.factorize(df['Cod_bano'], use_na_sentinel=False)
+    # Los tres operarios apilados por columna, para factorizarlos juntos sin pasar por objetos de Python
+    apilados = pd.concat([df[col] for col in COLUMNAS_OPERARIO], ignore_index=True)
+    codigos_op, operarios = pd.factorize(apilados, sort=True)
+
+    arreglos = {
+        'posicion': orden.astype(np.int64),
+        'tipo': codigos_tipo.astype(np.int32)[orden],
+        'proceso': codigos_proc.astype(np.int32)[orden],
+        'bano': codigos_bano.astype(np.int32)[orden],
+        'operarios': codigos_op.astype(np.int32).reshape(len(COLUMNAS_OPERARIO), -1).T[orden],
+        'cumple': df['Cumple_TT'].to_numpy(dtype=float)[orden],
+        't_real': df['T_Real_min'].to_numpy(dtype=float)[orden],
+        'tt': df['TT'].to_numpy(dtype=float)[orden],
+    }
+    clave_ordenada = clave[orden]
+    cortes = np.concatenate(([0], np.flatnonzero(clave_ordenada[1:] != clave_ordenada[:-1]) + 1, [len(df)]))
+    # Índices con el tipo que infiere pandas (str para textos), como los de un groupby
+    categorias = {
+        'tipos': pd.Index(np.asarray(tipos, dtype=object)),
+        'procesos': pd.Index(np.asarray(procesos, dtype=object)),
+        'operarios': pd.Index(np.asarray(operarios, dtype=object)),
+        'banos': int(codigos_bano.max()) + 1,
+    }
+    return arreglos, categorias, cortes
+
+
+def tramos_tareas(cortes, tareas):
+    """Agrupa particiones contiguas en hasta `tareas` tramos de tamaño parecido (sin partir particiones)."""
+    total = cortes[-1]
+    objetivos = np.arange(1, tareas) * total / tareas
+    internos = cortes[1:-1]
+    if len(internos):
+        elegidos = internos[np.clip(np.searchsorted(internos, objetivos), 0, len(internos) - 1)]
+    else:
+        elegidos = np.empty(0, dtype=cortes.dtype)
+    limites = np.unique(np.concatenate(([0], elegidos, [total])))
+    return list(zip(limites[:-1].tolist(), limites[1:].tolist()))
+#------------------------
+# Fin de Tabla de Hechos Codificada
+#------------------------
+
+
+#------------------------
+# Agregados Parciales (en cada proceso)
+#------------------------
+ESCALA_SUMA = 2.0 ** 10  # Parte gruesa de cada valor: múltiplo de 1/1024, se suma sin error
+
+
+def _suma_por_clave(sumas, medida, claves, largo, valores):
+    """
+    Suma por clave sin NaN, como la media de pandas. Cada valor se separa en
+    una parte gruesa, cuya suma es exacta, y un resto pequeño: el error queda
+    muy por debajo del de sumar los valores tal cual, y los promedios
+    redondeados coinciden con los de pandas (que compensa la suma).
+    """
+    valido = ~np.isnan(valores)
+    valores = np.where(valido, valores, 0.0)
+    grueso = np.round(valores * ESCALA_SUMA) / ESCALA_SUMA
+    sumas[medida] = np.bincount(claves, weights=grueso, minlength=largo)
+    sumas[medida + '_resto'] = np.bincount(claves, weights=valores - grueso, minlength=largo)
+    sumas[medida + '_n'] = np.bincount(claves, weights=valido, minlength=largo)
+
+
+def _sumas(claves, largo, t_real, cumple, tt=None):
+    """Conteo, cumplimientos y sumas de t_real (y tt) por clave."""
+    sumas = {
+        'n': np.bincount(claves, minlength=largo),
+        'cumple': np.bincount(claves, weights=cumple, minlength=largo),
+    }
+    _suma_por_clave(sumas, 't_real', claves, largo, t_real)
+    if tt is not None:
+        _suma_por_clave(sumas, 'tt', claves, largo, tt)
+    return sumas
+
+
+def agregar_tramo(arreglos, inicio, fin, dimensiones):
+    """Agregados parciales de las filas [inicio, fin) de los arreglos codificados."""
+    n_tipos, n_procesos, n_operarios = dimensiones
+    tramo = {nombre: arreglo[inicio:fin] for nombre, arreglo in arreglos.items()}
+    # Fila 0 de los cubos: tipo de baño vacío (cuenta para los totales por proceso u operario, no por tipo)
+    tipo = tramo['tipo'].astype(np.int64) + 1
+
+    con_proceso = tramo['proceso'] >= 0
+    parcial = {
+        'tipo_proceso': _sumas(
+            tipo[con_proceso] * n_procesos + tramo['proceso'][con_proceso], (n_tipos + 1) * n_procesos,
+            tramo['t_real'][con_proceso], tramo['cumple'][con_proceso], tramo['tt'][con_proceso]
+        )
+    }
+
+    # Una entrada por (fila, operario), como la tabla larga de analitica.operarios_largo
+    operarios = tramo['operarios']
+    filas, columnas = np.nonzero(operarios >= 0)
+    parcial['tipo_operario'] = _sumas(
+        tipo[filas] * n_operarios + operarios[filas, columnas], (n_tipos + 1) * n_operarios,
+        tramo['t_real'][filas], tramo['cumple'][filas]
+    )
+
+    # Primera fila de cada baño en el tramo (las filas mantienen su orden original dentro de la partición)
+    banos, primeras = np.unique(tramo['bano'], return_index=True)
+    parcial['banos'] = banos
+    parcial['primeras'] = tramo['posicion'][primeras]
+    return parcial
+
+
+def _tarea(descriptores, inicio, fin, dimensiones):
+    """Punto de entrada en el proceso hijo: abre la memoria compartida y agrega su tramo."""
+    bloques = []
+    try:
+        arreglos = {}
+        for nombre, (bloque_nombre, forma, tipo) in descriptores.items():
+            bloque = shared_memory.SharedMemory(name=bloque_nombre)
+            bloques.append(bloque)
+            arreglos[nombre] = np.ndarray(forma, dtype=tipo, buffer=bloque.buf)
+        resultado = agregar_tramo(arreglos, inicio, fin, dimensiones)
+        # Los resultados son copias pequeñas; las vistas a la memoria compartida se sueltan antes de cerrarla
+        del arreglos
+        return resultado
+    finally:
+        for bloque in bloques:
+            bloque.close()
+#------------------------
+# Fin de Agregados Parciales
+#------------------------
+
+
+#------------------------
+# Combinación de Parciales
+#------------------------
+def _combinar(parciales, n_banos):
+    total = {}
+    for seccion in ('tipo_proceso', 'tipo_operario'):
+        total[seccion] = {
+            medida: np.sum([p[seccion][medida] for p in parciales], axis=0)
+            for medida in parciales[0][seccion]
+        }
+    primera = np.full(n_banos, np.iinfo(np.int64).max)
+    for p in parciales:
+        np.minimum.at(primera, p['banos'], p['primeras'])
+    total['primeras'] = np.sort(primera[primera != np.iinfo(np.int64).max])
+    return total
+
+
+def _media(sumas, medida):
+    return (sumas[medida] + sumas[medida + '_resto']) / sumas[medida + '_n']
+
+
+def _cumplimiento(sumas, indice):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tabla = pd.DataFrame({
+            'Tasa_Cumplimiento': sumas['cumple'] / sumas['n'],
+            'Cantidad': sumas['n'].astype(np.int64),
+            'Tiempo_Promedio': _media(sumas, 't_real'),
+            'TT_Promedio': _media(sumas, 'tt'),
+        }, index=indice)
+    return tabla.round(1)
+
+
+def _operarios(sumas, indice):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tabla = pd.DataFrame({
+            'Total_Tareas': sumas['n'].astype(np.int64),
+            'Avg_T_Real': _media(sumas, 't_real'),
+            'Pct_Cumple_TT': sumas['cumple'] / sumas['n'],
+        }, index=indice)
+    tabla['Pct_Cumple_TT'] = tabla['Pct_Cumple_TT'] * 100
+    return tabla
+
+
+def _cubo(sumas, filas, columnas, nombres):
+    """Sumas (tipos x columnas) aplanadas -> sumas de los pares con filas, con su MultiIndex en orden de groupby."""
+    presentes = np.flatnonzero(sumas['n'] > 0)
+    presentes = presentes[presentes >= len(columnas)]  # Sin la fila del tipo vacío
+    indice = pd.MultiIndex.from_arrays(
+        [filas[presentes // len(columnas) - 1], columnas[presentes % len(columnas)]], names=nombres
+    )
+    return {medida: valores[presentes] for medida, valores in sumas.items()}, indice
+
+
+def _marginal(sumas, n_filas, n_columnas, columnas, nombre):
+    """Sumas por columna (sobre todas las filas), solo las columnas con filas."""
+    totales = {medida: valores.reshape(n_filas, n_columnas).sum(axis=0) for medida, valores in sumas.items()}
+    presentes = np.flatnonzero(totales['n'] > 0)
+    return {medida: valores[presentes] for medida, valores in totales.items()}, pd.Index(columnas[presentes], name=nombre)
+
+
+def armar_agregados(df, arreglos, categorias, total):
+    """Tablas de analitica.calcular_agregados a partir de los parciales combinados."""
+    tipos, procesos, operarios = categorias['tipos'], categorias['procesos'], categorias['operarios']
+
+    sumas, indice = _marginal(total['tipo_proceso'], len(tipos) + 1, len(procesos), procesos, 'Proceso')
+    cumplimiento_proceso = _cumplimiento(sumas, indice).sort_values('Tasa_Cumplimiento', ascending=True)
+
+    sumas, indice = _cubo(total['tipo_proceso'], tipos, procesos, ['Tipo_bano', 'Proceso'])
+    cubo = _cumplimiento(sumas, indice)
+    cumplimiento_tipo = {
+        tipo: cubo.xs(tipo, level='Tipo_bano').sort_values('Tasa_Cumplimiento', ascending=True)
+        for tipo in indice.get_level_values('Tipo_bano').unique()
+    }
+
+    sumas, indice = _marginal(total['tipo_operario'], len(tipos) + 1, len(operarios), operarios, 'Operario')
+    metricas_operario = _operarios(sumas, indice).reset_index().sort_values('Avg_T_Real')
+
+    sumas, indice = _cubo(total['tipo_operario'], tipos, operarios, ['Tipo_bano', 'Operario'])
+    cubo = _operarios(sumas, indice)
+    metricas_operario_tipo = {
+        tipo: cubo.xs(tipo, level='Tipo_bano').reset_index().sort_values('Avg_T_Real')
+        for tipo in indice.get_level_values('Tipo_bano').unique()
+    }
+
+    banos = df.iloc[total['primeras']]
+    return {
+        'cumplimiento_proceso': cumplimiento_proceso,
+        'cumplimiento_tipo': cumplimiento_tipo,
+        'banos_por_mes': banos_por_mes(banos),
+        'lead_time_diario': lead_time_diario(banos),
+        'operarios_largo': operarios_largo(df, arreglos, categorias),
+        'metricas_operario': metricas_operario,
+        'metricas_operario_tipo': metricas_operario_tipo,
+    }
+
+
+def operarios_largo(df, arreglos, categorias):
+    """Misma tabla que analitica.operarios_largo, desde los códigos (sin explode fila por fila)."""
+    codigos = np.empty_like(arreglos['operarios'])
+    codigos[arreglos['posicion']] = arreglos['operarios']
+    filas, columnas = np.nonzero(codigos >= 0)
+    return pd.DataFrame({
+        'Operario': categorias['operarios'].take(codigos[filas, columnas]),
+        'T_Real_Unit': df['T_Real_min'].to_numpy()[filas],
+        'Cumple_TT': df['Cumple_TT'].to_numpy()[filas],
+        'Tipo_bano': df['Tipo_bano'].iloc[filas].reset_index(drop=True),
+    })
+#------------------------
+# Fin de Combinación de Parciales
+#------------------------
+
+
+#------------------------
+# Punto de Entrada
+#------------------------
+def _compartir(arreglos):
+    """Copia cada arreglo a un bloque de memoria compartida; devuelve los bloques y sus descriptores."""
+    bloques, descriptores = [], {}
+    try:
+        for nombre, arreglo in arreglos.items():
+            bloque = shared_memory.SharedMemory(create=True, size=max(arreglo.nbytes, 1))
+            bloques.append(bloque)
+            np.ndarray(arreglo.shape, dtype=arreglo.dtype, buffer=bloque.buf)[...] = arreglo
+            descriptores[nombre] = (bloque.name, arreglo.shape, arreglo.dtype.str)
+    except Exception:
+        _liberar(bloques)
+        raise
+    return bloques, descriptores
+
+
+def _liberar(bloques):
+    for bloque in bloques:
+        bloque.close()
+        bloque.unlink()
+
+
+def calcular_agregados_paralelo(df, procesos=PROCESOS, particion='mes', min_filas=MIN_FILAS_PARALELO):
+    """
+    Agregados de analitica.calcular_agregados calculados por particiones en
+    procesos * TAREAS_POR_PROCESO tareas del pool compartido (a lo más PROCESOS
+    a la vez); con menos de min_filas filas, un solo proceso o sin
+    "forkserver", en este mismo proceso con analitica. procesos=0 calcula los
+    mismos parciales sin pool (útil para medir el costo de codificar y combinar).
+    """
+    if len(df) == 0 or len(df) < min_filas or procesos == 1 or (procesos > 1 and contexto_procesos() is None):
+        return calcular_agregados(df)
+
+    arreglos, categorias, cortes = codificar(df, particion)
+    dimensiones = (len(categorias['tipos']), len(categorias['procesos']), max(len(categorias['operarios']), 1))
+
+    if procesos == 0:
+        parciales = [agregar_tramo(arreglos, inicio, fin, dimensiones) for inicio, fin in tramos_tareas(cortes, 1)]
+    else:
+        tramos = tramos_tareas(cortes, procesos * TAREAS_POR_PROCESO)
+        bloques, descriptores = _compartir(arreglos)
+        try:
+            parciales = mapear_en_pool(
+                _tarea, [(descriptores, inicio, fin, dimensiones) for inicio, fin in tramos]
+            )
+        except BrokenProcessPool:
+            # Esta llamada se resuelve en este proceso; la siguiente usará un pool nuevo
+            return calcular_agregados(df)
+        finally:
+            _liberar(bloques)
+
+    return armar_agregados(df, arreglos, categorias, _combinar(parciales, categorias['banos']))
+#------------------------
+# Fin de Punto de Entrada
+#------------------------
+
+
+#------------------------
+# Paridad con analitica.py
+#------------------------
+def verificar_paridad(df, procesos=PROCESOS, particion='mes'):
+    """
+    Compara con analitica.calcular_agregados; devuelve la lista de (nombre,
+    diferencia). Las columnas redondeadas a 1 decimal pueden diferir en 0.1 si
+    una media cae justo en el borde del redondeo.
+    """
+    from motor_duckdb import _comparar
+
+    esperado = calcular_agregados(df)
+    obtenido = calcular_agregados_paralelo(df, procesos, particion, min_filas=0)
+    diferencias = []
+    for clave in esperado:
+        _comparar(clave, esperado[clave], obtenido[clave], diferencias)
+    return diferencias
+#------------------------
+# Fin de Paridad con analitica.py
+#------------------------
@@ -0,0 +1,331 @@
+#------------------------
+# Capa de Analítica
+#------------------------
+# Funciones de cálculo sin dependencia de Streamlit, reutilizables por el
+# dashboard y por procesos sin interfaz.
+#------------------------
+import numpy as np
+import pandas as pd
+
+
+#------------------------
+# Funciones de Utilidad
+#------------------------
+def format_time_from_minutes(minutes):
+    """Convierte minutos a un string en formato hh:mm:ss."""
+    if pd.isna(minutes) or not np.isfinite(minutes):
+        return "00:00:00"
+
+    td = pd.to_timedelta(minutes, unit='m')
+    total_seconds = int(td.total_seconds())
+    hours, remainder = divmod(total_seconds, 3600)
+    mins, secs = divmod(remainder, 60)
+    return f"{hours:02d}:{mins:02d}:{secs:02d}"
+
+
+def month_to_spanish(month_num):
+    """Convierte el número del mes a su nombre en español."""
+    return {
+        1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril", 5: "Mayo", 6: "Junio",
+        7: "Julio", 8: "Agosto", 9: "Septiembre", 10: "Octubre", 11: "Noviembre", 12: "Diciembre"
+    }.get(month_num, "Mes Desconocido")
+#------------------------
+# Fin de Funciones de Utilidad
+#------------------------
+
+
+#------------------------
+# Pre-procesamiento de Datos
+#------------------------
+def preparar_datos(df):
+    """
+    Pre-procesa el DataFrame de Datos_Banos.xlsx ya validado (validacion.validar):
+    fechas parseadas, operarios como texto sin espacios o NaN y Cumple_TT booleano.
+    """
+    df["Fecha"] = pd.to_datetime(df["Fecha"])
+
+    # Inicio y Fin reales de cada ejecución (NaT si la fuente no los trae, como el Excel de AppSheet)
+    for col in ("Inicio", "Fin"):
+        df[col] = pd.to_datetime(df[col]) if col in df.columns else pd.Series(pd.NaT, index=df.index, dtype=df["Fecha"].dtype)
+
+    # Crear la columna 'Tipo_bano_agrupado' para el filtro agrupado
+    df['Tipo_bano_agrupado'] = df['Tipo_bano'].str.extract(r'^(B\d+)', expand=False).fillna(df['Tipo_bano'])
+
+    # Operarios concatenados
+    operarios = df[["Operario_1", "Operario_2", "Operario_3"]]
+    presentes = operarios.notna().to_numpy()
+    df["Operarios_list"] = [
+        list(fila[presente]) for fila, presente in zip(operarios.to_numpy(dtype=object), presentes)
+    ]
+    df["Operarios"] = df["Operarios_list"].str.join(", ")
+
+    # --- Asignación de Tiempos en Horas y Minutos ---
+    # Se asignan las columnas de horas desde el Excel a los nombres usados en el app
+    df['T_Real_hr'] = df['T_Real_horas']
+    df['T_Espera_hr'] = df['T_Espera_horas']
+
+    # Calcular el Lead Time (Ciclo) por Baño en MINUTOS
+    df_max_corr_min = df.groupby('Cod_bano')['T_Real_Acumulado'].max().reset_index()
+    df_max_corr_min.columns = ['Cod_bano', 'Lead_Time_min']
+    df = pd.merge(df, df_max_corr_min, on='Cod_bano', how='left')
+
+    # Calcular el Lead Time (Ciclo) por Baño en HORAS
+    df_max_corr_hr = df.groupby('Cod_bano')['T_Real_Acumulado_horas'].max().reset_index()
+    df_max_corr_hr.columns = ['Cod_bano', 'Lead_Time_hr']
+    df = pd.merge(df, df_max_corr_hr, on='Cod_bano', how='left')
+
+    # Columnas numéricas para análisis de cumplimiento
+    df['Cumple_Num'] = df['Cumple_TT'].astype(int)
+
+    return df
+#------------------------
+# Fin de Pre-procesamiento de Datos
+#------------------------
+
+
+#------------------------
+# Índice por Correlativo
+#------------------------
+def construir_indice_correlativo(df):
+    """
+    Ordena el DataFrame por (Correlativo, Fecha) y registra el rango de filas de
+    cada correlativo, de modo que obtener un baño sea un corte O(grupo).
+    """
+    ordenado = (
+        df.dropna(subset=['Correlativo'])
+        .sort_values(['Correlativo', 'Fecha'], kind='mergesort')
+        .reset_index(drop=True)
+    )
+    valores = ordenado['Correlativo'].to_numpy()
+    cortes = np.flatnonzero(valores[1:] != valores[:-1]) + 1
+    inicios = np.concatenate(([0], cortes))
+    fines = np.concatenate((cortes, [len(valores)]))
+    rangos = {valores[i]: (int(i), int(f)) for i, f in zip(inicios, fines) if f > i}
+    return ordenado, rangos
+
+
+def filas_correlativo(ordenado, rangos, correlativo):
+    """Filas de un correlativo, ya ordenadas por Fecha."""
+    inicio, fin = rangos.get(correlativo, (0, 0))
+    return ordenado.iloc[inicio:fin]
+#------------------------
+# Fin de Índice por Correlativo
+#------------------------
+
+
+#------------------------
+# Detalle por Correlativo
+#------------------------
+def detalle_correlativo(d_corr):
+    """Calcula métricas, tabla de secuencia y datos del Gantt de procesos de un correlativo."""
+    operarios_corr_set = {op for ops_list in d_corr['Operarios_list'] for op in ops_list}
+    metricas = {
+        'tipo_bano': d_corr['Tipo_bano'].iloc[0],
+        'fecha_inicio': d_corr['Fecha'].min().date(),
+        'fecha_fin': d_corr['Fecha'].max().date(),
+        'tiempo_real_total': d_corr['T_Real_min'].sum(),
+        'tiempo_espera_total': d_corr['T_Espera_min'].sum(),
+        'num_procesos': len(d_corr),
+        'operarios': ", ".join(sorted(operarios_corr_set)),
+    }
+
+    # Tabla de secuencia de procesos
+    secuencia = pd.DataFrame({
+        'Fecha': d_corr['Fecha'].dt.date,
+        'Proceso': d_corr['Proceso'],
+        'T. Real': d_corr['T_Real_min'].map(format_time_from_minutes),
+        'T. Espera': d_corr['T_Espera_min'].map(format_time_from_minutes),
+        'Takt Time': d_corr['TT'].map(format_time_from_minutes),
+        'Cumple_TT': d_corr['Cumple_TT'],
+        'Operarios': d_corr['Operarios'],
+    }).reset_index(drop=True)
+
+    # Gantt en minutos desde el inicio del baño
+    t_real = d_corr['T_Real_min'].to_numpy(dtype=float)
+    if d_corr['Inicio'].notna().all() and d_corr['Fin'].notna().all():
+        # Con Inicio/Fin reales, directamente desde los registros
+        origen = d_corr['Inicio'].min()
+        inicio = ((d_corr['Inicio'] - origen).dt.total_seconds() / 60).to_numpy()
+        fin = ((d_corr['Fin'] - origen).dt.total_seconds() / 60).to_numpy()
+    else:
+        # Sin ellos, cada proceso inicia tras el término del anterior más su espera (la espera del primero se ignora)
+        t_espera = d_corr['T_Espera_min'].to_numpy(dtype=float).copy()
+        t_espera[:1] = 0
+        inicio = np.cumsum(t_espera) + np.cumsum(t_real) - t_real
+        fin = inicio + t_real
+    gantt = pd.DataFrame({
+        'Proceso': d_corr['Proceso'].to_numpy(),
+        'Inicio_Duracion': inicio,
+        'Fin_Duracion': fin,
+        'Operarios': d_corr['Operarios'].to_numpy(),
+        'T_Real_Unit': t_real,
+        'T_Espera_Unit': d_corr['T_Espera_min'].to_numpy(dtype=float),
+    })
+
+    return {
+        'metricas': metricas,
+        'secuencia': secuencia,
+        'gantt': gantt,
+        'orden_procesos': d_corr['Proceso'].unique().tolist(),
+    }
+#------------------------
+# Fin de Detalle por Correlativo
+#------------------------
+
+
+#------------------------
+# Agregados del Dashboard
+#------------------------
+def mascara_filtros(df, meses=None, correlativos=None, tipo_agrupado=None, pisos=None):
+    """Máscara booleana de los filtros de la barra lateral (mismos que MotorDuckDB.metricas_clave)."""
+    mascara = np.ones(len(df), dtype=bool)
+    if meses:
+        mascara &= df["AñoMes"].isin(meses).to_numpy()
+    if correlativos:
+        if pd.api.types.is_numeric_dtype(df["Correlativo"]):
+            # Comparación numérica: evita convertir a texto toda la columna en cada consulta
+            buscados = pd.to_numeric(pd.Series([str(c) for c in correlativos]), errors='coerce').dropna()
+            mascara &= df["Correlativo"].isin(buscados).to_numpy()
+        else:
+            mascara &= df["Correlativo"].astype(str).isin([str(c) for c in correlativos]).to_numpy()
+    if tipo_agrupado and tipo_agrupado != "Todos":
+        mascara &= (df["Tipo_bano_agrupado"] == tipo_agrupado).to_numpy()
+    if pisos:
+        mascara &= df["Piso"].isin([int(p) for p in pisos]).to_numpy()
+    return mascara
+
+
+def filtrar(df, meses=None, correlativos=None, tipo_agrupado=None, pisos=None):
+    """Filtros de la barra lateral con una sola máscara."""
+    mascara = mascara_filtros(df, meses, correlativos, tipo_agrupado, pisos)
+    return df if mascara.all() else df[mascara]
+
+
+def metricas_clave(df_filt):
+    """Métricas clave de productividad sobre el DataFrame filtrado."""
+    banos_terminados = df_filt['Cod_bano'].nunique()
+
+    if banos_terminados > 0:
+        avg_lead_time = df_filt.drop_duplicates(subset='Cod_bano')['Lead_Time_min'].mean()
+        avg_procesos_por_bano = len(df_filt) / banos_terminados
+    else:
+        avg_lead_time = 0
+        avg_procesos_por_bano = 0
+
+    return {
+        'banos_terminados': banos_terminados,
+        'avg_lead_time': avg_lead_time,
+        'avg_procesos_por_bano': avg_procesos_por_bano,
+        'avg_t_real': df_filt['T_Real_min'].mean() if len(df_filt) > 0 else 0,
+        'avg_pct_cumple': df_filt['Cumple_Num'].mean() * 100 if len(df_filt) > 0 else 0,
+    }
+
+
+def _agregar_cumplimiento(agrupado):
+    """Tasa de cumplimiento, cantidad, tiempo real promedio y TT promedio de un groupby por proceso."""
+    cumplimiento = agrupado.agg({
+        'Cumple_TT': ['mean', 'count'],
+        'T_Real_min': 'mean',
+        'TT': 'mean'
+    }).round(1)
+    cumplimiento.columns = ['Tasa_Cumplimiento', 'Cantidad', 'Tiempo_Promedio', 'TT_Promedio']
+    return cumplimiento
+
+
+def cumplimiento_por_proceso(df):
+    """Métricas de cumplimiento por proceso, ordenadas de menor a mayor tasa (Pestaña 3)."""
+    return _agregar_cumplimiento(df.groupby('Proceso')).sort_values('Tasa_Cumplimiento', ascending=True)
+
+
+def cumplimiento_por_tipo(df):
+    """Métricas de cumplimiento por proceso para cada tipo de baño, en un solo groupby (Pestaña 3)."""
+    cubo = _agregar_cumplimiento(df.groupby(['Tipo_bano', 'Proceso']))
+    return {
+        tipo: cubo.xs(tipo, level='Tipo_bano').sort_values('Tasa_Cumplimiento', ascending=True)
+        for tipo in sorted(df['Tipo_bano'].unique())
+    }
+
+
+def banos_por_mes(df):
+    """Baños terminados por mes con promedio móvil de 3 meses y tendencia lineal (Pestaña 5)."""
+    banos = df.drop_duplicates(subset='Cod_bano')
+    por_mes = banos.groupby(banos['Fecha'].dt.to_period('M').rename('Mes'))['Cod_bano'].count().reset_index()
+    por_mes['Mes'] = por_mes['Mes'].astype(str)
+    return completar_banos_por_mes(por_mes)
+
+
+def completar_banos_por_mes(por_mes):
+    """Agrega el promedio móvil de 3 meses y la tendencia lineal a los conteos mensuales."""
+    por_mes["PM3"] = por_mes["Cod_bano"].rolling(3).mean()
+    por_mes["Mes_num"] = range(len(por_mes))
+    coef = np.polyfit(por_mes["Mes_num"], por_mes["Cod_bano"], 1)
+    por_mes["Tendencia"] = coef[0] * por_mes["Mes_num"] + coef[1]
+    return por_mes
+
+
+def lead_time_diario(df, col_lead_time='Lead_Time_min'):
+    """Lead time promedio diario con promedio móvil de 7 días y tendencia lineal (Pestaña 5)."""
+    banos = df.drop_duplicates(subset='Cod_bano')
+    diario = banos.groupby(banos["Fecha"].dt.date)[col_lead_time].mean().reset_index()
+    diario.rename(columns={"Fecha": "Fecha_diaria"}, inplace=True)
+    return completar_lead_time_diario(diario, col_lead_time)
+
+
+def completar_lead_time_diario(diario, col_lead_time='Lead_Time_min'):
+    """Agrega el promedio móvil de 7 días y la tendencia lineal al lead time diario."""
+    diario["PM7"] = diario[col_lead_time].rolling(7).mean()
+    diario["Dia_num"] = range(len(diario))
+    coef = np.polyfit(diario["Dia_num"], diario[col_lead_time], 1)
+    diario["Tendencia"] = coef[0] * diario["Dia_num"] + coef[1]
+    return diario
+
+
+def operarios_largo(df):
+    """Tabla larga con una fila por (ejecución, operario), en el orden original de ejecuciones."""
+    largo = df[['Operarios_list', 'T_Real_min', 'Cumple_TT', 'Tipo_bano']].explode('Operarios_list')
+    largo = largo.dropna(subset=['Operarios_list']).reset_index(drop=True)
+    return largo.rename(columns={'Operarios_list': 'Operario', 'T_Real_min': 'T_Real_Unit'})
+
+
+def _agregar_operarios(agrupado):
+    return agrupado.agg(
+        Total_Tareas=('Operario', 'count'),
+        Avg_T_Real=('T_Real_Unit', 'mean'),
+        Pct_Cumple_TT=('Cumple_Bool', 'mean')
+    )
+
+
+def metricas_operario(df_op):
+    """Tareas, tiempo real promedio y % de cumplimiento TT por operario (Pestaña 6)."""
+    df_op = df_op.assign(Cumple_Bool=df_op['Cumple_TT'].astype(bool))
+    metricas = _agregar_operarios(df_op.groupby('Operario'))
+    metricas['Pct_Cumple_TT'] = metricas['Pct_Cumple_TT'] * 100
+    return metricas.reset_index().sort_values('Avg_T_Real')
+
+
+def metricas_operario_por_tipo(df_op):
+    """Métricas por operario para cada tipo de baño, en un solo groupby (Pestaña 6)."""
+    df_op = df_op.assign(Cumple_Bool=df_op['Cumple_TT'].astype(bool))
+    cubo = _agregar_operarios(df_op.groupby(['Tipo_bano', 'Operario']))
+    cubo['Pct_Cumple_TT'] = cubo['Pct_Cumple_TT'] * 100
+    return {
+        tipo: cubo.xs(tipo, level='Tipo_bano').reset_index().sort_values('Avg_T_Real')
+        for tipo in sorted(df_op['Tipo_bano'].unique())
+    }
+
+
+def calcular_agregados(df):
+    """Agregados que no dependen de los filtros de la barra lateral (Pestañas 3, 5 y 6)."""
+    df_op = operarios_largo(df)
+    return {
+        'cumplimiento_proceso': cumplimiento_por_proceso(df),
+        'cumplimiento_tipo': cumplimiento_por_tipo(df),
+        'banos_por_mes': banos_por_mes(df),
+        'lead_time_diario': lead_time_diario(df),
+        'operarios_largo': df_op,
+        'metricas_operario': metricas_operario(df_op),
+        'metricas_operario_tipo': metricas_operario_por_tipo(df_op),
+    }
+#------------------------
+# Fin de Agregados del Dashboard
+#------------------------
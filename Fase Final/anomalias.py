@@ -0,0 +1,134 @@
+#------------------------
+# Detección de Anomalías en Tiempos de Ejecución
+#------------------------
+# Además del cumplimiento contra el takt time fijo de cada proceso, compara
+# cada ejecución con la línea base robusta de su (proceso, tipo de baño):
+# mediana y MAD (desviación absoluta mediana) de T_Real_min. Las líneas base
+# se calculan una vez por versión del dataset; el puntaje (z modificado de
+# Iglewicz-Hoaglin) se obtiene para todas las filas en una sola operación
+# vectorizada, y las filas nuevas de una carga incremental se puntúan contra
+# las líneas base ya calculadas sin recalcularlas.
+#
+# Antes que los atípicos se marcan los errores de registro: tiempo real nulo,
+# negativo o faltante, tiempo real excesivo y espera negativa. Con datos que
+# pasaron por validacion.py los tiempos reales faltantes o negativos ya
+# quedaron en cuarentena (aquí solo llegan los nulos), y las esperas
+# negativas llegan para marcarse aquí.
+#------------------------
+import numpy as np
+import pandas as pd
+
+
+#------------------------
+# Constantes
+#------------------------
+UMBRAL_PUNTAJE = 3.5          # |z modificado| sobre el cual una ejecución es atípica
+MIN_MUESTRAS_BASE = 8         # Con menos ejecuciones se usa la línea base de todo el proceso
+FRACCION_MAD_MINIMA = 0.05    # Piso de la MAD como fracción de la mediana (grupos casi constantes)
+T_REAL_MAXIMO_MIN = 24 * 60   # Un proceso de más de un día se considera error de registro
+TODOS_LOS_TIPOS = "*"         # Tipo de baño de las líneas base por proceso
+
+ATIPICO_ALTO = "Atípico alto"
+ATIPICO_BAJO = "Atípico bajo"
+TIEMPO_INVALIDO = "Tiempo nulo o faltante"
+TIEMPO_EXCESIVO = "Tiempo excesivo"
+ESPERA_NEGATIVA = "Espera negativa"
+TIPOS_ANOMALIA = [TIEMPO_INVALIDO, TIEMPO_EXCESIVO, ESPERA_NEGATIVA, ATIPICO_ALTO, ATIPICO_BAJO]
+#------------------------
+# Fin de Constantes
+#------------------------
+
+
+#------------------------
+# Líneas Base
+#------------------------
+def _tiempos_validos(df):
+    t_real = df['T_Real_min']
+    return df[t_real.notna() & (t_real > 0) & (t_real <= T_REAL_MAXIMO_MIN)]
+
+
+def calcular_lineas_base(df):
+    """
+    Mediana, MAD y muestras de T_Real_min por (Proceso, Tipo_bano) y por
+    Proceso solo (Tipo_bano = TODOS_LOS_TIPOS), sobre los tiempos válidos.
+    """
+    validos = _tiempos_validos(df)[['Proceso', 'Tipo_bano', 'T_Real_min']]
+    todos = validos.assign(Tipo_bano=TODOS_LOS_TIPOS)
+
+    bases = []
+    for datos in (validos, todos):
+        claves = [datos['Proceso'], datos['Tipo_bano']]
+        mediana = datos.groupby(claves)['T_Real_min'].transform('median')
+        datos = datos.assign(Desvio=(datos['T_Real_min'] - mediana).abs())
+        bases.append(datos.groupby(['Proceso', 'Tipo_bano']).agg(
+            Mediana=('T_Real_min', 'median'),
+            MAD=('Desvio', 'median'),
+            Muestras=('T_Real_min', 'size')
+        ))
+    lineas_base = pd.concat(bases).sort_index()
+    lineas_base['MAD'] = np.maximum(lineas_base['MAD'], FRACCION_MAD_MINIMA * lineas_base['Mediana'])
+    return lineas_base
+#------------------------
+# Fin de Líneas Base
+#------------------------
+
+
+#------------------------
+# Puntaje de Ejecuciones
+#------------------------
+def puntuar(df, lineas_base):
+    """
+    Puntaje robusto y tipo de anomalía de cada fila de df (mismo índice), contra
+    líneas base ya calculadas. Sirve igual para el dataset completo que para
+    las filas nuevas de una carga incremental.
+    """
+    proceso = df['Proceso'].to_numpy()
+    por_tipo = lineas_base.index.get_indexer(pd.MultiIndex.from_arrays([proceso, df['Tipo_bano'].to_numpy()]))
+    por_proceso = lineas_base.index.get_indexer(
+        pd.MultiIndex.from_arrays([proceso, np.full(len(df), TODOS_LOS_TIPOS, dtype=object)])
+    )
+    # Fila -1 = sin línea base; con líneas base vacías (fragmento sin tiempos válidos) lo son todas
+    if lineas_base.empty:
+        fila_base = np.full(len(df), -1)
+    else:
+        muestras = lineas_base['Muestras'].to_numpy()
+        suficiente = (por_tipo >= 0) & (muestras[np.maximum(por_tipo, 0)] >= MIN_MUESTRAS_BASE)
+        fila_base = np.where(suficiente, por_tipo, por_proceso)
+    sin_base = fila_base < 0
+
+    mediana = np.full(len(df), np.nan)
+    mad = np.full(len(df), np.nan)
+    mediana[~sin_base] = lineas_base['Mediana'].to_numpy()[fila_base[~sin_base]]
+    mad[~sin_base] = lineas_base['MAD'].to_numpy()[fila_base[~sin_base]]
+
+    t_real = df['T_Real_min'].to_numpy(dtype=float)
+    t_espera = df['T_Espera_min'].to_numpy(dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        puntaje = 0.6745 * (t_real - mediana) / mad
+
+    invalido = ~np.isfinite(t_real) | (t_real <= 0)
+    excesivo = t_real > T_REAL_MAXIMO_MIN
+    anomalia = np.select(
+        [invalido, excesivo, t_espera < 0, puntaje > UMBRAL_PUNTAJE, puntaje < -UMBRAL_PUNTAJE],
+        TIPOS_ANOMALIA,
+        default=""
+    )
+
+    return pd.DataFrame({
+        'Mediana_Base': mediana,
+        'MAD_Base': mad,
+        'Puntaje': np.where(invalido | excesivo, np.nan, puntaje),
+        'Anomalia': anomalia,
+    }, index=df.index)
+
+
+def resumen_anomalias(df, puntuados):
+    """Ejecuciones marcadas con sus columnas de contexto, de mayor a menor |puntaje|."""
+    marcadas = puntuados[puntuados['Anomalia'] != ""]
+    columnas = ['Cod_bano', 'Fecha', 'Proceso', 'Tipo_bano', 'Operarios', 'T_Real_min', 'T_Espera_min', 'TT']
+    detalle = df.loc[marcadas.index, columnas].join(marcadas)
+    orden = np.argsort(-np.nan_to_num(detalle['Puntaje'].abs().to_numpy(), nan=np.inf), kind='stable')
+    return detalle.iloc[orden].reset_index(drop=True)
+#------------------------
+# Fin de Puntaje de Ejecuciones
+#------------------------
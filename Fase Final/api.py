@@ -0,0 +1,497 @@
+#------------------------
+# API HTTP de Solo Lectura
+#------------------------
+# Aplicación ASGI (asíncrona, sin framework) que sirve las mismas métricas del
+# dashboard para cualquier combinación de filtros, sobre la instantánea
+# vigente de refresco_datos.RefrescoDatos (la misma fuente y caché compartida
+# que app_streamlit.py, vía fuente_datos.py).
+#
+#   GET /api/version                      versión, fecha de la fuente, edificios y validación
+#   GET /api/kpis                         métricas clave filtradas
+#   GET /api/procesos?tipo_bano=B1        cumplimiento TT por proceso
+#   GET /api/operarios?tipo_bano=B1       métricas por operario
+#   GET /api/ejecuciones                  ejecuciones filtradas, paginadas
+#   GET /api/anomalias?anomalia=...       ejecuciones marcadas, paginadas
+#   GET /api/en_curso?instante=...        ejecuciones en curso (o entre desde y hasta),
+#                                         por proceso u operario, paginadas (hora local de la
+#                                         planta, sin zona horaria)
+#
+# Filtros (todos opcionales; las listas van separadas por coma o repetidas):
+# edificio (etiqueta de fragmentos, "Todos" por defecto), meses (AAAA-MM),
+# correlativos, tipo (tipo de baño agrupado) y pisos. Paginación: pagina
+# (desde 1) y tamano (hasta MAX_TAMANO_PAGINA).
+#
+# Cada respuesta lleva un ETag derivado de la versión del dataset y de la
+# consulta normalizada: con If-None-Match se responde 304 sin calcular nada.
+# Los cuerpos ya serializados se guardan en una caché LRU en memoria
+# (AXIS_API_CACHE respuestas); los cálculos corren en el pool de hilos para no
+# bloquear el ciclo de eventos, y peticiones iguales simultáneas esperan el
+# mismo cálculo.
+#
+#   python api.py --puerto 8000          (requiere uvicorn)
+#------------------------
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import sys
+from collections import OrderedDict
+from urllib.parse import parse_qsl
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import uvicorn
+except ImportError:
+    uvicorn = None
+
+import anomalias
+import fragmentos
+import fuente_datos
+import refresco_datos
+import validacion
+from analitica import filtrar, metricas_clave
+
+
+#------------------------
+# Configuración
+#------------------------
+MAX_RESPUESTAS_CACHE = int(os.environ.get("AXIS_API_CACHE", "2048"))
+TAMANO_PAGINA = 100
+MAX_TAMANO_PAGINA = 1000
+
+COLUMNAS_EJECUCION = [
+    'Correlativo', 'Cod_bano', 'Fecha', 'Proceso', 'Tipo_bano', 'Edificio', 'Piso', 'Operarios',
+    'T_Real_min', 'T_Espera_min', 'TT', 'Cumple_TT', 'Inicio', 'Fin',
+]
+#------------------------
+# Fin de Configuración
+#------------------------
+
+
+def disponible_servidor():
+    """Indica si uvicorn está instalado (para servir la API por HTTP)."""
+    return uvicorn is not None
+
+
+class ErrorPeticion(Exception):
+    """Parámetro inválido (400) o recurso inexistente (404)."""
+
+    def __init__(self, mensaje, estado=400):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+#------------------------
+# Serialización
+#------------------------
+def registros(df):
+    """Filas del DataFrame como diccionarios serializables (NaN como null, fechas ISO), columna por columna."""
+    columnas = {}
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            serie = serie.dt.strftime('%Y-%m-%dT%H:%M:%S')
+        valores = serie.to_numpy(dtype=object, copy=True)
+        valores[serie.isna().to_numpy()] = None
+        columnas[col] = valores.tolist()
+    return [dict(zip(columnas, fila)) for fila in zip(*columnas.values())]
+
+
+def _nativo(valor):
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return None
+    return valor
+
+
+def a_json(contenido):
+    """Bytes JSON del contenido (orjson si está instalado)."""
+    if orjson is not None:
+        return orjson.dumps(contenido, default=_nativo, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(contenido, default=_nativo, ensure_ascii=False, allow_nan=False).encode("utf-8")
+#------------------------
+# Fin de Serialización
+#------------------------
+
+
+#------------------------
+# Parámetros de Consulta
+#------------------------
+def _lista(parametros, nombre):
+    return [v.strip() for valor in parametros.get(nombre, []) for v in valor.split(",") if v.strip()]
+
+
+def _entero(parametros, nombre, defecto, minimo=1, maximo=None):
+    valores = parametros.get(nombre)
+    if not valores:
+        return defecto
+    try:
+        valor = int(valores[-1])
+    except ValueError:
+        raise ErrorPeticion(f"'{nombre}' debe ser un entero.")
+    if valor < minimo or (maximo is not None and valor > maximo):
+        raise ErrorPeticion(f"'{nombre}' debe estar entre {minimo} y {maximo if maximo is not None else '∞'}.")
+    return valor
+
+
+def _filtros(parametros):
+    """Filtros de la barra lateral desde la consulta, con los mismos nombres que MotorDuckDB.metricas_clave."""
+    try:
+        pisos = [int(p) for p in _lista(parametros, "pisos")]
+    except ValueError:
+        raise ErrorPeticion("'pisos' debe ser una lista de enteros.")
+    tipo = parametros.get("tipo", ["Todos"])[-1]
+    return {
+        'meses': _lista(parametros, "meses"),
+        'correlativos': _lista(parametros, "correlativos"),
+        'tipo_agrupado': tipo,
+        'pisos': pisos,
+    }
+
+
+def _momento(parametros, nombre):
+    valores = parametros.get(nombre)
+    if not valores:
+        return None
+    try:
+        momento = pd.Timestamp(valores[-1])
+    except ValueError:
+        raise ErrorPeticion(f"'{nombre}' debe ser una fecha y hora (AAAA-MM-DDTHH:MM).")
+    if momento.tzinfo is not None:
+        # Inicio y Fin se guardan en hora local de la planta, sin zona: no hay con qué convertir el desfase
+        raise ErrorPeticion(f"'{nombre}' debe ser hora local de la planta, sin zona horaria (sin Z ni +HH:MM).")
+    return momento
+
+
+def _fragmento(instantanea, parametros):
+    etiqueta = parametros.get("edificio", [fragmentos.TODOS])[-1]
+    particion = instantanea.datos['fragmentos']
+    if etiqueta not in particion.etiquetas():
+        raise ErrorPeticion(f"Edificio desconocido: {etiqueta}", estado=404)
+    return particion.obtener(etiqueta)
+
+
+def _pagina(df, parametros, columnas=None):
+    """Una página del DataFrame (solo columnas, si se indican) con el total de filas y páginas."""
+    tamano = _entero(parametros, "tamano", TAMANO_PAGINA, maximo=MAX_TAMANO_PAGINA)
+    pagina = _entero(parametros, "pagina", 1)
+    total = len(df)
+    inicio = (pagina - 1) * tamano
+    filas = df.iloc[inicio:inicio + tamano]
+    return {
+        'pagina': pagina,
+        'tamano': tamano,
+        'total': total,
+        'paginas': max(1, math.ceil(total / tamano)),
+        'datos': registros(filas if columnas is None else filas[columnas]),
+    }
+#------------------------
+# Fin de Parámetros de Consulta
+#------------------------
+
+
+#------------------------
+# Recursos
+#------------------------
+def recurso_version(instantanea, parametros):
+    return {
+        'version': instantanea.version,
+        'cargado_en': instantanea.cargado_en.isoformat(timespec='seconds'),
+        'fecha_fuente': instantanea.datos['fecha_fuente'].isoformat(timespec='seconds'),
+        'edificios': instantanea.datos['fragmentos'].etiquetas(),
+        'validacion': instantanea.datos['validacion'].reporte,
+    }
+
+
+def recurso_kpis(instantanea, parametros):
+    datos = _fragmento(instantanea, parametros)
+    filtros = _filtros(parametros)
+    if datos['motor'] is not None:
+        return datos['motor'].metricas_clave(**filtros)
+    return metricas_clave(filtrar(datos['df'], **filtros))
+
+
+def recurso_procesos(instantanea, parametros):
+    agregados = _fragmento(instantanea, parametros)['agregados']
+    tipo_bano = parametros.get("tipo_bano", [None])[-1]
+    if tipo_bano is None:
+        tabla = agregados['cumplimiento_proceso']
+    elif tipo_bano in agregados['cumplimiento_tipo']:
+        tabla = agregados['cumplimiento_tipo'][tipo_bano]
+    else:
+        raise ErrorPeticion(f"Tipo de baño desconocido: {tipo_bano}", estado=404)
+    return {'datos': registros(tabla.reset_index())}
+
+
+def recurso_operarios(instantanea, parametros):
+    agregados = _fragmento(instantanea, parametros)['agregados']
+    tipo_bano = parametros.get("tipo_bano", [None])[-1]
+    if tipo_bano is None:
+        tabla = agregados['metricas_operario']
+    elif tipo_bano in agregados['metricas_operario_tipo']:
+        tabla = agregados['metricas_operario_tipo'][tipo_bano]
+    else:
+        raise ErrorPeticion(f"Tipo de baño desconocido: {tipo_bano}", estado=404)
+    return {'datos': registros(tabla)}
+
+
+def recurso_ejecuciones(instantanea, parametros):
+    df = filtrar(_fragmento(instantanea, parametros)['df'], **_filtros(parametros))
+    return _pagina(df, parametros, COLUMNAS_EJECUCION)
+
+
+def recurso_anomalias(instantanea, parametros):
+    datos = _fragmento(instantanea, parametros)
+    # Se filtran solo las filas marcadas (pocas), no el fragmento completo
+    marcadas = datos['anomalias'][datos['anomalias']['Anomalia'] != ""]
+    df = filtrar(datos['df'].loc[marcadas.index], **_filtros(parametros))
+    detalle = anomalias.resumen_anomalias(df, marcadas.loc[df.index])
+    tipos = _lista(parametros, "anomalia")
+    if tipos:
+        detalle = detalle[detalle['Anomalia'].isin(tipos)]
+    return _pagina(detalle, parametros)
+
+
+def recurso_en_curso(instantanea, parametros):
+    datos = _fragmento(instantanea, parametros)
+    instante, desde, hasta = (_momento(parametros, n) for n in ("instante", "desde", "hasta"))
+    proceso = parametros.get("proceso", [None])[-1]
+    operario = parametros.get("operario", [None])[-1]
+    if proceso is not None and operario is not None:
+        raise ErrorPeticion("Indique 'proceso' u 'operario', no ambos.")
+    indice, clave = (datos['intervalos_operario'], operario) if operario is not None else (datos['intervalos_proceso'], proceso)
+
+    if instante is not None:
+        df = indice.en_instante(instante, clave)
+    elif desde is not None and hasta is not None:
+        if hasta <= desde:
+            raise ErrorPeticion("'hasta' debe ser posterior a 'desde'.")
+        df = indice.en_rango(desde, hasta, clave)
+    else:
+        raise ErrorPeticion("Indique 'instante' o bien 'desde' y 'hasta'.")
+    return _pagina(df, parametros, COLUMNAS_EJECUCION)
+
+
+RUTAS = {
+    "/api/version": recurso_version,
+    "/api/kpis": recurso_kpis,
+    "/api/procesos": recurso_procesos,
+    "/api/operarios": recurso_operarios,
+    "/api/ejecuciones": recurso_ejecuciones,
+    "/api/anomalias": recurso_anomalias,
+    "/api/en_curso": recurso_en_curso,
+}
+#------------------------
+# Fin de Recursos
+#------------------------
+
+
+#------------------------
+# Aplicación ASGI
+#------------------------
+class CacheRespuestas:
+    """Cuerpos ya serializados por clave, con desalojo LRU; se vacía al cambiar la versión del dataset."""
+
+    def __init__(self, max_entradas=MAX_RESPUESTAS_CACHE):
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._version = None
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, version, clave):
+        if version != self._version:
+            self._entradas.clear()
+            self._version = version
+        respuesta = self._entradas.get(clave)
+        if respuesta is None:
+            self.fallos += 1
+            return None
+        self._entradas.move_to_end(clave)
+        self.aciertos += 1
+        return respuesta
+
+    def guardar(self, version, clave, respuesta):
+        if version != self._version or self.max_entradas <= 0:
+            return
+        self._entradas[clave] = respuesta
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+class ApiMetricas:
+    """Aplicación ASGI de solo lectura sobre un RefrescoDatos."""
+
+    def __init__(self, refresco, max_respuestas=MAX_RESPUESTAS_CACHE):
+        self.refresco = refresco
+        self.cache = CacheRespuestas(max_respuestas)
+        self._pendientes = {}
+        self._cargado = False
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._ciclo_vida(receive, send)
+        elif scope['type'] == 'http':
+            await self._atender(scope, send)
+
+    async def _ciclo_vida(self, receive, send):
+        while True:
+            mensaje = await receive()
+            if mensaje['type'] == 'lifespan.startup':
+                try:
+                    await self._instantanea()
+                except validacion.ErrorValidacion as error:
+                    # La API arranca igual y responde 503 hasta que llegue un archivo válido
+                    print(f"No se pudieron cargar los datos: {error}", file=sys.stderr)
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensaje['type'] == 'lifespan.shutdown':
+                self.refresco.detener()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _instantanea(self):
+        # Solo la primera carga puede tardar; después actual() devuelve la instantánea publicada
+        if not self._cargado:
+            instantanea = await asyncio.get_running_loop().run_in_executor(None, self.refresco.actual)
+            self._cargado = True
+            return instantanea
+        return self.refresco.actual()
+
+    async def _atender(self, scope, send):
+        if scope['method'] not in ('GET', 'HEAD'):
+            await responder_json(send, 405, {'error': "Solo se permiten GET y HEAD."}, extra=[(b"allow", b"GET, HEAD")])
+            return
+        recurso = RUTAS.get(scope['path'].rstrip('/'))
+        if recurso is None:
+            await responder_json(send, 404, {'error': f"Ruta desconocida: {scope['path']}"})
+            return
+
+        try:
+            instantanea = await self._instantanea()
+        except validacion.ErrorValidacion as error:
+            await responder_json(send, 503, {'error': f"No se pudieron cargar los datos: {error}"})
+            return
+
+        pares = sorted(parse_qsl(scope['query_string'].decode('utf-8')))
+        clave = scope['path'].rstrip('/') + "?" + "&".join(f"{n}={v}" for n, v in pares)
+        etag = '"' + hashlib.sha1(f"{instantanea.version}|{clave}".encode('utf-8')).hexdigest()[:20] + '"'
+
+        si_no_coincide = _encabezado(scope, b"if-none-match")
+        if si_no_coincide is not None and (si_no_coincide.strip() == "*" or etag in si_no_coincide):
+            await _enviar(send, 304, b"", etag, scope['method'])
+            return
+
+        respuesta = self.cache.obtener(instantanea.version, clave)
+        if respuesta is None:
+            respuesta = await self._calcular(recurso, instantanea, clave, pares)
+        estado, cuerpo = respuesta
+        await _enviar(send, estado, cuerpo, etag if estado == 200 else None, scope['method'])
+
+    async def _calcular(self, recurso, instantanea, clave, pares):
+        """Calcula (en el pool de hilos) y guarda la respuesta; peticiones iguales en curso esperan la misma."""
+        pendiente = self._pendientes.get((instantanea.version, clave))
+        if pendiente is not None:
+            return await asyncio.shield(pendiente)
+
+        parametros = {}
+        for nombre, valor in pares:
+            parametros.setdefault(nombre, []).append(valor)
+
+        def calcular():
+            try:
+                contenido = recurso(instantanea, parametros)
+            except ErrorPeticion as error:
+                return error.estado, a_json({'error': str(error)})
+            if isinstance(contenido, dict):
+                contenido = {'version': instantanea.version, **contenido}
+            return 200, a_json(contenido)
+
+        futuro = asyncio.get_running_loop().run_in_executor(None, calcular)
+        self._pendientes[(instantanea.version, clave)] = futuro
+        try:
+            respuesta = await futuro
+        finally:
+            self._pendientes.pop((instantanea.version, clave), None)
+        if respuesta[0] == 200:
+            self.cache.guardar(instantanea.version, clave, respuesta)
+        return respuesta
+
+
+def _encabezado(scope, nombre):
+    for clave, valor in scope.get('headers', []):
+        if clave == nombre:
+            return valor.decode('latin-1')
+    return None
+
+
+async def _enviar(send, estado, cuerpo, etag, metodo='GET'):
+    encabezados = [
+        (b"content-type", b"application/json; charset=utf-8"),
+        (b"content-length", str(len(cuerpo)).encode()),
+        (b"cache-control", b"no-cache"),
+    ]
+    if etag is not None:
+        encabezados.append((b"etag", etag.encode()))
+    await send({'type': 'http.response.start', 'status': estado, 'headers': encabezados})
+    await send({'type': 'http.response.body', 'body': b"" if metodo == 'HEAD' else cuerpo})
+
+
+async def responder_json(send, estado, contenido, extra=()):
+    """Respuesta JSON sin ETag (errores y respuestas que no se guardan en caché)."""
+    cuerpo = a_json(contenido)
+    await send({'type': 'http.response.start', 'status': estado, 'headers': [
+        (b"content-type", b"application/json; charset=utf-8"),
+        (b"content-length", str(len(cuerpo)).encode()),
+        *extra,
+    ]})
+    await send({'type': 'http.response.body', 'body': cuerpo})
+
+
+def refresco_excel(ruta_datos="Datos_Banos.xlsx", ruta_variantes="variantes_correctas.csv"):
+    """RefrescoDatos sobre el Excel; la API nunca revisa la fuente dentro de una petición, siempre hay hilo."""
+    fuente = fuente_datos.FuenteExcel(ruta_datos, ruta_variantes)
+    intervalo = refresco_datos.INTERVALO_REFRESCO if refresco_datos.INTERVALO_REFRESCO > 0 else 30
+    return refresco_datos.RefrescoDatos(fuente.version, fuente.construir, intervalo=intervalo)
+
+
+def crear_app(refresco=None, max_respuestas=MAX_RESPUESTAS_CACHE):
+    """Aplicación ASGI sobre refresco (por defecto, Datos_Banos.xlsx del directorio actual)."""
+    return ApiMetricas(refresco if refresco is not None else refresco_excel(), max_respuestas)
+#------------------------
+# Fin de Aplicación ASGI
+#------------------------
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP de solo lectura con las métricas del dashboard.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--datos", default="Datos_Banos.xlsx")
+    parser.add_argument("--variantes", default="variantes_correctas.csv")
+    args = parser.parse_args(argv)
+
+    if not disponible_servidor():
+        print("uvicorn no está instalado: pip install uvicorn", file=sys.stderr)
+        return 1
+
+    app = crear_app(refresco_excel(args.datos, args.variantes))
+    uvicorn.run(app, host=args.host, port=args.puerto, log_level="warning", access_log=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,16 +6,41 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from sklearn.linear_model import LinearRegression
 from plotly.subplots import make_subplots
-import re
 import os
 import sys
+import simulacion
+import instrumentacion
+import cache_compartido
+import refresco_datos
+import afinidad
+import anomalias
+import validacion
+import fragmentos
+import fuente_datos
+import intervalos
+import paquete_datos
+import cohortes
+from instrumentacion import medir, medido
+from analitica import (
+    format_time_from_minutes, filas_correlativo, detalle_correlativo, filtrar, metricas_clave
+)
+from graficos import (
+    tabla_secuencia, tabla_cumplimiento, figura_pie_cumplimiento, figura_gantt_procesos, figura_gantt_global,
+    usar_modo_compacto, reducir_serie, MAX_PUNTOS_SERIE, MODO_RENDER,
+    figura_barras_operario, figura_desglose_procesos, tabla_comparacion, figura_comparacion_mensual,
+    figura_matriz_afinidad, figura_similitud_operarios
+)
 #------------------------
 # Fin de Importación de Librerías
 #------------------------
 
 
+instrumentacion.iniciar_ejecucion()
+
+
 #------------------------
 # Funciones de Utilidad
 #------------------------
@@ -29,36 +54,15 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
-def format_time_from_minutes(minutes):
-    """Convierte minutos a un string en formato hh:mm:ss."""
-    if pd.isna(minutes) or not np.isfinite(minutes):
-        return "00:00:00"
-    
-    td = pd.to_timedelta(minutes, unit='m')
-    total_seconds = int(td.total_seconds())
-    hours, remainder = divmod(total_seconds, 3600)
-    mins, secs = divmod(remainder, 60)
-    return f"{hours:02d}:{mins:02d}:{secs:02d}"
+@medido("plotly_chart")
+def mostrar_grafico(fig, **kwargs):
+    """st.plotly_chart medido (incluye la serialización de la figura)."""
+    return st.plotly_chart(fig, **kwargs)
 #------------------------
 # Fin de Funciones de Utilidad
 #------------------------
 
 
-#------------------------
-# Funciones Específicas de la App
-#------------------------
-def month_to_spanish(month_num):
-    """Convierte el número del mes a su nombre en español."""
-    return {
-        1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril", 5: "Mayo", 6: "Junio",
-        7: "Julio", 8: "Agosto", 9: "Septiembre", 10: "Octubre", 11: "Noviembre", 12: "Diciembre"
-    }.get(month_num, "Mes Desconocido")
-
-#------------------------
-# Fin de Funciones Específicas de la App
-#------------------------
-
-
 #------------------------
 # Definición de Constantes y Nombres de Columnas
 #------------------------
@@ -66,6 +70,9 @@ COL_T_REAL_MIN = "T_Real_min"
 COL_T_ESPERA_MIN = "T_Espera_min"
 COL_T_ACUMULADO = "T_Real_Acumulado" 
 COL_LEAD_TIME_MIN = 'Lead_Time_min' 
+
+# Motor de consultas: "pandas" (por defecto) o "duckdb" (requiere el paquete duckdb)
+MOTOR_ANALITICO = fuente_datos.MOTOR_ANALITICO
 #------------------------
 # Fin de Definición de Constantes y Nombres de Columnas
 #------------------------
@@ -74,44 +81,69 @@ COL_LEAD_TIME_MIN = 'Lead_Time_min'
 #------------------------
 # Carga y Pre-procesamiento de Datos
 #------------------------
-@st.cache_data
-def load_data():
-    data_path = resource_path("Datos_Banos.xlsx")
-    df = pd.read_excel(data_path, engine="openpyxl")
-
-    # PRE-PROCESAMIENTO DE DATOS
-    df["Fecha"] = pd.to_datetime(df["Fecha"], dayfirst=False, errors="coerce")
-
-    # Crear la columna 'Tipo_bano_agrupado' para el filtro agrupado
-    df['Tipo_bano_agrupado'] = df['Tipo_bano'].apply(lambda x: re.match(r'B\d+', x).group(0) if re.match(r'B\d+', x) else x)
-
-    # Operarios concatenados
-    df["Operarios_list"] = df[["Operario_1","Operario_2","Operario_3"]].apply(
-        lambda x: [p.strip() for p in x if isinstance(p,str) and p.strip() != ""], axis=1
-    )
-    df["Operarios"] = df["Operarios_list"].apply(lambda x: ", ".join(x))
-    
-    # --- Asignación de Tiempos en Horas y Minutos ---
-    # Se asignan las columnas de horas desde el Excel a los nombres usados en el app
-    df['T_Real_hr'] = df['T_Real_horas']
-    df['T_Espera_hr'] = df['T_Espera_horas']
-
-    # Calcular el Lead Time (Ciclo) por Baño en MINUTOS
-    df_max_corr_min = df.groupby('Cod_bano')[COL_T_ACUMULADO].max().reset_index()
-    df_max_corr_min.columns = ['Cod_bano', COL_LEAD_TIME_MIN]
-    df = pd.merge(df, df_max_corr_min, on='Cod_bano', how='left')
-
-    # Calcular el Lead Time (Ciclo) por Baño en HORAS
-    df_max_corr_hr = df.groupby('Cod_bano')['T_Real_Acumulado_horas'].max().reset_index()
-    df_max_corr_hr.columns = ['Cod_bano', 'Lead_Time_hr']
-    df = pd.merge(df, df_max_corr_hr, on='Cod_bano', how='left')
-
-    # Columnas numéricas para análisis de cumplimiento
-    df['Cumple_Num'] = df['Cumple_TT'].astype(int)
-
-    return df
-
-df = load_data()
+# Lectura, validación y derivados en fuente_datos.py (compartidos con la API HTTP). Un paquete exportado
+# con paquete_datos.py (AXIS_PAQUETE, o Datos_Banos.axis cuando no está el Excel) se abre sin validar ni
+# pre-procesar nada.
+RUTA_DATOS = resource_path("Datos_Banos.xlsx")
+RUTA_PAQUETE = os.environ.get("AXIS_PAQUETE") or resource_path("Datos_Banos" + paquete_datos.EXTENSION)
+if paquete_datos.disponible() and os.path.exists(RUTA_PAQUETE) and (
+        "AXIS_PAQUETE" in os.environ or not os.path.exists(RUTA_DATOS)):
+    FUENTE = paquete_datos.FuentePaquete(RUTA_PAQUETE, MOTOR_ANALITICO)
+else:
+    FUENTE = fuente_datos.FuenteExcel(RUTA_DATOS, resource_path("variantes_correctas.csv"), MOTOR_ANALITICO)
+
+@st.cache_resource
+def obtener_refresco():
+    """Refresco de datos del proceso (uno solo, compartido por todas las sesiones)."""
+    return refresco_datos.RefrescoDatos(FUENTE.version, FUENTE.construir)
+
+@st.cache_data(max_entries=128)
+def obtener_detalle_correlativo(version, correlativo, _indice):
+    """Métricas, secuencia y Gantt de un correlativo; caché acotada a los más consultados."""
+    ordenado, rangos = _indice
+    return detalle_correlativo(filas_correlativo(ordenado, rangos, correlativo))
+
+@st.cache_data(max_entries=4)
+def obtener_indice_operarios(version, _df):
+    """Pares (ejecución, operario) de la vista global, una vez por versión (Modo comparación)."""
+    return cohortes.indice_operarios(_df)
+
+@st.cache_data(max_entries=32)
+def obtener_comparacion(version, filtros_a, filtros_b, _particion):
+    """Métricas de las dos cohortes en una sola pasada sobre la vista global."""
+    df_global = _particion.obtener(fragmentos.TODOS)['df']
+    mascaras = [
+        cohortes.mascara_cohorte(df_global, filtros, _particion.posiciones(filtros['fragmento']))
+        for filtros in (filtros_a, filtros_b)
+    ]
+    return cohortes.comparar(df_global, mascaras, obtener_indice_operarios(version, df_global))
+
+with medir("load_data"):
+    refresco = obtener_refresco()
+    try:
+        instantanea = refresco.actual()
+    except validacion.ErrorValidacion as error:
+        st.error(f"No se pudieron cargar los datos: {error}")
+        st.stop()
+    version = instantanea.version
+    particion = instantanea.datos['fragmentos']
+
+    # Fragmento elegido en la barra lateral (se lee antes de dibujarla para cargar solo ese edificio)
+    if st.session_state.get('fragmento_sel') not in particion.etiquetas():
+        st.session_state.fragmento_sel = fragmentos.TODOS
+    fragmento_sel = st.session_state.fragmento_sel
+    datos = particion.obtener(fragmento_sel)
+
+    df = datos['df']
+    df_por_correlativo, rangos_correlativo = datos['indice_correlativo']
+    motor = datos['motor']
+    agregados = datos['agregados']
+    matriz_afinidad = datos['afinidad']
+    lineas_base = datos['lineas_base']
+    df_anomalias = datos['anomalias']
+    ocupacion_operarios = datos['ocupacion_operarios']
+    catalogo = datos['catalogo']
+    metadatos = datos['metadatos']
 #------------------------
 # Fin de Carga y Pre-procesamiento de Datos
 #------------------------
@@ -129,6 +161,22 @@ with col1:
     st.image(logo_path, width=200)
 with col2:
     st.title("Dashboard Productividad en Procesos - Baños")
+    estado_datos = f"Datos al {instantanea.datos['fecha_fuente']:%d/%m/%Y %H:%M}"
+    if refresco.actualizando:
+        estado_datos += " · actualizando en segundo plano..."
+    st.caption(estado_datos)
+
+reporte_validacion = instantanea.datos['validacion'].reporte
+if reporte_validacion['filas_cuarentena'] > 0:
+    with st.expander(
+        f"⚠️ {reporte_validacion['filas_cuarentena']} de {reporte_validacion['filas_totales']} filas "
+        "quedaron fuera del análisis por errores de datos"
+    ):
+        st.dataframe(
+            pd.Series(reporte_validacion['motivos'], name="Filas").rename_axis("Motivo").reset_index(),
+            hide_index=True
+        )
+        st.dataframe(instantanea.datos['validacion'].cuarentena, hide_index=True, use_container_width=True)
 
 st.markdown("---")
 #------------------------
@@ -139,36 +187,36 @@ st.markdown("---")
 #------------------------
 # Barra Lateral y Filtros
 #------------------------
-# Preparar meses_map antes de la barra lateral para inicialización de session_state
-df['AñoMes'] = df['Fecha'].dt.strftime('%Y-%m')
-unique_months = sorted(df["AñoMes"].unique(), reverse=True)
-meses_map = {
-    f"{month_to_spanish(int(ym.split('-')[1]))}, {ym.split('-')[0]}": ym
-    for ym in unique_months
-}
+# Opciones precalculadas del fragmento (metadatos de la versión): etiqueta del mes -> AAAA-MM
+meses_map = metadatos.meses
 
 with st.sidebar:
     st.header("Filtros de Análisis")
+    st.caption(f"Datos del {metadatos.fecha_min:%d/%m/%Y} al {metadatos.fecha_max:%d/%m/%Y}")
 
     # Initialize session state for filters to avoid warnings
     if 'tipo_analisis_temporal' not in st.session_state:
         st.session_state.tipo_analisis_temporal = 'Análisis Completo (Todos los Meses)'
     if 'meses_sel' not in st.session_state:
-        st.session_state.meses_sel = list(meses_map.keys())
+        st.session_state.meses_sel = list(metadatos.etiquetas_meses)
     if 'correlativos_sel' not in st.session_state:
         st.session_state.correlativos_sel = []
     if 'tipo_bano_agrupado_sel' not in st.session_state:
         st.session_state.tipo_bano_agrupado_sel = "Todos"
+    if 'pisos_sel' not in st.session_state:
+        st.session_state.pisos_sel = []
 
-    # --- Filtro Temporal Refinado ---
-    # meses_map ya definido arriba
+    # --- Edificio (fragmento del dataset) ---
+    st.selectbox("Edificio", particion.etiquetas(), key='fragmento_sel')
 
     # --- Lógica para el botón de reseteo ---
     def reset_filters():
-        st.session_state.meses_sel = list(meses_map.keys())
+        st.session_state.meses_sel = list(metadatos.etiquetas_meses)
         st.session_state.correlativos_sel = []
         st.session_state.tipo_bano_agrupado_sel = "Todos"
         st.session_state.tipo_analisis_temporal = 'Análisis Completo (Todos los Meses)'
+        st.session_state.fragmento_sel = fragmentos.TODOS
+        st.session_state.pisos_sel = []
 
     tipo_analisis_temporal = st.radio(
         "Seleccione el tipo de análisis temporal",
@@ -177,9 +225,11 @@ with st.sidebar:
     )
 
     if tipo_analisis_temporal == 'Selección por Mes Específico':
+        # Al cambiar de edificio pueden quedar seleccionados meses que ese edificio no tiene
+        st.session_state.meses_sel = [m for m in st.session_state.meses_sel if m in meses_map]
         meses_sel_display = st.multiselect(
             "Seleccione Mes(es) de Ciclo",
-            options=list(meses_map.keys()),
+            options=metadatos.etiquetas_meses,
             key='meses_sel'
         )
         meses_sel = [meses_map[m] for m in meses_sel_display]
@@ -188,20 +238,34 @@ with st.sidebar:
 
     # --- Otros Filtros ---
     # Correlativo
-    unique_vals = df["Correlativo"].dropna().unique().tolist()
+    st.session_state.correlativos_sel = [
+        c for c in st.session_state.correlativos_sel if c in metadatos.conjunto_correlativos
+    ]
+    correlativos_sel = st.multiselect("Correlativo(s)", metadatos.correlativos, key='correlativos_sel')
 
-    def _sort_key(v):
-        try:
-            return (0, float(v))
-        except Exception:
-            return (1, str(v))
+    # Tipo de Baño (Agrupado)
+    if st.session_state.tipo_bano_agrupado_sel not in metadatos.tipos_agrupados:
+        st.session_state.tipo_bano_agrupado_sel = "Todos"
+    tipo_bano_agrupado_sel = st.selectbox("Tipo baño (Agrupado)", metadatos.tipos_agrupados, key='tipo_bano_agrupado_sel')
 
-    todos_correlativos = [str(v) for v in sorted(unique_vals, key=_sort_key)]
-    correlativos_sel = st.multiselect("Correlativo(s)", todos_correlativos, key='correlativos_sel')
+    # Piso
+    st.session_state.pisos_sel = [p for p in st.session_state.pisos_sel if p in metadatos.conjunto_pisos]
+    pisos_sel = st.multiselect("Piso(s)", metadatos.pisos, key='pisos_sel')
 
-    # Tipo de Baño (Agrupado)
-    grouped_bano_options = ["Todos"] + sorted(df["Tipo_bano_agrupado"].unique().tolist())
-    tipo_bano_agrupado_sel = st.selectbox("Tipo baño (Agrupado)", grouped_bano_options, key='tipo_bano_agrupado_sel')
+    # --- Modo comparación: una segunda cohorte con sus propios filtros ---
+    st.markdown("---")
+    modo_comparacion = st.toggle(
+        "Modo comparación", key='modo_comparacion',
+        help="Compara los filtros de arriba (cohorte A) con una segunda selección (cohorte B) en la misma vista."
+    )
+    if modo_comparacion:
+        metadatos_global = particion.obtener(fragmentos.TODOS)['metadatos']
+        st.caption("Cohorte B (vacío = sin filtrar)")
+        fragmento_b = st.selectbox("Edificio (B)", particion.etiquetas(), key='cmp_fragmento_sel')
+        meses_b_display = st.multiselect("Mes(es) de Ciclo (B)", metadatos_global.etiquetas_meses, key='cmp_meses_sel')
+        correlativos_b = st.multiselect("Correlativo(s) (B)", metadatos_global.correlativos, key='cmp_correlativos_sel')
+        tipo_agrupado_b = st.selectbox("Tipo baño (Agrupado) (B)", metadatos_global.tipos_agrupados, key='cmp_tipo_sel')
+        pisos_b = st.multiselect("Piso(s) (B)", metadatos_global.pisos, key='cmp_pisos_sel')
 
     # --- Botón de Reseteo ---
     st.markdown("---")
@@ -215,19 +279,25 @@ with st.sidebar:
 #------------------------
 # Aplicación de Filtros al DataFrame
 #------------------------
-    df_filt = df.copy()
-
-    # Filtro por meses
-    if tipo_analisis_temporal == 'Selección por Mes Específico' and len(meses_sel) > 0:
-        df_filt = df_filt[df_filt["AñoMes"].isin(meses_sel)]
+    with medir("Filtros"):
+        meses_filtro = meses_sel if tipo_analisis_temporal == 'Selección por Mes Específico' else []
 
-    # Filtro por correlativo
-    if len(correlativos_sel) > 0:
-        df_filt = df_filt[df_filt["Correlativo"].astype(str).isin(correlativos_sel)]
+        # Con DuckDB los filtros se aplican dentro de la consulta de métricas; no se copia el DataFrame
+        if motor is None:
+            df_filt = filtrar(df, meses_filtro, correlativos_sel, tipo_bano_agrupado_sel, pisos_sel)
 
-    # Filtro por tipo de baño agrupado
-    if tipo_bano_agrupado_sel != "Todos":
-        df_filt = df_filt[df_filt["Tipo_bano_agrupado"] == tipo_bano_agrupado_sel]
+        # Cohortes A (la selección actual) y B, calculadas juntas con una columna de cohorte
+        comparacion = None
+        if modo_comparacion:
+            filtros_a = {
+                'fragmento': fragmento_sel, 'meses': meses_filtro, 'correlativos': correlativos_sel,
+                'tipo_agrupado': tipo_bano_agrupado_sel, 'pisos': pisos_sel
+            }
+            filtros_b = {
+                'fragmento': fragmento_b, 'meses': [metadatos_global.meses[m] for m in meses_b_display],
+                'correlativos': correlativos_b, 'tipo_agrupado': tipo_agrupado_b, 'pisos': pisos_b
+            }
+            comparacion = obtener_comparacion(version, filtros_a, filtros_b, particion)
 
 #------------------------
 # FIN Aplicación de filtros
@@ -250,17 +320,23 @@ with st.sidebar:
 #------------------------
 # Cálculo de Métricas Clave (usando DataFrame filtrado)
 #------------------------
-    banos_terminados = df_filt['Cod_bano'].nunique()
-
-    if banos_terminados > 0:
-        avg_lead_time = df_filt.drop_duplicates(subset='Cod_bano')[COL_LEAD_TIME_UNIT].mean()
-        avg_procesos_por_bano = len(df_filt) / banos_terminados
-    else:
-        avg_lead_time = 0
-        avg_procesos_por_bano = 0
+    with medir("Métricas Clave"):
+        if comparacion is not None:
+            # La cohorte A es la selección actual: sus KPIs ya salieron de la pasada de comparación
+            kpis = cohortes.metricas_cohorte(comparacion, "A")
+        elif motor is not None:
+            kpis = motor.metricas_clave(
+                meses=meses_filtro, correlativos=correlativos_sel, tipo_agrupado=tipo_bano_agrupado_sel,
+                pisos=pisos_sel
+            )
+        else:
+            kpis = metricas_clave(df_filt)
 
-    avg_t_real = df_filt[COL_T_REAL_UNIT].mean() if len(df_filt) > 0 else 0
-    avg_pct_cumple = df_filt['Cumple_Num'].mean() * 100 if len(df_filt) > 0 else 0
+        banos_terminados = kpis['banos_terminados']
+        avg_lead_time = kpis['avg_lead_time']
+        avg_procesos_por_bano = kpis['avg_procesos_por_bano']
+        avg_t_real = kpis['avg_t_real']
+        avg_pct_cumple = kpis['avg_pct_cumple']
 #------------------------
 # FIN Cálculo de Métricas Clave
 #------------------------
@@ -282,6 +358,33 @@ col4.metric("Tiempo Promedio de Proceso", format_time_from_minutes(avg_t_real))
 col5.metric("Tasa de Cumplimiento General", f"{avg_pct_cumple:.1f}%",
             help="Porcentaje promedio de procesos que cumplen con el Takt Time en los baños filtrados.")
 
+if comparacion is not None:
+    kpis_b = cohortes.metricas_cohorte(comparacion, "B")
+    st.subheader("Comparación de Cohortes")
+    st.caption(f"**A:** {cohortes.describir(filtros_a)} · **B:** {cohortes.describir(filtros_b)} "
+               f"(diferencias B − A; valor p < {cohortes.ALFA} = significativa)")
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Baños Terminados (B)", kpis_b['banos_terminados'],
+                delta=int(kpis_b['banos_terminados'] - banos_terminados))
+    col2.metric("Tiempo promedio de fabricación (B)", format_time_from_minutes(kpis_b['avg_lead_time']),
+                delta=f"{kpis_b['avg_lead_time'] - avg_lead_time:+.1f} min", delta_color="inverse")
+    col3.metric("Procesos Promedio por Baño (B)", f"{kpis_b['avg_procesos_por_bano']:.1f}",
+                delta=f"{kpis_b['avg_procesos_por_bano'] - avg_procesos_por_bano:+.1f}", delta_color="off")
+    col4.metric("Tiempo Promedio de Proceso (B)", format_time_from_minutes(kpis_b['avg_t_real']),
+                delta=f"{kpis_b['avg_t_real'] - avg_t_real:+.1f} min", delta_color="inverse")
+    col5.metric("Tasa de Cumplimiento General (B)", f"{kpis_b['avg_pct_cumple']:.1f}%",
+                delta=f"{kpis_b['avg_pct_cumple'] - avg_pct_cumple:+.1f} pp")
+    with st.expander("Pruebas de significancia de las métricas clave"):
+        st.dataframe(comparacion['pruebas_kpis'].round(3), hide_index=True, use_container_width=True)
+
+# Métricas de cada edificio desde sus sumas parciales (no requiere construir los fragmentos)
+with st.expander("Métricas por edificio (sin filtros)"):
+    st.dataframe(
+        instantanea.datos['resumen_fragmentos'].round(1),
+        hide_index=True,
+        use_container_width=True
+    )
+
 st.markdown("---")
 #------------------------
 # FIN Visualización de Métricas Clave
@@ -291,8 +394,9 @@ st.markdown("---")
 #------------------------
 # Creación de Pestañas (Tabs)
 #------------------------
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-    "Cronología y Distribución", "Análisis por Correlativo", "Análisis por Proceso", "Análisis por Operario", "Evolución Temporal", "Eficiencia Operarios"
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
+    "Cronología y Distribución", "Análisis por Correlativo", "Análisis por Proceso", "Análisis por Operario", "Evolución Temporal", "Eficiencia Operarios",
+    "Simulación Takt Time", "Anomalías"
 ])
 #------------------------
 # Fin de Creación de Pestañas (Tabs)
@@ -317,6 +421,9 @@ if st.session_state.tipo_analisis_temporal == 'Selección por Mes Específico':
         # Filtrar por el grupo seleccionado
         df_tab1_filtered = df_tab1_filtered[df_tab1_filtered["Tipo_bano_agrupado"] == st.session_state.tipo_bano_agrupado_sel]
 
+if st.session_state.pisos_sel:
+    df_tab1_filtered = df_tab1_filtered[df_tab1_filtered["Piso"].isin(st.session_state.pisos_sel)]
+
 if df_tab1_filtered.empty:
     st.warning("No hay datos con los filtros seleccionados para 'Cronología y Distribución'. Ajuste los filtros.")
     # No st.stop() aquí para permitir que otras pestañas se carguen con el df completo
@@ -328,15 +435,19 @@ if df_tab1_filtered.empty:
 #------------------------
 # Pestaña 1: Dashboard Principal
 #------------------------
-with tab1:
+with tab1, medir("Pestaña 1"):
     #------------------------
     # Pestaña 1 - Gráfico Gantt
     #------------------------
     st.subheader("Cronología General de Baños (Gantt)")
 
-    gantt_df = df_tab1_filtered.groupby('Correlativo').agg(
-        Inicio=('Fecha', 'min'),
-        Término=('Fecha', 'max'),
+    # Con Inicio/Fin reales la cronología llega a la hora; sin ellos, al día (Fecha)
+    gantt_df = df_tab1_filtered.assign(
+        Inicio=df_tab1_filtered['Inicio'].fillna(df_tab1_filtered['Fecha']),
+        Término=df_tab1_filtered['Fin'].fillna(df_tab1_filtered['Fecha'])
+    ).groupby('Correlativo').agg(
+        Inicio=('Inicio', 'min'),
+        Término=('Término', 'max'),
         Tipo_bano=('Tipo_bano', 'first')
     ).reset_index()
 
@@ -347,57 +458,8 @@ with tab1:
     gantt_df['Correlativo_str'] = gantt_df['Correlativo_num'].astype(int).astype(str)
 
     if not gantt_df.empty:
-        fig_gantt = px.timeline(
-            gantt_df,
-            x_start="Inicio",
-            x_end="Término",
-            y="Correlativo_str",
-            title="Línea de Tiempo de Fabricación por Baño",
-            color="Correlativo_str",
-            hover_data=['Tipo_bano']
-        )
-
-        # ---- FONDO ALTERNADO POR MES (blanco / gris) ----
-        min_date = gantt_df['Inicio'].min().replace(day=1)
-        max_date = gantt_df['Término'].max().replace(day=1) + pd.offsets.MonthEnd(1)
-
-        month_edges = pd.date_range(min_date, max_date, freq='MS')
-
-        shapes = []
-        toggle = True  # alternador blanco/gris
-
-        for i in range(len(month_edges)-1):
-            start_m = month_edges[i]
-            end_m = month_edges[i+1]
-
-            shapes.append(dict(
-                type="rect",
-                xref="x",
-                yref="paper",
-                x0=start_m,
-                x1=end_m,
-                y0=0,
-                y1=1,
-                fillcolor="white" if toggle else "LightGray",
-                opacity=0.4,
-                layer="below",
-                line_width=0
-            ))
-            
-            toggle = not toggle  # alterna colores
-
-        fig_gantt.update_layout(shapes=shapes)
-        # ---- FIN FONDO POR MES ----
-        
-        fig_gantt.update_yaxes(autorange="reversed", title="Correlativo")
-        fig_gantt.update_layout(
-            xaxis_title="Fecha",
-            height=max(500, len(gantt_df) * 10),
-            plot_bgcolor='white',
-            xaxis=dict(showgrid=True, gridwidth=1, gridcolor='LightGray'),
-            yaxis=dict(showgrid=True, gridwidth=1, gridcolor='LightGray')
-        )
-        st.plotly_chart(fig_gantt, use_container_width=True)
+        fig_gantt = figura_gantt_global(gantt_df)
+        mostrar_grafico(fig_gantt, use_container_width=True)
     else:
         st.info("No hay datos de correlativos para mostrar en el gráfico Gantt.")
     #------------------------
@@ -429,13 +491,6 @@ with tab1:
     total = tipo_bano_counts['Cantidad'].sum()
     tipo_bano_counts['Porcentaje'] = tipo_bano_counts['Cantidad'] / total
 
-    # Orden natural B1, B1a, B2, B2a, ...
-    def natural_sort_key(s):
-        match = re.match(r'B(\d+)([a-zA-Z]*)', str(s))
-        return (int(match.group(1)), match.group(2)) if match else (float('inf'), str(s))
-
-    sorted_categories = sorted(tipo_bano_counts['Tipo_bano'], key=natural_sort_key)
-
     # Configuración según modo seleccionado
     if display_mode == 'Cantidad':
         values_col = 'Cantidad'
@@ -448,18 +503,15 @@ with tab1:
         text_info = 'label+percent'
         hover_template = "<b>%{label}</b><br>Porcentaje: %{percent:.1%}<extra></extra>"
 
-    # Paleta elegida: tonos sobrios y profesionales
-    colors = px.colors.qualitative.Set2
-
-    # Creación del gráfico
+    # Creación del gráfico (orden natural B1, B1E, B2, ... y colores fijos del catálogo)
     fig_pie = px.pie(
         tipo_bano_counts,
         names='Tipo_bano',
         values=values_col,
         title=chart_title,
         color='Tipo_bano',
-        category_orders={'Tipo_bano': sorted_categories},
-        color_discrete_sequence=colors
+        category_orders={'Tipo_bano': catalogo.orden('Tipo_bano')},
+        color_discrete_map=catalogo.colores('Tipo_bano')
     )
 
     # Estética general
@@ -482,7 +534,7 @@ with tab1:
     )
 
     # Render en Streamlit
-    st.plotly_chart(fig_pie, use_container_width=True)
+    mostrar_grafico(fig_pie, use_container_width=True)
 
     #------------------------
     # Fin Pestaña 1 - Gráfico de Torta
@@ -495,10 +547,10 @@ with tab1:
 #------------------------
 # Pestaña 2: Análisis por Correlativo
 #------------------------
-with tab2:
+with tab2, medir("Pestaña 2"):
     st.header("Análisis Individual por Correlativo")
 
-    correlativos_disponibles = sorted(df["Correlativo"].dropna().unique().tolist())
+    correlativos_disponibles = list(rangos_correlativo)
     
     if not correlativos_disponibles:
         st.warning("No hay Correlativos disponibles con los filtros actuales.")
@@ -510,35 +562,25 @@ with tab2:
     )
 
     if correlativo_sel_ind:
-        d_corr = df[df["Correlativo"] == correlativo_sel_ind].copy()
-        d_corr = d_corr.sort_values('Fecha')
+        detalle = obtener_detalle_correlativo(version, correlativo_sel_ind, datos['indice_correlativo'])
+        metricas_corr = detalle['metricas']
 
         #------------------------
         # Pestaña 2 - Métricas Individuales
         #------------------------
         st.markdown(f"### Métricas para el Correlativo: **{correlativo_sel_ind}**")
 
-        tipo_bano_corr = d_corr['Tipo_bano'].iloc[0]
-        fecha_inicio = d_corr['Fecha'].min().date()
-        fecha_fin = d_corr['Fecha'].max().date()
-        tiempo_real_total = d_corr[COL_T_REAL_UNIT].sum()
-        tiempo_espera_total = d_corr[COL_T_ESPERA_UNIT].sum()
-        num_procesos = len(d_corr)
-        
-        operarios_corr_set = {op for ops_list in d_corr['Operarios_list'] for op in ops_list}
-        operarios_corr = ", ".join(sorted(list(operarios_corr_set)))
-
         col_m1, col_m2, col_m3 = st.columns(3)
-        col_m1.metric("Tipo de Baño", tipo_bano_corr)
-        col_m2.metric("Fecha de Inicio", str(fecha_inicio))
-        col_m3.metric("Fecha de Fin", str(fecha_fin))
+        col_m1.metric("Tipo de Baño", metricas_corr['tipo_bano'])
+        col_m2.metric("Fecha de Inicio", str(metricas_corr['fecha_inicio']))
+        col_m3.metric("Fecha de Fin", str(metricas_corr['fecha_fin']))
 
         col_m4, col_m5, col_m6 = st.columns(3)
-        col_m4.metric("Tiempo Real Total", format_time_from_minutes(tiempo_real_total))
-        col_m5.metric("Tiempo de Espera Total", format_time_from_minutes(tiempo_espera_total))
-        col_m6.metric("Número de Procesos", num_procesos)
+        col_m4.metric("Tiempo Real Total", format_time_from_minutes(metricas_corr['tiempo_real_total']))
+        col_m5.metric("Tiempo de Espera Total", format_time_from_minutes(metricas_corr['tiempo_espera_total']))
+        col_m6.metric("Número de Procesos", metricas_corr['num_procesos'])
 
-        st.markdown(f"**Operarios Involucrados:** {operarios_corr}")
+        st.markdown(f"**Operarios Involucrados:** {metricas_corr['operarios']}")
         st.markdown("---")
         #------------------------
         # Fin Pestaña 2 - Métricas Individuales
@@ -549,46 +591,8 @@ with tab2:
         # Pestaña 2 - Tabla de Secuencia de Procesos
         #------------------------
         st.subheader("Secuencia de Procesos")
-        
-        df_display = d_corr[[
-            'Fecha', 'Proceso', COL_T_REAL_UNIT, COL_T_ESPERA_UNIT, 
-            'TT', 'Cumple_TT', 'Operarios'
-        ]].copy()
-
-        df_display['Fecha'] = df_display['Fecha'].dt.date
-
-        df_display['T. Real'] = df_display[COL_T_REAL_UNIT].apply(format_time_from_minutes)
-        df_display['T. Espera'] = df_display[COL_T_ESPERA_UNIT].apply(format_time_from_minutes)
-        df_display['Takt Time'] = df_display['TT'].apply(format_time_from_minutes)
-        
-        df_display_final = df_display[[
-            'Fecha', 'Proceso', 'T. Real', 'T. Espera', 
-            'Takt Time', 'Cumple_TT', 'Operarios'
-        ]]
-
-        # ======== ESTILO PARA COLOREAR FILAS COMPLETAS ========
-        def style_rows(row):
-            espera_val = int(row["T. Espera"].split(":")[0]) * 60 + int(row["T. Espera"].split(":")[1])  # convertir h:m a minutos
-            cumple = row["Cumple_TT"]
-
-            # Colores base
-            if cumple:
-                base_color = "#c8f7c5"   # verde claro
-                dark_color = "#a1d89a"   # verde oscuro
-            else:
-                base_color = "#f7c5c5"   # rojo claro
-                dark_color = "#d89a9a"   # rojo oscuro
-
-            # Si T. Espera > 0 oscurecer la fila
-            if espera_val > 0:
-                color = dark_color
-            else:
-                color = base_color
 
-            return [f"background-color: {color}"] * len(row)
-
-
-        styled_df = df_display_final.style.apply(style_rows, axis=1)
+        styled_df = tabla_secuencia(detalle['secuencia'])
 
         st.dataframe(styled_df, use_container_width=True)
         #------------------------
@@ -601,157 +605,8 @@ with tab2:
         #------------------------
         st.subheader("Diagrama de Flujo de Procesos (Gantt)")
 
-        d_corr_sorted = d_corr.sort_values(by='Fecha').reset_index()
-
-        gantt_data = []
-        current_duration_minutes = 0
-
-        for index, row in d_corr_sorted.iterrows():
-            if index > 0:
-                wait_minutes = row['T_Espera_min']
-                current_duration_minutes += wait_minutes
-
-            start_duration = current_duration_minutes
-            process_duration = row['T_Real_min']
-            end_duration = start_duration + process_duration
-
-            gantt_data.append(dict(
-                Proceso=row['Proceso'],
-                Inicio_Duracion=start_duration,
-                Fin_Duracion=end_duration,
-                Operarios=row['Operarios'],
-                T_Real_Unit=row[COL_T_REAL_UNIT],
-                T_Espera_Unit=row[COL_T_ESPERA_MIN]
-            ))
-
-            current_duration_minutes = end_duration
-
-        gantt_df = pd.DataFrame(gantt_data)
-        
-        # Crear colores dinámicos para Operarios
-        unique_operarios = gantt_df['Operarios'].unique()
-        # Puedes elegir una paleta de colores de Plotly o definir la tuya
-        colors = px.colors.qualitative.Plotly # O cualquier otra paleta
-
-        color_map = {operario: colors[i % len(colors)] for i, operario in enumerate(unique_operarios)}
-
-
-        fig_gantt = go.Figure()
-
-        # Agrupar por operario para una leyenda unificada
-        for operario in unique_operarios:
-            df_operario = gantt_df[gantt_df['Operarios'] == operario]
-            
-            # Crear hovertext para todos los procesos de este operario
-            hovertexts = []
-            for idx, row in df_operario.iterrows():
-                hovertexts.append(
-                    f"Proceso: {row['Proceso']}<br>"
-                    f"Operarios: {row['Operarios']}<br>"
-                    f"Inicio (min): {row['Inicio_Duracion']:.1f}<br>"
-                    f"Fin (min): {row['Fin_Duracion']:.1f}<br>"
-                    f"Duración Real: {format_time_from_minutes(row['T_Real_Unit'])}<br>"
-                    f"Tiempo de Espera: {format_time_from_minutes(row['T_Espera_Unit'])}"
-                )
-
-            fig_gantt.add_trace(go.Bar(
-                y=df_operario['Proceso'],
-                x=df_operario['Fin_Duracion'] - df_operario['Inicio_Duracion'],
-                base=df_operario['Inicio_Duracion'],
-                orientation='h',
-                name=operario, # Nombre del operario para la leyenda
-                legendgroup=operario, # Agrupar elementos en la leyenda
-                showlegend=True, # Mostrar en la leyenda
-                marker_color=color_map[operario],
-                hoverinfo='text',
-                hovertext=hovertexts
-            ))
-        
-        # Función para formatear el eje X en hh:mm:ss
-        def format_minutes_to_hms(minutes_val):
-            total_seconds = int(minutes_val * 60)
-            hours, remainder = divmod(total_seconds, 3600)
-            mins, secs = divmod(remainder, 60)
-            return f"{hours:02d}:{mins:02d}:{secs:02d}"
-
-        # Determinar tickvals para el eje X
-        max_duration = gantt_df['Fin_Duracion'].max()
-        
-        # Calcular los intervalos de 10 horas para el sombreado (en minutos)
-        # 10 horas = 600 minutos
-        hour_interval_minutes = 600
-        
-        shapes = []
-        toggle = True # alternador blanco/gris
-        
-        # Iterar en intervalos de 10 horas
-        current_time_minutes = 0
-        while current_time_minutes < max_duration:
-            start_hour_block = current_time_minutes
-            end_hour_block = current_time_minutes + hour_interval_minutes
-            
-            # Solo añadir el rectángulo si toggle es True (para alternar los colores)
-            if toggle:
-                shapes.append(dict(
-                    type="rect",
-                    xref="x",
-                    yref="paper",
-                    x0=start_hour_block,
-                    x1=end_hour_block,
-                    y0=0,
-                    y1=1,
-                    fillcolor="LightGray", # Color gris claro
-                    opacity=0.4,
-                    layer="below",
-                    line_width=0
-                ))
-            toggle = not toggle # Alternar para el siguiente bloque
-
-            current_time_minutes = end_hour_block
-            
-
-        # Asegura que el intervalo de ticks sea al menos 1 para evitar divisiones por cero o ticks excesivamente pequeños
-        tick_interval = max(1, int(max_duration / 10)) 
-        tick_values = list(range(0, int(max_duration * 1.1) + tick_interval, tick_interval))
-
-        # Obtener el orden de los procesos tal como aparecen en gantt_df
-        # Esto asegura que el gráfico se dibuje del primer proceso al último
-        process_order = [p for p in d_corr_sorted['Proceso'].unique()]
-
-        fig_gantt.update_layout(
-            title=f"Cronología de Procesos (Duración) para Correlativo {correlativo_sel_ind}",
-            xaxis_title="Duración (hh:mm:ss)",
-            yaxis_title="Proceso",
-            barmode='stack',
-            height=max(500, len(process_order) * 25), # Ajustar altura dinámicamente
-            showlegend=True,
-            plot_bgcolor='white',
-            shapes=shapes, # Añadir los shapes al layout del gráfico
-            xaxis=dict(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='LightGray',
-                tickmode='array',
-                tickvals=tick_values,
-                ticktext=[format_minutes_to_hms(val) for val in tick_values]
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='LightGray',
-                categoryorder='array', # Usar el orden del array
-                categoryarray=process_order # El array con el orden de los procesos
-            ),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            )
-        )
-        
-        st.plotly_chart(fig_gantt, use_container_width=True)
+        fig_gantt = figura_gantt_procesos(detalle, correlativo_sel_ind)
+        mostrar_grafico(fig_gantt, use_container_width=True)
         #------------------------
         # Fin Pestaña 2 - Diagrama de Flujo (Gantt)
         #------------------------
@@ -763,66 +618,26 @@ with tab2:
 #------------------------
 # Pestaña 3: Análisis por Proceso
 #------------------------
-with tab3:
+with tab3, medir("Pestaña 3"):
+    if comparacion is not None:
+        st.subheader("Comparación de Cohortes por Proceso")
+        st.caption("Cumplimiento TT y tiempo real promedio (min) de cada cohorte; en color, las diferencias de cumplimiento significativas.")
+        st.dataframe(
+            tabla_comparacion(comparacion['cumplimiento_proceso'], cohortes.ALFA),
+            hide_index=True,
+            use_container_width=True
+        )
+        st.markdown("---")
+
     #------------------------
     # Métricas Generales por Proceso
     #------------------------
     st.subheader("Métricas Generales por Proceso")
-    cumplimiento_proceso_general = (
-        df
-        .groupby('Proceso')
-        .agg({
-            'Cumple_TT': ['mean', 'count'],
-            COL_T_REAL_MIN: 'mean',
-            'TT': 'mean'
-        })
-        .round(1)
-    )
-    cumplimiento_proceso_general.columns = ['Tasa_Cumplimiento', 'Cantidad', 'Tiempo_Promedio', 'TT_Promedio']
-    cumplimiento_proceso_general = cumplimiento_proceso_general.sort_values('Tasa_Cumplimiento', ascending=True)
+    cumplimiento_proceso_general = agregados['cumplimiento_proceso']
     if not cumplimiento_proceso_general.empty:
-        # Crear tabla para mostrar la información
-        df_display_general = cumplimiento_proceso_general.reset_index().copy()
-
-        def style_rows_proceso_general(row):
-            tasa = row["Tasa_Cumplimiento"]
-            if tasa < 0.5:
-                color = "#f7c5c5"  # rojo claro
-            elif tasa < 0.8:
-                color = "#fff3cc"  # amarillo claro
-            else:
-                color = "#c8f7c5"  # verde claro
-            return [f"background-color: {color}"] * len(row)
-
-        styled_df_proceso_general = df_display_general.style.apply(style_rows_proceso_general, axis=1)
-
-        # Formatear columnas para mejor visualización
-        styled_df_proceso_general = styled_df_proceso_general.format({
-            'Tasa_Cumplimiento': lambda x: f"{x * 100:.1f}%",
-            'Tiempo_Promedio': lambda x: format_time_from_minutes(x),
-            'TT_Promedio': lambda x: format_time_from_minutes(x)
-        }).set_table_styles([
-            {'selector': 'th', 'props': [('text-align', 'center')]},
-            {'selector': 'td', 'props': [('text-align', 'center')]},
-        ])
-
-        # Crear gráfico circular para porcentaje de cumplimiento
-        cumplimiento_proceso_general['Categoria'] = cumplimiento_proceso_general['Tasa_Cumplimiento'].apply(
-            lambda x: 'Bajo (<50%)' if x < 0.5 else 'Medio (50-80%)' if x < 0.8 else 'Alto (>80%)'
-        )
-        cumplimiento_counts_general = cumplimiento_proceso_general['Categoria'].value_counts()
-        cumplimiento_counts_general = cumplimiento_counts_general.reindex(['Bajo (<50%)', 'Medio (50-80%)', 'Alto (>80%)'], fill_value=0)
-
-        fig_pie_cumplimiento_general = go.Figure(data=[go.Pie(
-            labels=cumplimiento_counts_general.index,
-            values=cumplimiento_counts_general.values,
-            marker_colors=['#f7c5c5', '#fff3cc', '#c8f7c5'],
-            title="Distribución de Cumplimiento (General)"
-        )])
-
-        fig_pie_cumplimiento_general.update_layout(
-            height=400,
-            margin=dict(l=20, r=20, t=40, b=20)
+        styled_df_proceso_general = tabla_cumplimiento(cumplimiento_proceso_general)
+        fig_pie_cumplimiento_general = figura_pie_cumplimiento(
+            cumplimiento_proceso_general, "Distribución de Cumplimiento (General)"
         )
 
         # Usar columnas para layout
@@ -832,84 +647,28 @@ with tab3:
             st.dataframe(styled_df_proceso_general, use_container_width=True)
 
         with col_pie_general:
-            st.plotly_chart(fig_pie_cumplimiento_general, use_container_width=True)
+            mostrar_grafico(fig_pie_cumplimiento_general, use_container_width=True)
 
     #------------------------
     # Fin Métricas Generales por Proceso
     #------------------------
 
-    tipos_bano = sorted(df['Tipo_bano'].unique())
-    for tipo in tipos_bano:
-        df_tipo = df[df['Tipo_bano'] == tipo]
-        if df_tipo.empty:
+    for tipo, cumplimiento_proceso in agregados['cumplimiento_tipo'].items():
+        if cumplimiento_proceso.empty:
             st.subheader(f"{tipo}: No hay datos")
             continue
         st.subheader(f"Análisis de Cumplimiento por Proceso - Tipo {tipo}")
-        cumplimiento_proceso = (
-            df_tipo
-            .groupby('Proceso')
-            .agg({
-                'Cumple_TT': ['mean', 'count'],
-                COL_T_REAL_MIN: 'mean',
-                'TT': 'mean'
-            })
-            .round(1)
-        )
-        cumplimiento_proceso.columns = ['Tasa_Cumplimiento', 'Cantidad', 'Tiempo_Promedio', 'TT_Promedio']
-        cumplimiento_proceso = cumplimiento_proceso.sort_values('Tasa_Cumplimiento', ascending=True)
-        if not cumplimiento_proceso.empty:
-            # Crear tabla para mostrar la información
-            df_display = cumplimiento_proceso.reset_index().copy()
-
-            def style_rows_proceso(row):
-                tasa = row["Tasa_Cumplimiento"]
-                if tasa < 0.5:
-                    color = "#f7c5c5"  # rojo claro
-                elif tasa < 0.8:
-                    color = "#fff3cc"  # amarillo claro
-                else:
-                    color = "#c8f7c5"  # verde claro
-                return [f"background-color: {color}"] * len(row)
-
-            styled_df_proceso = df_display.style.apply(style_rows_proceso, axis=1)
-
-            # Formatear columnas para mejor visualización
-            styled_df_proceso = styled_df_proceso.format({
-                'Tasa_Cumplimiento': lambda x: f"{x * 100:.1f}%",
-                'Tiempo_Promedio': lambda x: format_time_from_minutes(x),
-                'TT_Promedio': lambda x: format_time_from_minutes(x)
-            }).set_table_styles([
-                {'selector': 'th', 'props': [('text-align', 'center')]},
-                {'selector': 'td', 'props': [('text-align', 'center')]},
-            ])
-
-            # Crear gráfico circular para porcentaje de cumplimiento
-            cumplimiento_proceso['Categoria'] = cumplimiento_proceso['Tasa_Cumplimiento'].apply(
-                lambda x: 'Bajo (<50%)' if x < 0.5 else 'Medio (50-80%)' if x < 0.8 else 'Alto (>80%)'
-            )
-            cumplimiento_counts = cumplimiento_proceso['Categoria'].value_counts()
-            cumplimiento_counts = cumplimiento_counts.reindex(['Bajo (<50%)', 'Medio (50-80%)', 'Alto (>80%)'], fill_value=0)
-
-            fig_pie_cumplimiento = go.Figure(data=[go.Pie(
-                labels=cumplimiento_counts.index,
-                values=cumplimiento_counts.values,
-                marker_colors=['#f7c5c5', '#fff3cc', '#c8f7c5'],
-                title=f"Distribución de Cumplimiento ({tipo})"
-            )])
-
-            fig_pie_cumplimiento.update_layout(
-                height=400,
-                margin=dict(l=20, r=20, t=40, b=20)
-            )
+        styled_df_proceso = tabla_cumplimiento(cumplimiento_proceso)
+        fig_pie_cumplimiento = figura_pie_cumplimiento(cumplimiento_proceso, f"Distribución de Cumplimiento ({tipo})")
 
-            # Usar columnas para layout
-            col_table, col_pie = st.columns([2, 1])
+        # Usar columnas para layout
+        col_table, col_pie = st.columns([2, 1])
 
-            with col_table:
-                st.dataframe(styled_df_proceso, use_container_width=True)
+        with col_table:
+            st.dataframe(styled_df_proceso, use_container_width=True)
 
-            with col_pie:
-                st.plotly_chart(fig_pie_cumplimiento, use_container_width=True)
+        with col_pie:
+            mostrar_grafico(fig_pie_cumplimiento, use_container_width=True)
 #------------------------
 # Fin Pestaña 3: Análisis por Proceso
 #------------------------
@@ -918,7 +677,7 @@ with tab3:
 #------------------------
 # Pestaña 4: Análisis por Operario
 #------------------------
-with tab4:
+with tab4, medir("Pestaña 4"):
     st.subheader("Análisis de Participación por Operario")
 
     # Selector de tipo de agrupación
@@ -929,15 +688,15 @@ with tab4:
     )
 
     if agrupacion == "Correlativo":
-        correlativos_disponibles_op = sorted(df["Correlativo"].dropna().unique().tolist())
+        correlativos_disponibles_op = list(rangos_correlativo)
         if not correlativos_disponibles_op:
             st.warning("No hay correlativos disponibles.")
         else:
             correlativo_sel_op = st.selectbox("Seleccione un Correlativo", correlativos_disponibles_op, key="correlativo_sel_op")
-            df_group = df[df["Correlativo"] == correlativo_sel_op].copy()
+            df_group = filas_correlativo(df_por_correlativo, rangos_correlativo, correlativo_sel_op)
             titulo = f"Participación en Correlativo {correlativo_sel_op}"
     else:  # Tipo de Baño
-        tipos_bano_disponibles = sorted(df["Tipo_bano"].unique())
+        tipos_bano_disponibles = catalogo.orden('Tipo_bano')
         if not tipos_bano_disponibles:
             st.warning("No hay tipos de baño disponibles.")
         else:
@@ -947,19 +706,15 @@ with tab4:
 
     # Si hay datos
     if not df_group.empty:
-        # Contar operarios por proceso
-        operarios_count = {}
+        # Contar operarios por proceso (en orden de primera aparición)
         total_procesos = len(df_group)
-
-        for _, row in df_group.iterrows():
-            for op in row["Operarios_list"]:
-                if op in operarios_count:
-                    operarios_count[op] += 1
-                else:
-                    operarios_count[op] = 1
+        operarios_count = df_group["Operarios_list"].explode().dropna().value_counts(sort=False)
 
         # Crear DataFrame
-        df_participacion = pd.DataFrame(list(operarios_count.items()), columns=["Operario", "Participaciones"])
+        df_participacion = pd.DataFrame({
+            "Operario": operarios_count.index.to_numpy(),
+            "Participaciones": operarios_count.to_numpy()
+        })
         df_participacion["Porcentaje"] = (df_participacion["Participaciones"] / total_procesos * 100).round(1)
 
         # Ordenar por porcentaje descendente
@@ -969,46 +724,21 @@ with tab4:
         st.markdown(f"**Total de Procesos:** {total_procesos}")
         st.markdown("---")
 
-        # Crear mapa de colores consistente para cada operario
-        operarios_unicos = sorted(df_participacion['Operario'].unique())
-        colores_operarios_part = px.colors.qualitative.Set3 + px.colors.qualitative.Pastel
-        color_map_part = {op: colores_operarios_part[i % len(colores_operarios_part)]
-                          for i, op in enumerate(operarios_unicos)}
+        # Color fijo de cada operario (el mismo en todos los gráficos)
+        color_map_part = catalogo.colores('Operario')
 
         col_part, col_pct = st.columns(2)
 
         with col_part:
-            fig_part = go.Figure()
-            for operario in df_participacion['Operario']:
-                data_op = df_participacion[df_participacion['Operario'] == operario]
-                fig_part.add_trace(go.Bar(
-                    x=data_op['Participaciones'],
-                    y=data_op['Operario'],
-                    orientation='h',
-                    name=operario,
-                    marker_color=color_map_part[operario],
-                    text=[f"{int(val)}" for val in data_op['Participaciones']],
-                    textposition='outside',
-                    showlegend=True
-                ))
-
-            fig_part.update_layout(
-                title="Número de Participaciones por Operario",
-                xaxis_title="Número de Participaciones",
-                yaxis_title="Operario",
-                yaxis={'categoryorder':'total ascending'},
-                height=max(400, len(df_participacion) * 30),
-                showlegend=True,
-                legend=dict(
-                    orientation="v",
-                    yanchor="middle",
-                    y=0.5,
-                    xanchor="left",
-                    x=1.02
-                )
+            fig_part = figura_barras_operario(
+                df_participacion, 'Participaciones',
+                titulo="Número de Participaciones por Operario",
+                titulo_x="Número de Participaciones",
+                color_map=color_map_part,
+                plantilla_texto="%{x:d}"
             )
             fig_part.update_xaxes(tickformat="d")
-            st.plotly_chart(fig_part, use_container_width=True)
+            mostrar_grafico(fig_part, use_container_width=True)
 
         with col_pct:
             # Pie chart for percentage
@@ -1019,58 +749,68 @@ with tab4:
                 title="Porcentaje de Participación por Operario",
                 hole=0.3,
                 color="Operario",
-                color_discrete_sequence=colores_operarios_part
+                color_discrete_map=color_map_part
             )
             fig_pie.update_traces(textinfo='percent', textfont_size=14)
-            st.plotly_chart(fig_pie, use_container_width=True)
+            mostrar_grafico(fig_pie, use_container_width=True)
 
         # Chart for process breakdown per operario
         st.markdown("---")
         st.subheader("Desglose de Procesos por Operario")
 
-        # Count processes per operario
-        process_count = {}
-        for _, row in df_group.iterrows():
-            for op in row["Operarios_list"]:
-                if op not in process_count:
-                    process_count[op] = {}
-                proceso = row['Proceso']
-                process_count[op][proceso] = process_count[op].get(proceso, 0) + 1
-
-        # Get unique processes
-        procesos_unicos = sorted(set(proceso for ops in process_count.values() for proceso in ops))
-
-        # Palette for processes
-        colores_procesos = px.colors.qualitative.Prism
-        color_map_procesos = {proc: colores_procesos[i % len(colores_procesos)] for i, proc in enumerate(procesos_unicos)}
-
-        fig_procesos = go.Figure()
-
-        for operario in df_participacion['Operario']:
-            counts = process_count.get(operario, {})
-            cumulative = 0
-            for proceso in procesos_unicos:
-                count = counts.get(proceso, 0)
-                if count > 0:
-                    fig_procesos.add_trace(go.Bar(
-                        x=[operario],
-                        y=[count],
-                        name=proceso,
-                        marker_color=color_map_procesos[proceso],
-                        offsetgroup=cumulative,  # No offset for stacking
-                        base=cumulative,
-                        showlegend=True if operario == df_participacion['Operario'].iloc[0] else False  # Legend only for first operario
-                    ))
-                    cumulative += count
-
-        fig_procesos.update_layout(
-            title="Desglose de Procesos Participados por Operario",
-            xaxis_title="Operario",
-            yaxis_title="Número de Participaciones",
-            barmode='stack',
-            template="simple_white"
+        # Tabla operario x proceso del grupo, en el orden de participación y de la secuencia de procesos
+        conteo_procesos = afinidad.construir_matriz(df_group).tabla('conteo')
+        conteo_procesos = conteo_procesos.reindex(
+            index=df_participacion['Operario'], columns=catalogo.ordenar('Proceso', conteo_procesos.columns)
         )
-        st.plotly_chart(fig_procesos, use_container_width=True)
+        fig_procesos = figura_desglose_procesos(conteo_procesos, catalogo.colores('Proceso'))
+        mostrar_grafico(fig_procesos, use_container_width=True)
+
+    #------------------------
+    # Afinidad Operario-Proceso (todos los datos)
+    #------------------------
+    st.markdown("---")
+    st.subheader("Afinidad Operario-Proceso")
+    st.caption(
+        f"{matriz_afinidad.forma[0]} operarios x {matriz_afinidad.forma[1]} procesos, considerando todas las ejecuciones."
+    )
+
+    medida_afinidad = st.radio(
+        "Medida:",
+        list(afinidad.MEDIDAS),
+        format_func=afinidad.MEDIDAS.get,
+        horizontal=True,
+        key="medida_afinidad"
+    )
+    fig_afinidad = figura_matriz_afinidad(
+        matriz_afinidad.tabla(medida_afinidad),
+        f"{afinidad.MEDIDAS[medida_afinidad]} por Operario y Proceso",
+        afinidad.MEDIDAS[medida_afinidad]
+    )
+    mostrar_grafico(fig_afinidad, use_container_width=True)
+
+    col_sim, col_pares = st.columns([3, 2])
+
+    with col_sim:
+        mostrar_grafico(figura_similitud_operarios(matriz_afinidad.similitud()), use_container_width=True)
+
+    with col_pares:
+        umbral_similitud = st.slider("Similitud mínima", 0.0, 1.0, 0.3, 0.05, key="umbral_similitud")
+        pares = matriz_afinidad.intercambiables(umbral_similitud)
+        st.markdown("**Operarios intercambiables**")
+        if pares.empty:
+            st.info("No hay pares de operarios sobre la similitud indicada.")
+        else:
+            st.dataframe(
+                pares.rename(columns={'Operario_A': 'Operario A', 'Operario_B': 'Operario B',
+                                      'Procesos_Comunes': 'Procesos en común'}),
+                column_config={'Similitud': st.column_config.NumberColumn(format="%.2f")},
+                hide_index=True,
+                use_container_width=True
+            )
+    #------------------------
+    # Fin Afinidad Operario-Proceso
+    #------------------------
 
 #------------------------
 # Fin Pestaña 4: Análisis por Operario
@@ -1080,28 +820,17 @@ with tab4:
 #------------------------
 # Pestaña 5: Evolución Temporal
 #------------------------
-with tab5:
-    st.subheader("Evolución de Productividad y Ciclo")
-
+def construir_figuras_evolucion(agregados, ventana=None):
+    """
+    Figuras de productividad mensual y lead time diario (Pestaña 5). Con series
+    largas el lead time diario se dibuja en WebGL, reducido con LTTB a la
+    ventana de fechas pedida.
+    """
     # ============================
     # PRODUCTIVIDAD (BAÑOS/MES)
     # ============================
 
-    df['Mes'] = df['Fecha'].dt.to_period('M')
-    banos_por_mes = df.drop_duplicates(subset='Cod_bano') \
-        .groupby('Mes')['Cod_bano'] \
-        .count().reset_index()
-
-    banos_por_mes['Mes'] = banos_por_mes['Mes'].astype(str)
-
-    # ---- Promedio móvil 3 meses ----
-    banos_por_mes["PM3"] = banos_por_mes["Cod_bano"].rolling(3).mean()
-
-    # ---- Regresión lineal ----
-    banos_por_mes["Mes_num"] = range(len(banos_por_mes))
-    coef = np.polyfit(banos_por_mes["Mes_num"], banos_por_mes["Cod_bano"], 1)
-    banos_por_mes["Tendencia"] = coef[0] * banos_por_mes["Mes_num"] + coef[1]
-
+    banos_por_mes = agregados['banos_por_mes']
 
     fig_unidades = go.Figure()
 
@@ -1139,35 +868,26 @@ with tab5:
         template="simple_white"
     )
 
-    st.plotly_chart(fig_unidades, use_container_width=True)
-
 
     # ============================
     # LEAD TIME PROMEDIO (DIARIO)
     # ============================
 
-    lead_time_diario = df.drop_duplicates(subset='Cod_bano') \
-        .groupby(df["Fecha"].dt.date)[COL_LEAD_TIME_UNIT] \
-        .mean().reset_index()
-
-    lead_time_diario.rename(columns={"Fecha": "Fecha_diaria"}, inplace=True)
-
-    # ---- Promedio móvil de 7 días ----
-    lead_time_diario["PM7"] = lead_time_diario[COL_LEAD_TIME_UNIT].rolling(7).mean()
-
-    # ---- Tendencia lineal ----
-    lead_time_diario["Dia_num"] = range(len(lead_time_diario))
-    coef2 = np.polyfit(lead_time_diario["Dia_num"], lead_time_diario[COL_LEAD_TIME_UNIT], 1)
-    lead_time_diario["Tendencia"] = coef2[0] * lead_time_diario["Dia_num"] + coef2[1]
-
-    # ---- Promedio general ----
+    lead_time_diario = agregados['lead_time_diario']
     promedio_general = lead_time_diario[COL_LEAD_TIME_UNIT].mean()
 
+    compacto = usar_modo_compacto(len(lead_time_diario), MAX_PUNTOS_SERIE)
+    if ventana is not None:
+        fechas = pd.to_datetime(lead_time_diario["Fecha_diaria"]).dt.date
+        lead_time_diario = lead_time_diario[fechas.between(*ventana)]
+    if compacto:
+        lead_time_diario = reducir_serie(lead_time_diario, "Fecha_diaria", COL_LEAD_TIME_UNIT)
+    Serie = go.Scattergl if compacto else go.Scatter
 
     fig_lead = go.Figure()
 
     # Línea real
-    fig_lead.add_trace(go.Scatter(
+    fig_lead.add_trace(Serie(
         x=lead_time_diario["Fecha_diaria"],
         y=lead_time_diario[COL_LEAD_TIME_UNIT],
         mode="lines+markers",
@@ -1176,7 +896,7 @@ with tab5:
     ))
 
     # Promedio móvil
-    fig_lead.add_trace(go.Scatter(
+    fig_lead.add_trace(Serie(
         x=lead_time_diario["Fecha_diaria"],
         y=lead_time_diario["PM7"],
         mode="lines",
@@ -1185,7 +905,7 @@ with tab5:
     ))
 
     # Tendencia lineal
-    fig_lead.add_trace(go.Scatter(
+    fig_lead.add_trace(Serie(
         x=lead_time_diario["Fecha_diaria"],
         y=lead_time_diario["Tendencia"],
         mode="lines",
@@ -1210,7 +930,57 @@ with tab5:
 
     fig_lead.update_yaxes(tickformat=".1f")
 
-    st.plotly_chart(fig_lead, use_container_width=True)
+    return fig_unidades, fig_lead
+
+
+@st.cache_data(max_entries=32)
+def obtener_figuras_evolucion(version, fragmento, _agregados, ventana=None):
+    """
+    Figuras de la Pestaña 5 serializadas (no dependen de los filtros, sí del
+    edificio). La vista completa se guarda en la caché compartida; las
+    ventanas, solo en la local.
+    """
+    def construir():
+        return tuple(fig.to_json() for fig in construir_figuras_evolucion(_agregados, ventana))
+    if ventana is not None:
+        return construir()
+    return cache_compartido.memoizar(f"figuras_evolucion_{MODO_RENDER}:{fragmento}", version, construir)
+
+with tab5, medir("Pestaña 5"):
+    st.subheader("Evolución de Productividad y Ciclo")
+
+    # Con series largas se elige una ventana: el detalle se carga bajo demanda y la cantidad de puntos queda acotada
+    ventana_lead = None
+    if usar_modo_compacto(len(agregados['lead_time_diario']), MAX_PUNTOS_SERIE):
+        fechas_lead = pd.to_datetime(agregados['lead_time_diario']["Fecha_diaria"]).dt.date
+        rango_lead = (fechas_lead.min(), fechas_lead.max())
+        ventana_lead = st.slider(
+            "Ventana de fechas del Lead Time diario",
+            min_value=rango_lead[0],
+            max_value=rango_lead[1],
+            value=rango_lead,
+            help=f"La serie se muestra con hasta {MAX_PUNTOS_SERIE} puntos; una ventana más corta muestra más detalle."
+        )
+        if tuple(ventana_lead) == rango_lead:
+            ventana_lead = None
+        else:
+            ventana_lead = tuple(ventana_lead)
+
+    fig_unidades_json, fig_lead_json = obtener_figuras_evolucion(version, fragmento_sel, agregados, ventana_lead)
+    mostrar_grafico(pio.from_json(fig_unidades_json), use_container_width=True)
+    mostrar_grafico(pio.from_json(fig_lead_json), use_container_width=True)
+
+    if comparacion is not None:
+        st.subheader("Comparación de Cohortes por Mes")
+        colA, colB = st.columns(2)
+        with colA:
+            mostrar_grafico(figura_comparacion_mensual(
+                comparacion['mensual'], 'Banos', "Baños Terminados por Mes", "Baños Terminados"
+            ), use_container_width=True)
+        with colB:
+            mostrar_grafico(figura_comparacion_mensual(
+                comparacion['mensual'], 'Lead_Time_Prom', "Lead Time Promedio por Mes", f"Lead Time Promedio ({UNIT_LABEL})"
+            ), use_container_width=True)
 
 #------------------------
 # Fin Pestaña 5: Evolución Temporal
@@ -1220,108 +990,54 @@ with tab5:
 #------------------------
 # Pestaña 6: Eficiencia Operarios
 #------------------------
-with tab6:
+with tab6, medir("Pestaña 6"):
     st.subheader("Análisis de Eficiencia por Operario")
     
-    # Crear estructura de datos con Tipo_bano incluido
-    operarios_flat = []
-    for index, row in df.iterrows():
-        for op in row["Operarios_list"]:
-            operarios_flat.append({
-                'Operario': op, 
-                'T_Real_Unit': row[COL_T_REAL_UNIT], 
-                'Cumple_TT': row['Cumple_TT'],
-                'Tipo_bano': row['Tipo_bano']
-            })
-    df_op = pd.DataFrame(operarios_flat)
-    
-    # Crear mapa de colores consistente para cada operario
-    operarios_unicos = sorted(df_op['Operario'].unique())
-    colores_operarios = px.colors.qualitative.Set3 + px.colors.qualitative.Pastel
-    color_map_operarios = {op: colores_operarios[i % len(colores_operarios)] 
-                           for i, op in enumerate(operarios_unicos)}
+    # Color fijo de cada operario (el mismo en todos los gráficos)
+    color_map_operarios = catalogo.colores('Operario')
     
-    # Obtener tipos de baño únicos
-    tipos_bano = sorted(df_op['Tipo_bano'].unique())
+    # Tipos de baño con ejecuciones asignadas a operarios
+    tipos_bano = list(agregados['metricas_operario_tipo'])
+
+    if comparacion is not None:
+        st.markdown("### Comparación de Cohortes por Operario")
+        st.dataframe(
+            tabla_comparacion(comparacion['metricas_operario'], cohortes.ALFA),
+            hide_index=True,
+            use_container_width=True
+        )
+        st.markdown("---")
     
     st.markdown("### Métricas Generales por Operario")
     st.markdown("---")
     
     # Métricas generales (sin separar por tipo de baño)
-    op_metrics = df_op.groupby('Operario').agg(
-        Total_Tareas=('Operario', 'count'),
-        Avg_T_Real=('T_Real_Unit', 'mean'), 
-        Pct_Cumple_TT=('Cumple_TT', lambda x: (x.astype(bool).mean() * 100))
-    ).reset_index().sort_values('Avg_T_Real')
+    op_metrics = agregados['metricas_operario']
     
     colA, colB = st.columns(2)
     
     with colA:
-        fig_real = go.Figure()
-        for operario in op_metrics['Operario']:
-            data_op = op_metrics[op_metrics['Operario'] == operario]
-            fig_real.add_trace(go.Bar(
-                x=data_op['Avg_T_Real'],
-                y=data_op['Operario'],
-                orientation='h',
-                name=operario,
-                marker_color=color_map_operarios[operario],
-                text=[f"{val:.1f}" for val in data_op['Avg_T_Real']],
-                textposition='outside',
-                showlegend=True
-            ))
-        
-        fig_real.update_layout(
-            title=f"Tiempo Real Promedio por Operario ({UNIT_LABEL})",
-            xaxis_title=f"Tiempo Real Promedio ({UNIT_LABEL})",
-            yaxis_title="Operario",
-            yaxis={'categoryorder':'total ascending'},
-            height=max(400, len(op_metrics) * 30),
-            showlegend=True,
-            legend=dict(
-                orientation="v",
-                yanchor="middle",
-                y=0.5,
-                xanchor="left",
-                x=1.02
-            )
+        fig_real = figura_barras_operario(
+            op_metrics, 'Avg_T_Real',
+            titulo=f"Tiempo Real Promedio por Operario ({UNIT_LABEL})",
+            titulo_x=f"Tiempo Real Promedio ({UNIT_LABEL})",
+            color_map=color_map_operarios,
+            plantilla_texto="%{x:.1f}"
         )
         fig_real.update_xaxes(tickformat=".1f")
-        st.plotly_chart(fig_real, use_container_width=True)
+        mostrar_grafico(fig_real, use_container_width=True)
     
     with colB:
-        fig_tt = go.Figure()
-        for operario in op_metrics['Operario']:
-            data_op = op_metrics[op_metrics['Operario'] == operario]
-            fig_tt.add_trace(go.Bar(
-                x=data_op['Pct_Cumple_TT'],
-                y=data_op['Operario'],
-                orientation='h',
-                name=operario,
-                marker_color=color_map_operarios[operario],
-                text=[f"{val:.1f}%" for val in data_op['Pct_Cumple_TT']],
-                textposition='outside',
-                showlegend=True
-            ))
-        
-        fig_tt.update_layout(
-            title="% Cumplimiento de Takt Time por Operario",
-            xaxis_title="% Cumple TT",
-            yaxis_title="Operario",
-            xaxis_range=[0, 110],
-            yaxis={'categoryorder':'total ascending'},
-            height=max(400, len(op_metrics) * 30),
-            showlegend=True,
-            legend=dict(
-                orientation="v",
-                yanchor="middle",
-                y=0.5,
-                xanchor="left",
-                x=1.02
-            )
+        fig_tt = figura_barras_operario(
+            op_metrics, 'Pct_Cumple_TT',
+            titulo="% Cumplimiento de Takt Time por Operario",
+            titulo_x="% Cumple TT",
+            color_map=color_map_operarios,
+            plantilla_texto="%{x:.1f}%",
+            rango_x=[0, 110]
         )
         fig_tt.update_xaxes(tickformat=".1f")
-        st.plotly_chart(fig_tt, use_container_width=True)
+        mostrar_grafico(fig_tt, use_container_width=True)
     
     # Análisis por Tipo de Baño
     st.markdown("---")
@@ -1330,90 +1046,310 @@ with tab6:
     for tipo in tipos_bano:
         st.markdown(f"#### Tipo de Baño: **{tipo}**")
         
-        # Filtrar datos por tipo de baño
-        df_op_tipo = df_op[df_op['Tipo_bano'] == tipo]
+        # Métricas por operario para este tipo de baño
+        op_metrics_tipo = agregados['metricas_operario_tipo'][tipo]
         
-        if len(df_op_tipo) == 0:
+        if len(op_metrics_tipo) == 0:
             st.info(f"No hay datos disponibles para el tipo de baño {tipo}")
             continue
         
-        # Calcular métricas por operario para este tipo de baño
-        op_metrics_tipo = df_op_tipo.groupby('Operario').agg(
-            Total_Tareas=('Operario', 'count'),
-            Avg_T_Real=('T_Real_Unit', 'mean'), 
-            Pct_Cumple_TT=('Cumple_TT', lambda x: (x.astype(bool).mean() * 100))
-        ).reset_index().sort_values('Avg_T_Real')
-        
         colC, colD = st.columns(2)
         
         with colC:
-            fig_real_tipo = go.Figure()
-            for operario in op_metrics_tipo['Operario']:
-                data_op = op_metrics_tipo[op_metrics_tipo['Operario'] == operario]
-                fig_real_tipo.add_trace(go.Bar(
-                    x=data_op['Avg_T_Real'],
-                    y=data_op['Operario'],
-                    orientation='h',
-                    name=operario,
-                    marker_color=color_map_operarios[operario],
-                    text=[f"{val:.1f} ({n} tareas)" for val, n in zip(data_op['Avg_T_Real'], data_op['Total_Tareas'])],
-                    textposition='outside',
-                    showlegend=True
-                ))
-            
-            fig_real_tipo.update_layout(
-                title=f"Tiempo Real Promedio - {tipo} ({UNIT_LABEL})",
-                xaxis_title=f"Tiempo Real Promedio ({UNIT_LABEL})",
-                yaxis_title="Operario",
-                yaxis={'categoryorder':'total ascending'},
-                height=max(350, len(op_metrics_tipo) * 30),
-                showlegend=True,
-                legend=dict(
-                    orientation="v",
-                    yanchor="middle",
-                    y=0.5,
-                    xanchor="left",
-                    x=1.02
-                )
+            fig_real_tipo = figura_barras_operario(
+                op_metrics_tipo, 'Avg_T_Real',
+                titulo=f"Tiempo Real Promedio - {tipo} ({UNIT_LABEL})",
+                titulo_x=f"Tiempo Real Promedio ({UNIT_LABEL})",
+                color_map=color_map_operarios,
+                plantilla_texto="%{x:.1f} (%{customdata} tareas)",
+                col_texto='Total_Tareas',
+                altura_min=350
             )
             fig_real_tipo.update_xaxes(tickformat=".1f")
-            st.plotly_chart(fig_real_tipo, use_container_width=True)
+            mostrar_grafico(fig_real_tipo, use_container_width=True)
         
         with colD:
-            fig_tt_tipo = go.Figure()
-            for operario in op_metrics_tipo['Operario']:
-                data_op = op_metrics_tipo[op_metrics_tipo['Operario'] == operario]
-                fig_tt_tipo.add_trace(go.Bar(
-                    x=data_op['Pct_Cumple_TT'],
-                    y=data_op['Operario'],
-                    orientation='h',
-                    name=operario,
-                    marker_color=color_map_operarios[operario],
-                    text=[f"{val:.1f}%" for val in data_op['Pct_Cumple_TT']],
-                    textposition='outside',
-                    showlegend=True
-                ))
-            
-            fig_tt_tipo.update_layout(
-                title=f"% Cumplimiento TT - {tipo}",
-                xaxis_title="% Cumple TT",
-                yaxis_title="Operario",
-                xaxis_range=[0, 110],
-                yaxis={'categoryorder':'total ascending'},
-                height=max(350, len(op_metrics_tipo) * 30),
-                showlegend=True,
-                legend=dict(
-                    orientation="v",
-                    yanchor="middle",
-                    y=0.5,
-                    xanchor="left",
-                    x=1.02
-                )
+            fig_tt_tipo = figura_barras_operario(
+                op_metrics_tipo, 'Pct_Cumple_TT',
+                titulo=f"% Cumplimiento TT - {tipo}",
+                titulo_x="% Cumple TT",
+                color_map=color_map_operarios,
+                plantilla_texto="%{x:.1f}%",
+                rango_x=[0, 110],
+                altura_min=350
             )
             fig_tt_tipo.update_xaxes(tickformat=".1f")
-            st.plotly_chart(fig_tt_tipo, use_container_width=True)
+            mostrar_grafico(fig_tt_tipo, use_container_width=True)
         
         st.markdown("---")
+
+    # Ocupación real: unión de los intervalos de cada operario por día, no la suma de sus tareas
+    st.markdown("### Ocupación y Doble Asignación")
+    resumen_ocupacion = ocupacion_operarios['resumen']
+    conflictos = ocupacion_operarios['conflictos']
+    dias_ocupacion = ocupacion_operarios['dias']
+    dias_sobre_jornada = dias_ocupacion[dias_ocupacion['Sobre_Jornada']]
+
+    colE, colF, colG = st.columns(3)
+    colE.metric("Ejecuciones en conflicto", len(conflictos))
+    colF.metric(f"Días-operario sobre {intervalos.JORNADA_MIN / 60:.0f} h", len(dias_sobre_jornada))
+    colG.metric("Horas con doble asignación", f"{dias_ocupacion['Doble_min'].sum() / 60:.1f}")
+
+    fig_ocupacion = figura_barras_operario(
+        resumen_ocupacion, 'Utilizacion_pct',
+        titulo=f"Utilización Promedio de la Jornada ({intervalos.JORNADA_MIN / 60:.0f} h) por Operario",
+        titulo_x="% de la jornada ocupado",
+        color_map=color_map_operarios,
+        plantilla_texto="%{x:.1f}% (%{customdata} días)",
+        col_texto='Dias'
+    )
+    fig_ocupacion.update_xaxes(tickformat=".1f")
+    mostrar_grafico(fig_ocupacion, use_container_width=True)
+
+    if conflictos.empty:
+        st.info(
+            "Los datos no traen Inicio/Fin de cada ejecución, o no hay cruces entre ellas: la ocupación "
+            "diaria se calcula con T_Real_min y los días sobre la jornada indican doble asignación o errores de registro."
+        )
+    else:
+        st.dataframe(
+            conflictos.drop(columns=['Fila', 'Fila_Previa']).round({'Solape_min': 1}),
+            hide_index=True,
+            use_container_width=True
+        )
+    if not dias_sobre_jornada.empty:
+        with st.expander("Días-operario sobre la jornada"):
+            st.dataframe(
+                dias_sobre_jornada[['Operario', 'Dia', 'Ejecuciones', 'Asignado_min', 'Ocupado_min', 'Doble_min']].round(1),
+                column_config={'Dia': st.column_config.DateColumn(format="DD/MM/YYYY")},
+                hide_index=True,
+                use_container_width=True
+            )
 #------------------------
 # Fin Pestaña 6: Eficiencia Operarios
 #------------------------
+
+
+#------------------------
+# Pestaña 7: Simulación Takt Time
+#------------------------
+@st.cache_data(show_spinner=False)
+def obtener_distribuciones(version, fragmento, _df, tipo_bano):
+    """Secuencia de procesos y muestras de tiempos del tipo de baño (una vez por versión, fragmento y tipo)."""
+    return simulacion.construir_distribuciones(_df, tipo_bano)
+
+
+@st.cache_data(show_spinner="Simulando réplicas...")
+def simular_escenario(version, fragmento, _df, tipo_bano, n_banos, n_replicas, proceso_mod, tt_mod, operarios_mod, factor_mod, semilla):
+    """Simula el escenario base y el escenario modificado con las mismas semillas."""
+    distrib = obtener_distribuciones(version, fragmento, _df, tipo_bano)
+    base = simulacion.simular(distrib, n_banos=n_banos, n_replicas=n_replicas, semilla=semilla)
+    escenario = simulacion.simular(
+        distrib,
+        n_banos=n_banos,
+        n_replicas=n_replicas,
+        operarios={proceso_mod: operarios_mod},
+        tt={proceso_mod: tt_mod},
+        factores={proceso_mod: factor_mod},
+        semilla=semilla
+    )
+    return (
+        simulacion.resumir(base),
+        simulacion.resumir(escenario),
+        simulacion.bandas_lead_time(base),
+        simulacion.bandas_lead_time(escenario)
+    )
+
+with tab7, medir("Pestaña 7"):
+    st.subheader("Simulación de Escenarios de Takt Time")
+    st.caption(
+        "Simulación de eventos discretos: los tiempos reales y de espera se muestrean desde el historial "
+        "de cada proceso y cada baño recorre la secuencia de procesos de su tipo."
+    )
+
+    tipos_bano_sim = catalogo.orden('Tipo_bano')
+    tipo_bano_sim = st.selectbox("Tipo de Baño a simular", tipos_bano_sim, key="tipo_bano_sim")
+    distrib_sim = obtener_distribuciones(version, fragmento_sel, df, tipo_bano_sim)
+
+    if distrib_sim is None or not distrib_sim['procesos']:
+        st.info("No hay historial suficiente para simular este tipo de baño.")
+    else:
+        tt_historico = dict(zip(distrib_sim['procesos'], distrib_sim['tt']))
+
+        with st.form("form_simulacion"):
+            proceso_mod = st.selectbox("Proceso a modificar", distrib_sim['procesos'])
+            col_s1, col_s2, col_s3 = st.columns(3)
+            tt_mod = col_s1.number_input(
+                "Nuevo Takt Time (minutos)", min_value=1.0,
+                value=float(tt_historico[proceso_mod]), step=1.0
+            )
+            operarios_mod = col_s2.number_input("Operarios en el proceso", min_value=1, max_value=10, value=1, step=1)
+            factor_mod = col_s3.number_input(
+                "Factor de tiempo del proceso", min_value=0.1, max_value=3.0, value=1.0, step=0.05,
+                help="Multiplica los tiempos reales muestreados del proceso (p. ej. 0.8 = 20% más rápido)."
+            )
+            col_s4, col_s5, col_s6 = st.columns(3)
+            n_banos_sim = col_s4.number_input("Baños por réplica", min_value=1, max_value=200, value=20, step=1)
+            n_replicas_sim = col_s5.number_input("Réplicas", min_value=100, max_value=20000, value=2000, step=100)
+            semilla_sim = col_s6.number_input("Semilla", min_value=0, value=0, step=1)
+            ejecutar_sim = st.form_submit_button("Ejecutar Simulación")
+
+        if ejecutar_sim:
+            st.session_state.params_sim = (
+                tipo_bano_sim, int(n_banos_sim), int(n_replicas_sim), proceso_mod,
+                float(tt_mod), int(operarios_mod), float(factor_mod), int(semilla_sim)
+            )
+
+        params_sim = st.session_state.get('params_sim')
+        if params_sim is not None and params_sim[0] == tipo_bano_sim:
+            resumen_base, resumen_esc, bandas_base, bandas_esc = simular_escenario(version, fragmento_sel, df, *params_sim)
+
+            #------------------------
+            # Pestaña 7 - Métricas del Escenario
+            #------------------------
+            st.markdown(f"### Escenario: **{params_sim[3]}** en baños {tipo_bano_sim}")
+            col_r1, col_r2, col_r3 = st.columns(3)
+            for col, (_, fila_base), (_, fila_esc) in zip(
+                (col_r1, col_r2, col_r3), resumen_base.iterrows(), resumen_esc.iterrows()
+            ):
+                col.metric(
+                    fila_esc['Métrica'],
+                    f"{fila_esc['Media']:.2f}",
+                    delta=f"{fila_esc['Media'] - fila_base['Media']:.2f}",
+                    delta_color="inverse" if 'Lead Time' in fila_esc['Métrica'] else "normal",
+                    help=f"Banda 95%: {fila_esc['Banda_Inferior']:.2f} – {fila_esc['Banda_Superior']:.2f}"
+                )
+
+            resumen_tabla = pd.concat(
+                [resumen_base.assign(Escenario="Base"), resumen_esc.assign(Escenario="Modificado")]
+            )[['Escenario', 'Métrica', 'Media', 'Banda_Inferior', 'Mediana', 'Banda_Superior']]
+            st.dataframe(resumen_tabla.round(2), use_container_width=True, hide_index=True)
+            #------------------------
+            # Fin Pestaña 7 - Métricas del Escenario
+            #------------------------
+
+
+            #------------------------
+            # Pestaña 7 - Bandas de Lead Time
+            #------------------------
+            fig_bandas = go.Figure()
+            for nombre, bandas, color in (("Base", bandas_base, "gray"), ("Modificado", bandas_esc, "royalblue")):
+                fig_bandas.add_trace(go.Scatter(
+                    x=np.concatenate([bandas['Bano_N'], bandas['Bano_N'][::-1]]),
+                    y=np.concatenate([bandas['Banda_Superior'], bandas['Banda_Inferior'][::-1]]),
+                    fill='toself',
+                    fillcolor=color,
+                    opacity=0.2,
+                    line=dict(width=0),
+                    hoverinfo='skip',
+                    name=f"Banda 95% ({nombre})"
+                ))
+                fig_bandas.add_trace(go.Scatter(
+                    x=bandas['Bano_N'],
+                    y=bandas['Mediana'],
+                    mode="lines+markers",
+                    line=dict(width=2, color=color),
+                    name=f"Mediana ({nombre})"
+                ))
+
+            fig_bandas.update_layout(
+                title="Lead Time Simulado por Orden de Liberación del Baño",
+                xaxis_title="Baño N° en la secuencia",
+                yaxis_title=f"Lead Time ({UNIT_LABEL})",
+                template="simple_white"
+            )
+            mostrar_grafico(fig_bandas, use_container_width=True)
+            #------------------------
+            # Fin Pestaña 7 - Bandas de Lead Time
+            #------------------------
+#------------------------
+# Fin Pestaña 7: Simulación Takt Time
+#------------------------
+
+
+#------------------------
+# Pestaña 8: Anomalías
+#------------------------
+with tab8, medir("Pestaña 8"):
+    st.subheader("Ejecuciones Anómalas")
+    st.markdown(
+        "Cada ejecución se compara con la mediana de su proceso y tipo de baño; se marca como atípica "
+        f"si su puntaje robusto (z modificado, con MAD) supera ±{anomalias.UMBRAL_PUNTAJE}. "
+        f"Los grupos con menos de {anomalias.MIN_MUESTRAS_BASE} ejecuciones usan la mediana del proceso."
+    )
+
+    detalle_anomalias = anomalias.resumen_anomalias(df, df_anomalias)
+    conteo_anomalias = detalle_anomalias['Anomalia'].value_counts().reindex(anomalias.TIPOS_ANOMALIA, fill_value=0)
+
+    cols_anom = st.columns(len(anomalias.TIPOS_ANOMALIA))
+    for col, (tipo_anomalia, cantidad) in zip(cols_anom, conteo_anomalias.items()):
+        col.metric(tipo_anomalia, int(cantidad))
+
+    if detalle_anomalias.empty:
+        st.success("No se detectaron anomalías en las ejecuciones.")
+    else:
+        tipos_sel = st.multiselect(
+            "Tipos de anomalía",
+            anomalias.TIPOS_ANOMALIA,
+            default=[t for t in anomalias.TIPOS_ANOMALIA if conteo_anomalias[t] > 0],
+            key="tipos_anomalia"
+        )
+        detalle_sel = detalle_anomalias[detalle_anomalias['Anomalia'].isin(tipos_sel)]
+
+        # Anomalías por proceso
+        por_proceso = (
+            detalle_sel.groupby(['Proceso', 'Anomalia']).size().rename('Ejecuciones').reset_index()
+        )
+        fig_anom = px.bar(
+            por_proceso,
+            x='Ejecuciones',
+            y='Proceso',
+            color='Anomalia',
+            orientation='h',
+            title="Ejecuciones Anómalas por Proceso",
+            category_orders={'Anomalia': anomalias.TIPOS_ANOMALIA}
+        )
+        fig_anom.update_layout(
+            yaxis={'categoryorder': 'total ascending'},
+            height=max(400, por_proceso['Proceso'].nunique() * 25),
+            template="simple_white"
+        )
+        mostrar_grafico(fig_anom, use_container_width=True)
+
+        st.dataframe(
+            detalle_sel.rename(columns={'Mediana_Base': 'Mediana del grupo', 'MAD_Base': 'MAD del grupo'}),
+            column_config={
+                'Fecha': st.column_config.DateColumn(format="DD/MM/YYYY"),
+                'Puntaje': st.column_config.NumberColumn(format="%.2f"),
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+
+    with st.expander("Líneas base por proceso y tipo de baño"):
+        st.dataframe(
+            lineas_base.reset_index().replace({'Tipo_bano': {anomalias.TODOS_LOS_TIPOS: "(todos)"}}).round(2),
+            hide_index=True,
+            use_container_width=True
+        )
+#------------------------
+# Fin Pestaña 8: Anomalías
+#------------------------
+
+
+#------------------------
+# Panel de Administración (Tiempos por Sección)
+#------------------------
+tramos_ejecucion = instrumentacion.finalizar_ejecucion()
+
+if st.query_params.get("admin") == "1":
+    with st.sidebar:
+        st.markdown("---")
+        with st.expander("Tiempos del Dashboard (admin)", expanded=False):
+            st.markdown("**Secciones más lentas (historial del proceso)**")
+            st.dataframe(instrumentacion.resumen_secciones().round(1), use_container_width=True, hide_index=True)
+            st.markdown("**Esta ejecución**")
+            st.dataframe(tramos_ejecucion.round(1), use_container_width=True, hide_index=True)
+#------------------------
+# Fin Panel de Administración
+#------------------------
@@ -73,6 +73,9 @@ CREATE TABLE ejecucion_proceso (
     id_b INT NOT NULL,
     id_proc INT NOT NULL,
     fecha DATE NOT NULL,
+    -- Inicio y término reales de la ejecución (NULL en los datos importados del Excel, que no los trae)
+    inicio DATETIME DEFAULT NULL,
+    fin DATETIME DEFAULT NULL,
 
     edificio ENUM('A', 'B', 'C') NOT NULL,
     piso SMALLINT NOT NULL,
@@ -113,10 +116,14 @@ CREATE TABLE ejecucion_proceso (
     -- FK
     CONSTRAINT fk_ejec_bano FOREIGN KEY (id_b) REFERENCES bano(id_b),
     CONSTRAINT fk_ejec_proc FOREIGN KEY (id_proc) REFERENCES proceso(id_proc),
+    CONSTRAINT ck_ejec_intervalo CHECK (fin >= inicio),
 
     INDEX idx_ejec_fecha (fecha),
     INDEX idx_ejec_proc (id_proc),
-    INDEX idx_ejec_bano_fecha (id_b, fecha)
+    INDEX idx_ejec_bano_fecha (id_b, fecha),
+    -- Línea de tiempo: qué estaba en curso en un instante, en total o por proceso
+    INDEX idx_ejec_inicio (inicio, fin),
+    INDEX idx_ejec_proc_inicio (id_proc, inicio, fin)
 );
 
 
@@ -0,0 +1,195 @@
+-- ============================================================
+-- ESQUEMA AXIS FLOW - VARIANTE SIN COLUMNAS GENERADAS
+-- ============================================================
+-- Mismo modelo que axis_flow_tables.sql, pero ejecucion_proceso guarda solo
+-- las mediciones de origen. Las columnas derivadas (tipo_bano,
+-- diferencia_tt_min, cumple_tt, porcentaje_tt, t_real_horas, t_espera_horas)
+-- se calculan al leer en v_ejecucion_proceso, y el tiempo real acumulado
+-- (t_real_acum_min / t_real_acum_horas) con una función de ventana en
+-- v_ejecucion_acumulado, por lo que el cargador ya no lo precalcula.
+-- Requiere MySQL 8.0+ o MariaDB 10.2+ (funciones de ventana).
+-- ============================================================
+
+CREATE DATABASE IF NOT EXISTS axis_bd
+CHARACTER SET utf8mb4 
+COLLATE utf8mb4_unicode_ci;
+
+USE axis_bd;
+
+-- ============================================================
+-- 1. TABLA: operario
+-- ============================================================
+DROP TABLE IF EXISTS ejecucion_operario;
+DROP TABLE IF EXISTS ejecucion_proceso;
+DROP TABLE IF EXISTS proceso;
+DROP TABLE IF EXISTS bano;
+DROP TABLE IF EXISTS operario;
+
+CREATE TABLE operario (
+    id_op INT AUTO_INCREMENT PRIMARY KEY,
+    nom_op VARCHAR(50) NOT NULL,
+    ap_pa_op VARCHAR(50),
+    ap_ma_op VARCHAR(50),
+    sigla_op VARCHAR(3),
+    UNIQUE KEY ux_operario_sigla (sigla_op)
+);
+
+
+-- ============================================================
+-- 2. TABLA: bano
+-- ============================================================
+
+CREATE TABLE bano (
+    id_b INT PRIMARY KEY,
+    variante ENUM(
+        'B1',
+        'B1E',
+        'B2',
+        'B2E',
+        'B2b',
+        'B3',
+        'B3E',
+        'B4',
+        'B4E',
+        'B4b',
+        'B5',
+        'B6',
+        'B6E'
+    ) NOT NULL,
+
+    edificio ENUM('A', 'B', 'C') NOT NULL,
+    piso SMALLINT NOT NULL,
+
+    UNIQUE KEY ux_bano_ident (id_b, edificio, piso, variante)
+);
+
+
+-- ============================================================
+-- 3. TABLA: proceso
+-- ============================================================
+
+CREATE TABLE proceso (
+    id_proc INT AUTO_INCREMENT PRIMARY KEY,
+    nom_proc VARCHAR(100) NOT NULL,
+    tt_proc INT NOT NULL
+);
+
+
+-- ============================================================
+-- 4. TABLA DE HECHOS: ejecucion_proceso
+-- ============================================================
+
+CREATE TABLE ejecucion_proceso (
+    id_ejec INT AUTO_INCREMENT PRIMARY KEY,
+
+    id_b INT NOT NULL,
+    id_proc INT NOT NULL,
+    fecha DATE NOT NULL,
+    -- Inicio y término reales de la ejecución (NULL en los datos importados del Excel, que no los trae)
+    inicio DATETIME DEFAULT NULL,
+    fin DATETIME DEFAULT NULL,
+
+    edificio ENUM('A', 'B', 'C') NOT NULL,
+    piso SMALLINT NOT NULL,
+
+    variante ENUM(
+        'B1',
+        'B1E',
+        'B2',
+        'B2E',
+        'B2b',
+        'B3',
+        'B3E',
+        'B4',
+        'B4E',
+        'B4b',
+        'B5',
+        'B6',
+        'B6E'
+    ) NOT NULL,
+
+    tt_proc INT NOT NULL,
+    t_real_min DECIMAL(10,2) NOT NULL,
+    t_espera_min DECIMAL(10,2) DEFAULT 0,
+
+    -- FK
+    CONSTRAINT fk_ejec_bano FOREIGN KEY (id_b) REFERENCES bano(id_b),
+    CONSTRAINT fk_ejec_proc FOREIGN KEY (id_proc) REFERENCES proceso(id_proc),
+    CONSTRAINT ck_ejec_intervalo CHECK (fin >= inicio),
+
+    INDEX idx_ejec_fecha (fecha),
+    INDEX idx_ejec_proc (id_proc),
+    INDEX idx_ejec_bano_fecha (id_b, fecha),
+    -- Línea de tiempo: qué estaba en curso en un instante, en total o por proceso
+    INDEX idx_ejec_inicio (inicio, fin),
+    INDEX idx_ejec_proc_inicio (id_proc, inicio, fin)
+);
+
+
+-- ============================================================
+-- 5. TABLA PUENTE: ejecucion_operario (N:M)
+-- ============================================================
+
+CREATE TABLE ejecucion_operario (
+    id_ejec_op INT AUTO_INCREMENT PRIMARY KEY,
+    id_ejec INT NOT NULL,
+    id_op INT NOT NULL,
+
+    rol ENUM('Operario_1','Operario_2','Operario_3') DEFAULT 'Operario_1',
+
+    CONSTRAINT fk_ejec_op_ejec FOREIGN KEY (id_ejec)
+        REFERENCES ejecucion_proceso(id_ejec)
+        ON DELETE CASCADE,
+
+    CONSTRAINT fk_ejec_op_op FOREIGN KEY (id_op)
+        REFERENCES operario(id_op)
+        ON DELETE RESTRICT,
+
+    UNIQUE KEY ux_ejec_op (id_ejec, id_op)
+);
+
+
+-- ============================================================
+-- 6. VISTAS DERIVADAS
+-- ============================================================
+
+-- Columnas calculadas fila a fila. La vista es fusionable (MERGE): los
+-- filtros sobre fecha, variante o id_b siguen usando los índices de la tabla.
+CREATE OR REPLACE ALGORITHM = MERGE VIEW v_ejecucion_proceso AS
+SELECT
+    e.id_ejec,
+    e.id_b,
+    e.id_proc,
+    e.fecha,
+    e.inicio,
+    e.fin,
+    e.edificio,
+    e.piso,
+    CONCAT(e.id_b, '-', e.edificio, '-', e.piso, '-', e.variante) AS tipo_bano,
+    e.variante,
+    e.tt_proc,
+    e.t_real_min,
+    e.t_espera_min,
+    e.t_real_min - e.tt_proc AS diferencia_tt_min,
+    e.t_real_min <= e.tt_proc AS cumple_tt,
+    (e.t_real_min / NULLIF(e.tt_proc, 0)) * 100 AS porcentaje_tt,
+    e.t_real_min / 60 AS t_real_horas,
+    e.t_espera_min / 60 AS t_espera_horas
+FROM ejecucion_proceso e;
+
+-- Tiempo real acumulado por baño en orden de carga (id_ejec), igual que la
+-- columna T_Real_Acumulado del Excel. Los filtros por id_b se empujan dentro
+-- de la ventana porque id_b es la columna de partición (MySQL 8.0.22+).
+CREATE OR REPLACE VIEW v_ejecucion_acumulado AS
+SELECT
+    v.*,
+    SUM(v.t_real_min) OVER (PARTITION BY v.id_b ORDER BY v.id_ejec) AS t_real_acum_min,
+    SUM(v.t_real_min) OVER (PARTITION BY v.id_b ORDER BY v.id_ejec) / 60 AS t_real_acum_horas
+FROM v_ejecucion_proceso v;
+
+-- Lead time por baño: el máximo del acumulado es la suma de los tiempos reales
+-- (no negativos), por lo que no hace falta evaluar la ventana completa.
+CREATE OR REPLACE VIEW v_lead_time_bano AS
+SELECT id_b, SUM(t_real_min) AS lead_time_min, MIN(fecha) AS fecha_inicio, MAX(fecha) AS fecha_fin
+FROM ejecucion_proceso
+GROUP BY id_b;
@@ -0,0 +1,136 @@
+-- ============================================================
+-- ESQUEMA AXIS FLOW - SUSTITUTO LOCAL EN SQLITE
+-- ============================================================
+-- Mismas tablas y columnas que axis_flow_tables.sql (esquema 'generadas'),
+-- para probar y medir la carga sin un servidor MySQL (ingesta.py,
+-- benchmarks.py ingesta). Los ENUM pasan a CHECK y las columnas generadas
+-- STORED se mantienen (SQLite 3.31+). Incluye las tablas resumen de
+-- migracion_rendimiento.sql, mantenidas con triggers igual que en MySQL.
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS operario (
+    id_op INTEGER PRIMARY KEY AUTOINCREMENT,
+    nom_op VARCHAR(50) NOT NULL,
+    ap_pa_op VARCHAR(50),
+    ap_ma_op VARCHAR(50),
+    sigla_op VARCHAR(3) UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS bano (
+    id_b INTEGER PRIMARY KEY,
+    variante TEXT NOT NULL CHECK (variante IN (
+        'B1', 'B1E', 'B2', 'B2E', 'B2b', 'B3', 'B3E', 'B4', 'B4E', 'B4b', 'B5', 'B6', 'B6E'
+    )),
+    edificio TEXT NOT NULL CHECK (edificio IN ('A', 'B', 'C')),
+    piso SMALLINT NOT NULL,
+
+    UNIQUE (id_b, edificio, piso, variante)
+);
+
+CREATE TABLE IF NOT EXISTS proceso (
+    id_proc INTEGER PRIMARY KEY AUTOINCREMENT,
+    nom_proc VARCHAR(100) NOT NULL,
+    tt_proc INT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ejecucion_proceso (
+    id_ejec INTEGER PRIMARY KEY AUTOINCREMENT,
+
+    id_b INT NOT NULL REFERENCES bano(id_b),
+    id_proc INT NOT NULL REFERENCES proceso(id_proc),
+    fecha DATE NOT NULL,
+    inicio DATETIME DEFAULT NULL,
+    fin DATETIME DEFAULT NULL CHECK (fin >= inicio),
+
+    edificio TEXT NOT NULL CHECK (edificio IN ('A', 'B', 'C')),
+    piso SMALLINT NOT NULL,
+
+    tipo_bano VARCHAR(50) GENERATED ALWAYS AS (
+        id_b || '-' || edificio || '-' || piso || '-' || variante
+    ) STORED,
+
+    variante TEXT NOT NULL CHECK (variante IN (
+        'B1', 'B1E', 'B2', 'B2E', 'B2b', 'B3', 'B3E', 'B4', 'B4E', 'B4b', 'B5', 'B6', 'B6E'
+    )),
+
+    tt_proc INT NOT NULL,
+    t_real_min DECIMAL(10,2) NOT NULL,
+    t_espera_min DECIMAL(10,2) DEFAULT 0,
+    t_real_acum_min DECIMAL(12,2) DEFAULT NULL,
+
+    diferencia_tt_min DECIMAL(10,2) GENERATED ALWAYS AS (t_real_min - tt_proc) STORED,
+    cumple_tt TINYINT GENERATED ALWAYS AS (t_real_min <= tt_proc) STORED,
+    porcentaje_tt DECIMAL(5,2) GENERATED ALWAYS AS ((t_real_min * 1.0 / NULLIF(tt_proc, 0)) * 100) STORED,
+
+    t_real_horas DECIMAL(10,4) GENERATED ALWAYS AS (t_real_min / 60.0) STORED,
+    t_espera_horas DECIMAL(10,4) GENERATED ALWAYS AS (t_espera_min / 60.0) STORED,
+    t_real_acum_horas DECIMAL(12,4) GENERATED ALWAYS AS (t_real_acum_min / 60.0) STORED
+);
+
+CREATE INDEX IF NOT EXISTS idx_ejec_fecha ON ejecucion_proceso (fecha);
+CREATE INDEX IF NOT EXISTS idx_ejec_proc ON ejecucion_proceso (id_proc);
+CREATE INDEX IF NOT EXISTS idx_ejec_bano_fecha ON ejecucion_proceso (id_b, fecha);
+CREATE INDEX IF NOT EXISTS idx_ejec_inicio ON ejecucion_proceso (inicio, fin);
+CREATE INDEX IF NOT EXISTS idx_ejec_proc_inicio ON ejecucion_proceso (id_proc, inicio, fin);
+
+CREATE TABLE IF NOT EXISTS ejecucion_operario (
+    id_ejec_op INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_ejec INT NOT NULL REFERENCES ejecucion_proceso(id_ejec) ON DELETE CASCADE,
+    id_op INT NOT NULL REFERENCES operario(id_op) ON DELETE RESTRICT,
+
+    rol TEXT DEFAULT 'Operario_1' CHECK (rol IN ('Operario_1', 'Operario_2', 'Operario_3')),
+
+    UNIQUE (id_ejec, id_op)
+);
+
+
+-- ============================================================
+-- TABLAS RESUMEN (migracion_rendimiento.sql, sección 5)
+-- ============================================================
+-- Solo el caso de inserción: el sustituto no recibe modificaciones ni
+-- eliminaciones.
+
+CREATE TABLE IF NOT EXISTS resumen_bano (
+    id_b INTEGER PRIMARY KEY,
+    num_procesos INT NOT NULL,
+    num_cumple INT NOT NULL,
+    t_real_total_min DECIMAL(14,2) NOT NULL,
+    t_espera_total_min DECIMAL(14,2) NOT NULL,
+    lead_time_min DECIMAL(12,2) DEFAULT NULL,
+    fecha_inicio DATE NOT NULL,
+    fecha_fin DATE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS resumen_mes (
+    mes DATE PRIMARY KEY,
+    num_ejecuciones INT NOT NULL,
+    num_cumple INT NOT NULL,
+    t_real_total_min DECIMAL(16,2) NOT NULL,
+    t_espera_total_min DECIMAL(16,2) NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_ejec_resumen_ai AFTER INSERT ON ejecucion_proceso
+FOR EACH ROW
+BEGIN
+    INSERT INTO resumen_bano
+        (id_b, num_procesos, num_cumple, t_real_total_min, t_espera_total_min, lead_time_min, fecha_inicio, fecha_fin)
+    VALUES (NEW.id_b, 1, NEW.t_real_min <= NEW.tt_proc, NEW.t_real_min, COALESCE(NEW.t_espera_min, 0),
+            NEW.t_real_acum_min, NEW.fecha, NEW.fecha)
+    ON CONFLICT (id_b) DO UPDATE SET
+        num_procesos = num_procesos + 1,
+        num_cumple = num_cumple + excluded.num_cumple,
+        t_real_total_min = t_real_total_min + excluded.t_real_total_min,
+        t_espera_total_min = t_espera_total_min + excluded.t_espera_total_min,
+        lead_time_min = MAX(COALESCE(lead_time_min, excluded.lead_time_min), COALESCE(excluded.lead_time_min, lead_time_min)),
+        fecha_inicio = MIN(fecha_inicio, excluded.fecha_inicio),
+        fecha_fin = MAX(fecha_fin, excluded.fecha_fin);
+
+    INSERT INTO resumen_mes (mes, num_ejecuciones, num_cumple, t_real_total_min, t_espera_total_min)
+    VALUES (strftime('%Y-%m-01', NEW.fecha), 1, NEW.t_real_min <= NEW.tt_proc, NEW.t_real_min,
+            COALESCE(NEW.t_espera_min, 0))
+    ON CONFLICT (mes) DO UPDATE SET
+        num_ejecuciones = num_ejecuciones + 1,
+        num_cumple = num_cumple + excluded.num_cumple,
+        t_real_total_min = t_real_total_min + excluded.t_real_total_min,
+        t_espera_total_min = t_espera_total_min + excluded.t_espera_total_min;
+END;
@@ -0,0 +1,321 @@
+#------------------------
+# Benchmark de Consultas sobre axis_bd (MySQL / MariaDB)
+#------------------------
+# Crea una base de prueba con axis_flow_tables.sql, la puebla con datos
+# sintéticos (benchmarks.generar_datos) y mide las consultas que hace el
+# dashboard antes y después de migracion_rendimiento.sql.
+#
+#   python benchmark_bd.py comparar --filas 200000 --usuario root --clave ****
+#
+# `revertir` aplica migracion_rendimiento_rollback.sql a la base de prueba
+# (para probar la reversión antes de usarla sobre axis_bd).
+#
+# También compara la inserción y el tamaño del esquema con columnas generadas
+# contra el esquema 'lote' de axis_flow_tables_lote.sql:
+#
+#   python benchmark_bd.py esquemas --filas 200000 --usuario root --clave ****
+#
+# Trabaja sobre una base separada (axis_bench por defecto): los scripts se
+# ejecutan reemplazando el nombre axis_bd, por lo que nunca modifica la base
+# real. Requiere el paquete pymysql (pip install pymysql).
+#------------------------
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+from benchmarks import generar_datos
+from carga_bd import (
+    DIRECTORIO, SCRIPTS_ESQUEMA, conectar, ejecutar_script, tablas_axis, insertar, poblar
+)
+
+
+SCRIPT_TABLAS = SCRIPTS_ESQUEMA["generadas"]
+SCRIPT_MIGRACION = os.path.join(DIRECTORIO, "migracion_rendimiento.sql")
+SCRIPT_REVERSION = os.path.join(DIRECTORIO, "migracion_rendimiento_rollback.sql")
+
+
+#------------------------
+# Lotes de Datos Sintéticos
+#------------------------
+def separar_banos(tablas, ids_b):
+    """Separa las ejecuciones de los baños indicados (lote para insertar después) del resto de los datos."""
+    ejec = tablas['ejecucion_proceso']
+    ejec_op = tablas['ejecucion_operario']
+    en_lote = ejec['id_b'].isin(ids_b)
+    op_en_lote = ejec_op['id_ejec'].isin(ejec.loc[en_lote, 'id_ejec'])
+
+    resto = dict(tablas, ejecucion_proceso=ejec[~en_lote], ejecucion_operario=ejec_op[~op_en_lote])
+    lote = {'ejecucion_proceso': ejec[en_lote], 'ejecucion_operario': ejec_op[op_en_lote]}
+    return resto, lote
+#------------------------
+# Fin de Lotes de Datos Sintéticos
+#------------------------
+
+
+#------------------------
+# Consultas Medidas
+#------------------------
+# (nombre, sql, parámetros, requiere tablas resumen)
+CONSULTAS = [
+    ("kpis_mes",
+     "SELECT COUNT(*), COUNT(DISTINCT id_b), AVG(t_real_min), AVG(cumple_tt) "
+     "FROM ejecucion_proceso WHERE fecha >= %s AND fecha < %s",
+     ('2025-03-01', '2025-04-01'), False),
+    ("cumplimiento_variante_proceso",
+     "SELECT id_proc, COUNT(*), AVG(cumple_tt), AVG(t_real_min), AVG(tt_proc) "
+     "FROM ejecucion_proceso WHERE variante = %s GROUP BY id_proc",
+     ('B6',), False),
+    ("metricas_operario",
+     "SELECT eo.id_op, COUNT(*), AVG(e.t_real_min), AVG(e.cumple_tt) "
+     "FROM ejecucion_operario eo JOIN ejecucion_proceso e ON e.id_ejec = eo.id_ejec "
+     "WHERE eo.id_op = %s GROUP BY eo.id_op",
+     (1,), False),
+    ("lead_time_promedio",
+     "SELECT AVG(lead_time) FROM (SELECT id_b, MAX(t_real_acum_min) AS lead_time "
+     "FROM ejecucion_proceso GROUP BY id_b) t",
+     None, False),
+    ("banos_por_mes",
+     "SELECT DATE_FORMAT(inicio, '%Y-%m') AS mes, COUNT(*) FROM (SELECT id_b, MIN(fecha) AS inicio "
+     "FROM ejecucion_proceso GROUP BY id_b) t GROUP BY mes",
+     None, False),
+    ("lead_time_promedio (resumen)",
+     "SELECT AVG(lead_time_min) FROM resumen_bano",
+     None, True),
+    ("banos_por_mes (resumen)",
+     "SELECT mes, banos FROM v_banos_por_mes",
+     None, True),
+]
+
+
+def existe_tabla(con, tabla):
+    with con.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                    (tabla,))
+        return cur.fetchone()[0] > 0
+
+
+def medir_consultas(con, repeticiones=5):
+    """Mediana en ms de cada consulta y particiones leídas según EXPLAIN."""
+    hay_resumen = existe_tabla(con, 'resumen_bano')
+    filas = []
+    with con.cursor() as cur:
+        for nombre, sql, parametros, requiere_resumen in CONSULTAS:
+            if requiere_resumen and not hay_resumen:
+                continue
+            mediana = cronometrar_consulta(cur, sql, parametros, repeticiones)
+
+            cur.execute("EXPLAIN " + sql, parametros)
+            columnas = [d[0] for d in cur.description]
+            particiones = None
+            if 'partitions' in columnas:
+                valores = [fila[columnas.index('partitions')] for fila in cur.fetchall()]
+                particiones = max((len(v.split(',')) for v in valores if v), default=None)
+            else:
+                cur.fetchall()
+            filas.append({'Consulta': nombre, 'Mediana_ms': mediana, 'Particiones': particiones})
+    return pd.DataFrame(filas).set_index('Consulta')
+
+
+def tamano_tablas(con):
+    """Tamaño de datos e índices (MB) de las tablas de la base actual."""
+    with con.cursor() as cur:
+        cur.execute(
+            "SELECT TABLE_NAME, TABLE_ROWS, DATA_LENGTH / 1048576, INDEX_LENGTH / 1048576 "
+            "FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'"
+        )
+        filas = cur.fetchall()
+    return pd.DataFrame(filas, columns=['Tabla', 'Filas_aprox', 'Datos_MB', 'Indices_MB']).set_index('Tabla')
+
+
+# Lecturas equivalentes en los dos esquemas de carga: (nombre, sql generadas, sql lote, parámetros)
+CONSULTAS_ESQUEMA = [
+    ("kpis_mes",
+     "SELECT COUNT(*), COUNT(DISTINCT id_b), AVG(t_real_min), AVG(cumple_tt) "
+     "FROM ejecucion_proceso WHERE fecha >= %s AND fecha < %s",
+     "SELECT COUNT(*), COUNT(DISTINCT id_b), AVG(t_real_min), AVG(cumple_tt) "
+     "FROM v_ejecucion_proceso WHERE fecha >= %s AND fecha < %s",
+     ('2025-03-01', '2025-04-01')),
+    ("porcentaje_tt_variante",
+     "SELECT id_proc, AVG(porcentaje_tt), AVG(diferencia_tt_min) FROM ejecucion_proceso "
+     "WHERE variante = %s GROUP BY id_proc",
+     "SELECT id_proc, AVG(porcentaje_tt), AVG(diferencia_tt_min) FROM v_ejecucion_proceso "
+     "WHERE variante = %s GROUP BY id_proc",
+     ('B6',)),
+    ("acumulado_bano",
+     "SELECT id_ejec, t_real_acum_min FROM ejecucion_proceso WHERE id_b = %s ORDER BY id_ejec",
+     "SELECT id_ejec, t_real_acum_min FROM v_ejecucion_acumulado WHERE id_b = %s ORDER BY id_ejec",
+     (1,)),
+    ("lead_time_promedio",
+     "SELECT AVG(lead_time) FROM (SELECT id_b, MAX(t_real_acum_min) AS lead_time "
+     "FROM ejecucion_proceso GROUP BY id_b) t",
+     "SELECT AVG(lead_time_min) FROM v_lead_time_bano",
+     None),
+]
+
+
+def cronometrar_consulta(cur, sql, parametros, repeticiones):
+    """Mediana en ms de una consulta."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        cur.execute(sql, parametros)
+        cur.fetchall()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+#------------------------
+# Fin de Consultas Medidas
+#------------------------
+
+
+#------------------------
+# Comandos
+#------------------------
+def preparar(args, tablas, esquema="generadas", base=None):
+    """Recrea la base de prueba con el esquema indicado y la puebla; devuelve los segundos por tabla."""
+    base = base or args.base
+    with conectar(args) as con:
+        # Elimina también las tablas resumen, vistas y eventos de una migración anterior
+        with con.cursor() as cur:
+            cur.execute(f"DROP DATABASE IF EXISTS `{base}`")
+        ejecutar_script(con, SCRIPTS_ESQUEMA[esquema], base)
+    with conectar(args, base) as con:
+        return poblar(con, tablas)
+
+
+def migrar(args):
+    inicio = time.perf_counter()
+    with conectar(args, args.base) as con:
+        ejecutar_script(con, SCRIPT_MIGRACION, args.base)
+    print(f"Migración aplicada en {time.perf_counter() - inicio:.1f} s")
+
+
+def revertir(args):
+    inicio = time.perf_counter()
+    with conectar(args, args.base) as con:
+        ejecutar_script(con, SCRIPT_REVERSION, args.base)
+    print(f"Migración revertida en {time.perf_counter() - inicio:.1f} s")
+
+
+def comparar(args):
+    """Mide consultas, inserciones y tamaño antes y después de la migración."""
+    tablas = tablas_axis(generar_datos(args.filas, args.semilla))
+    # Dos lotes de baños (5% cada uno) se reservan para medir inserciones sobre la base ya poblada
+    ids = tablas['bano']['id_b'].to_numpy()
+    n_lote = max(1, len(ids) // 20)
+    tablas, lote_base = separar_banos(tablas, ids[-2 * n_lote:-n_lote])
+    tablas, lote_migrada = separar_banos(tablas, ids[-n_lote:])
+
+    print(f"Preparando {args.base} ({len(tablas['ejecucion_proceso']):,} ejecuciones)")
+    preparar(args, tablas)
+
+    resultados = {}
+    for etapa, lote in (("base", lote_base), ("migrada", lote_migrada)):
+        if etapa == "migrada":
+            migrar(args)
+        with conectar(args, args.base) as con:
+            consultas = medir_consultas(con, args.repeticiones)
+            seg = insertar(con, 'ejecucion_proceso', lote['ejecucion_proceso'])
+            insertar(con, 'ejecucion_operario', lote['ejecucion_operario'])
+            print(f"[{etapa}] inserción de {len(lote['ejecucion_proceso']):,} ejecuciones: "
+                  f"{len(lote['ejecucion_proceso']) / max(seg, 1e-9):,.0f} filas/s")
+            print(tamano_tablas(con).round(2).to_string())
+        resultados[etapa] = consultas
+
+    tabla = pd.concat(resultados, axis=1)
+    print(tabla.round(2).to_string())
+    return tabla
+
+
+def comparar_esquemas(args):
+    """
+    Carga los mismos datos en el esquema con columnas generadas y en el esquema
+    'lote' (derivadas en vistas) y compara velocidad de inserción, tamaño en
+    disco y lecturas equivalentes.
+    """
+    datos = generar_datos(args.filas, args.semilla)
+    resumen = {}
+    lecturas = {}
+    for esquema in SCRIPTS_ESQUEMA:
+        base = f"{args.base}_{esquema}"
+        tablas = tablas_axis(datos, esquema)
+        print(f"[{esquema}] {base}")
+        tiempos = preparar(args, tablas, esquema, base)
+
+        with conectar(args, base) as con:
+            with con.cursor() as cur:
+                cur.execute("ANALYZE TABLE ejecucion_proceso")
+                cur.fetchall()
+                tamanos = tamano_tablas(con)
+                lecturas[esquema] = {}
+                for nombre, sql_generadas, sql_lote, parametros in CONSULTAS_ESQUEMA:
+                    sql = sql_generadas if esquema == "generadas" else sql_lote
+                    lecturas[esquema][nombre] = cronometrar_consulta(cur, sql, parametros, args.repeticiones)
+
+        n_ejec = len(tablas['ejecucion_proceso'])
+        resumen[esquema] = {
+            'Ejecuciones_por_s': n_ejec / max(tiempos['ejecucion_proceso'], 1e-9),
+            'Datos_MB': tamanos.loc['ejecucion_proceso', 'Datos_MB'],
+            'Indices_MB': tamanos.loc['ejecucion_proceso', 'Indices_MB'],
+            'Bytes_por_fila': float(tamanos.loc['ejecucion_proceso', 'Datos_MB']) * 1048576 / n_ejec,
+        }
+
+    print(pd.DataFrame(resumen).T.astype(float).round(2).to_string())
+    print(pd.DataFrame(lecturas).rename_axis('Mediana_ms').round(2).to_string())
+    return resumen, lecturas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de consultas de axis_bd sobre MySQL/MariaDB.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=3306)
+    parser.add_argument("--usuario", default="root")
+    parser.add_argument("--clave", default=os.environ.get("AXIS_BD_CLAVE", ""))
+    parser.add_argument("--base", default="axis_bench", help="Base de prueba (se recrea; no usar axis_bd).")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_preparar = sub.add_parser("preparar", help="Crea y puebla la base de prueba.")
+    p_preparar.add_argument("--filas", type=int, default=200_000)
+    p_preparar.add_argument("--semilla", type=int, default=0)
+    sub.add_parser("migrar", help="Aplica migracion_rendimiento.sql a la base de prueba.")
+    sub.add_parser("revertir", help="Aplica migracion_rendimiento_rollback.sql a la base de prueba.")
+    p_consultas = sub.add_parser("consultas", help="Mide las consultas sobre la base de prueba.")
+    p_consultas.add_argument("--repeticiones", type=int, default=5)
+    p_comparar = sub.add_parser("comparar", help="Prepara, mide, migra y vuelve a medir.")
+    p_comparar.add_argument("--filas", type=int, default=200_000)
+    p_comparar.add_argument("--semilla", type=int, default=0)
+    p_comparar.add_argument("--repeticiones", type=int, default=5)
+
+    p_esquemas = sub.add_parser("esquemas", help="Compara el esquema con columnas generadas contra el esquema 'lote'.")
+    p_esquemas.add_argument("--filas", type=int, default=200_000)
+    p_esquemas.add_argument("--semilla", type=int, default=0)
+    p_esquemas.add_argument("--repeticiones", type=int, default=5)
+
+    args = parser.parse_args(argv)
+    if args.base == "axis_bd":
+        parser.error("la base de prueba no puede ser axis_bd")
+
+    if args.comando == "preparar":
+        preparar(args, tablas_axis(generar_datos(args.filas, args.semilla)))
+    elif args.comando == "migrar":
+        migrar(args)
+    elif args.comando == "revertir":
+        revertir(args)
+    elif args.comando == "consultas":
+        with conectar(args, args.base) as con:
+            print(medir_consultas(con, args.repeticiones).round(2).to_string())
+    elif args.comando == "comparar":
+        comparar(args)
+    elif args.comando == "esquemas":
+        comparar_esquemas(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+#------------------------
+# Fin de Comandos
+#------------------------
@@ -0,0 +1,597 @@
+#------------------------
+# Benchmarks del Dashboard
+#------------------------
+# Mediciones reproducibles sobre datos sintéticos con la misma forma que
+# Datos_Banos.xlsx, para escalar más allá del dataset real.
+#
+#   python benchmarks.py motores --filas 1000000
+#       Compara pandas (analitica.py) contra DuckDB (motor_duckdb.py): tiempo
+#       de los agregados y de las métricas clave filtradas, y memoria máxima de
+#       cada motor medida en un proceso aparte.
+#
+#   python benchmarks.py payload --filas 200000 --operarios 120
+#       Tamaño del JSON y tiempo de serialización de los gráficos por operario:
+#       una traza por operario con listas de texto (forma anterior) contra una
+#       sola traza con arreglos tipados (graficos.py).
+#
+#   python benchmarks.py api --filas 200000 --peticiones 2000 --concurrencia 16
+#       Peticiones por segundo y latencia de la API (api.py) en un núcleo,
+#       llamando a la aplicación ASGI en el mismo proceso (sin la capa HTTP de
+#       uvicorn): consultas nuevas, repetidas (caché de respuestas) y
+#       revalidadas con If-None-Match (304).
+#
+#   python benchmarks.py ingesta --eventos 20000 --lotes 50,500,2000 --tasa 2000
+#       Escritura sostenida (ejecuciones/s) y latencia de visibilidad (desde
+#       que se recibe el evento hasta que su transacción se confirma) de
+#       ingesta.py para cada tamaño de lote, sobre una base SQLite local en
+#       lugar de MySQL.
+#
+#   python benchmarks.py paralelo --filas 1000000 --procesos 1,2,4,8 --particion mes
+#       Curva de escalamiento de los agregados de las Pestañas 3, 5 y 6 por
+#       particiones en un pool de procesos (agregacion_paralela.py) contra la
+#       ruta de un solo proceso de analitica.py, con su verificación de paridad.
+#       El pool se calienta antes de medir (el arranque de los procesos se
+#       paga una vez por sesión del dashboard, no por cálculo).
+#------------------------
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import plotly.graph_objects as go
+
+import agregacion_paralela
+import anomalias
+import api
+import carga_bd
+import catalogo
+import fragmentos
+import fuente_datos
+import ingesta
+import motor_duckdb
+import refresco_datos
+import validacion
+from analitica import preparar_datos, calcular_agregados, metricas_clave
+from graficos import figura_barras_operario, figura_desglose_procesos
+
+
+#------------------------
+# Datos Sintéticos
+#------------------------
+PROCESOS_SINTETICOS = [f"PROCESO {i:02d}" for i in range(1, 41)]
+# Mismas variantes que el ENUM de axis_flow_tables.sql y siglas de 3 caracteres (sigla_op VARCHAR(3)),
+# para poder cargar los datos sintéticos también en MySQL (benchmark_bd.py)
+VARIANTES_SINTETICAS = ['B1', 'B1E', 'B2', 'B2E', 'B2b', 'B3', 'B3E', 'B4', 'B4E', 'B4b', 'B5', 'B6', 'B6E']
+OPERARIOS_SINTETICOS = [f"O{i:02d}" for i in range(1, 31)]
+
+
+def generar_datos(filas, semilla=0, n_operarios=None):
+    """
+    DataFrame crudo (columnas del Excel) con ~filas ejecuciones de proceso, 40 por baño.
+    n_operarios cambia la dotación (por defecto, los 30 de OPERARIOS_SINTETICOS).
+    """
+    rng = np.random.default_rng(semilla)
+    siglas = OPERARIOS_SINTETICOS if n_operarios is None else [f"O{i:02d}" for i in range(1, n_operarios + 1)]
+    n_procesos = len(PROCESOS_SINTETICOS)
+    n_banos = max(1, filas // n_procesos)
+    n = n_banos * n_procesos
+
+    correlativo = np.repeat(np.arange(1, n_banos + 1), n_procesos)
+    variante = np.repeat(rng.choice(VARIANTES_SINTETICAS, n_banos), n_procesos)
+    edificio = np.repeat(rng.choice(list("ABC"), n_banos), n_procesos)
+    piso = np.repeat(rng.integers(1, 9, n_banos), n_procesos)
+    cod_bano = pd.Series(correlativo).astype(str) + "-" + edificio + piso.astype(str) + "-" + variante
+
+    inicio = np.datetime64("2025-01-01") + rng.integers(0, 300, n_banos).astype("timedelta64[D]")
+    fecha = np.repeat(inicio, n_procesos) + (np.tile(np.arange(n_procesos), n_banos) // 8).astype("timedelta64[D]")
+
+    tt_proceso = rng.choice([10, 15, 20, 30, 45, 60], n_procesos)
+    tt = np.tile(tt_proceso, n_banos)
+    t_real = np.round(tt * rng.lognormal(0.0, 0.35, n), 2)
+    t_espera = np.where(rng.random(n) < 0.1, np.round(rng.exponential(30, n), 2), 0.0)
+    t_real_acum = pd.Series(t_real).groupby(correlativo).cumsum().to_numpy()
+
+    def operario(prob_vacio):
+        valores = rng.choice(siglas, n).astype(object)
+        valores[rng.random(n) < prob_vacio] = np.nan
+        return valores
+
+    return pd.DataFrame({
+        'Correlativo': correlativo,
+        'Cod_bano': cod_bano,
+        'Tipo_bano': variante,
+        'Fecha': fecha,
+        'Proceso': np.tile(PROCESOS_SINTETICOS, n_banos),
+        'T_Espera_min': t_espera,
+        'T_Real_min': t_real,
+        'T_Real_Acumulado': t_real_acum,
+        'TT': tt,
+        'Cumple_TT': t_real <= tt,
+        'Diferencia_TT': np.round(t_real - tt, 2),
+        'Operario_1': operario(0.0),
+        'Operario_2': operario(0.6),
+        'Operario_3': operario(0.9),
+        'T_Real_horas': np.round(t_real / 60, 2),
+        'T_Espera_horas': np.round(t_espera / 60, 2),
+        'T_Real_Acumulado_horas': np.round(t_real_acum / 60, 2),
+    })
+#------------------------
+# Fin de Datos Sintéticos
+#------------------------
+
+
+#------------------------
+# Utilidades de Medición
+#------------------------
+def cronometrar(funcion, repeticiones=3):
+    """Mejor tiempo (segundos) de varias repeticiones y el último resultado."""
+    mejor = float("inf")
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def memoria_maxima_mb():
+    """
+    Memoria residente máxima del proceso. En Linux se lee VmHWM, que a diferencia
+    de ru_maxrss no hereda el máximo del proceso padre a través de exec.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+#------------------------
+# Fin de Utilidades de Medición
+#------------------------
+
+
+#------------------------
+# Motores: pandas vs DuckDB
+#------------------------
+def _filtros_ejemplo(df):
+    """Filtros de barra lateral representativos: tres meses y un tipo agrupado."""
+    meses = sorted(df['Fecha'].dt.strftime('%Y-%m').dropna().unique())[:3]
+    return meses, 'B6'
+
+
+def medir_motor(motor, ruta_parquet, repeticiones):
+    """Mide un motor en el proceso actual; pensado para ejecutarse en un subproceso aislado."""
+    resultado = {'motor': motor}
+    inicio = time.perf_counter()
+    if motor == "pandas":
+        df = pd.read_parquet(ruta_parquet)
+        resultado['carga_s'] = time.perf_counter() - inicio
+        meses, tipo = _filtros_ejemplo(df)
+
+        def kpis():
+            df_filt = df[df['Fecha'].dt.strftime('%Y-%m').isin(meses)]
+            df_filt = df_filt[df_filt['Tipo_bano_agrupado'] == tipo]
+            return metricas_clave(df_filt)
+
+        resultado['agregados_s'], _ = cronometrar(lambda: calcular_agregados(df), repeticiones)
+    else:
+        motor_db = motor_duckdb.MotorDuckDB(ruta_parquet=ruta_parquet)
+        resultado['carga_s'] = time.perf_counter() - inicio
+        meses = motor_db._consultar(
+            "SELECT DISTINCT strftime(Fecha, '%Y-%m') AS m FROM ejecuciones ORDER BY m LIMIT 3"
+        )['m'].tolist()
+        tipo = 'B6'
+
+        def kpis():
+            return motor_db.metricas_clave(meses=meses, tipo_agrupado=tipo)
+
+        resultado['agregados_s'], _ = cronometrar(motor_db.calcular_agregados, repeticiones)
+
+    resultado['metricas_clave_s'], valores = cronometrar(kpis, repeticiones)
+    resultado['banos_filtrados'] = valores['banos_terminados']
+    resultado['memoria_max_mb'] = memoria_maxima_mb()
+    return resultado
+
+
+def benchmark_motores(filas, repeticiones, semilla):
+    """Genera los datos una vez en Parquet y mide cada motor en su propio proceso."""
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_datos = os.path.join(tmp, "datos.parquet")
+        ruta_motor = os.path.join(tmp, "motor.parquet")
+
+        inicio = time.perf_counter()
+        df = preparar_datos(generar_datos(filas, semilla))
+        print(f"Datos sintéticos: {len(df):,} filas, {df['Cod_bano'].nunique():,} baños "
+              f"({time.perf_counter() - inicio:.1f} s)")
+        # pandas lee el dataset completo (como el dashboard); DuckDB solo las columnas del motor
+        df.to_parquet(ruta_datos, index=False)
+        motor_duckdb.exportar_parquet(df, ruta_motor)
+        del df
+
+        motores = [("pandas", ruta_datos)]
+        if motor_duckdb.disponible():
+            motores.append(("duckdb", ruta_motor))
+        else:
+            print("DuckDB no está instalado; se mide solo pandas.")
+
+        resultados = []
+        for motor, ruta in motores:
+            salida = subprocess.run(
+                [sys.executable, __file__, "_motor", motor, ruta, "--repeticiones", str(repeticiones)],
+                capture_output=True, text=True
+            )
+            if salida.returncode != 0:
+                raise RuntimeError(f"Falló la medición de {motor}:\n{salida.stderr}")
+            resultados.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+
+    tabla = pd.DataFrame(resultados).set_index('motor')
+    print(tabla.round(3).to_string())
+    return tabla
+#------------------------
+# Fin de Motores: pandas vs DuckDB
+#------------------------
+
+
+#------------------------
+# Payload de Gráficos
+#------------------------
+def _barras_por_traza(metricas, col_valor, color_map, formato):
+    """Forma anterior de las Pestañas 4 y 6: una traza por operario con su lista de textos."""
+    fig = go.Figure()
+    for operario in metricas['Operario']:
+        data_op = metricas[metricas['Operario'] == operario]
+        fig.add_trace(go.Bar(
+            x=data_op[col_valor],
+            y=data_op['Operario'],
+            orientation='h',
+            name=operario,
+            marker_color=color_map[operario],
+            text=[formato.format(val) for val in data_op[col_valor]],
+            textposition='outside',
+            showlegend=True
+        ))
+    return fig
+
+
+def _desglose_por_traza(conteo, color_map):
+    """Forma anterior del desglose de la Pestaña 4: una traza por par operario-proceso."""
+    fig = go.Figure()
+    for operario in conteo.index:
+        acumulado = 0
+        for proceso in conteo.columns:
+            cantidad = int(conteo.at[operario, proceso])
+            if cantidad > 0:
+                fig.add_trace(go.Bar(
+                    x=[operario], y=[cantidad], name=proceso, marker_color=color_map[proceso],
+                    offsetgroup=acumulado, base=acumulado, showlegend=bool(operario == conteo.index[0])
+                ))
+                acumulado += cantidad
+    return fig
+
+
+def medir_payload(fig, repeticiones):
+    """Bytes del JSON de la figura y mejor tiempo de serialización (fig.to_json, lo que envía st.plotly_chart)."""
+    segundos, texto = cronometrar(fig.to_json, repeticiones)
+    return len(texto.encode("utf-8")), segundos
+
+
+def benchmark_payload(filas, n_operarios, repeticiones, semilla):
+    """Compara, gráfico por gráfico, la forma anterior (trazas por operario) con la consolidada."""
+    df = preparar_datos(generar_datos(filas, semilla, n_operarios))
+    agregados = calcular_agregados(df)
+    metricas = agregados['metricas_operario']
+    catalogo_datos = catalogo.construir_catalogo(df)
+    color_map = catalogo_datos.colores('Operario')
+    colores_proceso = catalogo_datos.colores('Proceso')
+    pares = df[['Operarios_list', 'Proceso']].explode('Operarios_list').dropna().reset_index(drop=True)
+    conteo = pd.crosstab(pares['Operarios_list'], pares['Proceso'])
+    conteo = conteo.reindex(index=metricas['Operario'], columns=catalogo_datos.ordenar('Proceso', conteo.columns))
+    print(f"Datos sintéticos: {len(df):,} filas, {len(metricas)} operarios, {conteo.shape[1]} procesos")
+
+    graficos = {
+        'tiempo_real': (
+            lambda: _barras_por_traza(metricas, 'Avg_T_Real', color_map, "{:.1f}"),
+            lambda: figura_barras_operario(metricas, 'Avg_T_Real', "", "", color_map, "%{x:.1f}")
+        ),
+        'cumplimiento_tt': (
+            lambda: _barras_por_traza(metricas, 'Pct_Cumple_TT', color_map, "{:.1f}%"),
+            lambda: figura_barras_operario(metricas, 'Pct_Cumple_TT', "", "", color_map, "%{x:.1f}%")
+        ),
+        'desglose_procesos': (
+            lambda: _desglose_por_traza(conteo, colores_proceso),
+            lambda: figura_desglose_procesos(conteo, colores_proceso)
+        ),
+    }
+
+    filas_tabla = []
+    for nombre, (anterior, consolidado) in graficos.items():
+        for forma, construir in (("por_traza", anterior), ("consolidado", consolidado)):
+            construccion_s, fig = cronometrar(construir, repeticiones)
+            tamano, serializacion_s = medir_payload(fig, repeticiones)
+            filas_tabla.append({
+                'grafico': nombre, 'forma': forma, 'trazas': len(fig.data),
+                'construccion_s': construccion_s, 'serializacion_s': serializacion_s,
+                'payload_kb': tamano / 1024
+            })
+
+    tabla = pd.DataFrame(filas_tabla).set_index(['grafico', 'forma'])
+    print(tabla.round(4).to_string())
+    return tabla
+#------------------------
+# Fin de Payload de Gráficos
+#------------------------
+
+
+#------------------------
+# API HTTP
+#------------------------
+def _consultas_api(n, df):
+    """n consultas distintas que mezclan métricas filtradas, tablas y páginas de ejecuciones y anomalías."""
+    correlativos = df['Correlativo'].drop_duplicates().to_numpy()
+    tipos = sorted(df['Tipo_bano'].unique())
+    consultas = []
+    for i in range(n):
+        caso = i % 4
+        if caso == 0:
+            consultas.append(("/api/kpis", f"correlativos={correlativos[i % len(correlativos)]}&pisos={i % 8 + 1}"))
+        elif caso == 1:
+            consultas.append(("/api/ejecuciones", f"pagina={i // 4 + 1}&tamano=100"))
+        elif caso == 2:
+            consultas.append(("/api/anomalias", f"pagina={i // 4 + 1}&tamano=50&pisos={i % 8 + 1}"))
+        else:
+            consultas.append(("/api/procesos", f"tipo_bano={tipos[i % len(tipos)]}&pagina={i}"))
+    return consultas
+
+
+async def _pedir(app, ruta, consulta, etag=None):
+    """Una petición GET a la aplicación ASGI; devuelve estado, ETag y segundos."""
+    encabezados = [(b"if-none-match", etag)] if etag is not None else []
+    scope = {'type': 'http', 'method': 'GET', 'path': ruta,
+             'query_string': consulta.encode('utf-8'), 'headers': encabezados}
+    respuesta = {}
+
+    async def send(mensaje):
+        if mensaje['type'] == 'http.response.start':
+            respuesta['estado'] = mensaje['status']
+            respuesta['etag'] = dict(mensaje['headers']).get(b"etag")
+
+    inicio = time.perf_counter()
+    await app(scope, None, send)
+    return respuesta['estado'], respuesta['etag'], time.perf_counter() - inicio
+
+
+async def _ronda_api(app, consultas, concurrencia, etags=None):
+    """Envía las consultas en tandas concurrentes; devuelve resultados y segundos totales."""
+    resultados = []
+    inicio = time.perf_counter()
+    for desde in range(0, len(consultas), concurrencia):
+        tanda = consultas[desde:desde + concurrencia]
+        resultados += await asyncio.gather(*(
+            _pedir(app, ruta, consulta, etags[desde + k] if etags else None)
+            for k, (ruta, consulta) in enumerate(tanda)
+        ))
+    return resultados, time.perf_counter() - inicio
+
+
+def benchmark_api(filas, peticiones, concurrencia, semilla):
+    """Peticiones por segundo y latencias de la API sin caché, con caché de respuestas y con 304."""
+    inicio = time.perf_counter()
+    resultado_validacion = validacion.validar(generar_datos(filas, semilla))
+    resultado_validacion.valido = preparar_datos(resultado_validacion.valido)
+    version = f"sintetico-{filas}-{semilla}"
+    datos = fuente_datos.construir_datos(resultado_validacion, version, datetime.now())
+    df = resultado_validacion.valido
+    print(f"Datos sintéticos: {len(df):,} filas, {df['Cod_bano'].nunique():,} baños "
+          f"({time.perf_counter() - inicio:.1f} s)")
+
+    refresco = refresco_datos.RefrescoDatos(lambda: version, lambda v: datos, intervalo=0)
+    app = api.crear_app(refresco, max_respuestas=peticiones)
+    consultas = _consultas_api(peticiones, df)
+
+    async def medir():
+        await _pedir(app, "/api/version", "")
+        rondas = {}
+        rondas['sin_cache'] = await _ronda_api(app, consultas, concurrencia)
+        rondas['cache'] = await _ronda_api(app, consultas, concurrencia)
+        etags = [etag for _, etag, _ in rondas['cache'][0]]
+        rondas['revalidacion_304'] = await _ronda_api(app, consultas, concurrencia, etags)
+        return rondas
+
+    filas_tabla = []
+    for nombre, (resultados, segundos) in asyncio.run(medir()).items():
+        latencias = np.array([s for _, _, s in resultados]) * 1000
+        filas_tabla.append({
+            'ronda': nombre,
+            'peticiones': len(resultados),
+            'req_s': len(resultados) / segundos,
+            'p50_ms': np.percentile(latencias, 50),
+            'p99_ms': np.percentile(latencias, 99),
+            'estados': ", ".join(f"{e}: {n}" for e, n in sorted(pd.Series([e for e, _, _ in resultados]).value_counts().items())),
+        })
+
+    tabla = pd.DataFrame(filas_tabla).set_index('ronda')
+    print(tabla.round(2).to_string())
+    return tabla
+#------------------------
+# Fin de API HTTP
+#------------------------
+
+
+#------------------------
+# Ingesta por Lotes
+#------------------------
+def eventos_sinteticos(df):
+    """Eventos de ingesta (inicio y fin ISO) a partir de las filas validadas de generar_datos."""
+    inicio = pd.to_datetime(df['Fecha']) + pd.to_timedelta(8, unit='h')
+    fin = inicio + pd.to_timedelta(df['T_Real_min'], unit='m')
+    operarios = df[['Operario_1', 'Operario_2', 'Operario_3']].to_numpy(dtype=object)
+    return [
+        {'correlativo': int(c), 'cod_bano': cod, 'tipo_bano': tipo, 'proceso': proc, 'tt': int(tt),
+         'operarios': [o for o in ops if isinstance(o, str)], 'inicio': i, 'fin': f}
+        for c, cod, tipo, proc, tt, ops, i, f in zip(
+            df['Correlativo'], df['Cod_bano'], df['Tipo_bano'], df['Proceso'], df['TT'], operarios,
+            inicio.dt.strftime('%Y-%m-%dT%H:%M:%S'), fin.dt.strftime('%Y-%m-%dT%H:%M:%S')
+        )
+    ]
+
+
+def benchmark_ingesta(n_eventos, lotes, tasa, semilla, por_envio=10):
+    """
+    Envía los eventos en grupos de por_envio (tasa eventos/s; 0 = sin pausa) y
+    mide, por tamaño de lote, cuánto tarda en quedar todo confirmado.
+    """
+    df = validacion.validar(generar_datos(n_eventos, semilla)).valido
+    eventos = eventos_sinteticos(df)
+    lineas_base = anomalias.calcular_lineas_base(df)
+    print(f"Eventos sintéticos: {len(eventos):,}")
+
+    filas_tabla = []
+    for lote in lotes:
+        with tempfile.TemporaryDirectory() as tmp:
+            ruta = os.path.join(tmp, "axis_local.db")
+            # Base nueva con el catálogo proceso cargado: la ingesta no agrega procesos
+            with closing(carga_bd.conectar_sqlite(ruta)) as con:
+                carga_bd.completar_procesos(con, df)
+            cola = ingesta.IngestaEjecuciones(
+                lambda: carga_bd.conectar_sqlite(ruta), lineas_base=lineas_base, tamano_lote=lote,
+                max_pendientes=len(eventos)
+            )
+            inicio = time.perf_counter()
+            for k in range(0, len(eventos), por_envio):
+                if tasa > 0:
+                    espera = inicio + k / tasa - time.perf_counter()
+                    if espera > 0:
+                        time.sleep(espera)
+                cola.agregar(eventos[k:k + por_envio])
+            cola.detener()
+            segundos = time.perf_counter() - inicio
+
+            with closing(carga_bd.conectar_sqlite(ruta)) as con:
+                en_base = con.execute("SELECT COUNT(*) FROM ejecucion_proceso").fetchone()[0]
+            estado = cola.estado()
+            filas_tabla.append({
+                'lote': lote,
+                'escritos': estado['escritos'],
+                'en_base': en_base,
+                'transacciones': estado['lotes'],
+                'ejecuciones_s': estado['escritos'] / segundos,
+                'visibilidad_p50_ms': estado['latencia_visibilidad_ms']['p50'],
+                'visibilidad_p99_ms': estado['latencia_visibilidad_ms']['p99'],
+            })
+
+    tabla = pd.DataFrame(filas_tabla).set_index('lote')
+    print(tabla.round(1).to_string())
+    return tabla
+#------------------------
+# Fin de Ingesta por Lotes
+#------------------------
+
+
+#------------------------
+# Agregados en Paralelo
+#------------------------
+def benchmark_paralelo(filas, procesos, particion, repeticiones, semilla):
+    """Tiempo de los agregados para cada cantidad de procesos, contra analitica.calcular_agregados."""
+    inicio = time.perf_counter()
+    df = preparar_datos(generar_datos(filas, semilla))
+    fragmentos.agregar_ubicacion(df)
+    print(f"Datos sintéticos: {len(df):,} filas, {df['Cod_bano'].nunique():,} baños "
+          f"({time.perf_counter() - inicio:.1f} s); núcleos disponibles: {os.cpu_count()}")
+
+    base_s, _ = cronometrar(lambda: calcular_agregados(df), repeticiones)
+    resultados = [{'procesos': 'analitica', 'agregados_s': base_s, 'aceleracion': 1.0, 'diferencias': 0}]
+    for n in procesos:
+        # Primera llamada fuera de la medición: arranca el pool y sirve para la paridad
+        diferencias = agregacion_paralela.verificar_paridad(df, n, particion)
+        segundos, _ = cronometrar(
+            lambda: agregacion_paralela.calcular_agregados_paralelo(df, n, particion, min_filas=0), repeticiones
+        )
+        resultados.append({
+            'procesos': n, 'agregados_s': segundos, 'aceleracion': base_s / segundos,
+            'diferencias': len(diferencias),
+        })
+        for nombre, detalle in diferencias:
+            print(f"  {n} procesos, {nombre}: {detalle.splitlines()[0]}")
+    agregacion_paralela.cerrar_pool()
+
+    tabla = pd.DataFrame(resultados).set_index('procesos')
+    print(tabla.round(3).to_string())
+    return tabla
+#------------------------
+# Fin de Agregados en Paralelo
+#------------------------
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del dashboard sobre datos sintéticos.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_motores = sub.add_parser("motores", help="Compara pandas contra DuckDB (tiempo y memoria).")
+    p_motores.add_argument("--filas", type=int, default=1_000_000)
+    p_motores.add_argument("--repeticiones", type=int, default=3)
+    p_motores.add_argument("--semilla", type=int, default=0)
+
+    p_payload = sub.add_parser("payload", help="Tamaño y serialización de los gráficos por operario.")
+    p_payload.add_argument("--filas", type=int, default=200_000)
+    p_payload.add_argument("--operarios", type=int, default=120)
+    p_payload.add_argument("--repeticiones", type=int, default=3)
+    p_payload.add_argument("--semilla", type=int, default=0)
+
+    p_api = sub.add_parser("api", help="Peticiones por segundo de la API (sin caché, con caché y 304).")
+    p_api.add_argument("--filas", type=int, default=200_000)
+    p_api.add_argument("--peticiones", type=int, default=2000)
+    p_api.add_argument("--concurrencia", type=int, default=16)
+    p_api.add_argument("--semilla", type=int, default=0)
+
+    p_ingesta = sub.add_parser("ingesta", help="Escritura por lotes y latencia de visibilidad de la ingesta.")
+    p_ingesta.add_argument("--eventos", type=int, default=20_000)
+    p_ingesta.add_argument("--lotes", default="50,500,2000", help="Tamaños de lote separados por coma.")
+    p_ingesta.add_argument("--tasa", type=float, default=0, help="Eventos por segundo (0: sin pausa).")
+    p_ingesta.add_argument("--semilla", type=int, default=0)
+
+    p_paralelo = sub.add_parser("paralelo", help="Escalamiento de los agregados en un pool de procesos.")
+    p_paralelo.add_argument("--filas", type=int, default=1_000_000)
+    p_paralelo.add_argument("--procesos", default="1,2,4,8", help="Cantidades de procesos separadas por coma.")
+    p_paralelo.add_argument("--particion", choices=sorted(agregacion_paralela.PARTICIONES), default="mes")
+    p_paralelo.add_argument("--repeticiones", type=int, default=3)
+    p_paralelo.add_argument("--semilla", type=int, default=0)
+
+    # Uso interno: medición aislada de un motor en un subproceso
+    p_interno = sub.add_parser("_motor")
+    p_interno.add_argument("motor", choices=["pandas", "duckdb"])
+    p_interno.add_argument("ruta")
+    p_interno.add_argument("--repeticiones", type=int, default=3)
+
+    args = parser.parse_args(argv)
+    if args.comando == "motores":
+        benchmark_motores(args.filas, args.repeticiones, args.semilla)
+    elif args.comando == "payload":
+        benchmark_payload(args.filas, args.operarios, args.repeticiones, args.semilla)
+    elif args.comando == "api":
+        benchmark_api(args.filas, args.peticiones, args.concurrencia, args.semilla)
+    elif args.comando == "ingesta":
+        benchmark_ingesta(args.eventos, [int(n) for n in args.lotes.split(",")], args.tasa, args.semilla)
+    elif args.comando == "paralelo":
+        benchmark_paralelo(
+            args.filas, [int(n) for n in args.procesos.split(",")], args.particion, args.repeticiones, args.semilla
+        )
+    elif args.comando == "_motor":
+        print(json.dumps(medir_motor(args.motor, args.ruta, args.repeticiones)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
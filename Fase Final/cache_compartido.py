@@ -0,0 +1,213 @@
+#------------------------
+# Caché Compartida entre Sesiones y Procesos
+#------------------------
+# Segundo nivel de caché, detrás de st.cache_data, para que varios workers de
+# Streamlit compartan una sola copia del dataset cargado, de los agregados y
+# de las figuras serializadas, y para que la caché caliente sobreviva a los
+# reinicios. Las entradas se identifican por (clave, versión del dataset,
+# versión del código): un cambio en cualquier módulo .py del dashboard deja
+# de leer lo que guardó el código anterior.
+#
+# Por defecto se usa un archivo SQLite local (modo WAL, seguro entre procesos)
+# con desalojo LRU por tamaño total. Si AXIS_REDIS_URL está definida y el
+# paquete `redis` está instalado, se usa Redis (o un servidor compatible); en
+# ese caso el desalojo LRU lo hace el servidor (maxmemory-policy allkeys-lru).
+#------------------------
+import glob
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import closing, contextmanager
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+#------------------------
+# Configuración
+#------------------------
+DIRECTORIO_CACHE = os.environ.get("AXIS_CACHE_DIR", "cache")
+MAX_BYTES_CACHE = int(os.environ.get("AXIS_CACHE_MAX_MB", "512")) * 1024 * 1024
+URL_REDIS = os.environ.get("AXIS_REDIS_URL")
+CACHE_DESACTIVADA = os.environ.get("AXIS_CACHE_COMPARTIDA") == "0"
+INTERVALO_ACCESO = 60  # Segundos: ultimo_acceso solo se reescribe si es más antiguo (evita escribir en cada lectura)
+#------------------------
+# Fin de Configuración
+#------------------------
+
+
+#------------------------
+# Versión del Dataset
+#------------------------
+def version_archivo(ruta):
+    """Versión barata de un archivo fuente: hash de ruta, tamaño y fecha de modificación."""
+    try:
+        info = os.stat(ruta)
+    except OSError:
+        return "sin-archivo"
+    firma = f"{os.path.abspath(ruta)}|{info.st_size}|{info.st_mtime_ns}"
+    return hashlib.sha1(firma.encode("utf-8")).hexdigest()[:16]
+
+
+_version_codigo = None
+
+
+def version_codigo():
+    """
+    Hash de los módulos .py del dashboard y de la versión de Python (calculado
+    una vez por proceso): los valores guardados son pickles de lo que calcula
+    ese código.
+    """
+    global _version_codigo
+    if _version_codigo is None:
+        resumen = hashlib.sha1(f"{sys.version_info[:2]}|{pickle.HIGHEST_PROTOCOL}".encode("utf-8"))
+        directorio = os.path.dirname(os.path.abspath(__file__))
+        for ruta in sorted(glob.glob(os.path.join(directorio, "*.py"))):
+            resumen.update(os.path.basename(ruta).encode("utf-8"))
+            with open(ruta, "rb") as archivo:
+                resumen.update(archivo.read())
+        _version_codigo = resumen.hexdigest()[:12]
+    return _version_codigo
+#------------------------
+# Fin de Versión del Dataset
+#------------------------
+
+
+#------------------------
+# Almacenes
+#------------------------
+class AlmacenSQLite:
+    """Almacén clave/valor en SQLite con desalojo LRU por tamaño total."""
+
+    def __init__(self, ruta, max_bytes=MAX_BYTES_CACHE):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        with self._conexion() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS entradas ("
+                " clave TEXT NOT NULL,"
+                " version TEXT NOT NULL,"
+                " valor BLOB NOT NULL,"
+                " tamano INTEGER NOT NULL,"
+                " ultimo_acceso REAL NOT NULL,"
+                " PRIMARY KEY (clave, version))"
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS idx_entradas_acceso ON entradas (ultimo_acceso)")
+
+    @contextmanager
+    def _conexion(self):
+        """Conexión en una transacción (commit o rollback al salir) que se cierra siempre."""
+        with closing(sqlite3.connect(self.ruta, timeout=30)) as con, con:
+            yield con
+
+    def obtener(self, clave, version):
+        with self._conexion() as con:
+            fila = con.execute(
+                "SELECT valor, ultimo_acceso FROM entradas WHERE clave = ? AND version = ?", (clave, version)
+            ).fetchone()
+            if fila is None:
+                return None
+            ahora = time.time()
+            # Solo las lecturas con el acceso desactualizado toman el bloqueo de escritura
+            if ahora - fila[1] > INTERVALO_ACCESO:
+                con.execute(
+                    "UPDATE entradas SET ultimo_acceso = ? WHERE clave = ? AND version = ?",
+                    (ahora, clave, version)
+                )
+        return fila[0]
+
+    def guardar(self, clave, version, datos):
+        with self._conexion() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO entradas (clave, version, valor, tamano, ultimo_acceso) VALUES (?, ?, ?, ?, ?)",
+                (clave, version, datos, len(datos), time.time())
+            )
+            self._desalojar(con, version)
+
+    def _desalojar(self, con, version_actual):
+        """Elimina primero las entradas de otras versiones y luego las menos usadas, hasta caber en el límite."""
+        total = con.execute("SELECT COALESCE(SUM(tamano), 0) FROM entradas").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        candidatos = con.execute(
+            "SELECT clave, version, tamano FROM entradas ORDER BY (version = ?) ASC, ultimo_acceso ASC",
+            (version_actual,)
+        ).fetchall()
+        eliminar = []
+        for clave, version, tamano in candidatos:
+            if total <= self.max_bytes:
+                break
+            eliminar.append((clave, version))
+            total -= tamano
+        con.executemany("DELETE FROM entradas WHERE clave = ? AND version = ?", eliminar)
+
+
+class AlmacenRedis:
+    """Almacén sobre Redis o un servidor compatible; el LRU queda a cargo de la política del servidor."""
+
+    def __init__(self, url):
+        self.cliente = redis.Redis.from_url(url)
+
+    def obtener(self, clave, version):
+        return self.cliente.get(f"axis:{version}:{clave}")
+
+    def guardar(self, clave, version, datos):
+        self.cliente.set(f"axis:{version}:{clave}", datos)
+
+
+_almacen = None
+_bloqueo = threading.Lock()
+
+
+def obtener_almacen():
+    """Almacén del proceso (uno solo, creado bajo demanda)."""
+    global _almacen
+    with _bloqueo:
+        if _almacen is None:
+            if URL_REDIS and redis is not None:
+                _almacen = AlmacenRedis(URL_REDIS)
+            else:
+                _almacen = AlmacenSQLite(os.path.join(DIRECTORIO_CACHE, "axis_cache.sqlite"))
+    return _almacen
+#------------------------
+# Fin de Almacenes
+#------------------------
+
+
+#------------------------
+# Memoización
+#------------------------
+def memoizar(clave, version, calcular):
+    """
+    Devuelve el valor de (clave, versión) desde la caché compartida o lo calcula
+    y lo guarda. Cualquier falla de la caché degrada a calcular directamente.
+    """
+    if CACHE_DESACTIVADA:
+        return calcular()
+
+    try:
+        version = f"{version}:{version_codigo()}"
+        almacen = obtener_almacen()
+        datos = almacen.obtener(clave, version)
+        if datos is not None:
+            return pickle.loads(datos)
+    except Exception:
+        return calcular()
+
+    valor = calcular()
+    try:
+        almacen.guardar(clave, version, pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        pass
+    return valor
+#------------------------
+# Fin de Memoización
+#------------------------
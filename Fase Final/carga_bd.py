@@ -0,0 +1,352 @@
+#------------------------
+# Carga de Datos en axis_bd (MySQL / MariaDB)
+#------------------------
+# Reemplazo vectorizado del Script INSERT INTO: descompone el Excel en las
+# tablas de axis_bd con operaciones de pandas y las inserta con INSERT
+# multi-fila por lotes, en vez de una sentencia con subconsultas por fila.
+#
+# Dos esquemas de destino:
+#   generadas  axis_flow_tables.sql: columnas STORED generadas; el cargador
+#              envía t_real_acum_min precalculado.
+#   lote       axis_flow_tables_lote.sql: solo mediciones de origen; las
+#              derivadas y el acumulado se obtienen de las vistas.
+#
+#   python carga_bd.py Datos_Banos.xlsx --esquema lote --usuario root --clave ****
+#
+# La carga desde la línea de comandos corre en una sola transacción (todo o
+# nada). id_ejec lo asigna AUTO_INCREMENT: cada lote de ejecuciones es un solo
+# INSERT multi-fila, cuyos ids son consecutivos a partir de LAST_INSERT_ID(),
+# y con ellos se arman las filas de ejecucion_operario.
+#
+# Requiere el paquete pymysql (pip install pymysql). Las funciones de
+# inserción aceptan también una conexión sqlite3 (sustituto local de la base
+# con axis_flow_tables_sqlite.sql, usado por ingesta.py y sus benchmarks).
+#------------------------
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+import validacion
+
+try:
+    import pymysql
+except ImportError:
+    pymysql = None
+
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_ESQUEMA = {
+    "generadas": os.path.join(DIRECTORIO, "axis_flow_tables.sql"),
+    "lote": os.path.join(DIRECTORIO, "axis_flow_tables_lote.sql"),
+}
+SCRIPT_SQLITE = os.path.join(DIRECTORIO, "axis_flow_tables_sqlite.sql")
+TAMANO_LOTE = 5000
+MAX_PARAMETROS_SQLITE = 999  # Mínimo garantizado de parámetros por sentencia en SQLite
+
+# Marcador de parámetros e INSERT que omite duplicados de cada motor
+DIALECTOS = {
+    "mysql": ("%s", "INSERT IGNORE"),
+    "sqlite": ("?", "INSERT OR IGNORE"),
+}
+
+
+#------------------------
+# Conexión y Scripts SQL
+#------------------------
+def conectar(args, base=None):
+    """Conexión pymysql en modo autocommit."""
+    if pymysql is None:
+        raise ImportError("pymysql no está instalado (pip install pymysql).")
+    return pymysql.connect(
+        host=args.host, port=args.puerto, user=args.usuario, password=args.clave,
+        database=base, autocommit=True, charset="utf8mb4"
+    )
+
+
+def dialecto(con):
+    return "sqlite" if isinstance(con, sqlite3.Connection) else "mysql"
+
+
+def conectar_sqlite(ruta):
+    """
+    Conexión sqlite3 al sustituto local de axis_bd, con las tablas creadas si
+    faltan. Sin transacción implícita: ingesta.py abre y cierra las suyas.
+    """
+    con = sqlite3.connect(ruta, isolation_level=None, check_same_thread=False)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA foreign_keys=ON")
+    if not con.execute("SELECT 1 FROM sqlite_master WHERE name = 'ejecucion_proceso'").fetchone():
+        with open(SCRIPT_SQLITE, encoding="utf-8") as f:
+            con.executescript(f.read())
+    return con
+
+
+def sentencias_script(ruta, base="axis_bd"):
+    """
+    Separa un script .sql en sentencias, respetando los bloques DELIMITER del
+    cliente mysql y reemplazando axis_bd por la base indicada.
+    """
+    with open(ruta, encoding="utf-8") as f:
+        texto = re.sub(r"\baxis_bd\b", base, f.read())
+
+    sentencias = []
+    delimitador = ";"
+    actual = []
+    for linea in texto.splitlines():
+        limpia = linea.strip()
+        if limpia.upper().startswith("DELIMITER "):
+            delimitador = limpia.split()[1]
+            continue
+        if not actual and (limpia == "" or limpia.startswith("--")):
+            continue
+        actual.append(linea)
+        if limpia.endswith(delimitador):
+            sentencia = "\n".join(actual).rstrip()[:-len(delimitador)].strip()
+            if sentencia:
+                sentencias.append(sentencia)
+            actual = []
+    return sentencias
+
+
+def ejecutar_script(con, ruta, base="axis_bd"):
+    with closing(con.cursor()) as cur:
+        for sentencia in sentencias_script(ruta, base):
+            cur.execute(sentencia)
+#------------------------
+# Fin de Conexión y Scripts SQL
+#------------------------
+
+
+#------------------------
+# Descomposición en Tablas
+#------------------------
+def tablas_axis(df, esquema="generadas", proceso=None, operario=None, primer_id_ejec=1):
+    """
+    Descompone el DataFrame crudo (columnas del Excel) en las tablas de axis_bd,
+    con los mismos campos que arma el Script INSERT INTO, de forma vectorizada.
+
+    proceso / operario: catálogos ya existentes en la base (id_proc, nom_proc,
+    tt_proc / id_op, sigla_op). Si no se entregan, se numeran desde 1.
+    """
+    partes = df['Cod_bano'].str.extract(r'-([A-Z])(\d+)-')
+    ejec = pd.DataFrame({
+        'id_ejec': np.arange(primer_id_ejec, primer_id_ejec + len(df)),
+        'id_b': df['Correlativo'].astype(int).to_numpy(),
+        'fecha': pd.to_datetime(df['Fecha']).dt.strftime('%Y-%m-%d').to_numpy(),
+        'edificio': partes[0].to_numpy(),
+        'piso': partes[1].astype(int).to_numpy(),
+        'variante': df['Tipo_bano'].to_numpy(),
+        'tt_proc': df['TT'].astype(int).to_numpy(),
+        't_real_min': df['T_Real_min'].to_numpy(),
+        't_espera_min': df['T_Espera_min'].to_numpy(),
+    })
+    if esquema == "generadas":
+        ejec['t_real_acum_min'] = df['T_Real_Acumulado'].to_numpy()
+    # Inicio y fin reales, si los datos los traen (la ingesta en vivo sí, el Excel no)
+    if 'Inicio' in df.columns and 'Fin' in df.columns:
+        ejec.insert(3, 'inicio', pd.to_datetime(df['Inicio']).dt.strftime('%Y-%m-%d %H:%M:%S').to_numpy())
+        ejec.insert(4, 'fin', pd.to_datetime(df['Fin']).dt.strftime('%Y-%m-%d %H:%M:%S').to_numpy())
+
+    if proceso is None:
+        proceso = df[['Proceso', 'TT']].drop_duplicates().rename(columns={'Proceso': 'nom_proc', 'TT': 'tt_proc'})
+        proceso.insert(0, 'id_proc', np.arange(1, len(proceso) + 1))
+        proceso = proceso.reset_index(drop=True)
+    proceso = proceso.drop_duplicates(subset=['nom_proc', 'tt_proc'])
+    claves_proc = pd.DataFrame({'nom_proc': df['Proceso'].to_numpy(), 'tt_proc': df['TT'].astype(int).to_numpy()})
+    ejec.insert(2, 'id_proc', claves_proc.merge(proceso, on=['nom_proc', 'tt_proc'], how='left')['id_proc'].to_numpy())
+
+    bano = ejec[['id_b', 'variante', 'edificio', 'piso']].drop_duplicates(subset='id_b')
+
+    operarios = pd.melt(
+        df[['Operario_1', 'Operario_2', 'Operario_3']].assign(id_ejec=ejec['id_ejec'].to_numpy()),
+        id_vars='id_ejec', var_name='rol', value_name='sigla_op'
+    ).dropna(subset=['sigla_op'])
+    operarios['sigla_op'] = operarios['sigla_op'].astype(str).str.strip()
+    operarios = operarios[operarios['sigla_op'] != '']
+    if operario is None:
+        operario = pd.DataFrame({'sigla_op': sorted(operarios['sigla_op'].unique())})
+        operario.insert(0, 'id_op', np.arange(1, len(operario) + 1))
+        operario['nom_op'] = operario['sigla_op']
+    ejec_op = (
+        operarios.merge(operario[['id_op', 'sigla_op']], on='sigla_op')
+        .sort_values(['id_ejec', 'rol'])
+        .drop_duplicates(subset=['id_ejec', 'id_op'])[['id_ejec', 'id_op', 'rol']]
+    )
+
+    return {
+        'operario': operario[['id_op', 'nom_op', 'sigla_op']],
+        'bano': bano,
+        'proceso': proceso[['id_proc', 'nom_proc', 'tt_proc']],
+        'ejecucion_proceso': ejec,
+        'ejecucion_operario': ejec_op,
+    }
+#------------------------
+# Fin de Descomposición en Tablas
+#------------------------
+
+
+#------------------------
+# Inserción por Lotes
+#------------------------
+def insertar(con, tabla, df, lote=TAMANO_LOTE, ignorar_duplicados=False):
+    """INSERT multi-fila por lotes (pymysql reescribe executemany en un solo VALUES); devuelve los segundos."""
+    marcador, insert_ignore = DIALECTOS[dialecto(con)]
+    columnas = ", ".join(df.columns)
+    marcadores = ", ".join([marcador] * len(df.columns))
+    verbo = insert_ignore if ignorar_duplicados else "INSERT"
+    sql = f"{verbo} INTO {tabla} ({columnas}) VALUES ({marcadores})"
+    filas = list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+    inicio = time.perf_counter()
+    with closing(con.cursor()) as cur:
+        for i in range(0, len(filas), lote):
+            cur.executemany(sql, filas[i:i + lote])
+    return time.perf_counter() - inicio
+
+
+def _max_parametros_sqlite(con):
+    try:
+        return con.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    except AttributeError:  # Python < 3.11
+        return MAX_PARAMETROS_SQLITE
+
+
+def insertar_con_ids(con, tabla, df, lote=TAMANO_LOTE):
+    """
+    INSERT multi-fila por lotes dejando que AUTO_INCREMENT asigne la clave;
+    devuelve (ids en el orden de las filas, segundos). Cada lote es una sola
+    sentencia: MySQL reserva sus ids juntos y consecutivos (también con
+    innodb_autoinc_lock_mode=2) y LAST_INSERT_ID() es el de la primera fila; en
+    SQLite lastrowid es el de la última.
+    """
+    motor = dialecto(con)
+    marcador = DIALECTOS[motor][0]
+    columnas = ", ".join(df.columns)
+    valores_fila = "(" + ", ".join([marcador] * len(df.columns)) + ")"
+    filas = list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+    if motor == "sqlite":
+        lote = max(1, min(lote, _max_parametros_sqlite(con) // max(len(df.columns), 1)))
+        paso = 1
+    else:
+        paso = int(_leer_tabla(con, "SELECT @@auto_increment_increment AS paso")['paso'].iloc[0])
+
+    ids = np.empty(len(filas), dtype=np.int64)
+    inicio = time.perf_counter()
+    with closing(con.cursor()) as cur:
+        for i in range(0, len(filas), lote):
+            bloque = filas[i:i + lote]
+            cur.execute(
+                f"INSERT INTO {tabla} ({columnas}) VALUES " + ", ".join([valores_fila] * len(bloque)),
+                tuple(valor for fila in bloque for valor in fila)
+            )
+            primero = cur.lastrowid - (len(bloque) - 1) * paso if motor == "sqlite" else cur.lastrowid
+            ids[i:i + len(bloque)] = primero + paso * np.arange(len(bloque))
+    return ids, time.perf_counter() - inicio
+
+
+def poblar(con, tablas, informar=True):
+    """Inserta todas las tablas en orden de dependencias; devuelve los segundos por tabla."""
+    tiempos = {}
+    for tabla in ('operario', 'bano', 'proceso', 'ejecucion_proceso', 'ejecucion_operario'):
+        tiempos[tabla] = insertar(con, tabla, tablas[tabla])
+        if informar:
+            print(f"  {tabla:<20} {len(tablas[tabla]):>10,} filas  {tiempos[tabla]:7.2f} s  "
+                  f"({len(tablas[tabla]) / max(tiempos[tabla], 1e-9):,.0f} filas/s)")
+    return tiempos
+
+
+def _leer_tabla(con, sql):
+    with closing(con.cursor()) as cur:
+        cur.execute(sql)
+        columnas = [d[0] for d in cur.description]
+        return pd.DataFrame(list(cur.fetchall()), columns=columnas)
+
+
+def catalogo_procesos(con):
+    """Catálogo proceso de la base (id_proc, nom_proc, tt_proc), para validacion.validar(procesos=...)."""
+    return _leer_tabla(con, "SELECT id_proc, nom_proc, tt_proc FROM proceso")
+
+
+def completar_procesos(con, df):
+    """Agrega al catálogo proceso los (Proceso, TT) de df que falten; devuelve los segundos del INSERT."""
+    nuevos_proc = df[['Proceso', 'TT']].drop_duplicates().rename(columns={'Proceso': 'nom_proc', 'TT': 'tt_proc'})
+    existentes = _leer_tabla(con, "SELECT nom_proc, tt_proc FROM proceso")
+    nuevos_proc = nuevos_proc.merge(existentes, on=['nom_proc', 'tt_proc'], how='left', indicator=True)
+    return insertar(con, 'proceso', nuevos_proc.loc[nuevos_proc['_merge'] == 'left_only', ['nom_proc', 'tt_proc']])
+
+
+def cargar_excel(con, df, esquema="generadas"):
+    """
+    Agrega el Excel a una base axis_bd existente: completa los catálogos de
+    procesos y operarios con los que falten y luego inserta baños y ejecuciones.
+    No abre transacción: quien llama decide (main e ingesta.py usan una).
+    """
+    completar_procesos(con, df)
+
+    siglas = pd.unique(df[['Operario_1', 'Operario_2', 'Operario_3']].melt()['value'].dropna().astype(str).str.strip())
+    siglas_existentes = set(_leer_tabla(con, "SELECT sigla_op FROM operario")['sigla_op'])
+    faltantes = [s for s in siglas if s and s not in siglas_existentes]
+    insertar(con, 'operario', pd.DataFrame({'nom_op': faltantes, 'sigla_op': faltantes}))
+
+    proceso = catalogo_procesos(con)
+    operario = _leer_tabla(con, "SELECT id_op, nom_op, sigla_op FROM operario")
+    # id_ejec provisorio 1..n (posición de la fila) hasta conocer los ids asignados por la base
+    tablas = tablas_axis(df, esquema, proceso=proceso, operario=operario)
+
+    tiempos = {'bano': insertar(con, 'bano', tablas['bano'], ignorar_duplicados=True)}
+    ejec = tablas['ejecucion_proceso']
+    ids, tiempos['ejecucion_proceso'] = insertar_con_ids(con, 'ejecucion_proceso', ejec.drop(columns='id_ejec'))
+    ejec['id_ejec'] = ids
+    ejec_op = tablas['ejecucion_operario']
+    ejec_op['id_ejec'] = ids[ejec_op['id_ejec'].to_numpy() - 1]
+    tiempos['ejecucion_operario'] = insertar(con, 'ejecucion_operario', ejec_op)
+    return tablas, tiempos
+#------------------------
+# Fin de Inserción por Lotes
+#------------------------
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Carga Datos_Banos.xlsx en axis_bd por lotes.")
+    parser.add_argument("excel", help="Excel de datos (Datos_Banos.xlsx).")
+    parser.add_argument("--esquema", choices=sorted(SCRIPTS_ESQUEMA), default="generadas",
+                        help="Esquema de destino (ver encabezado).")
+    parser.add_argument("--crear", action="store_true", help="Crea (o recrea) las tablas antes de cargar.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=3306)
+    parser.add_argument("--usuario", default="root")
+    parser.add_argument("--clave", default=os.environ.get("AXIS_BD_CLAVE", ""))
+    parser.add_argument("--base", default="axis_bd")
+    args = parser.parse_args(argv)
+
+    resultado = validacion.validar(pd.read_excel(args.excel, engine="openpyxl"))
+    df = resultado.valido
+    if len(resultado.cuarentena):
+        print(f"{len(resultado.cuarentena)} filas en cuarentena (no se cargan): {resultado.reporte['motivos']}")
+    if args.crear:
+        with conectar(args) as con:
+            ejecutar_script(con, SCRIPTS_ESQUEMA[args.esquema], args.base)
+
+    with conectar(args, args.base) as con:
+        # conectar() usa autocommit: la carga abre su propia transacción, como ingesta.py
+        con.begin()
+        try:
+            tablas, tiempos = cargar_excel(con, df, args.esquema)
+        except Exception:
+            con.rollback()
+            raise
+        con.commit()
+    for tabla, segundos in tiempos.items():
+        print(f"{tabla:<20} {len(tablas[tabla]):>8,} filas  {segundos:6.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#------------------------
+# Catálogo de Categorías: Orden y Colores
+#------------------------
+# Orden y color de cada categoría que aparece en selectores y gráficos (tipo
+# de baño, tipo agrupado, proceso, correlativo y operario), calculados una vez
+# por versión del dataset en vez de ordenar con expresiones regulares en cada
+# interacción:
+#
+#   - Tipo_bano y Tipo_bano_agrupado en orden natural (B1, B1E, B2, ..., B10).
+#   - Proceso en el orden real de la secuencia de fabricación: la mediana de
+#     la posición del proceso dentro de la secuencia de cada baño.
+#   - Correlativo en orden numérico (los no numéricos al final).
+#   - Operario en orden alfabético.
+#
+# Los colores se asignan sobre el catálogo completo de la versión, por lo que
+# un operario, proceso o tipo conserva su color en todos los gráficos,
+# edificios y filtros. Cada fragmento usa el catálogo global restringido a sus
+# propios valores (mismo orden, mismos colores).
+#
+# MetadatosDataset reúne además lo que necesita la barra lateral (meses con
+# su etiqueta en español, correlativos, tipos, pisos y rango de fechas), para
+# dibujarla desde listas pequeñas ya calculadas.
+#------------------------
+import re
+
+import numpy as np
+import pandas as pd
+from plotly.colors import qualitative
+
+from analitica import month_to_spanish
+
+
+PALETA_OPERARIOS = qualitative.Set3 + qualitative.Pastel
+PALETA_PROCESOS = qualitative.Prism
+PALETA_TIPOS = qualitative.Set2
+
+PALETAS = {
+    'Tipo_bano': PALETA_TIPOS,
+    'Tipo_bano_agrupado': PALETA_TIPOS,
+    'Proceso': PALETA_PROCESOS,
+    'Operario': PALETA_OPERARIOS,
+}
+PATRON_TIPO = re.compile(r'B(\d+)([a-zA-Z]*)')
+
+
+def clave_natural(tipo):
+    """Orden natural B1, B1E, B2, ..., B10 (lo que no sigue el patrón va al final)."""
+    coincidencia = PATRON_TIPO.match(str(tipo))
+    return (int(coincidencia.group(1)), coincidencia.group(2)) if coincidencia else (float('inf'), str(tipo))
+
+
+def _clave_correlativo(valor):
+    try:
+        return (0, float(valor))
+    except (TypeError, ValueError):
+        return (1, str(valor))
+
+
+def orden_procesos(df):
+    """Procesos por la mediana de su posición en la secuencia de cada baño (empates: primera aparición)."""
+    secuencia = df[['Correlativo', 'Fecha', 'Proceso']].sort_values(['Correlativo', 'Fecha'], kind='mergesort')
+    posicion = secuencia.groupby('Correlativo', sort=False).cumcount()
+    mediana = posicion.groupby(secuencia['Proceso'], sort=False).median()
+    return mediana.sort_values(kind='mergesort').index.tolist()
+
+
+class Catalogo:
+    """Tipos categóricos ordenados y mapas de colores por columna."""
+
+    def __init__(self, ordenes, colores):
+        self._tipos = {col: pd.CategoricalDtype(orden, ordered=True) for col, orden in ordenes.items()}
+        self._listas = {col: list(orden) for col, orden in ordenes.items()}
+        self._textos = {col: [str(v) for v in orden] for col, orden in ordenes.items()}
+        self._colores = colores
+
+    def tipo(self, columna):
+        """CategoricalDtype ordenado de la columna."""
+        return self._tipos[columna]
+
+    def orden(self, columna):
+        return self._listas[columna]
+
+    def textos(self, columna):
+        """El orden como texto, para los selectores (p. ej. correlativos)."""
+        return self._textos[columna]
+
+    def colores(self, columna):
+        return self._colores[columna]
+
+    def ordenar(self, columna, valores):
+        """Los valores dados, en el orden del catálogo (los desconocidos al final, en su orden)."""
+        categorias = self._tipos[columna].categories
+        valores = list(valores)
+        posiciones = categorias.get_indexer(valores)
+        posiciones = np.where(posiciones < 0, len(categorias) + np.arange(len(valores)), posiciones)
+        return [valores[i] for i in np.argsort(posiciones, kind='stable')]
+
+    def exportar(self):
+        """Órdenes y colores como listas y diccionarios simples; Catalogo(**exportado) lo reconstruye."""
+        return {'ordenes': self._listas, 'colores': self._colores}
+
+    def restringir(self, df):
+        """Catálogo con solo los valores presentes en df, con el mismo orden y los mismos colores."""
+        presentes = _valores(df)
+        ordenes = {
+            col: [v for v in orden if v in presentes[col]] for col, orden in self._listas.items()
+        }
+        return Catalogo(ordenes, self._colores)
+
+
+def _valores(df):
+    return {
+        'Tipo_bano': set(df['Tipo_bano'].dropna().unique()),
+        'Tipo_bano_agrupado': set(df['Tipo_bano_agrupado'].dropna().unique()),
+        'Proceso': set(df['Proceso'].dropna().unique()),
+        'Correlativo': set(df['Correlativo'].dropna().unique()),
+        'Operario': set(df['Operarios_list'].explode().dropna().unique()),
+    }
+
+
+def construir_catalogo(df):
+    """Catálogo de una versión del dataset completo (ya pre-procesado con preparar_datos)."""
+    valores = _valores(df)
+    ordenes = {
+        'Tipo_bano': sorted(valores['Tipo_bano'], key=clave_natural),
+        'Tipo_bano_agrupado': sorted(valores['Tipo_bano_agrupado'], key=clave_natural),
+        'Proceso': orden_procesos(df),
+        'Correlativo': sorted(valores['Correlativo'], key=_clave_correlativo),
+        'Operario': sorted(valores['Operario']),
+    }
+    colores = {
+        col: {v: paleta[i % len(paleta)] for i, v in enumerate(ordenes[col])}
+        for col, paleta in PALETAS.items()
+    }
+    return Catalogo(ordenes, colores)
+#------------------------
+# Fin de Catálogo de Categorías
+#------------------------
+
+
+#------------------------
+# Metadatos de la Barra Lateral
+#------------------------
+class MetadatosDataset:
+    """Opciones de los filtros de un fragmento del dataset, calculadas una vez por versión."""
+
+    def __init__(self, df, catalogo):
+        # Meses del más reciente al más antiguo, desde los valores únicos de AñoMes (no fila por fila)
+        meses = sorted(df['AñoMes'].dropna().unique(), reverse=True)
+        self.meses = {f"{month_to_spanish(int(ym[5:7]))}, {ym[:4]}": ym for ym in meses}
+        self.etiquetas_meses = list(self.meses)
+        self.correlativos = catalogo.textos('Correlativo')
+        self.tipos_agrupados = ["Todos"] + catalogo.orden('Tipo_bano_agrupado')
+        self.pisos = sorted(int(p) for p in df['Piso'].dropna().unique())
+        self.fecha_min = df['Fecha'].min()
+        self.fecha_max = df['Fecha'].max()
+        # Para depurar selecciones de otro fragmento sin recorrer listas
+        self.conjunto_correlativos = frozenset(self.correlativos)
+        self.conjunto_pisos = frozenset(self.pisos)
+#------------------------
+# Fin de Metadatos de la Barra Lateral
+#------------------------
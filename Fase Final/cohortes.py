@@ -0,0 +1,260 @@
+#------------------------
+# Comparación de Cohortes
+#------------------------
+# Compara dos estados de filtros (mes contra mes, edificio B contra C, B2
+# contra B2E) en una sola pasada: las filas de cada cohorte se apilan con una
+# columna Cohorte y cada métrica sale de un solo groupby por (Cohorte, ...),
+# en vez de correr dos veces el pipeline completo del dashboard. Las cohortes
+# pueden compartir filas (p. ej. un mes contra todo el año); cada una las
+# cuenta como propias.
+#
+# Un estado de filtros es un diccionario con las mismas opciones de la barra
+# lateral: fragmento (edificio), meses (AAAA-MM), correlativos, tipo_agrupado
+# y pisos. Las cohortes se calculan sobre el DataFrame de la vista global.
+#
+# Cada diferencia viene con su valor p: prueba z de dos proporciones para el
+# cumplimiento TT y t de Welch para los tiempos promedio (con SciPy se usa la
+# distribución t; sin SciPy, la aproximación normal). Si las cohortes
+# comparten filas las pruebas son solo orientativas.
+#------------------------
+import math
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy import stats
+except ImportError:
+    stats = None
+
+from analitica import mascara_filtros, month_to_spanish
+from fragmentos import TODOS
+
+
+COHORTES = ("A", "B")
+ALFA = 0.05  # Nivel de significancia de las pruebas
+
+
+#------------------------
+# Estados de Filtros
+#------------------------
+def mascara_cohorte(df, filtros, posiciones=None):
+    """Filas de df de un estado de filtros; posiciones restringe al fragmento (edificio) elegido."""
+    mascara = mascara_filtros(
+        df, filtros.get('meses'), filtros.get('correlativos'), filtros.get('tipo_agrupado'), filtros.get('pisos')
+    )
+    if posiciones is not None:
+        en_fragmento = np.zeros(len(df), dtype=bool)
+        en_fragmento[posiciones] = True
+        mascara &= en_fragmento
+    return mascara
+
+
+def describir(filtros):
+    """Texto corto de un estado de filtros, para rotular la cohorte."""
+    partes = []
+    if filtros.get('fragmento', TODOS) != TODOS:
+        partes.append(filtros['fragmento'])
+    if filtros.get('meses'):
+        partes.append(", ".join(f"{month_to_spanish(int(m[5:7]))} {m[:4]}" for m in sorted(filtros['meses'])))
+    if filtros.get('correlativos'):
+        partes.append("Correlativo " + ", ".join(map(str, filtros['correlativos'])))
+    if filtros.get('tipo_agrupado') and filtros['tipo_agrupado'] != "Todos":
+        partes.append(filtros['tipo_agrupado'])
+    if filtros.get('pisos'):
+        partes.append("Piso " + ", ".join(map(str, filtros['pisos'])))
+    return " · ".join(partes) or "Todos los datos"
+
+
+def indice_operarios(df):
+    """Posición de la ejecución y operario de cada par (ejecución, operario) de df."""
+    cantidades = df['Operarios_list'].str.len().to_numpy()
+    filas = np.repeat(np.arange(len(df)), cantidades)
+    operarios = np.array([op for ops in df['Operarios_list'] for op in ops], dtype=object)
+    return filas, operarios
+#------------------------
+# Fin de Estados de Filtros
+#------------------------
+
+
+#------------------------
+# Pruebas de Significancia
+#------------------------
+def _valor_p_normal(z):
+    z = np.abs(np.asarray(z, dtype=float))
+    if stats is not None:
+        return 2 * stats.norm.sf(z)
+    return np.vectorize(math.erfc, otypes=[float])(z / math.sqrt(2))
+
+
+def prueba_proporciones(exitos_a, n_a, exitos_b, n_b):
+    """Valor p bilateral de la prueba z de dos proporciones (NaN si alguna cohorte no tiene datos)."""
+    exitos_a, n_a, exitos_b, n_b = (np.asarray(x, dtype=float) for x in (exitos_a, n_a, exitos_b, n_b))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_a, p_b = exitos_a / n_a, exitos_b / n_b
+        p = (exitos_a + exitos_b) / (n_a + n_b)
+        error = np.sqrt(p * (1 - p) * (1 / n_a + 1 / n_b))
+        z = (p_b - p_a) / error
+    # Ambas tasas en 0 % o en 100 %: sin variación, no hay diferencia que probar
+    return np.where(error > 0, _valor_p_normal(z), np.where(p_a == p_b, 1.0, np.nan))
+
+
+def prueba_welch(media_a, desv_a, n_a, media_b, desv_b, n_b):
+    """Valor p bilateral de la prueba t de Welch desde medias, desviaciones y tamaños (NaN con n < 2)."""
+    media_a, desv_a, n_a, media_b, desv_b, n_b = (
+        np.asarray(x, dtype=float) for x in (media_a, desv_a, n_a, media_b, desv_b, n_b)
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var_a, var_b = desv_a ** 2 / n_a, desv_b ** 2 / n_b
+        error = np.sqrt(var_a + var_b)
+        t = (media_b - media_a) / error
+        grados = (var_a + var_b) ** 2 / (var_a ** 2 / (n_a - 1) + var_b ** 2 / (n_b - 1))
+        valor_p = 2 * stats.t.sf(np.abs(t), grados) if stats is not None else _valor_p_normal(t)
+    valor_p = np.where(error > 0, valor_p, np.where(media_a == media_b, 1.0, np.nan))
+    return np.where((n_a >= 2) & (n_b >= 2), valor_p, np.nan)
+#------------------------
+# Fin de Pruebas de Significancia
+#------------------------
+
+
+#------------------------
+# Comparación en una Pasada
+#------------------------
+def _apilar(mascaras, etiquetas):
+    """Posiciones de las filas de cada cohorte, concatenadas, y la cohorte de cada una."""
+    posiciones = [np.flatnonzero(mascara) for mascara in mascaras]
+    codigos = np.repeat(np.arange(len(posiciones)), [len(p) for p in posiciones])
+    return np.concatenate(posiciones), pd.Categorical.from_codes(codigos, categories=list(etiquetas))
+
+
+def _cubo(hechos, clave):
+    """Sumas, medias y desviaciones de cumplimiento y tiempo real por (clave, Cohorte)."""
+    return hechos.groupby([clave, 'Cohorte'], observed=False).agg(
+        Cantidad=('Cumple_Num', 'size'),
+        Cumple=('Cumple_Num', 'sum'),
+        Media=('T_Real_min', 'mean'),
+        Desv=('T_Real_min', 'std'),
+        N=('T_Real_min', 'count'),
+    )
+
+
+def _tabla_comparada(cubo, clave, a, b):
+    """Una fila por valor de la clave con las métricas de ambas cohortes, sus diferencias y valores p."""
+    ancho = cubo.unstack('Cohorte')
+    col = lambda medida, cohorte: ancho[(medida, cohorte)].to_numpy(dtype=float)
+    n_a, n_b = col('Cantidad', a), col('Cantidad', b)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tasa_a, tasa_b = col('Cumple', a) / n_a * 100, col('Cumple', b) / n_b * 100
+    tabla = pd.DataFrame({
+        clave: ancho.index,
+        f'Cantidad_{a}': n_a.astype(int),
+        f'Cantidad_{b}': n_b.astype(int),
+        f'Pct_Cumple_{a}': tasa_a,
+        f'Pct_Cumple_{b}': tasa_b,
+        'Dif_Cumple_pp': tasa_b - tasa_a,
+        'p_Cumple': prueba_proporciones(col('Cumple', a), n_a, col('Cumple', b), n_b),
+        f'T_Real_{a}': col('Media', a),
+        f'T_Real_{b}': col('Media', b),
+        'Dif_T_Real': col('Media', b) - col('Media', a),
+        'p_T_Real': prueba_welch(
+            col('Media', a), col('Desv', a), col('N', a), col('Media', b), col('Desv', b), col('N', b)
+        ),
+    })
+    tabla = tabla[(n_a + n_b) > 0]
+    return tabla.sort_values('Dif_Cumple_pp', ascending=True, na_position='last').reset_index(drop=True)
+
+
+def comparar(df, mascaras, indice, etiquetas=COHORTES):
+    """
+    Métricas de dos cohortes de df (una máscara por cohorte) desde una sola
+    tabla apilada: KPIs, cumplimiento por proceso (Pestaña 3), producción y
+    lead time por mes (Pestaña 5) y métricas por operario (Pestaña 6).
+    indice: el de indice_operarios(df), calculado una vez por versión.
+    """
+    a, b = etiquetas
+    filas, cohorte = _apilar(mascaras, etiquetas)
+    hechos = pd.DataFrame({
+        'Cohorte': cohorte,
+        'Cod_bano': df['Cod_bano'].to_numpy()[filas],
+        'Proceso': df['Proceso'].to_numpy()[filas],
+        'Fecha': df['Fecha'].to_numpy()[filas],
+        'T_Real_min': df['T_Real_min'].to_numpy(dtype=float)[filas],
+        'Cumple_Num': df['Cumple_Num'].to_numpy()[filas],
+        'Lead_Time_min': df['Lead_Time_min'].to_numpy(dtype=float)[filas],
+    })
+    # Primera fila de cada baño dentro de su cohorte (como metricas_clave)
+    banos = hechos.drop_duplicates(subset=['Cohorte', 'Cod_bano'])
+
+    kpis = hechos.groupby('Cohorte', observed=False).agg(
+        Filas=('Cod_bano', 'size'),
+        Media_T_Real=('T_Real_min', 'mean'),
+        Desv_T_Real=('T_Real_min', 'std'),
+        N_T_Real=('T_Real_min', 'count'),
+        Cumple=('Cumple_Num', 'sum'),
+    ).join(banos.groupby('Cohorte', observed=False).agg(
+        Banos=('Cod_bano', 'size'),
+        Media_Lead=('Lead_Time_min', 'mean'),
+        Desv_Lead=('Lead_Time_min', 'std'),
+        N_Lead=('Lead_Time_min', 'count'),
+    ))
+
+    mensual = banos.assign(Mes=banos['Fecha'].dt.to_period('M').astype(str)).groupby(
+        ['Cohorte', 'Mes'], observed=True
+    ).agg(Banos=('Cod_bano', 'size'), Lead_Time_Prom=('Lead_Time_min', 'mean')).reset_index()
+
+    # Pares (ejecución, operario) de cada cohorte, desde el índice de la versión (sin explode)
+    filas_op, operarios = indice
+    pares, cohorte_op = _apilar([mascara[filas_op] for mascara in mascaras], etiquetas)
+    largo = pd.DataFrame({
+        'Cohorte': cohorte_op,
+        'Operario': operarios[pares],
+        'T_Real_min': df['T_Real_min'].to_numpy(dtype=float)[filas_op[pares]],
+        'Cumple_Num': df['Cumple_Num'].to_numpy()[filas_op[pares]],
+    })
+
+    return {
+        'etiquetas': (a, b),
+        'kpis': kpis,
+        'pruebas_kpis': pruebas_kpis(kpis, a, b),
+        'cumplimiento_proceso': _tabla_comparada(_cubo(hechos, 'Proceso'), 'Proceso', a, b),
+        'mensual': mensual,
+        'metricas_operario': _tabla_comparada(_cubo(largo, 'Operario'), 'Operario', a, b),
+    }
+
+
+def metricas_cohorte(comparacion, etiqueta):
+    """KPIs de una cohorte con las mismas claves que analitica.metricas_clave."""
+    fila = comparacion['kpis'].loc[etiqueta]
+    banos, filas = int(fila['Banos']), int(fila['Filas'])
+    return {
+        'banos_terminados': banos,
+        'avg_lead_time': fila['Media_Lead'] if banos > 0 else 0,
+        'avg_procesos_por_bano': filas / banos if banos > 0 else 0,
+        'avg_t_real': fila['Media_T_Real'] if filas > 0 else 0,
+        'avg_pct_cumple': fila['Cumple'] / filas * 100 if filas > 0 else 0,
+    }
+
+
+def pruebas_kpis(kpis, a, b):
+    """Tabla de los KPIs de ambas cohortes con su diferencia (B - A), valor p y si es significativa."""
+    fa, fb = kpis.loc[a], kpis.loc[b]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        filas = [
+            ("Baños Terminados", fa['Banos'], fb['Banos'], np.nan),
+            ("Tiempo promedio de fabricación (min)", fa['Media_Lead'], fb['Media_Lead'], prueba_welch(
+                fa['Media_Lead'], fa['Desv_Lead'], fa['N_Lead'], fb['Media_Lead'], fb['Desv_Lead'], fb['N_Lead'])),
+            ("Procesos Promedio por Baño", fa['Filas'] / fa['Banos'], fb['Filas'] / fb['Banos'], np.nan),
+            ("Tiempo Promedio de Proceso (min)", fa['Media_T_Real'], fb['Media_T_Real'], prueba_welch(
+                fa['Media_T_Real'], fa['Desv_T_Real'], fa['N_T_Real'],
+                fb['Media_T_Real'], fb['Desv_T_Real'], fb['N_T_Real'])),
+            ("Tasa de Cumplimiento General (%)", fa['Cumple'] / fa['Filas'] * 100, fb['Cumple'] / fb['Filas'] * 100,
+             prueba_proporciones(fa['Cumple'], fa['Filas'], fb['Cumple'], fb['Filas'])),
+        ]
+    tabla = pd.DataFrame(filas, columns=['Métrica', f'Cohorte {a}', f'Cohorte {b}', 'Valor_p'])
+    tabla['Valor_p'] = tabla['Valor_p'].astype(float)
+    tabla.insert(3, 'Diferencia', tabla[f'Cohorte {b}'] - tabla[f'Cohorte {a}'])
+    tabla['Significativa'] = tabla['Valor_p'] < ALFA
+    return tabla
+#------------------------
+# Fin de Comparación en una Pasada
+#------------------------
@@ -0,0 +1,120 @@
+#------------------------
+# Fragmentos del Dataset por Proyecto y Edificio
+#------------------------
+# El dataset se reparte en fragmentos (proyecto, edificio). Cada fragmento
+# tiene sus propios índices, agregados y matrices, que se construyen la
+# primera vez que alguien lo consulta y se guardan en la caché compartida
+# con su propia clave. Quien mira un edificio solo paga por ese edificio,
+# aunque se agreguen datos de otros edificios o proyectos. La vista global
+# ("Todos") es un fragmento más.
+#
+# El edificio y el piso salen del código de baño (77-B1-B6: edificio B, piso
+# 1). El proyecto se lee de la columna Proyecto si los datos la traen; si no,
+# todas las filas son del proyecto AXIS_PROYECTO.
+#------------------------
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+PATRON_UBICACION = r'-([A-Z])(\d+)-'
+PROYECTO_POR_DEFECTO = os.environ.get("AXIS_PROYECTO", "Principal")
+TODOS = "Todos"
+
+
+def agregar_ubicacion(df):
+    """Agrega las columnas Proyecto, Edificio y Piso (desde Cod_bano)."""
+    partes = df['Cod_bano'].str.extract(PATRON_UBICACION)
+    if 'Proyecto' not in df.columns:
+        df['Proyecto'] = PROYECTO_POR_DEFECTO
+    df['Edificio'] = partes[0]
+    df['Piso'] = pd.to_numeric(partes[1]).astype(int)
+    return df
+
+
+def resumen_por_fragmento(df):
+    """
+    Métricas clave de cada edificio y su total, desde sumas parciales por
+    fragmento (un solo groupby, sin construir los fragmentos).
+    """
+    por_bano = df.drop_duplicates(subset='Cod_bano')
+    claves = ['Proyecto', 'Edificio']
+    parciales = df.groupby(claves).agg(
+        Filas=('Cod_bano', 'size'),
+        Suma_T_Real=('T_Real_min', 'sum'),
+        Filas_T_Real=('T_Real_min', 'count'),
+        Suma_Cumple=('Cumple_Num', 'sum'),
+        Pisos=('Piso', 'nunique'),
+    ).join(por_bano.groupby(claves).agg(
+        Banos=('Cod_bano', 'size'),
+        Suma_Lead=('Lead_Time_min', 'sum'),
+        Banos_Lead=('Lead_Time_min', 'count'),
+    ))
+    total = parciales.sum().to_frame(TODOS).T
+    total['Pisos'] = df.groupby(['Proyecto', 'Edificio', 'Piso']).ngroups
+    total.index = pd.MultiIndex.from_tuples([(TODOS, TODOS)], names=claves)
+
+    tabla = pd.concat([parciales, total])
+    return pd.DataFrame({
+        'Baños': tabla['Banos'].astype(int),
+        'Pisos': tabla['Pisos'].astype(int),
+        'Lead Time Prom. (min)': tabla['Suma_Lead'] / tabla['Banos_Lead'],
+        'Procesos por Baño': tabla['Filas'] / tabla['Banos'],
+        'T. Real Prom. (min)': tabla['Suma_T_Real'] / tabla['Filas_T_Real'],
+        '% Cumple TT': tabla['Suma_Cumple'] / tabla['Filas'] * 100,
+    }).reset_index()
+
+
+class FragmentosDatos:
+    """
+    Fragmentos de una versión del dataset. construir(df, sufijo) arma los datos
+    derivados de un fragmento; sufijo distingue sus claves en la caché compartida.
+    """
+
+    def __init__(self, df, construir):
+        self._df = df
+        self._construir = construir
+        self._posiciones = df.groupby(['Proyecto', 'Edificio'], sort=True).indices
+        varios_proyectos = len({proyecto for proyecto, _ in self._posiciones}) > 1
+        self._claves = {
+            (f"{proyecto} · Edificio {edificio}" if varios_proyectos else f"Edificio {edificio}"): (proyecto, edificio)
+            for proyecto, edificio in self._posiciones
+        }
+        self._datos = {}
+        self._bloqueo = threading.Lock()
+        self._bloqueos = {}
+
+    def etiquetas(self):
+        """Opciones del selector: la vista global y un fragmento por (proyecto, edificio)."""
+        return [TODOS] + list(self._claves)
+
+    def construidos(self):
+        return list(self._datos)
+
+    def posiciones(self, etiqueta=TODOS):
+        """Posiciones del fragmento en el DataFrame de la vista global (None en la vista global)."""
+        if etiqueta == TODOS:
+            return None
+        return np.sort(self._posiciones[self._claves[etiqueta]])
+
+    def obtener(self, etiqueta=TODOS):
+        """Datos derivados del fragmento; el primero que lo pide lo construye y los demás esperan ese resultado."""
+        datos = self._datos.get(etiqueta)
+        if datos is not None:
+            return datos
+
+        with self._bloqueo:
+            bloqueo = self._bloqueos.setdefault(etiqueta, threading.Lock())
+        # Un bloqueo por fragmento: construir un edificio no detiene a quien consulta otro
+        with bloqueo:
+            if etiqueta not in self._datos:
+                if etiqueta == TODOS:
+                    df, sufijo = self._df, ""
+                else:
+                    proyecto, edificio = self._claves[etiqueta]
+                    df = self._df.iloc[self.posiciones(etiqueta)].reset_index(drop=True)
+                    sufijo = f":{proyecto}:{edificio}"
+                self._datos[etiqueta] = self._construir(df, sufijo)
+        return self._datos[etiqueta]
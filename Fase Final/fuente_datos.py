@@ -0,0 +1,135 @@
+#------------------------
+# Fuente de Datos del Dashboard y de la API
+#------------------------
+# Lectura, validación y derivados del dataset de una versión del Excel, sin
+# dependencia de Streamlit: los usan el dashboard (app_streamlit.py) y la API
+# HTTP (api.py), y ambos comparten las mismas entradas de la caché compartida.
+#------------------------
+import os
+from datetime import datetime
+
+import pandas as pd
+
+import afinidad
+import agregacion_paralela
+import anomalias
+import cache_compartido
+import catalogo
+import fragmentos
+import intervalos
+import motor_duckdb
+import validacion
+from analitica import preparar_datos, construir_indice_correlativo
+
+
+# Motor de consultas: "pandas" (por defecto) o "duckdb" (requiere el paquete duckdb)
+MOTOR_ANALITICO = os.environ.get("AXIS_MOTOR", "pandas")
+
+
+class FuenteExcel:
+    """Datos_Banos.xlsx (y variantes_correctas.csv, si existe) en un directorio."""
+
+    def __init__(self, ruta_datos, ruta_variantes=None, motor_analitico=MOTOR_ANALITICO):
+        self.ruta_datos = ruta_datos
+        self.ruta_variantes = ruta_variantes
+        self.motor_analitico = motor_analitico
+
+    def version(self):
+        """Versión del archivo fuente; cambia cuando se reemplaza o modifica el Excel."""
+        return cache_compartido.version_archivo(self.ruta_datos)
+
+    def cargar(self, version):
+        """Lee, valida y pre-procesa el Excel; las filas que no pasan la validación quedan en la cuarentena."""
+        def leer():
+            resultado = validacion.validar(
+                pd.read_excel(self.ruta_datos, engine="openpyxl"),
+                variantes=validacion.leer_variantes(self.ruta_variantes) if self.ruta_variantes else None
+            )
+            resultado.valido = preparar_datos(resultado.valido)
+            return resultado
+        return cache_compartido.memoizar("dataset_validado", version, leer)
+
+    def construir(self, version):
+        """
+        Dataset validado y sus fragmentos por edificio de una versión. Corre en
+        el hilo de refresco; el resultado se comparte y no se modifica.
+        """
+        fecha_fuente = datetime.fromtimestamp(os.path.getmtime(self.ruta_datos))
+        resultado_validacion = self.cargar(version)
+        return construir_datos(resultado_validacion, version, fecha_fuente, self.motor_analitico)
+
+
+def derivar_datos(df, version, sufijo="", motor_analitico=MOTOR_ANALITICO, catalogo_version=None,
+                  precalculados=None):
+    """
+    Índices por correlativo y por intervalo (Inicio, Fin), motor, agregados,
+    afinidad, anomalías, ocupación de operarios, catálogo de categorías y
+    metadatos de la barra lateral de un fragmento del dataset; sufijo separa sus entradas en la caché compartida.
+    catalogo_version: catálogo del dataset completo, que se restringe al fragmento.
+    precalculados: resultados de la vista global ya calculados (paquete_datos.py), por clave de caché.
+    """
+    if catalogo_version is None:
+        catalogo_version = catalogo.construir_catalogo(df)
+    catalogo_fragmento = catalogo_version.restringir(df) if sufijo else catalogo_version
+    precalculados = {} if sufijo or precalculados is None else precalculados
+
+    def memoizar(clave, calcular):
+        if clave in precalculados:
+            return precalculados[clave]
+        return cache_compartido.memoizar(clave + sufijo, version, calcular)
+
+    motor = None
+    if motor_analitico == "duckdb" and motor_duckdb.disponible():
+        motor = motor_duckdb.MotorDuckDB(df)
+        agregados = cache_compartido.memoizar("agregados_duckdb" + sufijo, version, motor.calcular_agregados)
+    else:
+        # Por particiones en varios procesos con datasets grandes; en este proceso con el Excel actual
+        agregados = memoizar("agregados", lambda: agregacion_paralela.calcular_agregados_paralelo(df))
+
+    lineas_base = memoizar("lineas_base", lambda: anomalias.calcular_lineas_base(df))
+
+    return {
+        'df': df,
+        'indice_correlativo': construir_indice_correlativo(df),
+        'intervalos_proceso': intervalos.IndiceIntervalos.por_columna(df, 'Proceso'),
+        'intervalos_operario': intervalos.IndiceIntervalos.por_operario(df),
+        'motor': motor,
+        'agregados': agregados,
+        'afinidad': memoizar("afinidad", lambda: afinidad.construir_matriz(df)),
+        'lineas_base': lineas_base,
+        'anomalias': anomalias.puntuar(df, lineas_base),
+        'catalogo': catalogo_fragmento,
+        'metadatos': catalogo.MetadatosDataset(df, catalogo_fragmento),
+        'ocupacion_operarios': memoizar("ocupacion_operarios", lambda: intervalos.analizar_operarios(df)),
+    }
+
+
+def construir_datos(resultado_validacion, version, fecha_fuente, motor_analitico=MOTOR_ANALITICO,
+                    precalculados=None):
+    """
+    Instantánea de una versión a partir del resultado de la validación (dataset
+    ya pre-procesado). precalculados: resultados de un paquete exportado
+    (paquete_datos.py), que se usan en vez de calcularlos.
+    """
+    precalculados = precalculados or {}
+    df = resultado_validacion.valido
+    if 'AñoMes' not in df.columns:  # Los paquetes exportados ya traen el mes y la ubicación
+        df['AñoMes'] = df['Fecha'].dt.strftime('%Y-%m')
+        fragmentos.agregar_ubicacion(df)
+
+    catalogo_version = precalculados.get('catalogo') or cache_compartido.memoizar(
+        "catalogo", version, lambda: catalogo.construir_catalogo(df)
+    )
+    particion = fragmentos.FragmentosDatos(
+        df, lambda d, sufijo: derivar_datos(d, version, sufijo, motor_analitico, catalogo_version, precalculados)
+    )
+    # La vista global queda lista antes de publicar la instantánea; los edificios se construyen al pedirlos
+    particion.obtener(fragmentos.TODOS)
+
+    resumen = precalculados.get('resumen_fragmentos')
+    return {
+        'fragmentos': particion,
+        'resumen_fragmentos': resumen if resumen is not None else fragmentos.resumen_por_fragmento(df),
+        'fecha_fuente': fecha_fuente,
+        'validacion': resultado_validacion,
+    }
@@ -0,0 +1,559 @@
+#------------------------
+# Constructores de Gráficos y Tablas
+#------------------------
+# Figuras y tablas estilizadas compartidas por el dashboard y por el
+# generador de reportes por lote.
+#------------------------
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from analitica import format_time_from_minutes
+
+
+#------------------------
+# Modo de Renderizado
+#------------------------
+# "auto" usa el renderizado compacto (una sola traza, WebGL y series
+# reducidas) solo cuando el volumen lo amerita; "compacto" y "completo" lo
+# fuerzan en uno u otro sentido.
+MODO_RENDER = os.environ.get("AXIS_RENDER", "auto")
+MAX_PUNTOS_SERIE = int(os.environ.get("AXIS_MAX_PUNTOS", "600"))
+UMBRAL_GANTT_COMPACTO = 150
+FILAS_VISIBLES_GANTT = 60
+
+
+def usar_modo_compacto(n_elementos, umbral):
+    """Indica si corresponde el renderizado compacto para n_elementos (trazas, barras o puntos)."""
+    if MODO_RENDER == "compacto":
+        return True
+    if MODO_RENDER == "completo":
+        return False
+    return n_elementos > umbral
+
+
+def indices_lttb(x, y, n_puntos):
+    """
+    Índices de los puntos que conserva Largest-Triangle-Three-Buckets: los
+    extremos y, en cada tramo, el punto que forma el triángulo de mayor área
+    con el elegido en el tramo anterior y el promedio del siguiente.
+    """
+    n = len(x)
+    if n_puntos >= n or n_puntos < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    bordes = np.linspace(1, n - 1, n_puntos - 1).astype(int)
+
+    indices = np.empty(n_puntos, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    anterior = 0
+    for i in range(n_puntos - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        fin_siguiente = bordes[i + 2] if i + 2 < len(bordes) else n
+        x_prom = x[fin:fin_siguiente].mean()
+        y_prom = y[fin:fin_siguiente].mean()
+
+        areas = np.abs(
+            (x[anterior] - x_prom) * (y[inicio:fin] - y[anterior])
+            - (x[anterior] - x[inicio:fin]) * (y_prom - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        indices[i + 1] = anterior
+    return indices
+
+
+def reducir_serie(df, col_x, col_y, max_puntos=MAX_PUNTOS_SERIE):
+    """Filas de df reducidas con LTTB sobre (col_x, col_y); las demás columnas siguen a las filas elegidas."""
+    if len(df) <= max_puntos:
+        return df
+    x = df[col_x]
+    if not pd.api.types.is_numeric_dtype(x):
+        # Fechas (datetime64 o objetos date) a nanosegundos
+        x = pd.to_datetime(x).astype("int64")
+    return df.iloc[indices_lttb(x.to_numpy(), df[col_y].to_numpy(), max_puntos)]
+#------------------------
+# Fin de Modo de Renderizado
+#------------------------
+
+
+#------------------------
+# Estilos de Tablas
+#------------------------
+def estilo_filas_secuencia(row):
+    """Colorea la fila según Cumple_TT y la oscurece si el proceso tuvo espera."""
+    espera_val = int(row["T. Espera"].split(":")[0]) * 60 + int(row["T. Espera"].split(":")[1])  # convertir h:m a minutos
+    cumple = row["Cumple_TT"]
+
+    # Colores base
+    if cumple:
+        base_color = "#c8f7c5"   # verde claro
+        dark_color = "#a1d89a"   # verde oscuro
+    else:
+        base_color = "#f7c5c5"   # rojo claro
+        dark_color = "#d89a9a"   # rojo oscuro
+
+    # Si T. Espera > 0 oscurecer la fila
+    if espera_val > 0:
+        color = dark_color
+    else:
+        color = base_color
+
+    return [f"background-color: {color}"] * len(row)
+
+
+def estilo_filas_cumplimiento(row):
+    """Colorea la fila en rojo, amarillo o verde según la tasa de cumplimiento."""
+    tasa = row["Tasa_Cumplimiento"]
+    if tasa < 0.5:
+        color = "#f7c5c5"  # rojo claro
+    elif tasa < 0.8:
+        color = "#fff3cc"  # amarillo claro
+    else:
+        color = "#c8f7c5"  # verde claro
+    return [f"background-color: {color}"] * len(row)
+
+
+def tabla_secuencia(secuencia):
+    """Tabla de secuencia de procesos con filas coloreadas (Pestaña 2)."""
+    return secuencia.style.apply(estilo_filas_secuencia, axis=1)
+
+
+def tabla_cumplimiento(cumplimiento):
+    """Tabla de cumplimiento por proceso con filas coloreadas y tiempos en hh:mm:ss (Pestaña 3)."""
+    df_display = cumplimiento.reset_index().copy()
+    return df_display.style.apply(estilo_filas_cumplimiento, axis=1).format({
+        'Tasa_Cumplimiento': lambda x: f"{x * 100:.1f}%",
+        'Tiempo_Promedio': lambda x: format_time_from_minutes(x),
+        'TT_Promedio': lambda x: format_time_from_minutes(x)
+    }).set_table_styles([
+        {'selector': 'th', 'props': [('text-align', 'center')]},
+        {'selector': 'td', 'props': [('text-align', 'center')]},
+    ])
+
+
+def estilo_filas_comparacion(row, alfa):
+    """Destaca en verde o rojo las filas cuya diferencia de cumplimiento es significativa."""
+    if not row["p_Cumple"] < alfa:
+        return [""] * len(row)
+    color = "#c8f7c5" if row["Dif_Cumple_pp"] > 0 else "#f7c5c5"
+    return [f"background-color: {color}"] * len(row)
+
+
+def tabla_comparacion(comparada, alfa):
+    """Tabla de dos cohortes con diferencias y valores p (Modo comparación, Pestañas 3 y 6)."""
+    formatos = {col: "{:.1f}%" for col in comparada.columns if col.startswith('Pct_Cumple_')}
+    formatos.update({col: "{:.1f}" for col in comparada.columns if col.startswith('T_Real_')})
+    formatos.update({'Dif_Cumple_pp': "{:+.1f}", 'Dif_T_Real': "{:+.1f}", 'p_Cumple': "{:.3f}", 'p_T_Real': "{:.3f}"})
+    return comparada.style.apply(estilo_filas_comparacion, axis=1, alfa=alfa).format(formatos, na_rep="-")
+#------------------------
+# Fin de Estilos de Tablas
+#------------------------
+
+
+#------------------------
+# Figuras
+#------------------------
+def figura_comparacion_mensual(mensual, col_valor, titulo, titulo_y):
+    """Una línea por cohorte de una métrica mensual (Modo comparación, Pestaña 5)."""
+    fig = go.Figure()
+    for cohorte, serie in mensual.groupby('Cohorte', observed=True):
+        fig.add_trace(go.Scatter(
+            x=serie['Mes'],
+            y=serie[col_valor],
+            mode="lines+markers",
+            name=f"Cohorte {cohorte}",
+            line=dict(width=2)
+        ))
+    fig.update_layout(title=titulo, xaxis_title="Mes", yaxis_title=titulo_y, template="simple_white")
+    return fig
+
+
+def figura_pie_cumplimiento(cumplimiento, titulo):
+    """Distribución de procesos por categoría de cumplimiento (Pestaña 3)."""
+    categoria = cumplimiento['Tasa_Cumplimiento'].apply(
+        lambda x: 'Bajo (<50%)' if x < 0.5 else 'Medio (50-80%)' if x < 0.8 else 'Alto (>80%)'
+    )
+    cumplimiento_counts = categoria.value_counts()
+    cumplimiento_counts = cumplimiento_counts.reindex(['Bajo (<50%)', 'Medio (50-80%)', 'Alto (>80%)'], fill_value=0)
+
+    fig_pie_cumplimiento = go.Figure(data=[go.Pie(
+        labels=cumplimiento_counts.index,
+        values=cumplimiento_counts.values,
+        marker_colors=['#f7c5c5', '#fff3cc', '#c8f7c5'],
+        title=titulo
+    )])
+
+    fig_pie_cumplimiento.update_layout(
+        height=400,
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+    return fig_pie_cumplimiento
+
+
+def format_minutes_to_hms(minutes_val):
+    """Formatea el eje X del Gantt en hh:mm:ss."""
+    total_seconds = int(minutes_val * 60)
+    hours, remainder = divmod(total_seconds, 3600)
+    mins, secs = divmod(remainder, 60)
+    return f"{hours:02d}:{mins:02d}:{secs:02d}"
+
+
+def figura_gantt_procesos(detalle, correlativo):
+    """Diagrama de flujo (Gantt) de los procesos de un correlativo, coloreado por operarios (Pestaña 2)."""
+    gantt_df = detalle['gantt']
+
+    # Crear colores dinámicos para Operarios
+    unique_operarios = gantt_df['Operarios'].unique()
+    colors = px.colors.qualitative.Plotly
+
+    color_map = {operario: colors[i % len(colors)] for i, operario in enumerate(unique_operarios)}
+
+    fig_gantt = go.Figure()
+
+    # Agrupar por operario para una leyenda unificada
+    for operario in unique_operarios:
+        df_operario = gantt_df[gantt_df['Operarios'] == operario]
+
+        # Crear hovertext para todos los procesos de este operario
+        hovertexts = []
+        for idx, row in df_operario.iterrows():
+            hovertexts.append(
+                f"Proceso: {row['Proceso']}<br>"
+                f"Operarios: {row['Operarios']}<br>"
+                f"Inicio (min): {row['Inicio_Duracion']:.1f}<br>"
+                f"Fin (min): {row['Fin_Duracion']:.1f}<br>"
+                f"Duración Real: {format_time_from_minutes(row['T_Real_Unit'])}<br>"
+                f"Tiempo de Espera: {format_time_from_minutes(row['T_Espera_Unit'])}"
+            )
+
+        fig_gantt.add_trace(go.Bar(
+            y=df_operario['Proceso'],
+            x=df_operario['Fin_Duracion'] - df_operario['Inicio_Duracion'],
+            base=df_operario['Inicio_Duracion'],
+            orientation='h',
+            name=operario, # Nombre del operario para la leyenda
+            legendgroup=operario, # Agrupar elementos en la leyenda
+            showlegend=True, # Mostrar en la leyenda
+            marker_color=color_map[operario],
+            hoverinfo='text',
+            hovertext=hovertexts
+        ))
+
+    # Determinar tickvals para el eje X
+    max_duration = gantt_df['Fin_Duracion'].max()
+
+    # Calcular los intervalos de 10 horas para el sombreado (en minutos)
+    # 10 horas = 600 minutos
+    hour_interval_minutes = 600
+
+    shapes = []
+    toggle = True # alternador blanco/gris
+
+    # Iterar en intervalos de 10 horas
+    current_time_minutes = 0
+    while current_time_minutes < max_duration:
+        start_hour_block = current_time_minutes
+        end_hour_block = current_time_minutes + hour_interval_minutes
+
+        # Solo añadir el rectángulo si toggle es True (para alternar los colores)
+        if toggle:
+            shapes.append(dict(
+                type="rect",
+                xref="x",
+                yref="paper",
+                x0=start_hour_block,
+                x1=end_hour_block,
+                y0=0,
+                y1=1,
+                fillcolor="LightGray", # Color gris claro
+                opacity=0.4,
+                layer="below",
+                line_width=0
+            ))
+        toggle = not toggle # Alternar para el siguiente bloque
+
+        current_time_minutes = end_hour_block
+
+    # Asegura que el intervalo de ticks sea al menos 1 para evitar divisiones por cero o ticks excesivamente pequeños
+    tick_interval = max(1, int(max_duration / 10))
+    tick_values = list(range(0, int(max_duration * 1.1) + tick_interval, tick_interval))
+
+    # Orden de los procesos tal como aparecen en la secuencia, del primero al último
+    process_order = detalle['orden_procesos']
+
+    fig_gantt.update_layout(
+        title=f"Cronología de Procesos (Duración) para Correlativo {correlativo}",
+        xaxis_title="Duración (hh:mm:ss)",
+        yaxis_title="Proceso",
+        barmode='stack',
+        height=max(500, len(process_order) * 25), # Ajustar altura dinámicamente
+        showlegend=True,
+        plot_bgcolor='white',
+        shapes=shapes, # Añadir los shapes al layout del gráfico
+        xaxis=dict(
+            showgrid=True,
+            gridwidth=1,
+            gridcolor='LightGray',
+            tickmode='array',
+            tickvals=tick_values,
+            ticktext=[format_minutes_to_hms(val) for val in tick_values]
+        ),
+        yaxis=dict(
+            showgrid=True,
+            gridwidth=1,
+            gridcolor='LightGray',
+            categoryorder='array', # Usar el orden del array
+            categoryarray=process_order # El array con el orden de los procesos
+        ),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig_gantt
+
+
+def _sombreado_meses(inicio, termino):
+    """Rectángulos de fondo alternados (blanco / gris) por mes para ejes de fechas."""
+    min_date = inicio.replace(day=1)
+    max_date = termino.replace(day=1) + pd.offsets.MonthEnd(1)
+
+    month_edges = pd.date_range(min_date, max_date, freq='MS')
+
+    shapes = []
+    toggle = True  # alternador blanco/gris
+
+    for i in range(len(month_edges)-1):
+        start_m = month_edges[i]
+        end_m = month_edges[i+1]
+
+        shapes.append(dict(
+            type="rect",
+            xref="x",
+            yref="paper",
+            x0=start_m,
+            x1=end_m,
+            y0=0,
+            y1=1,
+            fillcolor="white" if toggle else "LightGray",
+            opacity=0.4,
+            layer="below",
+            line_width=0
+        ))
+
+        toggle = not toggle  # alterna colores
+    return shapes
+
+
+def _gantt_global_compacto(gantt_df):
+    """Una sola traza WebGL con un segmento por correlativo (inicio-término) separados por huecos."""
+    n = len(gantt_df)
+    inicio = gantt_df['Inicio'].to_numpy()
+    termino = gantt_df['Término'].to_numpy()
+    correlativo = gantt_df['Correlativo_str'].to_numpy()
+
+    # Tres puntos por correlativo: inicio, término y un hueco (None) que corta la línea
+    x = np.empty(3 * n, dtype=object)
+    x[0::3], x[1::3], x[2::3] = inicio, termino, None
+    y = np.empty(3 * n, dtype=object)
+    y[0::3], y[1::3], y[2::3] = correlativo, correlativo, None
+    datos_hover = np.empty((3 * n, 3), dtype=object)
+    for k in range(2):
+        datos_hover[k::3, 0] = gantt_df['Tipo_bano'].to_numpy()
+        datos_hover[k::3, 1] = gantt_df['Inicio'].dt.strftime('%Y-%m-%d').to_numpy()
+        datos_hover[k::3, 2] = gantt_df['Término'].dt.strftime('%Y-%m-%d').to_numpy()
+
+    fig = go.Figure(go.Scattergl(
+        x=x,
+        y=y,
+        mode='lines',
+        line=dict(width=8, color=px.colors.qualitative.Plotly[0]),
+        customdata=datos_hover,
+        hovertemplate=(
+            "Correlativo: %{y}<br>Tipo_bano: %{customdata[0]}<br>"
+            "Inicio: %{customdata[1]}<br>Término: %{customdata[2]}<extra></extra>"
+        ),
+        showlegend=False
+    ))
+    fig.update_layout(title="Línea de Tiempo de Fabricación por Baño")
+    # Se muestran las primeras filas; el resto se recorre desplazando o alejando el eje Y
+    fig.update_yaxes(
+        categoryorder='array',
+        categoryarray=correlativo,
+        range=[min(n, FILAS_VISIBLES_GANTT) - 0.5, -0.5]
+    )
+    return fig
+
+
+def figura_gantt_global(gantt_df, compacto=None):
+    """
+    Cronología general de baños (Pestaña 1). En modo completo, una barra por
+    correlativo con px.timeline; en modo compacto, una sola traza WebGL con
+    altura acotada.
+    """
+    if compacto is None:
+        compacto = usar_modo_compacto(len(gantt_df), UMBRAL_GANTT_COMPACTO)
+
+    if compacto:
+        fig_gantt = _gantt_global_compacto(gantt_df)
+        altura = min(max(500, len(gantt_df) * 10), FILAS_VISIBLES_GANTT * 12)
+    else:
+        fig_gantt = px.timeline(
+            gantt_df,
+            x_start="Inicio",
+            x_end="Término",
+            y="Correlativo_str",
+            title="Línea de Tiempo de Fabricación por Baño",
+            color="Correlativo_str",
+            hover_data=['Tipo_bano']
+        )
+        fig_gantt.update_yaxes(autorange="reversed")
+        altura = max(500, len(gantt_df) * 10)
+
+    # ---- FONDO ALTERNADO POR MES (blanco / gris) ----
+    fig_gantt.update_layout(shapes=_sombreado_meses(gantt_df['Inicio'].min(), gantt_df['Término'].max()))
+    # ---- FIN FONDO POR MES ----
+
+    fig_gantt.update_yaxes(title="Correlativo")
+    fig_gantt.update_layout(
+        xaxis_title="Fecha",
+        height=altura,
+        plot_bgcolor='white',
+        xaxis=dict(showgrid=True, gridwidth=1, gridcolor='LightGray'),
+        yaxis=dict(showgrid=True, gridwidth=1, gridcolor='LightGray')
+    )
+    return fig_gantt
+#------------------------
+# Fin de Figuras
+#------------------------
+
+
+#------------------------
+# Barras por Operario
+#------------------------
+# Una sola traza por gráfico: los valores viajan como arreglos NumPy (plotly
+# los serializa como buffers base64 tipados), el color de cada operario como
+# arreglo de marker.color y las etiquetas con texttemplate, en vez de una
+# traza y una lista de textos por operario.
+# Los colores de operarios y procesos vienen del catálogo de la versión (catalogo.py).
+def figura_barras_operario(metricas, col_valor, titulo, titulo_x, color_map, plantilla_texto,
+                           col_texto=None, rango_x=None, altura_min=400):
+    """
+    Barras horizontales de una métrica por operario (Pestañas 4 y 6).
+
+    plantilla_texto: texttemplate de plotly sobre %{x}; con col_texto, esa
+    columna se entrega como customdata (p. ej. "%{x:.1f} (%{customdata} tareas)").
+    """
+    operarios = metricas['Operario'].to_numpy()
+    fig = go.Figure(go.Bar(
+        x=metricas[col_valor].to_numpy(dtype=float),
+        y=operarios,
+        orientation='h',
+        marker_color=[color_map[op] for op in operarios],
+        customdata=metricas[col_texto].to_numpy() if col_texto else None,
+        texttemplate=plantilla_texto,
+        textposition='outside',
+        showlegend=False
+    ))
+    fig.update_layout(
+        title=titulo,
+        xaxis_title=titulo_x,
+        yaxis_title="Operario",
+        yaxis={'categoryorder': 'total ascending'},
+        height=max(altura_min, len(metricas) * 30)
+    )
+    if rango_x is not None:
+        fig.update_layout(xaxis_range=rango_x)
+    return fig
+
+
+def figura_desglose_procesos(conteo, color_map):
+    """
+    Participaciones apiladas por operario y proceso (Pestaña 4). conteo: tabla
+    operario x proceso (filas en el orden a graficar, columnas en el orden de
+    apilado). Una sola traza con un segmento por par operario-proceso con
+    participaciones; la base de cada segmento es el acumulado del operario y
+    el proceso se ve en el hover.
+    """
+    largo = conteo.stack().rename('Cantidad').reset_index()
+    largo.columns = ['Operario', 'Proceso', 'Cantidad']
+    largo = largo[largo['Cantidad'] > 0]
+    base = largo.groupby('Operario', sort=False)['Cantidad'].cumsum() - largo['Cantidad']
+
+    fig = go.Figure(go.Bar(
+        x=largo['Operario'].to_numpy(),
+        y=largo['Cantidad'].to_numpy(dtype=float),
+        base=base.to_numpy(dtype=float),
+        marker_color=largo['Proceso'].map(color_map).to_numpy(),
+        customdata=largo['Proceso'].to_numpy(),
+        hovertemplate="Operario: %{x}<br>Proceso: %{customdata}<br>Participaciones: %{y}<extra></extra>",
+        showlegend=False
+    ))
+    fig.update_layout(
+        title="Desglose de Procesos Participados por Operario",
+        xaxis_title="Operario",
+        yaxis_title="Número de Participaciones",
+        template="simple_white"
+    )
+    fig.update_xaxes(categoryorder='array', categoryarray=conteo.index.to_numpy())
+    return fig
+#------------------------
+# Fin de Barras por Operario
+#------------------------
+
+
+#------------------------
+# Mapas de Calor de Afinidad
+#------------------------
+def figura_matriz_afinidad(tabla, titulo, etiqueta):
+    """Mapa de calor operario x proceso (Pestaña 4); una sola traza con la matriz como arreglo tipado."""
+    fig = go.Figure(go.Heatmap(
+        z=tabla.to_numpy(dtype=float),
+        x=np.asarray(tabla.columns),
+        y=np.asarray(tabla.index),
+        colorscale='Blues',
+        colorbar=dict(title=etiqueta),
+        hovertemplate="Operario: %{y}<br>Proceso: %{x}<br>" + etiqueta + ": %{z:.1f}<extra></extra>",
+        hoverongaps=False
+    ))
+    fig.update_layout(
+        title=titulo,
+        xaxis_title="Proceso",
+        yaxis_title="Operario",
+        height=max(400, min(len(tabla), 200) * 18 + 150),
+        template="simple_white"
+    )
+    fig.update_yaxes(autorange="reversed")
+    return fig
+
+
+def figura_similitud_operarios(similitud):
+    """Similitud coseno entre operarios según sus perfiles de procesos (Pestaña 4)."""
+    fig = go.Figure(go.Heatmap(
+        z=similitud.to_numpy(dtype=float),
+        x=np.asarray(similitud.columns),
+        y=np.asarray(similitud.index),
+        zmin=0,
+        zmax=1,
+        colorscale='Viridis',
+        colorbar=dict(title="Similitud"),
+        hovertemplate="%{y} / %{x}<br>Similitud: %{z:.2f}<extra></extra>"
+    ))
+    fig.update_layout(
+        title="Similitud entre Operarios (perfil de procesos)",
+        height=max(400, min(len(similitud), 200) * 18 + 150),
+        template="simple_white"
+    )
+    fig.update_yaxes(autorange="reversed")
+    return fig
+#------------------------
+# Fin de Mapas de Calor de Afinidad
+#------------------------
@@ -0,0 +1,639 @@
+#------------------------
+# Ingesta en Vivo de Ejecuciones
+#------------------------
+# Recibe eventos de ejecución de proceso desde la planta (baño, proceso,
+# operarios, inicio y fin) sin pasar por AppSheet ni por el Excel. Los eventos
+# se acumulan en memoria y un hilo escritor los graba en micro-lotes: cada
+# lote se valida (validacion.py), se descompone en las tablas de axis_bd
+# (carga_bd.tablas_axis) e inserta en ejecucion_proceso y ejecucion_operario
+# dentro de una sola transacción. Las tablas resumen_bano y resumen_mes se
+# actualizan en la misma transacción con los triggers de
+# migracion_rendimiento.sql (o de axis_flow_tables_sqlite.sql).
+#
+# Después de cada lote se actualizan en memoria los agregados incrementales
+# (cumplimiento por proceso y métricas por operario, como calcular_agregados)
+# y las filas nuevas se puntúan con anomalias.puntuar contra las líneas base
+# ya calculadas del dataset, sin recalcularlas.
+#
+# Los eventos se validan contra el catálogo proceso de la base (leído en cada
+# conexión): un (proceso, TT) que no está en el catálogo va a cuarentena en vez
+# de agregarse. El catálogo se mantiene con carga_bd.py o, en una base nueva,
+# con --completar-procesos (los procesos del --excel).
+#
+# Un lote se escribe al llegar a TAMANO_LOTE_INGESTA eventos o cada
+# INTERVALO_INGESTA_MS, lo que ocurra primero. Con más de MAX_PENDIENTES
+# eventos sin escribir se rechazan los nuevos (503) en vez de crecer sin
+# límite.
+#
+# Si la transacción de un lote falla, el lote vuelve al frente de la cola y se
+# reintenta con espera exponencial (ESPERA_REINTENTO_MS, duplicándose) hasta
+# MAX_REINTENTOS veces. Los lotes que se agotan los reintentos, o cuyos eventos
+# no se pueden convertir, se escriben en RUTA_DESCARTADOS (una línea JSON por
+# evento, con el error) para reenviarlos después.
+#
+#   python ingesta.py --sqlite axis_local.db --excel Datos_Banos.xlsx --completar-procesos --puerto-http 8001
+#   python ingesta.py --usuario root --clave **** --excel Datos_Banos.xlsx
+#
+#   POST /ingesta/eventos     un evento o una lista de eventos (JSON); responde 202.
+#                             inicio y fin van en hora local de la planta, sin zona
+#                             horaria (un evento con Z o +HH:MM se rechaza con 400)
+#   GET  /ingesta/estado      contadores, cuarentena y latencia de visibilidad
+#   GET  /ingesta/procesos    cumplimiento TT por proceso (agregado incremental)
+#   GET  /ingesta/operarios   métricas por operario (agregado incremental)
+#   GET  /ingesta/anomalias   últimas ejecuciones ingeridas marcadas como anómalas
+#------------------------
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import uvicorn
+except ImportError:
+    uvicorn = None
+
+import anomalias
+import api
+import cache_compartido
+import carga_bd
+import fuente_datos
+import validacion
+
+
+#------------------------
+# Configuración
+#------------------------
+TAMANO_LOTE_INGESTA = int(os.environ.get("AXIS_INGESTA_LOTE", "500"))
+INTERVALO_INGESTA_MS = float(os.environ.get("AXIS_INGESTA_INTERVALO_MS", "200"))
+MAX_PENDIENTES = int(os.environ.get("AXIS_INGESTA_MAX_PENDIENTES", "100000"))
+MAX_REINTENTOS = int(os.environ.get("AXIS_INGESTA_REINTENTOS", "5"))
+ESPERA_REINTENTO_MS = float(os.environ.get("AXIS_INGESTA_ESPERA_MS", "500"))
+MAX_ESPERA_REINTENTO_MS = 30000
+RUTA_DESCARTADOS = os.environ.get("AXIS_INGESTA_DESCARTADOS", "ingesta_descartados.jsonl")
+MAX_ANOMALIAS_RECIENTES = 1000
+MUESTRAS_LATENCIA = 10000
+
+CAMPOS_REQUERIDOS = ['correlativo', 'cod_bano', 'proceso', 'tt', 'inicio', 'fin']
+#------------------------
+# Fin de Configuración
+#------------------------
+
+logger = logging.getLogger("axis.ingesta")
+
+
+def _con_zona(valor):
+    """Indica si una marca de tiempo trae zona horaria (Z o +HH:MM); las no interpretables las revisa validacion."""
+    try:
+        return pd.Timestamp(valor).tzinfo is not None
+    except (ValueError, TypeError):
+        return False
+
+
+class ErrorEvento(ValueError):
+    """Evento mal formado (400) o cola llena (503)."""
+
+    def __init__(self, mensaje, estado=400):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+#------------------------
+# Eventos a Filas del Excel
+#------------------------
+def filas_eventos(eventos):
+    """
+    DataFrame con las columnas del Excel a partir de los eventos, para validarlo
+    con validacion.validar. Inicio y Fin se conservan; la fecha es el día de
+    inicio y T_Real_min la duración (fin - inicio); el acumulado por baño se
+    completa al escribir.
+    """
+    ev = pd.DataFrame(list(eventos))
+    inicio = pd.to_datetime(ev['inicio'], errors='coerce', format='ISO8601')
+    fin = pd.to_datetime(ev['fin'], errors='coerce', format='ISO8601')
+    t_real = ((fin - inicio).dt.total_seconds() / 60).round(2)
+    t_espera = pd.to_numeric(ev['t_espera_min'], errors='coerce').fillna(0.0) if 't_espera_min' in ev else 0.0
+    tt = pd.to_numeric(ev['tt'], errors='coerce')
+
+    cod_bano = ev['cod_bano']
+    tipo_bano = ev['tipo_bano'] if 'tipo_bano' in ev else cod_bano.astype(str).str.rsplit('-', n=1).str[-1]
+
+    operarios = ev['operarios'] if 'operarios' in ev else pd.Series([[]] * len(ev))
+    operarios = [o if isinstance(o, list) else ([o] if isinstance(o, str) else []) for o in operarios]
+    columnas_operario = {
+        f'Operario_{k + 1}': [lista[k] if len(lista) > k else np.nan for lista in operarios] for k in range(3)
+    }
+
+    return pd.DataFrame({
+        'Correlativo': ev['correlativo'],
+        'Cod_bano': cod_bano,
+        'Tipo_bano': tipo_bano,
+        'Fecha': inicio.dt.normalize(),
+        'Inicio': inicio,
+        'Fin': fin,
+        'Proceso': ev['proceso'],
+        'T_Espera_min': t_espera,
+        'T_Real_min': t_real,
+        'T_Real_Acumulado': np.nan,
+        'TT': ev['tt'],
+        'Cumple_TT': t_real <= tt,
+        'Diferencia_TT': (t_real - tt).round(2),
+        **columnas_operario,
+        'T_Real_horas': (t_real / 60).round(2),
+        'T_Espera_horas': (t_espera / 60).round(2) if isinstance(t_espera, pd.Series) else 0.0,
+        'T_Real_Acumulado_horas': np.nan,
+    })
+#------------------------
+# Fin de Eventos a Filas del Excel
+#------------------------
+
+
+#------------------------
+# Agregados Incrementales
+#------------------------
+class AgregadosIncrementales:
+    """
+    Sumas por proceso y por operario que se actualizan con cada lote; de ellas
+    salen las mismas tablas que calcular_agregados sin recorrer el dataset.
+    """
+
+    def __init__(self):
+        self.por_proceso = pd.DataFrame(columns=['Cantidad', 'Cumple', 'Suma_T_Real', 'Suma_TT'], dtype=float)
+        self.por_operario = pd.DataFrame(columns=['Total_Tareas', 'Cumple', 'Suma_T_Real'], dtype=float)
+        self._bloqueo = threading.Lock()
+
+    @classmethod
+    def desde(cls, df):
+        agregados = cls()
+        agregados.agregar(df)
+        return agregados
+
+    def agregar(self, df):
+        """Suma las ejecuciones de df (columnas del Excel, ya validadas)."""
+        cumple = df['Cumple_TT'].astype(bool).astype(float)
+        parcial_proceso = pd.DataFrame({
+            'Proceso': df['Proceso'], 'Cantidad': 1.0, 'Cumple': cumple,
+            'Suma_T_Real': df['T_Real_min'], 'Suma_TT': df['TT'].astype(float),
+        }).groupby('Proceso').sum()
+
+        largo = pd.DataFrame({
+            'Operario': df[['Operario_1', 'Operario_2', 'Operario_3']].to_numpy().ravel(),
+            'Total_Tareas': 1.0,
+            'Cumple': np.repeat(cumple.to_numpy(), 3),
+            'Suma_T_Real': np.repeat(df['T_Real_min'].to_numpy(dtype=float), 3),
+        }).dropna(subset=['Operario'])
+        parcial_operario = largo.groupby('Operario').sum()
+
+        with self._bloqueo:
+            self.por_proceso = self.por_proceso.add(parcial_proceso, fill_value=0)
+            self.por_operario = self.por_operario.add(parcial_operario, fill_value=0)
+
+    def cumplimiento_proceso(self):
+        """Misma tabla que analitica.cumplimiento_por_proceso."""
+        sumas = self.por_proceso
+        tabla = pd.DataFrame({
+            'Tasa_Cumplimiento': sumas['Cumple'] / sumas['Cantidad'],
+            'Cantidad': sumas['Cantidad'].astype(int),
+            'Tiempo_Promedio': sumas['Suma_T_Real'] / sumas['Cantidad'],
+            'TT_Promedio': sumas['Suma_TT'] / sumas['Cantidad'],
+        }).round(1)
+        tabla.index.name = 'Proceso'
+        return tabla.sort_values('Tasa_Cumplimiento', ascending=True)
+
+    def metricas_operario(self):
+        """Misma tabla que analitica.metricas_operario."""
+        sumas = self.por_operario
+        tabla = pd.DataFrame({
+            'Total_Tareas': sumas['Total_Tareas'].astype(int),
+            'Avg_T_Real': sumas['Suma_T_Real'] / sumas['Total_Tareas'],
+            'Pct_Cumple_TT': sumas['Cumple'] / sumas['Total_Tareas'] * 100,
+        })
+        tabla.index.name = 'Operario'
+        return tabla.reset_index().sort_values('Avg_T_Real')
+#------------------------
+# Fin de Agregados Incrementales
+#------------------------
+
+
+#------------------------
+# Escritura por Micro-lotes
+#------------------------
+def _ejecutar(con, sql):
+    with closing(con.cursor()) as cur:
+        cur.execute(sql)
+        return cur.fetchall()
+
+
+class IngestaEjecuciones:
+    """
+    Cola en memoria y escritor de micro-lotes.
+
+    conectar(): nueva conexión a axis_bd (carga_bd.conectar o carga_bd.conectar_sqlite);
+    la usa solo el hilo escritor.
+    lineas_base: líneas base de anomalias.calcular_lineas_base (opcional).
+    agregados: AgregadosIncrementales de partida (por ejemplo, del dataset actual).
+    ruta_descartados: archivo JSONL de los eventos que no se pudieron grabar.
+    """
+
+    def __init__(self, conectar, esquema="generadas", lineas_base=None, agregados=None,
+                 tamano_lote=TAMANO_LOTE_INGESTA, intervalo_ms=INTERVALO_INGESTA_MS, max_pendientes=MAX_PENDIENTES,
+                 max_reintentos=MAX_REINTENTOS, espera_reintento_ms=ESPERA_REINTENTO_MS,
+                 ruta_descartados=RUTA_DESCARTADOS):
+        self._conectar = conectar
+        self.esquema = esquema
+        self.lineas_base = lineas_base
+        self.agregados = agregados if agregados is not None else AgregadosIncrementales()
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo_ms / 1000
+        self.max_pendientes = max_pendientes
+        self.max_reintentos = max_reintentos
+        self.espera_reintento = espera_reintento_ms / 1000
+        self.ruta_descartados = ruta_descartados
+
+        # (evento, instante de recepción, intentos fallidos)
+        self._pendientes = []
+        self._bloqueo = threading.Lock()
+        self._hay_lote = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = None
+        self._acumulado = None
+        self._procesos = None
+        self._reintentar_desde = 0.0
+        self._reconectar = False
+        self._fallos_conexion = 0
+
+        self.recibidos = 0
+        self.escritos = 0
+        self.cuarentena = 0
+        self.fallidos = 0
+        self.reintentos = 0
+        self.descartados = 0
+        self.lotes = 0
+        self.motivos = Counter()
+        self.latencias = deque(maxlen=MUESTRAS_LATENCIA)
+        self.anomalias = deque(maxlen=MAX_ANOMALIAS_RECIENTES)
+        self.ultimo_error = None
+
+    def agregar(self, eventos):
+        """Encola eventos (diccionarios); devuelve cuántos se aceptaron."""
+        if isinstance(eventos, dict):
+            eventos = [eventos]
+        if not isinstance(eventos, list):
+            raise ErrorEvento("Se espera un evento (objeto JSON) o una lista de eventos.")
+        for evento in eventos:
+            faltantes = [c for c in CAMPOS_REQUERIDOS if not isinstance(evento, dict) or c not in evento]
+            if faltantes:
+                raise ErrorEvento(f"Faltan campos en el evento: {', '.join(faltantes)}")
+            # Una marca con zona mezclada con otras sin zona haría fallar la conversión de todo el lote
+            con_zona = [c for c in ('inicio', 'fin') if _con_zona(evento[c])]
+            if con_zona:
+                raise ErrorEvento(
+                    f"{', '.join(con_zona)} debe ser hora local de la planta, sin zona horaria (sin Z ni +HH:MM)."
+                )
+
+        recibido = time.perf_counter()
+        with self._bloqueo:
+            if len(self._pendientes) + len(eventos) > self.max_pendientes:
+                raise ErrorEvento("Demasiados eventos pendientes; reintente más tarde.", estado=503)
+            self._pendientes.extend((evento, recibido, 0) for evento in eventos)
+            self.recibidos += len(eventos)
+            if len(self._pendientes) >= self.tamano_lote:
+                self._hay_lote.set()
+        self.iniciar()
+        return len(eventos)
+
+    @property
+    def pendientes(self):
+        return len(self._pendientes)
+
+    def iniciar(self):
+        """Lanza el hilo escritor si no está corriendo."""
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        with self._bloqueo:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._detener.clear()
+                self._hilo = threading.Thread(target=self._escribir_lotes, name="axis-ingesta", daemon=True)
+                self._hilo.start()
+
+    def detener(self, esperar=True):
+        """Detiene el escritor después de grabar lo pendiente."""
+        self._detener.set()
+        self._hay_lote.set()
+        if esperar and self._hilo is not None:
+            self._hilo.join()
+
+    def _escribir_lotes(self):
+        # La primera conexión sigue el mismo camino que una reconexión: si la base no responde, se reintenta
+        con = None
+        self._reconectar = True
+        try:
+            while True:
+                self._hay_lote.wait(max(self.intervalo, self._reintentar_desde - time.monotonic()))
+                self._hay_lote.clear()
+                detener = self._detener.is_set()
+                if self._reconectar:
+                    con = self._reabrir(con)
+                    if con is None and detener:
+                        # Al detener sin base disponible, lo pendiente queda en descartados
+                        with self._bloqueo:
+                            lote, self._pendientes = self._pendientes, []
+                        if lote:
+                            self._descartar(lote, self.ultimo_error)
+                        return
+                while con is not None and time.monotonic() >= self._reintentar_desde:
+                    with self._bloqueo:
+                        lote = self._pendientes[:self.tamano_lote]
+                        del self._pendientes[:self.tamano_lote]
+                    if not lote:
+                        break
+                    if not self._escribir(con, lote):
+                        self._reintentar(lote)
+                        break
+                    if len(lote) < self.tamano_lote:
+                        break
+                if detener and not self._pendientes:
+                    return
+        finally:
+            if con is not None:
+                con.close()
+
+    def _reabrir(self, con):
+        """
+        Conexión nueva (al arrancar o tras un ROLLBACK fallido), con el catálogo
+        proceso releído y el acumulado por baño leído la primera vez; None (y
+        reintento más tarde) si no se puede.
+        """
+        if con is not None:
+            try:
+                con.close()
+            except Exception:
+                pass
+            con = None
+        try:
+            con = self._conectar()
+            self._procesos = carga_bd.catalogo_procesos(con)
+            if self._acumulado is None:
+                filas = _ejecutar(con, "SELECT id_b, SUM(t_real_min) FROM ejecucion_proceso GROUP BY id_b")
+                self._acumulado = {int(id_b): float(total) for id_b, total in filas}
+        except Exception as error:
+            logger.exception("No se pudo abrir la conexión de ingesta")
+            self.ultimo_error = str(error)
+            # Espera exponencial, como los reintentos de lotes
+            espera = min(self.espera_reintento * 2 ** self._fallos_conexion, MAX_ESPERA_REINTENTO_MS / 1000)
+            self._fallos_conexion += 1
+            self._reintentar_desde = time.monotonic() + espera
+            if con is not None:
+                try:
+                    con.close()
+                except Exception:
+                    pass
+            return None
+        self._reconectar = False
+        self._fallos_conexion = 0
+        return con
+
+    def _reintentar(self, lote):
+        """Devuelve el lote al frente de la cola con espera exponencial, o lo descarta si agotó los reintentos."""
+        intentos = lote[0][2] + 1
+        if intentos > self.max_reintentos:
+            self._descartar(lote, self.ultimo_error)
+            return
+        espera = min(self.espera_reintento * 2 ** (intentos - 1), MAX_ESPERA_REINTENTO_MS / 1000)
+        self._reintentar_desde = time.monotonic() + espera
+        self.reintentos += 1
+        with self._bloqueo:
+            self._pendientes[:0] = [(evento, recibido, intentos) for evento, recibido, _ in lote]
+        logger.warning("Lote de %d eventos se reintentará en %.1f s (intento %d)", len(lote), espera, intentos)
+
+    def _descartar(self, lote, motivo):
+        """Guarda los eventos del lote en el archivo de descartados (JSONL) para reenviarlos después."""
+        self.fallidos += len(lote)
+        fecha = datetime.now().isoformat(timespec='seconds')
+        try:
+            with open(self.ruta_descartados, "a", encoding="utf-8") as archivo:
+                for evento, _, intentos in lote:
+                    registro = {'fecha': fecha, 'intentos': intentos, 'error': motivo, 'evento': evento}
+                    archivo.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+            self.descartados += len(lote)
+        except OSError:
+            logger.exception("No se pudieron guardar %d eventos descartados", len(lote))
+
+    def _escribir(self, con, lote):
+        """
+        Valida y graba un lote en una transacción; luego actualiza agregados y
+        anomalías. Devuelve False si la transacción falló (el lote se reintenta).
+        """
+        eventos = [evento for evento, _, _ in lote]
+        recibidos = np.array([recibido for _, recibido, _ in lote])
+        try:
+            # Con el catálogo, un proceso desconocido va a cuarentena (cargar_excel lo agregaría)
+            resultado = validacion.validar(filas_eventos(eventos), procesos=self._procesos)
+        except Exception as error:
+            # Reintentar no cambia el resultado: los eventos van directo a descartados
+            logger.exception("Lote de %d eventos no se pudo convertir", len(lote))
+            self.ultimo_error = str(error)
+            self._descartar(lote, self.ultimo_error)
+            return True
+        valido = resultado.valido
+        if valido.empty:
+            self.cuarentena += len(resultado.cuarentena)
+            self.motivos.update(resultado.cuarentena['Motivo'])
+            return True
+
+        # T_Real_Acumulado continúa el de cada baño en la base (orden de llegada dentro del lote)
+        base = valido['Correlativo'].map(self._acumulado).fillna(0.0)
+        valido['T_Real_Acumulado'] = (base + valido.groupby('Correlativo')['T_Real_min'].cumsum()).round(2)
+        valido['T_Real_Acumulado_horas'] = (valido['T_Real_Acumulado'] / 60).round(2)
+
+        try:
+            _ejecutar(con, "BEGIN")
+            carga_bd.cargar_excel(con, valido, self.esquema)
+            _ejecutar(con, "COMMIT")
+        except Exception as error:
+            logger.exception("Falló la escritura de un lote de %d ejecuciones", len(valido))
+            self.ultimo_error = str(error)
+            try:
+                _ejecutar(con, "ROLLBACK")
+            except Exception:
+                # Conexión caída o en un estado desconocido: el hilo sigue y abre otra antes del reintento
+                logger.exception("Falló el ROLLBACK del lote")
+                self._reconectar = True
+            return False
+
+        visible = time.perf_counter()
+        self.latencias.extend(visible - recibidos)
+        self.escritos += len(valido)
+        self.cuarentena += len(resultado.cuarentena)
+        self.motivos.update(resultado.cuarentena['Motivo'])
+        self.lotes += 1
+        self._acumulado.update(valido.groupby('Correlativo')['T_Real_Acumulado'].max().to_dict())
+
+        self.agregados.agregar(valido)
+        if self.lineas_base is not None:
+            puntuados = anomalias.puntuar(valido, self.lineas_base)
+            marcadas = puntuados['Anomalia'] != ""
+            if marcadas.any():
+                columnas = ['Cod_bano', 'Fecha', 'Proceso', 'Tipo_bano', 'Operario_1', 'T_Real_min', 'TT']
+                detalle = valido.loc[marcadas, columnas].join(puntuados.loc[marcadas, ['Puntaje', 'Anomalia']])
+                self.anomalias.extend(api.registros(detalle))
+        return True
+
+    def estado(self):
+        latencias = np.array(self.latencias) * 1000
+        return {
+            'recibidos': self.recibidos,
+            'pendientes': self.pendientes,
+            'escritos': self.escritos,
+            'cuarentena': self.cuarentena,
+            'fallidos': self.fallidos,
+            'reintentos': self.reintentos,
+            'descartados': self.descartados,
+            'lotes': self.lotes,
+            'motivos_cuarentena': dict(self.motivos),
+            'latencia_visibilidad_ms': {
+                'p50': float(np.percentile(latencias, 50)) if len(latencias) else None,
+                'p99': float(np.percentile(latencias, 99)) if len(latencias) else None,
+                'max': float(latencias.max()) if len(latencias) else None,
+            },
+            'ultimo_error': self.ultimo_error,
+        }
+#------------------------
+# Fin de Escritura por Micro-lotes
+#------------------------
+
+
+#------------------------
+# Aplicación ASGI
+#------------------------
+class AppIngesta:
+    """Aplicación ASGI del endpoint de ingesta sobre una IngestaEjecuciones."""
+
+    def __init__(self, ingesta):
+        self.ingesta = ingesta
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                mensaje = await receive()
+                if mensaje['type'] == 'lifespan.startup':
+                    self.ingesta.iniciar()
+                    await send({'type': 'lifespan.startup.complete'})
+                elif mensaje['type'] == 'lifespan.shutdown':
+                    await asyncio.get_running_loop().run_in_executor(None, self.ingesta.detener)
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        elif scope['type'] == 'http':
+            await self._atender(scope, receive, send)
+
+    async def _atender(self, scope, receive, send):
+        ruta = scope['path'].rstrip('/')
+        if ruta == "/ingesta/eventos":
+            if scope['method'] != 'POST':
+                await api.responder_json(send, 405, {'error': "Use POST."}, extra=[(b"allow", b"POST")])
+                return
+            cuerpo = b""
+            while True:
+                mensaje = await receive()
+                cuerpo += mensaje.get('body', b"")
+                if not mensaje.get('more_body'):
+                    break
+            try:
+                aceptados = self.ingesta.agregar(json.loads(cuerpo))
+            except json.JSONDecodeError:
+                await api.responder_json(send, 400, {'error': "El cuerpo no es JSON válido."})
+                return
+            except ErrorEvento as error:
+                await api.responder_json(send, error.estado, {'error': str(error)})
+                return
+            await api.responder_json(send, 202, {'aceptados': aceptados, 'pendientes': self.ingesta.pendientes})
+            return
+
+        recursos = {
+            "/ingesta/estado": lambda: self.ingesta.estado(),
+            "/ingesta/procesos": lambda: {'datos': api.registros(self.ingesta.agregados.cumplimiento_proceso().reset_index())},
+            "/ingesta/operarios": lambda: {'datos': api.registros(self.ingesta.agregados.metricas_operario())},
+            "/ingesta/anomalias": lambda: {'datos': list(self.ingesta.anomalias)},
+        }
+        if ruta not in recursos:
+            await api.responder_json(send, 404, {'error': f"Ruta desconocida: {scope['path']}"})
+        elif scope['method'] != 'GET':
+            await api.responder_json(send, 405, {'error': "Use GET."}, extra=[(b"allow", b"GET")])
+        else:
+            await api.responder_json(send, 200, recursos[ruta]())
+#------------------------
+# Fin de Aplicación ASGI
+#------------------------
+
+
+def datos_base(ruta_excel, ruta_variantes="variantes_correctas.csv"):
+    """Líneas base (desde la caché compartida, como el dashboard) y agregados de partida del Excel."""
+    fuente = fuente_datos.FuenteExcel(ruta_excel, ruta_variantes)
+    version = fuente.version()
+    df = fuente.cargar(version).valido
+    lineas_base = cache_compartido.memoizar("lineas_base", version, lambda: anomalias.calcular_lineas_base(df))
+    return lineas_base, AgregadosIncrementales.desde(df)
+
+
+def completar_procesos(conectar, ruta_excel, ruta_variantes="variantes_correctas.csv"):
+    """Agrega al catálogo proceso de la base los (Proceso, TT) del Excel validado que falten."""
+    fuente = fuente_datos.FuenteExcel(ruta_excel, ruta_variantes)
+    df = fuente.cargar(fuente.version()).valido
+    with closing(conectar()) as con:
+        _ejecutar(con, "BEGIN")
+        carga_bd.completar_procesos(con, df)
+        _ejecutar(con, "COMMIT")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Endpoint de ingesta de ejecuciones con escritura por lotes.")
+    parser.add_argument("--sqlite", help="Base SQLite local en vez de MySQL (axis_flow_tables_sqlite.sql).")
+    parser.add_argument("--excel", help="Datos_Banos.xlsx para las líneas base de anomalías y los agregados de partida.")
+    parser.add_argument("--completar-procesos", action="store_true",
+                        help="Agrega al catálogo proceso los (Proceso, TT) del --excel que falten antes de empezar.")
+    parser.add_argument("--esquema", choices=sorted(carga_bd.SCRIPTS_ESQUEMA), default="generadas")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE_INGESTA)
+    parser.add_argument("--intervalo-ms", type=float, default=INTERVALO_INGESTA_MS)
+    parser.add_argument("--escuchar", default="127.0.0.1", help="Dirección del endpoint HTTP.")
+    parser.add_argument("--puerto-http", type=int, default=8001)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=3306)
+    parser.add_argument("--usuario", default="root")
+    parser.add_argument("--clave", default=os.environ.get("AXIS_BD_CLAVE", ""))
+    parser.add_argument("--base", default="axis_bd")
+    args = parser.parse_args(argv)
+
+    if uvicorn is None:
+        print("uvicorn no está instalado: pip install uvicorn", file=sys.stderr)
+        return 1
+
+    if args.sqlite:
+        conectar = lambda: carga_bd.conectar_sqlite(args.sqlite)
+    else:
+        conectar = lambda: carga_bd.conectar(args, args.base)
+    lineas_base, agregados = datos_base(args.excel) if args.excel else (None, None)
+    if args.completar_procesos:
+        if not args.excel:
+            print("--completar-procesos necesita --excel", file=sys.stderr)
+            return 1
+        completar_procesos(conectar, args.excel)
+
+    ingesta = IngestaEjecuciones(
+        conectar, "generadas" if args.sqlite else args.esquema, lineas_base, agregados,
+        tamano_lote=args.lote, intervalo_ms=args.intervalo_ms
+    )
+    uvicorn.run(AppIngesta(ingesta), host=args.escuchar, port=args.puerto_http, log_level="warning", access_log=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#------------------------
+# Instrumentación de Tiempos del Dashboard
+#------------------------
+# Mide la duración de cada sección nombrada de una ejecución (rerun) del
+# script, registra los tramos en un log rotativo local y conserva un historial
+# acotado por sección para calcular promedios y p95 en el panel de
+# administración. La medición de memoria con tracemalloc se activa con la
+# variable de entorno AXIS_TRACEMALLOC=1.
+#------------------------
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+
+import numpy as np
+import pandas as pd
+
+
+#------------------------
+# Configuración
+#------------------------
+RUTA_LOG = os.environ.get("AXIS_LOG_TIEMPOS", os.path.join("logs", "tiempos_dashboard.log"))
+MAX_BYTES_LOG = 2 * 1024 * 1024
+RESPALDOS_LOG = 5
+MAX_MUESTRAS_SECCION = 1000
+MEDIR_MEMORIA = os.environ.get("AXIS_TRACEMALLOC") == "1"
+
+if MEDIR_MEMORIA and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+_estado = threading.local()              # Ejecución en curso de cada hilo de sesión
+_historial = defaultdict(lambda: deque(maxlen=MAX_MUESTRAS_SECCION))
+_bloqueo = threading.Lock()
+#------------------------
+# Fin de Configuración
+#------------------------
+
+
+#------------------------
+# Log Rotativo
+#------------------------
+def _obtener_logger():
+    """Logger de tiempos con archivo rotativo; se configura una sola vez por proceso."""
+    logger = logging.getLogger("axis.tiempos")
+    if not logger.handlers:
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        try:
+            os.makedirs(os.path.dirname(RUTA_LOG) or ".", exist_ok=True)
+            handler = RotatingFileHandler(RUTA_LOG, maxBytes=MAX_BYTES_LOG, backupCount=RESPALDOS_LOG, encoding="utf-8")
+        except OSError:
+            # Sin permisos de escritura (p. ej. ejecutable en carpeta protegida): solo historial en memoria
+            handler = logging.NullHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+    return logger
+#------------------------
+# Fin de Log Rotativo
+#------------------------
+
+
+#------------------------
+# Medición de Secciones
+#------------------------
+def iniciar_ejecucion():
+    """Comienza el registro de tramos de una nueva ejecución del script."""
+    _estado.tramos = []
+    _estado.pila = []
+    _estado.inicio = time.perf_counter()
+
+
+@contextmanager
+def medir(seccion):
+    """Mide la duración (y memoria, si está activa) de un bloque; los tramos anidados usan 'padre / hijo'."""
+    pila = getattr(_estado, "pila", None)
+    if pila is None:
+        iniciar_ejecucion()
+        pila = _estado.pila
+
+    pila.append(seccion)
+    nombre = " / ".join(pila)
+    memoria_inicio = tracemalloc.get_traced_memory()[0] if MEDIR_MEMORIA else 0
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        memoria_kb = (tracemalloc.get_traced_memory()[0] - memoria_inicio) / 1024 if MEDIR_MEMORIA else None
+        pila.pop()
+        _estado.tramos.append((nombre, duracion_ms, memoria_kb))
+        with _bloqueo:
+            _historial[nombre].append(duracion_ms)
+
+
+def medido(seccion=None):
+    """Decorador que mide cada llamada a la función bajo el nombre de sección indicado."""
+    def decorador(funcion):
+        nombre = seccion or funcion.__name__
+
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with medir(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def finalizar_ejecucion():
+    """Cierra la ejecución en curso, escribe sus tramos en el log y los devuelve como DataFrame."""
+    tramos = getattr(_estado, "tramos", [])
+    total_ms = (time.perf_counter() - getattr(_estado, "inicio", time.perf_counter())) * 1000
+    with _bloqueo:
+        _historial["Ejecución completa"].append(total_ms)
+
+    registro = {"total_ms": round(total_ms, 1), "tramos": [[n, round(d, 1)] for n, d, _ in tramos]}
+    if MEDIR_MEMORIA:
+        registro["memoria_kb"] = [[n, round(m, 1)] for n, _, m in tramos]
+        registro["pico_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    _obtener_logger().info(json.dumps(registro, ensure_ascii=False))
+
+    iniciar_ejecucion()
+    return pd.DataFrame(tramos, columns=["Sección", "Duración_ms", "Memoria_kb"])
+#------------------------
+# Fin de Medición de Secciones
+#------------------------
+
+
+#------------------------
+# Resumen para el Panel de Administración
+#------------------------
+def resumen_secciones():
+    """Estadísticas por sección sobre el historial del proceso, ordenadas por p95 descendente."""
+    with _bloqueo:
+        historial = {nombre: np.array(muestras) for nombre, muestras in _historial.items() if muestras}
+
+    filas = [{
+        "Sección": nombre,
+        "Ejecuciones": len(muestras),
+        "Promedio_ms": muestras.mean(),
+        "P95_ms": np.percentile(muestras, 95),
+        "Máximo_ms": muestras.max(),
+    } for nombre, muestras in historial.items()]
+
+    if not filas:
+        return pd.DataFrame(columns=["Sección", "Ejecuciones", "Promedio_ms", "P95_ms", "Máximo_ms"])
+    return pd.DataFrame(filas).sort_values("P95_ms", ascending=False).reset_index(drop=True)
+#------------------------
+# Fin de Resumen para el Panel de Administración
+#------------------------
@@ -0,0 +1,243 @@
+#------------------------
+# Índice de Intervalos (Inicio, Fin) de las Ejecuciones
+#------------------------
+# Responde consultas de línea de tiempo sobre los Inicio/Fin reales de cada
+# ejecución: qué estaba en curso en un instante ("qué corría a las 10:30 en
+# Pintura") o qué se cruza con un rango, en total, por proceso o por operario.
+#
+# Por cada clave (proceso, operario...) se guardan los intervalos ordenados
+# por Inicio junto con el máximo acumulado de Fin. Con dos búsquedas binarias
+# se acota el tramo de candidatos: los que empiezan antes del fin del rango y
+# están después del último punto donde todo lo anterior ya había terminado.
+# Solo ese tramo se revisa, en vez de recorrer el dataset ni reconstruir la
+# línea de tiempo con sumas acumuladas de T_Real_min y T_Espera_min.
+#
+# Solo entran las filas con Inicio y Fin (el Excel de AppSheet no los trae;
+# la ingesta en vivo y las tablas con las columnas inicio/fin sí).
+#
+# La segunda parte es el barrido por operario: con las ejecuciones de cada
+# operario ordenadas por Inicio, una ejecución se cruza con otra anterior si
+# empieza antes del máximo Fin acumulado. De ahí salen los conflictos (un
+# operario en dos ejecuciones a la vez) y el tiempo realmente ocupado por
+# operario y día (la unión de sus intervalos, no la suma), todo con
+# operaciones por grupo sobre la historia completa, una vez por versión.
+#------------------------
+import os
+
+import numpy as np
+import pandas as pd
+
+
+TODAS = None  # Clave de las consultas sin restringir por proceso u operario
+JORNADA_MIN = float(os.environ.get("AXIS_JORNADA_HORAS", "10")) * 60  # Capacidad de un operario por día
+
+
+def _nanosegundos(serie):
+    return serie.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+
+def _instante(valor):
+    return pd.Timestamp(valor).as_unit('ns').value
+
+
+class IndiceIntervalos:
+    """
+    Intervalos [Inicio, Fin) de las filas de df, agrupados por clave. claves y
+    filas van alineados: la clave de cada intervalo y su posición en df (una
+    fila puede aparecer con varias claves, como con varios operarios).
+    """
+
+    def __init__(self, df, claves=None, filas=None):
+        self.df = df
+        if filas is None:
+            filas = np.arange(len(df))
+        inicio = _nanosegundos(df['Inicio'])[filas]
+        fin = _nanosegundos(df['Fin'])[filas]
+        nat = np.iinfo(np.int64).min
+        validos = (inicio != nat) & (fin != nat) & (fin >= inicio)
+        filas, inicio, fin = filas[validos], inicio[validos], fin[validos]
+
+        self._grupos = {TODAS: self._grupo(filas, inicio, fin)}
+        if claves is not None:
+            claves = np.asarray(claves, dtype=object)[validos]
+            for clave, posiciones in pd.Series(np.arange(len(claves))).groupby(claves).indices.items():
+                self._grupos[clave] = self._grupo(filas[posiciones], inicio[posiciones], fin[posiciones])
+
+    @staticmethod
+    def _grupo(filas, inicio, fin):
+        orden = np.argsort(inicio, kind='stable')
+        fin = fin[orden]
+        return filas[orden], inicio[orden], fin, np.maximum.accumulate(fin) if len(fin) else fin
+
+    @classmethod
+    def por_columna(cls, df, columna):
+        """Índice por los valores de una columna (Proceso, Cod_bano...)."""
+        return cls(df, df[columna].to_numpy())
+
+    @classmethod
+    def por_operario(cls, df):
+        """Índice por operario: cada ejecución aparece una vez por cada operario que la hizo."""
+        cantidades = df['Operarios_list'].str.len().to_numpy()
+        filas = np.repeat(np.arange(len(df)), cantidades)
+        claves = [op for ops in df['Operarios_list'] for op in ops]
+        return cls(df, claves, filas)
+
+    def claves(self):
+        return [clave for clave in self._grupos if clave is not TODAS]
+
+    def __len__(self):
+        return len(self._grupos[TODAS][0])
+
+    def _posiciones(self, desde, hasta, clave):
+        grupo = self._grupos.get(clave)
+        if grupo is None:
+            return np.empty(0, dtype=np.intp)
+        filas, inicio, fin, max_fin = grupo
+        # Candidatos: empiezan antes de hasta y no todo lo anterior terminó antes de desde
+        primero = np.searchsorted(max_fin, desde, side='right')
+        ultimo = np.searchsorted(inicio, hasta, side='left')
+        tramo = slice(primero, max(primero, ultimo))
+        return filas[tramo][fin[tramo] > desde]
+
+    def en_rango(self, desde, hasta, clave=TODAS):
+        """Ejecuciones que se cruzan con [desde, hasta), ordenadas por Inicio."""
+        return self.df.iloc[self._posiciones(_instante(desde), _instante(hasta), clave)]
+
+    def en_instante(self, instante, clave=TODAS):
+        """Ejecuciones en curso en el instante (Inicio <= instante < Fin)."""
+        t = _instante(instante)
+        return self.df.iloc[self._posiciones(t, t + 1, clave)]
+#------------------------
+# Fin de Índice de Intervalos
+#------------------------
+
+
+#------------------------
+# Solapes y Ocupación por Operario
+#------------------------
+def _tramos_operario(df):
+    """
+    Una fila por (ejecución, operario) con su día y duración, ordenada por
+    (Operario, Inicio). Fila es la posición de la ejecución en df. Sin Inicio/Fin,
+    el día es Fecha y la duración T_Real_min.
+    """
+    cantidades = df['Operarios_list'].str.len().to_numpy()
+    filas = np.repeat(np.arange(len(df)), cantidades)
+    inicio = df['Inicio'].to_numpy(dtype='datetime64[ns]')[filas]
+    fin = df['Fin'].to_numpy(dtype='datetime64[ns]')[filas]
+    con_intervalo = ~np.isnat(inicio) & ~np.isnat(fin) & (fin >= inicio)
+    duracion = np.where(
+        con_intervalo,
+        (fin - inicio) / np.timedelta64(1, 'm'),
+        df['T_Real_min'].to_numpy(dtype=float)[filas]
+    )
+    dia = np.where(con_intervalo, inicio, df['Fecha'].to_numpy(dtype='datetime64[ns]')[filas]).astype('datetime64[D]')
+
+    tramos = pd.DataFrame({
+        'Operario': [op for ops in df['Operarios_list'] for op in ops],
+        'Fila': filas,
+        'Dia': dia,
+        'Inicio': np.where(con_intervalo, inicio, np.datetime64('NaT')),
+        'Fin': np.where(con_intervalo, fin, np.datetime64('NaT')),
+        'Con_Intervalo': con_intervalo,
+        'Duracion_min': duracion,
+    })
+    return tramos.sort_values(['Operario', 'Inicio'], kind='mergesort', na_position='last').reset_index(drop=True)
+
+
+def _fin_previo(tramos, claves):
+    """Máximo Fin de las ejecuciones anteriores del mismo grupo (NaT en la primera) y la fila que lo tiene."""
+    grupos = tramos.groupby(claves, sort=False)
+    maximo = grupos['Fin'].cummax()
+    duena = tramos['Fila'].where(tramos['Fin'] == maximo)
+    duena = duena.groupby([tramos[c] for c in claves], sort=False).ffill()
+    desplazar = lambda serie: serie.groupby([tramos[c] for c in claves], sort=False).shift(1)
+    return desplazar(maximo), desplazar(duena)
+
+
+def conflictos_operario(df, tramos=None):
+    """
+    Ejecuciones que un operario empezó mientras seguía en otra, con la
+    ejecución anterior en curso de término más tardío y los minutos de cruce.
+    """
+    if tramos is None:
+        tramos = _tramos_operario(df)
+    reales = tramos[tramos['Con_Intervalo']].reset_index(drop=True)
+    fin_previo, fila_previa = _fin_previo(reales, ['Operario'])
+    cruza = (reales['Inicio'] < fin_previo).to_numpy()
+
+    conflictos = reales.loc[cruza, ['Operario', 'Fila', 'Inicio', 'Fin']].reset_index(drop=True)
+    conflictos['Fila_Previa'] = fila_previa[cruza].astype(int).to_numpy()
+    conflictos['Solape_min'] = (
+        (np.minimum(reales['Fin'][cruza], fin_previo[cruza]) - reales['Inicio'][cruza]).dt.total_seconds() / 60
+    ).to_numpy()
+    for sufijo, posiciones in (('', conflictos['Fila']), ('_Previo', conflictos['Fila_Previa'])):
+        for col in ('Cod_bano', 'Proceso'):
+            conflictos[col + sufijo] = df[col].to_numpy()[posiciones.to_numpy()]
+    return conflictos
+
+
+def ocupacion_operario_dia(df, tramos=None):
+    """
+    Por operario y día: minutos asignados (suma de duraciones, lo que cuentan
+    las métricas por tarea), ocupados (unión de intervalos; las ejecuciones sin
+    Inicio/Fin suman su T_Real_min), doble asignación, utilización y ocio
+    contra la jornada, y ocio entre la primera y la última ejecución.
+    """
+    if tramos is None:
+        tramos = _tramos_operario(df)
+    claves = ['Operario', 'Dia']
+    fin_previo, _ = _fin_previo(tramos, claves)
+    # Lo que cada intervalo agrega a la unión: desde donde termina lo ya cubierto hasta su Fin
+    desde = tramos['Inicio'].where(fin_previo.isna() | (tramos['Inicio'] > fin_previo), fin_previo)
+    aporte = ((tramos['Fin'] - desde).dt.total_seconds() / 60).clip(lower=0)
+    tramos = tramos.assign(Ocupado_min=aporte.where(tramos['Con_Intervalo'], tramos['Duracion_min']))
+
+    dias = tramos.groupby(claves).agg(
+        Ejecuciones=('Fila', 'size'),
+        Con_Intervalo=('Con_Intervalo', 'sum'),
+        Asignado_min=('Duracion_min', 'sum'),
+        Ocupado_min=('Ocupado_min', 'sum'),
+        Primer_Inicio=('Inicio', 'min'),
+        Ultimo_Fin=('Fin', 'max'),
+    )
+    ocupado_intervalos = tramos['Ocupado_min'].where(tramos['Con_Intervalo'], 0).groupby(
+        [tramos[c] for c in claves]).sum()
+    dias['Doble_min'] = (dias['Asignado_min'] - dias['Ocupado_min']).clip(lower=0)
+    dias['Utilizacion_pct'] = dias['Ocupado_min'] / JORNADA_MIN * 100
+    dias['Ocioso_min'] = (JORNADA_MIN - dias['Ocupado_min']).clip(lower=0)
+    dias['Ocioso_Entre_min'] = (
+        (dias['Ultimo_Fin'] - dias['Primer_Inicio']).dt.total_seconds() / 60 - ocupado_intervalos
+    ).clip(lower=0)
+    dias['Sobre_Jornada'] = dias['Ocupado_min'] > JORNADA_MIN
+    return dias.reset_index()
+
+
+def resumen_ocupacion(dias, conflictos):
+    """Promedios por operario de la ocupación diaria, con sus conflictos y días sobre la jornada."""
+    resumen = dias.groupby('Operario').agg(
+        Dias=('Dia', 'size'),
+        Ocupado_hr_Dia=('Ocupado_min', 'mean'),
+        Utilizacion_pct=('Utilizacion_pct', 'mean'),
+        Doble_hr=('Doble_min', 'sum'),
+        Dias_Sobre_Jornada=('Sobre_Jornada', 'sum'),
+    )
+    resumen['Ocupado_hr_Dia'] /= 60
+    resumen['Doble_hr'] /= 60
+    resumen['Conflictos'] = conflictos.groupby('Operario').size().reindex(resumen.index, fill_value=0)
+    return resumen.reset_index().sort_values('Utilizacion_pct', ascending=False)
+
+
+def analizar_operarios(df):
+    """Conflictos, ocupación por día y resumen por operario, desde un solo barrido."""
+    tramos = _tramos_operario(df)
+    conflictos = conflictos_operario(df, tramos)
+    dias = ocupacion_operario_dia(df, tramos)
+    return {
+        'conflictos': conflictos,
+        'dias': dias,
+        'resumen': resumen_ocupacion(dias, conflictos),
+    }
+#------------------------
+# Fin de Solapes y Ocupación por Operario
+#------------------------
@@ -0,0 +1,77 @@
+-- ============================================================
+-- MIGRACIÓN: INICIO Y FIN REALES DE CADA EJECUCIÓN - axis_bd
+-- ============================================================
+-- Se ejecuta una vez sobre una base creada antes de que axis_flow_tables.sql
+-- (o axis_flow_tables_lote.sql) trajera las columnas inicio y fin:
+--
+--   mysql -u root -p axis_bd < migracion_inicio_fin.sql
+--
+-- Contenido:
+--   1. Columnas inicio y fin (DATETIME) en ejecucion_proceso, con sus índices.
+--   2. Procedimientos de línea de tiempo: ejecuciones en curso en un instante,
+--      por proceso o por operario.
+--
+-- Las filas existentes quedan con inicio y fin en NULL: el Excel solo trae la
+-- fecha, y reconstruir la hora encadenando t_espera_min y t_real_min daría
+-- una línea de tiempo inventada. Las cargas nuevas con Inicio/Fin (ingesta.py)
+-- las llenan.
+-- ============================================================
+
+USE axis_bd;
+
+
+-- ============================================================
+-- 1. COLUMNAS E ÍNDICES
+-- ============================================================
+
+-- idx_ejec_inicio:       qué estaba en curso en un instante o rango, en total.
+-- idx_ejec_proc_inicio:  lo mismo para un proceso (estación).
+-- fin va en el índice para descartar las ejecuciones ya terminadas sin leer la fila.
+ALTER TABLE ejecucion_proceso
+    ADD COLUMN inicio DATETIME DEFAULT NULL AFTER fecha,
+    ADD COLUMN fin DATETIME DEFAULT NULL AFTER inicio,
+    ADD CONSTRAINT ck_ejec_intervalo CHECK (fin >= inicio),
+    ADD INDEX idx_ejec_inicio (inicio, fin),
+    ADD INDEX idx_ejec_proc_inicio (id_proc, inicio, fin);
+
+
+-- ============================================================
+-- 2. CONSULTAS DE LÍNEA DE TIEMPO
+-- ============================================================
+-- Un índice B-tree sobre inicio solo acota un lado del intervalo. Como una
+-- ejecución de más de un día es un error de registro (T_REAL_MAXIMO_MIN en
+-- anomalias.py), basta con leer las que empezaron el día anterior al
+-- instante: un rango acotado de idx_ejec_proc_inicio / idx_ejec_inicio.
+-- p_id_proc NULL consulta todos los procesos.
+
+DROP PROCEDURE IF EXISTS ejecuciones_en_curso;
+DROP PROCEDURE IF EXISTS ejecuciones_en_curso_operario;
+
+DELIMITER $$
+
+CREATE PROCEDURE ejecuciones_en_curso(IN p_instante DATETIME, IN p_id_proc INT)
+BEGIN
+    SELECT e.*
+    FROM ejecucion_proceso e
+    WHERE (p_id_proc IS NULL OR e.id_proc = p_id_proc)
+      AND e.inicio > p_instante - INTERVAL 1 DAY
+      AND e.inicio <= p_instante
+      AND e.fin > p_instante
+    ORDER BY e.inicio;
+END$$
+
+-- Del operario a sus ejecuciones por la tabla puente (idx_ejec_op_operario
+-- de migracion_rendimiento.sql o el índice de fk_ejec_op_op).
+CREATE PROCEDURE ejecuciones_en_curso_operario(IN p_instante DATETIME, IN p_id_op INT)
+BEGIN
+    SELECT e.*, eo.rol
+    FROM ejecucion_operario eo
+    JOIN ejecucion_proceso e ON e.id_ejec = eo.id_ejec
+    WHERE eo.id_op = p_id_op
+      AND e.inicio > p_instante - INTERVAL 1 DAY
+      AND e.inicio <= p_instante
+      AND e.fin > p_instante
+    ORDER BY e.inicio;
+END$$
+
+DELIMITER ;
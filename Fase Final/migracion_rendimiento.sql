@@ -0,0 +1,324 @@
+-- ============================================================
+-- MIGRACIÓN DE RENDIMIENTO - axis_bd
+-- ============================================================
+-- Se ejecuta una vez sobre una base creada con axis_flow_tables.sql
+-- (MySQL 8.0.19+, por el alias de fila de los INSERT ... ON DUPLICATE KEY
+-- UPDATE; cliente `mysql`, por el uso de DELIMITER):
+--
+--   mysql -u root -p axis_bd < migracion_rendimiento.sql
+--
+-- Se revierte con migracion_rendimiento_rollback.sql (mismos datos, esquema
+-- de axis_flow_tables.sql).
+--
+-- Contenido:
+--   1. Quita las claves foráneas hacia/desde ejecucion_proceso.
+--   2. Cambia la clave primaria a (id_ejec, fecha) y agrega índices de cobertura.
+--   3. Particiona ejecucion_proceso por mes (RANGE COLUMNS sobre fecha).
+--   4. Reemplaza las claves foráneas quitadas por triggers de integridad.
+--   5. Tablas resumen por baño y por mes, mantenidas por triggers.
+--   6. Procedimiento y evento que crean las particiones de los meses siguientes.
+--
+-- Restricciones de InnoDB que explican los pasos 1, 2 y 4:
+--   - Una tabla particionada no puede tener claves foráneas ni ser
+--     referenciada por ellas.
+--   - Toda clave única (incluida la primaria) debe contener la columna de
+--     particionamiento.
+-- ============================================================
+
+USE axis_bd;
+
+
+-- ============================================================
+-- 1. CLAVES FORÁNEAS
+-- ============================================================
+
+ALTER TABLE ejecucion_operario DROP FOREIGN KEY fk_ejec_op_ejec;
+
+ALTER TABLE ejecucion_proceso
+    DROP FOREIGN KEY fk_ejec_bano,
+    DROP FOREIGN KEY fk_ejec_proc;
+
+
+-- ============================================================
+-- 2. CLAVE PRIMARIA E ÍNDICES DE COBERTURA
+-- ============================================================
+
+-- idx_ejec_mes_cubre:    filtros por rango de fechas (meses de la barra lateral,
+--                        baños y cumplimiento por mes) sin leer la fila completa.
+-- idx_ejec_var_proc:     cumplimiento y tiempos por (variante, proceso), Pestaña 3.
+-- idx_ejec_fecha queda cubierto por el prefijo de idx_ejec_mes_cubre.
+ALTER TABLE ejecucion_proceso
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (id_ejec, fecha),
+    DROP INDEX idx_ejec_fecha,
+    ADD INDEX idx_ejec_mes_cubre (fecha, id_b, cumple_tt, t_real_min),
+    ADD INDEX idx_ejec_var_proc (variante, id_proc, fecha, cumple_tt, t_real_min, tt_proc);
+
+-- Métricas por operario (Pestaña 6): del operario a sus ejecuciones sin leer la tabla puente.
+-- Reemplaza al índice que MySQL creó automáticamente para fk_ejec_op_op.
+ALTER TABLE ejecucion_operario ADD INDEX idx_ejec_op_operario (id_op, id_ejec, rol);
+ALTER TABLE ejecucion_operario DROP INDEX fk_ejec_op_op;
+
+
+-- ============================================================
+-- 3. PARTICIONAMIENTO MENSUAL
+-- ============================================================
+-- Las consultas con filtro por rango de fecha leen solo las particiones de
+-- los meses pedidos (ver EXPLAIN, columna partitions). Los meses siguientes
+-- se agregan con asegurar_particiones_mes (sección 6). p_antiguo y p_futuro
+-- (MAXVALUE) reciben cualquier fecha fuera del rango: una inserción nunca
+-- falla por falta de partición, aunque el evento mensual no haya corrido.
+
+ALTER TABLE ejecucion_proceso
+PARTITION BY RANGE COLUMNS (fecha) (
+    PARTITION p_antiguo VALUES LESS THAN ('2025-01-01'),
+    PARTITION p2025_01 VALUES LESS THAN ('2025-02-01'),
+    PARTITION p2025_02 VALUES LESS THAN ('2025-03-01'),
+    PARTITION p2025_03 VALUES LESS THAN ('2025-04-01'),
+    PARTITION p2025_04 VALUES LESS THAN ('2025-05-01'),
+    PARTITION p2025_05 VALUES LESS THAN ('2025-06-01'),
+    PARTITION p2025_06 VALUES LESS THAN ('2025-07-01'),
+    PARTITION p2025_07 VALUES LESS THAN ('2025-08-01'),
+    PARTITION p2025_08 VALUES LESS THAN ('2025-09-01'),
+    PARTITION p2025_09 VALUES LESS THAN ('2025-10-01'),
+    PARTITION p2025_10 VALUES LESS THAN ('2025-11-01'),
+    PARTITION p2025_11 VALUES LESS THAN ('2025-12-01'),
+    PARTITION p2025_12 VALUES LESS THAN ('2026-01-01'),
+    PARTITION p2026_01 VALUES LESS THAN ('2026-02-01'),
+    PARTITION p2026_02 VALUES LESS THAN ('2026-03-01'),
+    PARTITION p2026_03 VALUES LESS THAN ('2026-04-01'),
+    PARTITION p2026_04 VALUES LESS THAN ('2026-05-01'),
+    PARTITION p2026_05 VALUES LESS THAN ('2026-06-01'),
+    PARTITION p2026_06 VALUES LESS THAN ('2026-07-01'),
+    PARTITION p2026_07 VALUES LESS THAN ('2026-08-01'),
+    PARTITION p2026_08 VALUES LESS THAN ('2026-09-01'),
+    PARTITION p2026_09 VALUES LESS THAN ('2026-10-01'),
+    PARTITION p2026_10 VALUES LESS THAN ('2026-11-01'),
+    PARTITION p2026_11 VALUES LESS THAN ('2026-12-01'),
+    PARTITION p2026_12 VALUES LESS THAN ('2027-01-01'),
+    PARTITION p_futuro VALUES LESS THAN (MAXVALUE)
+);
+
+
+-- ============================================================
+-- 4. INTEGRIDAD REFERENCIAL POR TRIGGERS
+-- ============================================================
+-- Cumplen el rol de las claves foráneas quitadas en la sección 1
+-- (incluido el ON DELETE CASCADE de ejecucion_operario).
+
+DROP TRIGGER IF EXISTS trg_ejec_proceso_bi;
+DROP TRIGGER IF EXISTS trg_ejec_operario_bi;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_ejec_proceso_bi BEFORE INSERT ON ejecucion_proceso
+FOR EACH ROW
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM bano WHERE id_b = NEW.id_b) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ejecucion_proceso: id_b no existe en bano';
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM proceso WHERE id_proc = NEW.id_proc) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ejecucion_proceso: id_proc no existe en proceso';
+    END IF;
+END$$
+
+CREATE TRIGGER trg_ejec_operario_bi BEFORE INSERT ON ejecucion_operario
+FOR EACH ROW
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM ejecucion_proceso WHERE id_ejec = NEW.id_ejec) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ejecucion_operario: id_ejec no existe en ejecucion_proceso';
+    END IF;
+END$$
+
+DELIMITER ;
+
+
+-- ============================================================
+-- 5. TABLAS RESUMEN
+-- ============================================================
+-- resumen_bano: una fila por baño con su lead time (máximo tiempo real
+--               acumulado), fechas de inicio y fin y totales de tiempos.
+-- resumen_mes:  una fila por mes con conteos de ejecuciones y cumplimiento.
+-- Las inserciones actualizan ambas tablas de forma incremental; las
+-- modificaciones y eliminaciones recalculan solo el baño y el mes afectados.
+
+DROP TABLE IF EXISTS resumen_bano;
+DROP TABLE IF EXISTS resumen_mes;
+
+CREATE TABLE resumen_bano (
+    id_b INT PRIMARY KEY,
+    num_procesos INT NOT NULL,
+    num_cumple INT NOT NULL,
+    t_real_total_min DECIMAL(14,2) NOT NULL,
+    t_espera_total_min DECIMAL(14,2) NOT NULL,
+    lead_time_min DECIMAL(12,2) DEFAULT NULL,
+    fecha_inicio DATE NOT NULL,
+    fecha_fin DATE NOT NULL,
+
+    INDEX idx_resumen_bano_inicio (fecha_inicio)
+);
+
+CREATE TABLE resumen_mes (
+    mes DATE PRIMARY KEY,
+    num_ejecuciones INT NOT NULL,
+    num_cumple INT NOT NULL,
+    t_real_total_min DECIMAL(16,2) NOT NULL,
+    t_espera_total_min DECIMAL(16,2) NOT NULL
+);
+
+-- Carga inicial desde los datos existentes
+INSERT INTO resumen_bano
+    (id_b, num_procesos, num_cumple, t_real_total_min, t_espera_total_min, lead_time_min, fecha_inicio, fecha_fin)
+SELECT id_b, COUNT(*), SUM(t_real_min <= tt_proc), SUM(t_real_min), SUM(COALESCE(t_espera_min, 0)),
+       MAX(t_real_acum_min), MIN(fecha), MAX(fecha)
+FROM ejecucion_proceso
+GROUP BY id_b;
+
+INSERT INTO resumen_mes (mes, num_ejecuciones, num_cumple, t_real_total_min, t_espera_total_min)
+SELECT DATE_FORMAT(fecha, '%Y-%m-01'), COUNT(*), SUM(t_real_min <= tt_proc), SUM(t_real_min),
+       SUM(COALESCE(t_espera_min, 0))
+FROM ejecucion_proceso
+GROUP BY DATE_FORMAT(fecha, '%Y-%m-01');
+
+-- Baños iniciados por mes (Pestaña 5) sobre la tabla resumen, sin recorrer la tabla de hechos
+CREATE OR REPLACE VIEW v_banos_por_mes AS
+SELECT DATE_FORMAT(fecha_inicio, '%Y-%m') AS mes, COUNT(*) AS banos
+FROM resumen_bano
+GROUP BY DATE_FORMAT(fecha_inicio, '%Y-%m');
+
+DROP TRIGGER IF EXISTS trg_ejec_resumen_ai;
+DROP TRIGGER IF EXISTS trg_ejec_resumen_au;
+DROP TRIGGER IF EXISTS trg_ejec_resumen_ad;
+DROP PROCEDURE IF EXISTS recalcular_resumen_bano;
+DROP PROCEDURE IF EXISTS recalcular_resumen_mes;
+
+DELIMITER $$
+
+CREATE PROCEDURE recalcular_resumen_bano(IN p_id_b INT)
+BEGIN
+    DELETE FROM resumen_bano WHERE id_b = p_id_b;
+    INSERT INTO resumen_bano
+        (id_b, num_procesos, num_cumple, t_real_total_min, t_espera_total_min, lead_time_min, fecha_inicio, fecha_fin)
+    SELECT id_b, COUNT(*), SUM(t_real_min <= tt_proc), SUM(t_real_min), SUM(COALESCE(t_espera_min, 0)),
+           MAX(t_real_acum_min), MIN(fecha), MAX(fecha)
+    FROM ejecucion_proceso
+    WHERE id_b = p_id_b
+    GROUP BY id_b;
+END$$
+
+CREATE PROCEDURE recalcular_resumen_mes(IN p_fecha DATE)
+BEGIN
+    DECLARE v_mes DATE DEFAULT DATE_FORMAT(p_fecha, '%Y-%m-01');
+
+    DELETE FROM resumen_mes WHERE mes = v_mes;
+    -- El rango de fechas limita la lectura a una sola partición
+    INSERT INTO resumen_mes (mes, num_ejecuciones, num_cumple, t_real_total_min, t_espera_total_min)
+    SELECT v_mes, COUNT(*), SUM(t_real_min <= tt_proc), SUM(t_real_min), SUM(COALESCE(t_espera_min, 0))
+    FROM ejecucion_proceso
+    WHERE fecha >= v_mes AND fecha < v_mes + INTERVAL 1 MONTH
+    HAVING COUNT(*) > 0;
+END$$
+
+CREATE TRIGGER trg_ejec_resumen_ai AFTER INSERT ON ejecucion_proceso
+FOR EACH ROW
+BEGIN
+    INSERT INTO resumen_bano
+        (id_b, num_procesos, num_cumple, t_real_total_min, t_espera_total_min, lead_time_min, fecha_inicio, fecha_fin)
+    VALUES
+        (NEW.id_b, 1, NEW.t_real_min <= NEW.tt_proc, NEW.t_real_min, COALESCE(NEW.t_espera_min, 0),
+         NEW.t_real_acum_min, NEW.fecha, NEW.fecha)
+    AS nuevo
+    ON DUPLICATE KEY UPDATE
+        num_procesos = num_procesos + 1,
+        num_cumple = num_cumple + nuevo.num_cumple,
+        t_real_total_min = t_real_total_min + nuevo.t_real_total_min,
+        t_espera_total_min = t_espera_total_min + nuevo.t_espera_total_min,
+        lead_time_min = GREATEST(COALESCE(lead_time_min, nuevo.lead_time_min),
+                                 COALESCE(nuevo.lead_time_min, lead_time_min)),
+        fecha_inicio = LEAST(fecha_inicio, nuevo.fecha_inicio),
+        fecha_fin = GREATEST(fecha_fin, nuevo.fecha_fin);
+
+    INSERT INTO resumen_mes (mes, num_ejecuciones, num_cumple, t_real_total_min, t_espera_total_min)
+    VALUES
+        (DATE_FORMAT(NEW.fecha, '%Y-%m-01'), 1, NEW.t_real_min <= NEW.tt_proc, NEW.t_real_min,
+         COALESCE(NEW.t_espera_min, 0))
+    AS nuevo
+    ON DUPLICATE KEY UPDATE
+        num_ejecuciones = num_ejecuciones + 1,
+        num_cumple = num_cumple + nuevo.num_cumple,
+        t_real_total_min = t_real_total_min + nuevo.t_real_total_min,
+        t_espera_total_min = t_espera_total_min + nuevo.t_espera_total_min;
+END$$
+
+CREATE TRIGGER trg_ejec_resumen_au AFTER UPDATE ON ejecucion_proceso
+FOR EACH ROW
+BEGIN
+    CALL recalcular_resumen_bano(OLD.id_b);
+    IF NEW.id_b <> OLD.id_b THEN
+        CALL recalcular_resumen_bano(NEW.id_b);
+    END IF;
+
+    CALL recalcular_resumen_mes(OLD.fecha);
+    IF DATE_FORMAT(NEW.fecha, '%Y-%m') <> DATE_FORMAT(OLD.fecha, '%Y-%m') THEN
+        CALL recalcular_resumen_mes(NEW.fecha);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_ejec_resumen_ad AFTER DELETE ON ejecucion_proceso
+FOR EACH ROW
+BEGIN
+    -- Equivalente al ON DELETE CASCADE de fk_ejec_op_ejec
+    DELETE FROM ejecucion_operario WHERE id_ejec = OLD.id_ejec;
+
+    CALL recalcular_resumen_bano(OLD.id_b);
+    CALL recalcular_resumen_mes(OLD.fecha);
+END$$
+
+DELIMITER ;
+
+
+-- ============================================================
+-- 6. MANTENCIÓN DE PARTICIONES
+-- ============================================================
+-- asegurar_particiones_mes(n) divide p_futuro hasta que existan particiones
+-- para el mes actual y los n meses siguientes. El evento la ejecuta cada mes
+-- (requiere event_scheduler=ON).
+
+DROP PROCEDURE IF EXISTS asegurar_particiones_mes;
+DROP EVENT IF EXISTS evt_particiones_mensuales;
+
+DELIMITER $$
+
+CREATE PROCEDURE asegurar_particiones_mes(IN meses_adelante INT)
+BEGIN
+    DECLARE v_limite DATE;
+    DECLARE v_objetivo DATE DEFAULT DATE_FORMAT(CURDATE(), '%Y-%m-01') + INTERVAL (meses_adelante + 1) MONTH;
+
+    SELECT MAX(CAST(TRIM(BOTH '''' FROM PARTITION_DESCRIPTION) AS DATE)) INTO v_limite
+    FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE()
+      AND TABLE_NAME = 'ejecucion_proceso'
+      AND PARTITION_DESCRIPTION <> 'MAXVALUE';
+
+    WHILE v_limite < v_objetivo DO
+        SET @sql_particion = CONCAT(
+            'ALTER TABLE ejecucion_proceso REORGANIZE PARTITION p_futuro INTO (',
+            'PARTITION p', DATE_FORMAT(v_limite, '%Y_%m'),
+            ' VALUES LESS THAN (''', v_limite + INTERVAL 1 MONTH, '''), ',
+            'PARTITION p_futuro VALUES LESS THAN (MAXVALUE))'
+        );
+        PREPARE stmt FROM @sql_particion;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+        SET v_limite = v_limite + INTERVAL 1 MONTH;
+    END WHILE;
+END$$
+
+DELIMITER ;
+
+CREATE EVENT evt_particiones_mensuales
+ON SCHEDULE EVERY 1 MONTH
+STARTS DATE_FORMAT(CURDATE(), '%Y-%m-01') + INTERVAL 1 MONTH
+DO CALL asegurar_particiones_mes(2);
+
+CALL asegurar_particiones_mes(2);
@@ -0,0 +1,93 @@
+-- ============================================================
+-- REVERSIÓN DE LA MIGRACIÓN DE RENDIMIENTO - axis_bd
+-- ============================================================
+-- Deshace migracion_rendimiento.sql y deja ejecucion_proceso y
+-- ejecucion_operario como las crea axis_flow_tables.sql, sin perder filas
+-- (MySQL 8.0.19+, cliente `mysql`):
+--
+--   mysql -u root -p axis_bd < migracion_rendimiento_rollback.sql
+--
+-- Los pasos van en el orden inverso de la migración:
+--   6. Quita el evento y el procedimiento de mantención de particiones.
+--   5. Quita las tablas resumen, su vista, sus triggers y procedimientos.
+--   4. Quita los triggers de integridad referencial.
+--   3. Quita el particionamiento mensual.
+--   2. Restaura la clave primaria (id_ejec) y los índices originales.
+--   1. Restaura las claves foráneas.
+--
+-- Las claves foráneas se vuelven a validar al crearlas: si mientras la base
+-- estuvo migrada quedaron filas huérfanas (por ejemplo, cargadas con
+-- triggers desactivados), el paso 1 falla e indica la restricción.
+-- ============================================================
+
+USE axis_bd;
+
+
+-- ============================================================
+-- 6. MANTENCIÓN DE PARTICIONES
+-- ============================================================
+
+DROP EVENT IF EXISTS evt_particiones_mensuales;
+DROP PROCEDURE IF EXISTS asegurar_particiones_mes;
+
+
+-- ============================================================
+-- 5. TABLAS RESUMEN
+-- ============================================================
+
+DROP TRIGGER IF EXISTS trg_ejec_resumen_ai;
+DROP TRIGGER IF EXISTS trg_ejec_resumen_au;
+DROP TRIGGER IF EXISTS trg_ejec_resumen_ad;
+DROP PROCEDURE IF EXISTS recalcular_resumen_bano;
+DROP PROCEDURE IF EXISTS recalcular_resumen_mes;
+DROP VIEW IF EXISTS v_banos_por_mes;
+DROP TABLE IF EXISTS resumen_bano;
+DROP TABLE IF EXISTS resumen_mes;
+
+
+-- ============================================================
+-- 4. INTEGRIDAD REFERENCIAL POR TRIGGERS
+-- ============================================================
+-- Los reemplazan otra vez las claves foráneas del paso 1.
+
+DROP TRIGGER IF EXISTS trg_ejec_proceso_bi;
+DROP TRIGGER IF EXISTS trg_ejec_operario_bi;
+
+
+-- ============================================================
+-- 3. PARTICIONAMIENTO MENSUAL
+-- ============================================================
+-- Las filas de todas las particiones vuelven a una sola tabla.
+
+ALTER TABLE ejecucion_proceso REMOVE PARTITIONING;
+
+
+-- ============================================================
+-- 2. CLAVE PRIMARIA E ÍNDICES
+-- ============================================================
+
+ALTER TABLE ejecucion_proceso
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (id_ejec),
+    DROP INDEX idx_ejec_mes_cubre,
+    DROP INDEX idx_ejec_var_proc,
+    ADD INDEX idx_ejec_fecha (fecha);
+
+-- fk_ejec_op_op necesita un índice que empiece por id_op: se crea el original
+-- antes de quitar el de cobertura.
+ALTER TABLE ejecucion_operario ADD INDEX fk_ejec_op_op (id_op);
+ALTER TABLE ejecucion_operario DROP INDEX idx_ejec_op_operario;
+
+
+-- ============================================================
+-- 1. CLAVES FORÁNEAS
+-- ============================================================
+
+ALTER TABLE ejecucion_proceso
+    ADD CONSTRAINT fk_ejec_bano FOREIGN KEY (id_b) REFERENCES bano(id_b),
+    ADD CONSTRAINT fk_ejec_proc FOREIGN KEY (id_proc) REFERENCES proceso(id_proc);
+
+ALTER TABLE ejecucion_operario
+    ADD CONSTRAINT fk_ejec_op_ejec FOREIGN KEY (id_ejec)
+        REFERENCES ejecucion_proceso(id_ejec)
+        ON DELETE CASCADE;
@@ -0,0 +1,340 @@
+#------------------------
+# Motor Analítico DuckDB (Opcional)
+#------------------------
+# Expresa las métricas clave, el cumplimiento de la Pestaña 3, los resúmenes
+# temporales de la Pestaña 5 y las métricas de operarios de la Pestaña 6 como
+# consultas SQL columnares y multihilo sobre DuckDB, leyendo desde el
+# DataFrame cargado (vía Arrow, sin copia) o directamente desde Parquet.
+#
+# Se activa en el dashboard con AXIS_MOTOR=duckdb. Los resultados deben
+# coincidir con la ruta pandas de analitica.py; para verificarlo:
+#   python motor_duckdb.py --paridad Datos_Banos.xlsx
+#------------------------
+import argparse
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+import validacion
+from fragmentos import PATRON_UBICACION
+from analitica import (
+    preparar_datos, calcular_agregados, metricas_clave, completar_banos_por_mes, completar_lead_time_diario
+)
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+
+COLUMNAS_MOTOR = [
+    'Correlativo', 'Cod_bano', 'Tipo_bano', 'Tipo_bano_agrupado', 'Fecha', 'Proceso',
+    'T_Real_min', 'TT', 'Cumple_TT', 'Cumple_Num', 'Lead_Time_min',
+    'Operario_1', 'Operario_2', 'Operario_3',
+]
+
+
+def disponible():
+    """Indica si DuckDB está instalado."""
+    return duckdb is not None
+
+
+#------------------------
+# Preparación de la Fuente
+#------------------------
+def _media(expresion):
+    """
+    Promedio SQL con suma compensada (fsum), como la suma de Kahan de pandas:
+    AVG puede diferir en el último bit y cambiar el redondeo de empates x.x5.
+    """
+    return f"fsum({expresion}) / COUNT({expresion})"
+
+
+def _tabla_motor(df):
+    """Columnas usadas por el motor más el número de fila original (para replicar 'primera fila' de pandas)."""
+    tabla = df[COLUMNAS_MOTOR].copy()
+    for col in ('Operario_1', 'Operario_2', 'Operario_3'):
+        # Igual que en pandas, solo cuentan los operarios de tipo texto
+        if not (pd.api.types.is_object_dtype(tabla[col]) or pd.api.types.is_string_dtype(tabla[col])):
+            tabla[col] = pd.Series(None, index=tabla.index, dtype=object)
+    tabla['_fila'] = np.arange(len(tabla))
+    return tabla
+
+
+def exportar_parquet(df, ruta):
+    """Escribe las columnas del motor a Parquet, para consultar sin cargar el Excel."""
+    _tabla_motor(df).to_parquet(ruta, index=False)
+#------------------------
+# Fin de Preparación de la Fuente
+#------------------------
+
+
+#------------------------
+# Motor
+#------------------------
+class MotorDuckDB:
+    """Conexión DuckDB en memoria con la vista 'ejecuciones' sobre un DataFrame o un archivo Parquet."""
+
+    def __init__(self, df=None, ruta_parquet=None, hilos=None):
+        if duckdb is None:
+            raise ImportError("DuckDB no está instalado (pip install duckdb).")
+        self.con = duckdb.connect()
+        self._bloqueo = threading.Lock()
+        if hilos:
+            self.con.execute(f"SET threads = {int(hilos)}")
+        if ruta_parquet is not None:
+            ruta_sql = str(ruta_parquet).replace("'", "''")
+            self.con.execute(f"CREATE VIEW ejecuciones AS SELECT * FROM read_parquet('{ruta_sql}')")
+        else:
+            self._tabla = _tabla_motor(df)
+            self.con.register("ejecuciones", self._tabla)
+
+        # Una fila por ejecución y operario, equivalente a Operarios_list
+        self.con.execute("""
+            CREATE TEMP VIEW operarios AS
+            SELECT trim(Operario_1) AS Operario, T_Real_min, Cumple_TT, Tipo_bano FROM ejecuciones
+            WHERE trim(Operario_1) <> ''
+            UNION ALL
+            SELECT trim(Operario_2), T_Real_min, Cumple_TT, Tipo_bano FROM ejecuciones
+            WHERE trim(Operario_2) <> ''
+            UNION ALL
+            SELECT trim(Operario_3), T_Real_min, Cumple_TT, Tipo_bano FROM ejecuciones
+            WHERE trim(Operario_3) <> ''
+        """)
+
+    def _consultar(self, sql, parametros=None):
+        # La conexión se comparte entre las sesiones del dashboard; DuckDB paraleliza dentro de cada consulta
+        with self._bloqueo:
+            return self.con.execute(sql, parametros or []).fetchdf()
+
+    #------------------------
+    # Métricas Clave
+    #------------------------
+    def metricas_clave(self, meses=None, correlativos=None, tipo_agrupado=None, pisos=None):
+        """Métricas clave con los filtros de la barra lateral aplicados dentro de la consulta."""
+        condiciones = ["TRUE"]
+        parametros = []
+        if meses:
+            condiciones.append("strftime(Fecha, '%Y-%m') IN (SELECT UNNEST(?))")
+            parametros.append(list(meses))
+        if correlativos:
+            condiciones.append("CAST(Correlativo AS VARCHAR) IN (SELECT UNNEST(?))")
+            parametros.append([str(c) for c in correlativos])
+        if tipo_agrupado and tipo_agrupado != "Todos":
+            condiciones.append("Tipo_bano_agrupado = ?")
+            parametros.append(tipo_agrupado)
+        if pisos:
+            # El piso sale del código de baño (77-B1-B6: piso 1), igual que en fragmentos.py
+            condiciones.append("CAST(regexp_extract(Cod_bano, '-[A-Z](\\d+)-', 1) AS INTEGER) IN (SELECT UNNEST(?))")
+            parametros.append([int(p) for p in pisos])
+
+        fila = self._consultar(f"""
+            WITH f AS (SELECT * FROM ejecuciones WHERE {' AND '.join(condiciones)}),
+            b AS (SELECT arg_min(Lead_Time_min, _fila) AS lead FROM f GROUP BY Cod_bano)
+            SELECT
+                (SELECT COUNT(DISTINCT Cod_bano) FROM f) AS banos_terminados,
+                (SELECT {_media('lead')} FROM b) AS avg_lead_time,
+                (SELECT COUNT(*) FROM f) AS n_filas,
+                (SELECT {_media('T_Real_min')} FROM f) AS avg_t_real,
+                (SELECT {_media('Cumple_Num')} FROM f) AS avg_cumple
+        """, parametros).iloc[0]
+
+        banos_terminados = int(fila['banos_terminados'])
+        n_filas = int(fila['n_filas'])
+        return {
+            'banos_terminados': banos_terminados,
+            'avg_lead_time': fila['avg_lead_time'] if banos_terminados > 0 else 0,
+            'avg_procesos_por_bano': n_filas / banos_terminados if banos_terminados > 0 else 0,
+            'avg_t_real': fila['avg_t_real'] if n_filas > 0 else 0,
+            'avg_pct_cumple': fila['avg_cumple'] * 100 if n_filas > 0 else 0,
+        }
+
+    #------------------------
+    # Pestaña 3 - Cumplimiento
+    #------------------------
+    def _cumplimiento(self, claves):
+        resultado = self._consultar(f"""
+            SELECT {', '.join(claves)},
+                {_media('CAST(Cumple_TT AS DOUBLE)')} AS Tasa_Cumplimiento,
+                COUNT(Cumple_TT) AS Cantidad,
+                {_media('T_Real_min')} AS Tiempo_Promedio,
+                {_media('TT')} AS TT_Promedio
+            FROM ejecuciones
+            WHERE {' AND '.join(f'{c} IS NOT NULL' for c in claves)}
+            GROUP BY ALL
+            ORDER BY ALL
+        """)
+        # El redondeo se hace en pandas (mitad al par) para coincidir con la ruta pandas
+        return resultado.set_index(claves).round(1)
+
+    def cumplimiento_por_proceso(self):
+        return self._cumplimiento(['Proceso']).sort_values('Tasa_Cumplimiento', ascending=True)
+
+    def cumplimiento_por_tipo(self):
+        cubo = self._cumplimiento(['Tipo_bano', 'Proceso'])
+        return {
+            tipo: cubo.xs(tipo, level='Tipo_bano').sort_values('Tasa_Cumplimiento', ascending=True)
+            for tipo in cubo.index.get_level_values('Tipo_bano').unique()
+        }
+
+    #------------------------
+    # Pestaña 5 - Resúmenes Temporales
+    #------------------------
+    def _primera_fila_bano(self):
+        return """
+            SELECT Cod_bano, arg_min(Fecha, _fila) AS Fecha, arg_min(Lead_Time_min, _fila) AS Lead_Time_min
+            FROM ejecuciones GROUP BY Cod_bano
+        """
+
+    def banos_por_mes(self):
+        por_mes = self._consultar(f"""
+            SELECT strftime(Fecha, '%Y-%m') AS Mes, COUNT(Cod_bano) AS Cod_bano
+            FROM ({self._primera_fila_bano()})
+            WHERE Fecha IS NOT NULL
+            GROUP BY Mes ORDER BY Mes
+        """)
+        return completar_banos_por_mes(por_mes)
+
+    def lead_time_diario(self):
+        diario = self._consultar(f"""
+            SELECT CAST(Fecha AS DATE) AS Fecha_diaria, {_media('Lead_Time_min')} AS Lead_Time_min
+            FROM ({self._primera_fila_bano()})
+            WHERE Fecha IS NOT NULL
+            GROUP BY Fecha_diaria ORDER BY Fecha_diaria
+        """)
+        diario['Fecha_diaria'] = pd.to_datetime(diario['Fecha_diaria']).dt.date
+        return completar_lead_time_diario(diario)
+
+    #------------------------
+    # Pestaña 6 - Operarios
+    #------------------------
+    def _metricas_operario(self, claves):
+        resultado = self._consultar(f"""
+            SELECT {', '.join(claves)},
+                COUNT(*) AS Total_Tareas,
+                {_media('T_Real_min')} AS Avg_T_Real,
+                {_media('CAST(COALESCE(Cumple_TT, TRUE) AS DOUBLE)')} * 100 AS Pct_Cumple_TT
+            FROM operarios
+            GROUP BY ALL
+            ORDER BY ALL
+        """)
+        return resultado
+
+    def metricas_operario(self):
+        return self._metricas_operario(['Operario']).sort_values('Avg_T_Real')
+
+    def metricas_operario_por_tipo(self):
+        cubo = self._metricas_operario(['Tipo_bano', 'Operario'])
+        return {
+            tipo: cubo[cubo['Tipo_bano'] == tipo].drop(columns='Tipo_bano').reset_index(drop=True).sort_values('Avg_T_Real')
+            for tipo in cubo['Tipo_bano'].unique()
+        }
+
+    def operarios_largo(self):
+        return self._consultar("SELECT Operario, T_Real_min AS T_Real_Unit, Cumple_TT, Tipo_bano FROM operarios")
+
+    def calcular_agregados(self):
+        """Mismo contenido que analitica.calcular_agregados, calculado en DuckDB."""
+        return {
+            'cumplimiento_proceso': self.cumplimiento_por_proceso(),
+            'cumplimiento_tipo': self.cumplimiento_por_tipo(),
+            'banos_por_mes': self.banos_por_mes(),
+            'lead_time_diario': self.lead_time_diario(),
+            'operarios_largo': self.operarios_largo(),
+            'metricas_operario': self.metricas_operario(),
+            'metricas_operario_tipo': self.metricas_operario_por_tipo(),
+        }
+#------------------------
+# Fin de Motor
+#------------------------
+
+
+#------------------------
+# Verificación de Paridad con pandas
+#------------------------
+def _comparar(nombre, esperado, obtenido, diferencias, rtol=1e-9):
+    try:
+        if isinstance(esperado, dict) and not isinstance(esperado, pd.DataFrame):
+            if sorted(map(str, esperado)) != sorted(map(str, obtenido)):
+                raise AssertionError(f"claves distintas: {sorted(esperado)} vs {sorted(obtenido)}")
+            for clave in esperado:
+                _comparar(f"{nombre}[{clave}]", esperado[clave], obtenido[clave], diferencias, rtol)
+            return
+        if isinstance(esperado, pd.DataFrame):
+            pd.testing.assert_frame_equal(
+                esperado.reset_index(), obtenido.reset_index(),
+                check_dtype=False, check_exact=False, rtol=rtol, check_index_type=False
+            )
+        elif not np.isclose(esperado, obtenido, rtol=rtol):
+            raise AssertionError(f"{esperado} != {obtenido}")
+    except AssertionError as error:
+        diferencias.append((nombre, str(error).strip()))
+
+
+def verificar_paridad(df, filtros=None):
+    """Compara la ruta pandas con DuckDB; devuelve la lista de (nombre, diferencia) encontradas."""
+    motor = MotorDuckDB(df)
+    diferencias = []
+
+    agregados = calcular_agregados(df)
+    agregados_motor = motor.calcular_agregados()
+    for clave in agregados:
+        if clave == 'operarios_largo':
+            # Mismo contenido; el orden de filas no forma parte del contrato
+            columnas = ['Operario', 'T_Real_Unit', 'Tipo_bano', 'Cumple_TT']
+            esperado = agregados[clave].sort_values(columnas, kind='mergesort').reset_index(drop=True)
+            obtenido = agregados_motor[clave].sort_values(columnas, kind='mergesort').reset_index(drop=True)
+            _comparar(clave, esperado, obtenido, diferencias)
+        else:
+            _comparar(clave, agregados[clave], agregados_motor[clave], diferencias)
+
+    anio_mes = df['Fecha'].dt.strftime('%Y-%m')
+    # Mismo piso que fragmentos.agregar_ubicacion (77-B1-B6: piso 1)
+    piso = pd.to_numeric(df['Cod_bano'].str.extract(PATRON_UBICACION)[1], errors='coerce')
+    pisos = sorted(int(p) for p in piso.dropna().unique())
+    filtros = filtros or [
+        {},
+        {'meses': sorted(anio_mes.dropna().unique())[:2]},
+        {'correlativos': [str(c) for c in df['Correlativo'].dropna().unique()[:5]]},
+        {'tipo_agrupado': df['Tipo_bano_agrupado'].dropna().iloc[0]},
+        {'pisos': pisos[:1]},
+        {'meses': sorted(anio_mes.dropna().unique())[:3], 'pisos': pisos[-2:]},
+    ]
+    for filtro in filtros:
+        d = df
+        if filtro.get('meses'):
+            d = d[anio_mes.loc[d.index].isin(filtro['meses'])]
+        if filtro.get('correlativos'):
+            d = d[d['Correlativo'].astype(str).isin(filtro['correlativos'])]
+        if filtro.get('tipo_agrupado'):
+            d = d[d['Tipo_bano_agrupado'] == filtro['tipo_agrupado']]
+        if filtro.get('pisos'):
+            d = d[piso.loc[d.index].isin(filtro['pisos'])]
+        esperado = metricas_clave(d)
+        obtenido = motor.metricas_clave(**filtro)
+        for clave in esperado:
+            _comparar(f"metricas_clave{filtro}[{clave}]", esperado[clave], obtenido[clave], diferencias)
+
+    return diferencias
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica que DuckDB reproduzca los resultados de pandas.")
+    parser.add_argument("--paridad", metavar="EXCEL", required=True, help="Excel de datos (Datos_Banos.xlsx).")
+    args = parser.parse_args(argv)
+
+    df = preparar_datos(validacion.validar(pd.read_excel(args.paridad, engine="openpyxl")).valido)
+    diferencias = verificar_paridad(df)
+    for nombre, detalle in diferencias:
+        print(f"DIFERENCIA {nombre}: {detalle}")
+    print("Paridad OK" if not diferencias else f"{len(diferencias)} diferencias")
+    return 1 if diferencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+#------------------------
+# Fin de Verificación de Paridad con pandas
+#------------------------
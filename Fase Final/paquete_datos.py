@@ -0,0 +1,394 @@
+#------------------------
+# Paquetes de Datos Exportables (.axis)
+#------------------------
+# Un solo archivo con lo que el dashboard necesita para abrir una versión del
+# dataset sin el Excel y sin pre-procesarlo, para compartirlo y usarlo sin
+# conexión (junto al ejecutable de PyInstaller, por ejemplo).
+#
+# Uso:
+#   python paquete_datos.py exportar --datos Datos_Banos.xlsx --salida Datos_Banos.axis
+#   python paquete_datos.py exportar --compresion zstd      (archivo más chico, apertura algo más lenta)
+#   python paquete_datos.py info Datos_Banos.axis
+#
+# El dashboard abre el paquete, en lugar de leer y validar el Excel, solo si
+# AXIS_PAQUETE está definida (ese paquete tiene prioridad sobre el Excel) o si
+# no está el Excel y existe Datos_Banos.axis en su lugar. Con el Excel
+# presente y sin AXIS_PAQUETE se usa siempre el Excel.
+#
+# Formato: un ZIP sin compresión, inspeccionable con cualquier descompresor,
+# con cada entrada alineada a 64 bytes. Las tablas son archivos Arrow IPC con
+# sus buffers comprimidos (lz4 por defecto). Al abrirlo, el archivo completo
+# se mapea en memoria y cada tabla se lee desde su posición, sin extraerla:
+#
+#   manifiesto.json        formato, versión y fecha de la fuente, reporte de la
+#                          validación, filas y tipos de cada tabla
+#   catalogo.json          órdenes y colores de catalogo.py
+#   hechos.arrow           tabla de hechos ya pre-procesada (una fila por ejecución)
+#   puente_operarios.arrow (Fila, Rol, Operario), como ejecucion_operario en axis_bd
+#   cuarentena.arrow       filas que no pasaron la validación
+#   resumenes/...          agregados de las Pestañas 3, 5 y 6, resumen por
+#                          edificio, ocupación de operarios, celdas de la matriz
+#                          de afinidad y líneas base (mediana y MAD) de anomalías
+#
+# Los resúmenes son los de la vista global; los edificios se calculan al
+# pedirlos, como con el Excel.
+#------------------------
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import zipfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+import afinidad
+import cache_compartido
+import catalogo
+import fragmentos
+import fuente_datos
+import validacion
+
+
+#------------------------
+# Configuración
+#------------------------
+FORMATO_PAQUETE = 1
+EXTENSION = ".axis"
+COMPRESIONES = ("lz4", "zstd", "ninguna")
+ALINEACION = 64                      # Inicio de cada entrada (buffers de Arrow legibles en el mapa sin copiar)
+NOMBRE_MANIFIESTO = "manifiesto.json"
+NOMBRE_CATALOGO = "catalogo.json"
+HECHOS = "hechos"
+PUENTE = "puente_operarios"
+CUARENTENA = "cuarentena"
+COLUMNAS_OPERARIO = ['Operario_1', 'Operario_2', 'Operario_3']
+
+# Resúmenes de la vista global: clave de la caché en fuente_datos -> tablas que la forman
+AGREGADOS_TABLA = ['cumplimiento_proceso', 'banos_por_mes', 'lead_time_diario', 'metricas_operario']
+AGREGADOS_POR_TIPO = ['cumplimiento_tipo', 'metricas_operario_tipo']
+OCUPACION = ['conflictos', 'dias', 'resumen']
+#------------------------
+# Fin de Configuración
+#------------------------
+
+
+def disponible():
+    """Indica si pyarrow está instalado (necesario para exportar y abrir paquetes)."""
+    return pa is not None
+
+
+#------------------------
+# Escritura
+#------------------------
+def _arrow(df, compresion):
+    """DataFrame como archivo Arrow IPC (con el índice de pandas) en un buffer."""
+    tabla = pa.Table.from_pandas(df, preserve_index=None)
+    opciones = pa.ipc.IpcWriteOptions(compression=None if compresion == "ninguna" else compresion)
+    destino = pa.BufferOutputStream()
+    with pa.ipc.new_file(destino, tabla.schema, options=opciones) as escritor:
+        escritor.write_table(tabla)
+    return destino.getvalue()
+
+
+def _escribir_entrada(archivo, nombre, datos):
+    """
+    Agrega una entrada sin compresión cuyo contenido empieza en un múltiplo de
+    ALINEACION, rellenando el campo extra de la cabecera local (como zipalign).
+    """
+    info = zipfile.ZipInfo(nombre, date_time=time.localtime()[:6])
+    info.compress_type = zipfile.ZIP_STORED
+    # zipfile agrega 20 bytes de zip64 a la cabecera local con entradas grandes
+    zip64 = len(datos) * 1.05 > zipfile.ZIP64_LIMIT
+    inicio_datos = archivo.fp.tell() + 30 + len(nombre.encode("utf-8")) + (20 if zip64 else 0)
+    relleno = -(inicio_datos + 4) % ALINEACION
+    info.extra = struct.pack("<HH", 0xD935, relleno) + b"\0" * relleno
+    archivo.writestr(info, memoryview(datos))
+
+
+def _como_texto(df):
+    """Columnas object con valores mezclados (filas en cuarentena) como texto, para guardarlas en Arrow."""
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].map(lambda v: v if v is None or (isinstance(v, float) and np.isnan(v)) else str(v))
+    return df
+
+
+def _tablas(datos):
+    """Tablas del paquete (nombre de la entrada -> DataFrame) y las claves de los resúmenes por tipo de baño."""
+    global_ = datos['fragmentos'].obtener(fragmentos.TODOS)
+    df = global_['df']
+
+    codigos = df[COLUMNAS_OPERARIO].notna().to_numpy()
+    filas, roles = np.nonzero(codigos)
+    puente = pd.DataFrame({
+        'Fila': filas,
+        'Rol': roles + 1,
+        'Operario': df[COLUMNAS_OPERARIO].to_numpy(dtype=object)[filas, roles],
+    })
+
+    tablas = {
+        HECHOS: df.drop(columns=['Operarios_list']),
+        PUENTE: puente,
+        CUARENTENA: _como_texto(datos['validacion'].cuarentena),
+        'resumenes/resumen_fragmentos': datos['resumen_fragmentos'],
+        'resumenes/lineas_base': global_['lineas_base'],
+        'resumenes/afinidad': global_['afinidad'].celdas(),
+    }
+    agregados = global_['agregados']
+    for nombre in AGREGADOS_TABLA:
+        tablas[f'resumenes/{nombre}'] = agregados[nombre]
+    claves = {}
+    for nombre in AGREGADOS_POR_TIPO:
+        claves[nombre] = list(agregados[nombre])
+        for i, tipo in enumerate(claves[nombre]):
+            tablas[f'resumenes/{nombre}/{i}'] = agregados[nombre][tipo]
+    for nombre in OCUPACION:
+        tablas[f'resumenes/ocupacion/{nombre}'] = global_['ocupacion_operarios'][nombre]
+    return tablas, claves, global_
+
+
+def _tipos(df):
+    """dtype de cada columna y del índice, para recuperar los object que Arrow lee como texto."""
+    return {
+        'columnas': {str(col): str(tipo) for col, tipo in df.dtypes.items()},
+        'indice': [str(nivel.dtype) for nivel in (df.index.levels if isinstance(df.index, pd.MultiIndex) else [df.index])],
+    }
+
+
+def _json_simple(valor):
+    if isinstance(valor, np.integer):
+        return int(valor)
+    if isinstance(valor, np.floating):
+        return float(valor)
+    if isinstance(valor, (np.bool_,)):
+        return bool(valor)
+    raise TypeError(f"No serializable en JSON: {type(valor).__name__}")
+
+
+def exportar(datos, version, ruta, compresion="lz4"):
+    """Escribe el paquete de una instantánea de fuente_datos.construir_datos; devuelve el manifiesto."""
+    if not disponible():
+        raise RuntimeError("Exportar paquetes requiere el paquete pyarrow.")
+    tablas, claves, global_ = _tablas(datos)
+    afinidad_global = global_['afinidad']
+
+    manifiesto = {
+        'formato': FORMATO_PAQUETE,
+        'version_fuente': version,
+        'fecha_fuente': datos['fecha_fuente'].isoformat(),
+        'exportado': datetime.now().isoformat(timespec='seconds'),
+        'compresion': compresion,
+        'versiones': {'pandas': pd.__version__, 'pyarrow': pa.__version__},
+        'validacion': datos['validacion'].reporte,
+        'columnas_hechos': list(global_['df'].columns),
+        'agregados': list(global_['agregados']),
+        'claves_por_tipo': claves,
+        'afinidad': {'operarios': list(afinidad_global.operarios), 'procesos': list(afinidad_global.procesos)},
+        'tablas': {},
+    }
+
+    temporal = ruta + ".tmp"
+    with zipfile.ZipFile(temporal, "w", zipfile.ZIP_STORED, allowZip64=True) as archivo:
+        _escribir_entrada(
+            archivo, NOMBRE_CATALOGO,
+            json.dumps(global_['catalogo'].exportar(), ensure_ascii=False, default=_json_simple).encode("utf-8")
+        )
+        for nombre, df in tablas.items():
+            _escribir_entrada(archivo, nombre + ".arrow", _arrow(df, compresion))
+            manifiesto['tablas'][nombre] = {'filas': len(df), **_tipos(df)}
+        # El manifiesto va al final: solo queda escrito si todo lo anterior se escribió
+        _escribir_entrada(
+            archivo, NOMBRE_MANIFIESTO,
+            json.dumps(manifiesto, ensure_ascii=False, indent=1, default=_json_simple).encode("utf-8")
+        )
+    os.replace(temporal, ruta)
+    return manifiesto
+#------------------------
+# Fin de Escritura
+#------------------------
+
+
+#------------------------
+# Lectura
+#------------------------
+class Paquete:
+    """Paquete abierto: manifiesto, catálogo y tablas leídas desde el archivo mapeado en memoria."""
+
+    def __init__(self, ruta):
+        if not disponible():
+            raise RuntimeError("Abrir paquetes requiere el paquete pyarrow.")
+        self.ruta = ruta
+        try:
+            with zipfile.ZipFile(ruta) as archivo:
+                self._entradas = {info.filename: info for info in archivo.infolist()}
+                self.manifiesto = json.loads(archivo.read(NOMBRE_MANIFIESTO))
+                self._catalogo = json.loads(archivo.read(NOMBRE_CATALOGO))
+        except (zipfile.BadZipFile, KeyError) as error:
+            raise validacion.ErrorValidacion(f"{ruta} no es un paquete de datos válido ({error}).")
+        if self.manifiesto.get('formato') != FORMATO_PAQUETE:
+            raise validacion.ErrorValidacion(
+                f"{ruta} tiene el formato {self.manifiesto.get('formato')}; se esperaba {FORMATO_PAQUETE}."
+            )
+        # Los buffers sin comprimir de las tablas apuntan a este mapa; se libera con el último DataFrame que lo usa
+        self._mapa = pa.memory_map(ruta).read_buffer()
+
+    def _contenido(self, nombre):
+        info = self._entradas[nombre]
+        cabecera = self._mapa.slice(info.header_offset, 30).to_pybytes()
+        largo_nombre, largo_extra = struct.unpack("<HH", cabecera[26:30])
+        return self._mapa.slice(info.header_offset + 30 + largo_nombre + largo_extra, info.file_size)
+
+    def tabla(self, nombre):
+        """DataFrame de una tabla del paquete, con los mismos tipos de columnas con que se exportó."""
+        df = pa.ipc.open_file(self._contenido(nombre + ".arrow")).read_pandas()
+        tipos = self.manifiesto['tablas'][nombre]
+        objetos = [col for col, tipo in tipos['columnas'].items() if tipo == 'object' and df[col].dtype != object]
+        if objetos:
+            df[objetos] = df[objetos].astype(object)
+        if tipos['indice'] == ['object'] and df.index.dtype != object:
+            df.index = df.index.astype(object)
+        return df
+
+    def fecha_fuente(self):
+        return datetime.fromisoformat(self.manifiesto['fecha_fuente'])
+
+    def cargar(self):
+        """Tabla de hechos con Operarios_list y el resultado de la validación de la exportación."""
+        df = self.tabla(HECHOS)
+        df['Operarios_list'] = _listas_operarios(df)
+        df = df[self.manifiesto['columnas_hechos']]
+        return validacion.ResultadoValidacion(df, self.tabla(CUARENTENA), self.manifiesto['validacion'])
+
+    def precalculados(self, df):
+        """Resúmenes de la vista global por clave de la caché de fuente_datos (df: la tabla de hechos cargada)."""
+        claves = self.manifiesto['claves_por_tipo']
+        agregados = {nombre: self.tabla(f'resumenes/{nombre}') for nombre in AGREGADOS_TABLA}
+        for nombre in AGREGADOS_POR_TIPO:
+            agregados[nombre] = {tipo: self.tabla(f'resumenes/{nombre}/{i}') for i, tipo in enumerate(claves[nombre])}
+        agregados['operarios_largo'] = self._operarios_largo(df)
+        agregados = {nombre: agregados[nombre] for nombre in self.manifiesto['agregados']}
+
+        ejes = self.manifiesto['afinidad']
+        return {
+            'agregados': agregados,
+            'lineas_base': self.tabla('resumenes/lineas_base'),
+            'afinidad': afinidad.matriz_desde_celdas(ejes['operarios'], ejes['procesos'], self.tabla('resumenes/afinidad')),
+            'ocupacion_operarios': {nombre: self.tabla(f'resumenes/ocupacion/{nombre}') for nombre in OCUPACION},
+            'catalogo': catalogo.Catalogo(**self._catalogo),
+            'resumen_fragmentos': self.tabla('resumenes/resumen_fragmentos'),
+        }
+
+    def _operarios_largo(self, df):
+        """Misma tabla que analitica.operarios_largo, desde el puente (sin explode)."""
+        puente = self.tabla(PUENTE)
+        filas = puente['Fila'].to_numpy()
+        return pd.DataFrame({
+            'Operario': puente['Operario'],
+            'T_Real_Unit': df['T_Real_min'].to_numpy()[filas],
+            'Cumple_TT': df['Cumple_TT'].to_numpy()[filas],
+            'Tipo_bano': df['Tipo_bano'].iloc[filas].reset_index(drop=True),
+        })
+
+
+def _listas_operarios(df):
+    """
+    Operarios_list como en analitica.preparar_datos, con una lista por equipo
+    distinto (Operario_1..3) en vez de una por fila: las filas del mismo
+    equipo comparten la misma lista, que nadie modifica.
+    """
+    codigos, nombres = pd.factorize(pd.concat([df[col] for col in COLUMNAS_OPERARIO], ignore_index=True))
+    codigos = codigos.reshape(len(COLUMNAS_OPERARIO), -1).astype(np.int64) + 1
+    base = len(nombres) + 1
+    equipo, primeras = pd.factorize(codigos[0] * base * base + codigos[1] * base + codigos[2])
+    nombres = np.asarray(nombres, dtype=object)
+    listas = np.empty(len(primeras), dtype=object)
+    for i, clave in enumerate(primeras):
+        miembros = (clave // (base * base), clave // base % base, clave % base)
+        listas[i] = [nombres[m - 1] for m in miembros if m > 0]
+    return listas[equipo]
+#------------------------
+# Fin de Lectura
+#------------------------
+
+
+#------------------------
+# Fuente de Datos desde un Paquete
+#------------------------
+class FuentePaquete:
+    """Paquete .axis como fuente del dashboard, en lugar de fuente_datos.FuenteExcel."""
+
+    def __init__(self, ruta, motor_analitico=fuente_datos.MOTOR_ANALITICO):
+        self.ruta = ruta
+        self.motor_analitico = motor_analitico
+
+    def version(self):
+        return cache_compartido.version_archivo(self.ruta)
+
+    def construir(self, version):
+        paquete = Paquete(self.ruta)
+        resultado_validacion = paquete.cargar()
+        return fuente_datos.construir_datos(
+            resultado_validacion, version, paquete.fecha_fuente(), self.motor_analitico,
+            paquete.precalculados(resultado_validacion.valido)
+        )
+#------------------------
+# Fin de Fuente de Datos desde un Paquete
+#------------------------
+
+
+#------------------------
+# Programa Principal
+#------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta o describe paquetes de datos del dashboard (.axis).")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_exportar = sub.add_parser("exportar", help="Escribe el paquete de la versión actual del Excel.")
+    p_exportar.add_argument("--datos", default="Datos_Banos.xlsx", help="Ruta del Excel de datos.")
+    p_exportar.add_argument("--variantes", default="variantes_correctas.csv", help="Ruta de variantes_correctas.csv.")
+    p_exportar.add_argument("--salida", default=None, help="Ruta del paquete (por defecto, la del Excel con .axis).")
+    p_exportar.add_argument("--compresion", choices=COMPRESIONES, default="lz4")
+
+    p_info = sub.add_parser("info", help="Muestra el manifiesto y las tablas de un paquete.")
+    p_info.add_argument("ruta")
+
+    args = parser.parse_args(argv)
+    if not disponible():
+        print("pyarrow no está instalado.", file=sys.stderr)
+        return 1
+
+    if args.comando == "exportar":
+        salida = args.salida or os.path.splitext(args.datos)[0] + EXTENSION
+        fuente = fuente_datos.FuenteExcel(args.datos, args.variantes)
+        inicio = time.perf_counter()
+        version = fuente.version()
+        datos = fuente.construir(version)
+        manifiesto = exportar(datos, version, salida, args.compresion)
+        print(f"{salida}: {manifiesto['tablas'][HECHOS]['filas']:,} ejecuciones, "
+              f"{os.path.getsize(salida) / 1024 / 1024:.1f} MB ({time.perf_counter() - inicio:.1f} s)")
+    else:
+        paquete = Paquete(args.ruta)
+        manifiesto = paquete.manifiesto
+        print(f"Formato {manifiesto['formato']}, fuente {manifiesto['version_fuente']} "
+              f"del {manifiesto['fecha_fuente']}, exportado el {manifiesto['exportado']} ({manifiesto['compresion']})")
+        for nombre, info in manifiesto['tablas'].items():
+            entrada = paquete._entradas[nombre + ".arrow"]
+            print(f"  {nombre:<45} {info['filas']:>10,} filas  {entrada.file_size / 1024:>10,.1f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+#------------------------
+# Fin de Programa Principal
+#------------------------
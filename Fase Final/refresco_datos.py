@@ -0,0 +1,118 @@
+#------------------------
+# Refresco de Datos en Segundo Plano
+#------------------------
+# Un hilo por proceso vigila la versión de la fuente (el Excel o la base de
+# datos). Cuando cambia, reconstruye el dataset, los índices y los agregados
+# fuera del ciclo de las peticiones y publica la nueva instantánea con un solo
+# reemplazo de referencia. Mientras tanto las sesiones siguen sirviendo la
+# instantánea anterior (stale-while-revalidate), y si la reconstrucción falla
+# (por ejemplo, el Excel se está copiando) se conserva la anterior y se
+# reintenta en la siguiente revisión.
+#
+# AXIS_REFRESCO_SEG fija cada cuántos segundos se revisa la fuente (30 por
+# defecto). Con 0 no se lanza el hilo y la revisión se hace en cada petición,
+# como antes.
+#------------------------
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+
+INTERVALO_REFRESCO = float(os.environ.get("AXIS_REFRESCO_SEG", "30"))
+
+logger = logging.getLogger("axis.refresco")
+
+
+class Instantanea:
+    """Datos derivados de una versión de la fuente; se reemplaza completa, nunca se modifica."""
+
+    def __init__(self, version, datos, segundos_construccion):
+        self.version = version
+        self.datos = datos
+        self.cargado_en = datetime.now()
+        self.segundos_construccion = segundos_construccion
+
+
+class RefrescoDatos:
+    """
+    Mantiene la instantánea vigente de los datos del dashboard.
+
+    obtener_version(): versión barata de la fuente (p. ej. cache_compartido.version_archivo).
+    construir(version): arma los datos de esa versión; puede tardar, corre en el hilo de refresco.
+    """
+
+    def __init__(self, obtener_version, construir, intervalo=INTERVALO_REFRESCO):
+        self._obtener_version = obtener_version
+        self._construir = construir
+        self.intervalo = intervalo
+        self._instantanea = None
+        self._bloqueo = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+        self.actualizando = False
+        self.ultimo_error = None
+
+    def actual(self):
+        """Instantánea vigente. Solo la primera se construye dentro de una petición, porque no hay otra que servir."""
+        if self._instantanea is None or self.intervalo <= 0:
+            self.revisar()
+        self.iniciar()
+        return self._instantanea
+
+    def revisar(self):
+        """Reconstruye y publica si la versión de la fuente cambió; devuelve True si hubo reemplazo."""
+        try:
+            version = self._obtener_version()
+        except Exception:
+            logger.exception("No se pudo obtener la versión de la fuente")
+            return False
+
+        if self._instantanea is not None and self._instantanea.version == version:
+            return False
+
+        with self._bloqueo:
+            # Otra petición o el hilo pudo haberla construido mientras se esperaba el bloqueo
+            if self._instantanea is not None and self._instantanea.version == version:
+                return False
+
+            self.actualizando = True
+            inicio = time.perf_counter()
+            try:
+                datos = self._construir(version)
+            except Exception as error:
+                self.ultimo_error = error
+                if self._instantanea is None:
+                    raise
+                logger.exception("Falló la reconstrucción de la versión %s; se mantiene %s",
+                                 version, self._instantanea.version)
+                return False
+            finally:
+                self.actualizando = False
+
+            # Reemplazo atómico: las sesiones en curso conservan su referencia a la instantánea anterior
+            self._instantanea = Instantanea(version, datos, time.perf_counter() - inicio)
+            self.ultimo_error = None
+        logger.info("Datos actualizados a la versión %s (%.1f s)", version, self._instantanea.segundos_construccion)
+        return True
+
+    def iniciar(self):
+        """Lanza el hilo de vigilancia si corresponde y no está corriendo."""
+        if self.intervalo <= 0 or (self._hilo is not None and self._hilo.is_alive()):
+            return
+        with self._bloqueo:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._detener.clear()
+                self._hilo = threading.Thread(target=self._vigilar, name="axis-refresco-datos", daemon=True)
+                self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+
+    def _vigilar(self):
+        while not self._detener.wait(self.intervalo):
+            try:
+                self.revisar()
+            except Exception:
+                logger.exception("Error inesperado en el refresco de datos")
@@ -0,0 +1,444 @@
+#------------------------
+# Salidas de Referencia para Regresión Numérica
+#------------------------
+# Fija los números que reporta el dashboard para que una optimización pueda
+# demostrar que no los cambia: métricas clave con varios filtros, agregados de
+# las Pestañas 3, 5 y 6 (vista global y por edificio), detalle de correlativos,
+# afinidad, ocupación, anomalías, simulación y comparación de cohortes. Corre
+# sin interfaz los mismos cálculos del dashboard sobre data_clean_v3_final.csv
+# y sobre datos sintéticos (benchmarks.generar_datos).
+#
+#   python regresion.py generar --salida regresion
+#       Calcula las salidas con la ruta de referencia (pandas, como el
+#       dashboard) y guarda un JSON comprimido por conjunto de datos en la
+#       carpeta (los de la carpeta regresion/ son la referencia vigente).
+#
+#   python regresion.py comparar --referencia regresion --rutas pandas,paralelo,paquete,duckdb
+#       Recalcula con cada ruta de cálculo y muestra las diferencias fuera de
+#       tolerancia (--rtol, --atol) y el tiempo de cada ruta; termina con
+#       código 1 si hay alguna. Las rutas alternativas se comparan solo en lo
+#       que calculan:
+#         pandas    fuente_datos.construir_datos, igual que el dashboard
+#         paralelo  agregados por particiones en procesos (agregacion_paralela.py)
+#         paquete   todo, abriendo el dataset desde un paquete .axis exportado
+#         duckdb    agregados y métricas clave con motor_duckdb.py (se omite
+#                   si DuckDB no está instalado)
+#
+# Cada número se guarda con su representación exacta (repr de float en JSON),
+# así que con las tolerancias por defecto cualquier cambio de redondeo aparece.
+# La caché compartida se desactiva: un resultado guardado por otra versión del
+# código ocultaría un cambio.
+#------------------------
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import agregacion_paralela
+import anomalias
+import benchmarks
+import cache_compartido
+import catalogo
+import cohortes
+import fragmentos
+import fuente_datos
+import motor_duckdb
+import paquete_datos
+import simulacion
+import validacion
+from analitica import preparar_datos, filtrar, metricas_clave, filas_correlativo, detalle_correlativo
+
+
+#------------------------
+# Configuración
+#------------------------
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+DIRECTORIO_EVIDENCIAS = os.path.join(DIRECTORIO, "..", "Fase 3", "Evidencias Proyecto")
+RUTA_CSV = os.path.join(DIRECTORIO_EVIDENCIAS, "data_clean_v3_final.csv")
+RUTA_VARIANTES = os.path.join(DIRECTORIO_EVIDENCIAS, "variantes_correctas.csv")
+SALIDA_POR_DEFECTO = os.path.join(DIRECTORIO, "regresion")
+SINTETICOS_POR_DEFECTO = "4000:0,8000:1:60"   # filas:semilla[:operarios], separados por coma
+
+# Columnas de data_clean_v3_final.csv con otro nombre que en Datos_Banos.xlsx
+COLUMNAS_CSV = {
+    'Tipo_bano': 'Cod_bano',
+    'Variante': 'Tipo_bano',
+    'T_Real_Acumulado_min': 'T_Real_Acumulado',
+    'Diferencia_TT_min': 'Diferencia_TT',
+}
+
+RTOL = 1e-9
+ATOL = 1e-9
+RUTAS = ("pandas", "paralelo", "paquete", "duckdb")
+RUTAS_POR_DEFECTO = ",".join(RUTAS)
+# Prefijos de las salidas que calcula cada ruta
+COBERTURA = {
+    "pandas": ("",),
+    "paquete": ("",),
+    "paralelo": ("agregados/",),
+    "duckdb": ("agregados/", "kpis/"),
+}
+REPLICAS_SIMULACION = 200  # Bajo simulacion.UMBRAL_PARALELO: un solo bloque, resultado reproducible
+#------------------------
+# Fin de Configuración
+#------------------------
+
+
+#------------------------
+# Conjuntos de Datos
+#------------------------
+def leer_csv(ruta=RUTA_CSV):
+    """data_clean_v3_final.csv con los nombres de columna del Excel de AppSheet."""
+    return pd.read_csv(ruta, sep=';', encoding='utf-8-sig').rename(columns=COLUMNAS_CSV)
+
+
+def conjuntos_datos(ruta_csv, sinteticos):
+    """Conjuntos de datos crudos por nombre: el CSV real (si existe) y los sintéticos pedidos."""
+    conjuntos = {}
+    if ruta_csv and os.path.exists(ruta_csv):
+        nombre = os.path.splitext(os.path.basename(ruta_csv))[0]
+        conjuntos[nombre] = (lambda: leer_csv(ruta_csv), validacion.leer_variantes(RUTA_VARIANTES))
+    for especificacion in filter(None, sinteticos.split(",")):
+        partes = [int(p) for p in especificacion.split(":")]
+        filas, semilla = partes[0], partes[1] if len(partes) > 1 else 0
+        operarios = partes[2] if len(partes) > 2 else None
+        nombre = f"sintetico_{filas}_s{semilla}" + (f"_op{operarios}" if operarios else "")
+        conjuntos[nombre] = (lambda f=filas, s=semilla, o=operarios: benchmarks.generar_datos(f, s, o), None)
+    return conjuntos
+
+
+def validar_y_preparar(crudo, variantes):
+    """Mismo paso que FuenteExcel.cargar: validación y pre-procesamiento."""
+    resultado = validacion.validar(crudo, variantes=variantes)
+    resultado.valido = preparar_datos(resultado.valido)
+    return resultado
+#------------------------
+# Fin de Conjuntos de Datos
+#------------------------
+
+
+#------------------------
+# Normalización de Salidas
+#------------------------
+def _valor(valor):
+    """Escalar como tipo JSON: números exactos, NaN como None y lo demás como texto."""
+    if valor is None or (isinstance(valor, (float, np.floating)) and np.isnan(valor)):
+        return None
+    if isinstance(valor, (bool, np.bool_)):
+        return bool(valor)
+    if isinstance(valor, (int, np.integer)):
+        return int(valor)
+    if isinstance(valor, (float, np.floating)):
+        return float(valor)
+    if valor is pd.NaT:
+        return None
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    return str(valor)
+
+
+def normalizar_tabla(tabla):
+    """DataFrame como {'columnas', 'filas'}, con el índice como columnas si no es el rango por defecto."""
+    if not isinstance(tabla.index, pd.RangeIndex) or tabla.index.name is not None:
+        tabla = tabla.reset_index()
+    return {
+        'columnas': [str(col) for col in tabla.columns],
+        'filas': [[_valor(v) for v in fila] for fila in tabla.itertuples(index=False, name=None)],
+    }
+
+
+def _agregar(salidas, prefijo, valor):
+    """Agrega un DataFrame, un diccionario de DataFrames o de escalares a las salidas, con nombres planos."""
+    if isinstance(valor, pd.DataFrame):
+        salidas['tablas'][prefijo] = normalizar_tabla(valor)
+    elif isinstance(valor, dict):
+        for clave, subvalor in valor.items():
+            _agregar(salidas, f"{prefijo}/{clave}", subvalor)
+    else:
+        salidas['escalares'][prefijo] = _valor(valor)
+
+
+def _agregados(salidas, prefijo, agregados):
+    # La tabla larga de operarios no tiene un orden de filas contractual (motor_duckdb.verificar_paridad)
+    agregados = dict(agregados)
+    columnas = ['Operario', 'T_Real_Unit', 'Cumple_TT', 'Tipo_bano']
+    agregados['operarios_largo'] = agregados['operarios_largo'].sort_values(
+        columnas, kind='mergesort').reset_index(drop=True)
+    _agregar(salidas, prefijo, agregados)
+#------------------------
+# Fin de Normalización de Salidas
+#------------------------
+
+
+#------------------------
+# Cálculo de las Salidas
+#------------------------
+def filtros_referencia(df, catalogo_version):
+    """Estados de la barra lateral con los que se fijan las métricas clave."""
+    meses = sorted(df['AñoMes'].dropna().unique())
+    conteo_tipos = df['Tipo_bano_agrupado'].value_counts()
+    tipo = sorted(conteo_tipos.index, key=lambda t: (-conteo_tipos[t], t))[0]
+    return {
+        'sin_filtros': {},
+        'primeros_meses': {'meses': meses[:3]},
+        'tipo_frecuente': {'tipo_agrupado': tipo},
+        'correlativos': {'correlativos': catalogo_version.textos('Correlativo')[:5]},
+        'piso_menor': {'pisos': [int(df['Piso'].min())]},
+        'ultimos_meses_tipo': {'meses': meses[-3:], 'tipo_agrupado': tipo},
+    }
+
+
+def _construir(resultado, nombre, motor_analitico="pandas"):
+    return fuente_datos.construir_datos(resultado, f"regresion:{nombre}", datetime(2000, 1, 1), motor_analitico)
+
+
+def salidas_dashboard(datos):
+    """Todas las salidas de referencia de una instantánea de fuente_datos.construir_datos."""
+    particion = datos['fragmentos']
+    global_ = particion.obtener(fragmentos.TODOS)
+    df = global_['df']
+    catalogo_version = global_['catalogo']
+    salidas = {'filas': len(df), 'escalares': {}, 'tablas': {}}
+
+    for nombre, filtros in filtros_referencia(df, catalogo_version).items():
+        _agregar(salidas, f"kpis/{nombre}", metricas_clave(filtrar(df, **filtros)))
+
+    for etiqueta in particion.etiquetas():
+        fragmento = particion.obtener(etiqueta)
+        _agregados(salidas, f"agregados/{etiqueta}", fragmento['agregados'])
+        _agregar(salidas, f"kpis/{etiqueta}", metricas_clave(fragmento['df']))
+    _agregar(salidas, "resumen_fragmentos", datos['resumen_fragmentos'])
+
+    # Detalle (Pestaña 2) del primer, del central y del último correlativo
+    ordenado, rangos = global_['indice_correlativo']
+    correlativos = sorted(rangos)
+    for correlativo in dict.fromkeys([correlativos[0], correlativos[len(correlativos) // 2], correlativos[-1]]):
+        detalle = detalle_correlativo(filas_correlativo(ordenado, rangos, correlativo))
+        _agregar(salidas, f"correlativo/{correlativo}", {k: detalle[k] for k in ('metricas', 'secuencia', 'gantt')})
+
+    matriz = global_['afinidad']
+    _agregar(salidas, "afinidad/celdas", matriz.celdas())
+    _agregar(salidas, "afinidad/intercambiables", matriz.intercambiables())
+    _agregar(salidas, "anomalias/lineas_base", global_['lineas_base'])
+    _agregar(salidas, "anomalias/resumen", anomalias.resumen_anomalias(df, global_['anomalias']))
+    _agregar(salidas, "ocupacion", global_['ocupacion_operarios'])
+
+    tipo = df['Tipo_bano'].value_counts().sort_index().idxmax()
+    resultado = simulacion.simular(
+        simulacion.construir_distribuciones(df, tipo), n_banos=10, n_replicas=REPLICAS_SIMULACION, semilla=0
+    )
+    _agregar(salidas, f"simulacion/{tipo}", {
+        'resumen': simulacion.resumir(resultado), 'bandas': simulacion.bandas_lead_time(resultado)
+    })
+
+    # Cohortes: primer contra último mes
+    meses = sorted(df['AñoMes'].dropna().unique())
+    mascaras = [cohortes.mascara_cohorte(df, {'meses': [mes]}) for mes in (meses[0], meses[-1])]
+    comparacion = cohortes.comparar(df, mascaras, cohortes.indice_operarios(df))
+    _agregar(salidas, "cohortes", {k: v for k, v in comparacion.items() if k not in ('etiquetas', 'kpis')})
+    return salidas
+
+
+def salidas_ruta(ruta, resultado, nombre):
+    """Salidas de una ruta de cálculo; las rutas alternativas calculan solo su parte."""
+    if ruta == "pandas":
+        return salidas_dashboard(_construir(resultado, nombre))
+
+    if ruta == "paquete":
+        datos = _construir(resultado, nombre)
+        with tempfile.TemporaryDirectory() as directorio:
+            archivo = os.path.join(directorio, f"{nombre}{paquete_datos.EXTENSION}")
+            paquete_datos.exportar(datos, f"regresion:{nombre}", archivo)
+            return salidas_dashboard(paquete_datos.FuentePaquete(archivo, "pandas").construir(f"regresion:{nombre}"))
+
+    df = resultado.valido
+    if 'AñoMes' not in df.columns:  # Lo que agrega fuente_datos.construir_datos
+        df['AñoMes'] = df['Fecha'].dt.strftime('%Y-%m')
+        fragmentos.agregar_ubicacion(df)
+    particion = fragmentos.FragmentosDatos(df, lambda d, sufijo: {'df': d})
+    salidas = {'filas': len(df), 'escalares': {}, 'tablas': {}}
+    if ruta == "paralelo":
+        for etiqueta in particion.etiquetas():
+            agregados = agregacion_paralela.calcular_agregados_paralelo(particion.obtener(etiqueta)['df'], min_filas=0)
+            _agregados(salidas, f"agregados/{etiqueta}", agregados)
+    elif ruta == "duckdb":
+        for etiqueta in particion.etiquetas():
+            motor = motor_duckdb.MotorDuckDB(particion.obtener(etiqueta)['df'])
+            _agregados(salidas, f"agregados/{etiqueta}", motor.calcular_agregados())
+            _agregar(salidas, f"kpis/{etiqueta}", motor.metricas_clave())
+        motor = motor_duckdb.MotorDuckDB(df)
+        for nombre_filtro, filtros in filtros_referencia(df, catalogo.construir_catalogo(df)).items():
+            _agregar(salidas, f"kpis/{nombre_filtro}", motor.metricas_clave(**filtros))
+    return salidas
+
+
+def rutas_disponibles(rutas):
+    """Las rutas pedidas cuyas dependencias opcionales están instaladas (con aviso de las omitidas)."""
+    faltantes = {"duckdb": motor_duckdb.disponible(), "paquete": paquete_datos.disponible()}
+    elegidas = []
+    for ruta in rutas:
+        if ruta not in RUTAS:
+            raise ValueError(f"Ruta desconocida: {ruta} (opciones: {', '.join(RUTAS)})")
+        if faltantes.get(ruta, True):
+            elegidas.append(ruta)
+        else:
+            print(f"Ruta {ruta} omitida: falta su paquete opcional.", file=sys.stderr)
+    return elegidas
+#------------------------
+# Fin de Cálculo de las Salidas
+#------------------------
+
+
+#------------------------
+# Comparación con Tolerancias
+#------------------------
+def _numerico(valor):
+    return valor is None or (isinstance(valor, (int, float)) and not isinstance(valor, bool))
+
+
+def _iguales(esperado, obtenido, rtol, atol):
+    if _numerico(esperado) and _numerico(obtenido):
+        if esperado is None or obtenido is None:
+            return esperado is None and obtenido is None
+        return bool(np.isclose(esperado, obtenido, rtol=rtol, atol=atol))
+    return esperado == obtenido
+
+
+def comparar_tabla(esperada, obtenida, rtol=RTOL, atol=ATOL):
+    """Descripción de la primera diferencia entre dos tablas normalizadas (None si coinciden)."""
+    if esperada['columnas'] != obtenida['columnas']:
+        return f"columnas distintas: {esperada['columnas']} vs {obtenida['columnas']}"
+    if len(esperada['filas']) != len(obtenida['filas']):
+        return f"{len(esperada['filas'])} filas vs {len(obtenida['filas'])}"
+    distintas = [
+        (i, j) for i, (fila_e, fila_o) in enumerate(zip(esperada['filas'], obtenida['filas']))
+        for j, (e, o) in enumerate(zip(fila_e, fila_o)) if not _iguales(e, o, rtol, atol)
+    ]
+    if not distintas:
+        return None
+    i, j = distintas[0]
+    return (f"{len(distintas)} celdas distintas; fila {i}, {esperada['columnas'][j]}: "
+            f"{esperada['filas'][i][j]!r} vs {obtenida['filas'][i][j]!r}")
+
+
+def comparar_salidas(referencia, obtenidas, prefijos=("",), rtol=RTOL, atol=ATOL):
+    """Lista de (nombre, diferencia) de las salidas de referencia que empiezan con alguno de los prefijos."""
+    diferencias = []
+    cubiertas = lambda nombres: [n for n in nombres if n.startswith(prefijos)]
+    for nombre in cubiertas(referencia['escalares']):
+        if nombre not in obtenidas['escalares']:
+            diferencias.append((nombre, "falta"))
+        elif not _iguales(referencia['escalares'][nombre], obtenidas['escalares'][nombre], rtol, atol):
+            diferencias.append((nombre, f"{referencia['escalares'][nombre]!r} vs {obtenidas['escalares'][nombre]!r}"))
+    for nombre in cubiertas(referencia['tablas']):
+        if nombre not in obtenidas['tablas']:
+            diferencias.append((nombre, "falta"))
+            continue
+        diferencia = comparar_tabla(referencia['tablas'][nombre], obtenidas['tablas'][nombre], rtol, atol)
+        if diferencia:
+            diferencias.append((nombre, diferencia))
+    # Salidas nuevas que la referencia no tiene (p. ej. un edificio o un tipo más)
+    for tipo in ('escalares', 'tablas'):
+        for nombre in cubiertas(obtenidas[tipo]):
+            if nombre not in referencia[tipo]:
+                diferencias.append((nombre, "no está en la referencia"))
+    return diferencias
+#------------------------
+# Fin de Comparación con Tolerancias
+#------------------------
+
+
+#------------------------
+# Programa Principal
+#------------------------
+def _ruta_referencia(directorio, nombre):
+    return os.path.join(directorio, f"{nombre}.json.gz")
+
+
+def generar(salida, ruta_csv, sinteticos):
+    """Calcula y guarda las salidas de referencia de cada conjunto de datos con la ruta pandas."""
+    os.makedirs(salida, exist_ok=True)
+    for nombre, (leer, variantes) in conjuntos_datos(ruta_csv, sinteticos).items():
+        inicio = time.perf_counter()
+        salidas = salidas_ruta("pandas", validar_y_preparar(leer(), variantes), nombre)
+        destino = _ruta_referencia(salida, nombre)
+        contenido = json.dumps(salidas, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+        temporal = destino + ".tmp"
+        with open(temporal, "wb") as archivo:
+            # Sin fecha en la cabecera gzip: las mismas salidas dan el mismo archivo
+            archivo.write(gzip.compress(contenido.encode("utf-8"), mtime=0))
+        os.replace(temporal, destino)
+        print(f"{nombre}: {salidas['filas']:,} filas, {len(salidas['tablas'])} tablas, "
+              f"{len(salidas['escalares'])} escalares ({time.perf_counter() - inicio:.1f} s) -> {destino}")
+    return 0
+
+
+def comparar(referencia, ruta_csv, sinteticos, rutas, rtol, atol):
+    """Recalcula cada conjunto con cada ruta y lo compara con la referencia guardada; 1 si hay diferencias."""
+    total = 0
+    for nombre, (leer, variantes) in conjuntos_datos(ruta_csv, sinteticos).items():
+        archivo = _ruta_referencia(referencia, nombre)
+        if not os.path.exists(archivo):
+            print(f"{nombre}: sin referencia en {archivo} (python regresion.py generar)")
+            total += 1
+            continue
+        with gzip.open(archivo, "rt", encoding="utf-8") as f:
+            esperadas = json.load(f)
+        resultado = validar_y_preparar(leer(), variantes)
+        for ruta in rutas:
+            inicio = time.perf_counter()
+            obtenidas = salidas_ruta(ruta, resultado, nombre)
+            segundos = time.perf_counter() - inicio
+            diferencias = comparar_salidas(esperadas, obtenidas, COBERTURA[ruta], rtol, atol)
+            if obtenidas['filas'] != esperadas['filas']:
+                diferencias.insert(0, ("filas", f"{esperadas['filas']} vs {obtenidas['filas']}"))
+            estado = "OK" if not diferencias else f"{len(diferencias)} diferencias"
+            print(f"{nombre} [{ruta}]: {estado} ({segundos:.2f} s)")
+            for salida, detalle in diferencias:
+                print(f"  {salida}: {detalle}")
+            total += len(diferencias)
+    return 1 if total else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Salidas de referencia del dashboard y su comparación.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    def argumentos_datos(p):
+        p.add_argument("--csv", default=RUTA_CSV, help="data_clean_v3_final.csv ('' para omitirlo).")
+        p.add_argument("--sinteticos", default=SINTETICOS_POR_DEFECTO,
+                       help="Conjuntos sintéticos filas:semilla[:operarios], separados por coma.")
+
+    p_generar = sub.add_parser("generar", help="Calcula y guarda las salidas de referencia.")
+    p_generar.add_argument("--salida", default=SALIDA_POR_DEFECTO)
+    argumentos_datos(p_generar)
+
+    p_comparar = sub.add_parser("comparar", help="Compara las salidas actuales con las de referencia.")
+    p_comparar.add_argument("--referencia", default=SALIDA_POR_DEFECTO)
+    p_comparar.add_argument("--rutas", default=RUTAS_POR_DEFECTO,
+                            help=f"Rutas de cálculo separadas por coma ({', '.join(RUTAS)}).")
+    p_comparar.add_argument("--rtol", type=float, default=RTOL)
+    p_comparar.add_argument("--atol", type=float, default=ATOL)
+    argumentos_datos(p_comparar)
+
+    args = parser.parse_args(argv)
+    cache_compartido.CACHE_DESACTIVADA = True
+    if args.comando == "generar":
+        return generar(args.salida, args.csv, args.sinteticos)
+    return comparar(
+        args.referencia, args.csv, args.sinteticos, rutas_disponibles(args.rutas.split(",")), args.rtol, args.atol
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+#------------------------
+# Fin de Programa Principal
+#------------------------
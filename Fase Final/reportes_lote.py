@@ -0,0 +1,286 @@
+#------------------------
+# Generador de Reportes por Lote
+#------------------------
+# Genera sin interfaz el reporte de cada correlativo (métricas, secuencia de
+# procesos y Gantt, como en la Pestaña 2) y el de cumplimiento de cada tipo
+# de baño (como en la Pestaña 3), en paralelo sobre un pool de procesos.
+#
+# Uso:
+#   python reportes_lote.py --datos Datos_Banos.xlsx --salida reportes
+#   python reportes_lote.py --formatos html,png,pdf --procesos 8
+#
+# La ejecución es reanudable: el manifiesto de la carpeta de salida registra
+# las tareas terminadas para la versión del dataset, y solo se rehacen las
+# pendientes (o todas con --forzar). PNG y PDF requieren el paquete kaleido.
+#------------------------
+import argparse
+import html
+import json
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import plotly.offline
+
+import fuente_datos
+from analitica import (
+    format_time_from_minutes, construir_indice_correlativo, filas_correlativo,
+    detalle_correlativo, cumplimiento_por_tipo
+)
+from graficos import tabla_secuencia, tabla_cumplimiento, figura_pie_cumplimiento, figura_gantt_procesos
+
+
+NOMBRE_MANIFIESTO = "manifiesto.json"
+FORMATOS_VALIDOS = ("html", "png", "pdf")
+
+# Dataset de solo lectura de cada worker: heredado por fork o cargado una vez por el inicializador
+_DATOS = None
+
+
+#------------------------
+# Preparación del Dataset Compartido
+#------------------------
+def cargar_dataset(fuente, version):
+    """
+    Lee el Excel validado y pre-procesado (como el dashboard, desde la caché
+    compartida) y arma las estructuras que usan todas las tareas.
+    """
+    df = fuente.cargar(version).valido
+    ordenado, rangos = construir_indice_correlativo(df)
+    return {
+        'ordenado': ordenado,
+        'rangos': rangos,
+        'cumplimiento_tipo': cumplimiento_por_tipo(df),
+    }
+
+
+def _inicializar_worker(ruta_pickle):
+    """Carga el dataset una vez por worker cuando no se puede heredar por fork."""
+    global _DATOS
+    if _DATOS is None:
+        with open(ruta_pickle, "rb") as f:
+            _DATOS = pickle.load(f)
+#------------------------
+# Fin de Preparación del Dataset Compartido
+#------------------------
+
+
+#------------------------
+# Renderizado de Reportes
+#------------------------
+def _pagina_html(titulo, cuerpo):
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(titulo)}</title>"
+        "<script src='plotly.min.js'></script>"
+        "<style>body{font-family:sans-serif;margin:2em} table{border-collapse:collapse} "
+        "td,th{padding:4px 8px;border:1px solid #ddd}</style>"
+        f"</head><body><h1>{html.escape(titulo)}</h1>{cuerpo}</body></html>"
+    )
+
+
+def _escribir(figuras, pagina, base, formatos):
+    """Escribe la página HTML y, si se piden, las figuras como PNG/PDF; devuelve las rutas escritas."""
+    rutas = []
+    if "html" in formatos:
+        ruta = f"{base}.html"
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(pagina)
+        rutas.append(ruta)
+    for formato in ("png", "pdf"):
+        if formato in formatos:
+            for i, fig in enumerate(figuras):
+                ruta = f"{base}_{i + 1}.{formato}"
+                fig.write_image(ruta, format=formato, width=1400, height=fig.layout.height or 600)
+                rutas.append(ruta)
+    return rutas
+
+
+def reporte_correlativo(correlativo, carpeta, formatos):
+    """Reporte de un baño: métricas, secuencia de procesos y Gantt."""
+    d_corr = filas_correlativo(_DATOS['ordenado'], _DATOS['rangos'], correlativo)
+    detalle = detalle_correlativo(d_corr)
+    metricas = detalle['metricas']
+    fig_gantt = figura_gantt_procesos(detalle, correlativo)
+
+    filas_metricas = [
+        ("Tipo de Baño", metricas['tipo_bano']),
+        ("Fecha de Inicio", metricas['fecha_inicio']),
+        ("Fecha de Fin", metricas['fecha_fin']),
+        ("Tiempo Real Total", format_time_from_minutes(metricas['tiempo_real_total'])),
+        ("Tiempo de Espera Total", format_time_from_minutes(metricas['tiempo_espera_total'])),
+        ("Número de Procesos", metricas['num_procesos']),
+        ("Operarios Involucrados", metricas['operarios']),
+    ]
+    cuerpo = (
+        "<h2>Métricas</h2><table>"
+        + "".join(f"<tr><th>{html.escape(str(k))}</th><td>{html.escape(str(v))}</td></tr>" for k, v in filas_metricas)
+        + "</table><h2>Secuencia de Procesos</h2>"
+        + tabla_secuencia(detalle['secuencia']).to_html()
+        + "<h2>Diagrama de Flujo de Procesos (Gantt)</h2>"
+        + fig_gantt.to_html(full_html=False, include_plotlyjs=False)
+    )
+    pagina = _pagina_html(f"Correlativo {correlativo}", cuerpo)
+    return _escribir([fig_gantt], pagina, os.path.join(carpeta, f"correlativo_{correlativo}"), formatos)
+
+
+def reporte_tipo(tipo, carpeta, formatos):
+    """Reporte de cumplimiento por proceso de un tipo de baño."""
+    cumplimiento = _DATOS['cumplimiento_tipo'][tipo]
+    fig_pie = figura_pie_cumplimiento(cumplimiento, f"Distribución de Cumplimiento ({tipo})")
+    cuerpo = (
+        tabla_cumplimiento(cumplimiento).to_html()
+        + fig_pie.to_html(full_html=False, include_plotlyjs=False)
+    )
+    pagina = _pagina_html(f"Análisis de Cumplimiento por Proceso - Tipo {tipo}", cuerpo)
+    return _escribir([fig_pie], pagina, os.path.join(carpeta, f"tipo_{tipo}"), formatos)
+
+
+def ejecutar_tarea(tarea, carpeta, formatos):
+    """Punto de entrada de cada tarea en el worker; devuelve la tarea, sus archivos y su duración."""
+    inicio = time.perf_counter()
+    clase, valor = tarea
+    if clase == "correlativo":
+        rutas = reporte_correlativo(valor, carpeta, formatos)
+    else:
+        rutas = reporte_tipo(valor, carpeta, formatos)
+    return tarea, rutas, time.perf_counter() - inicio
+#------------------------
+# Fin de Renderizado de Reportes
+#------------------------
+
+
+#------------------------
+# Manifiesto y Reanudación
+#------------------------
+def _clave_tarea(tarea):
+    return f"{tarea[0]}:{tarea[1]}"
+
+
+def leer_manifiesto(carpeta, version, formatos):
+    """Tareas completas de una ejecución anterior con la misma versión de datos y formatos."""
+    ruta = os.path.join(carpeta, NOMBRE_MANIFIESTO)
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding="utf-8") as f:
+        manifiesto = json.load(f)
+    if manifiesto.get("version") != version or manifiesto.get("formatos") != sorted(formatos):
+        return {}
+    # Solo cuentan como terminadas las tareas cuyos archivos siguen existiendo
+    return {
+        clave: rutas for clave, rutas in manifiesto.get("tareas", {}).items()
+        if all(os.path.exists(os.path.join(carpeta, r)) for r in rutas)
+    }
+
+
+def guardar_manifiesto(carpeta, version, formatos, tareas):
+    ruta = os.path.join(carpeta, NOMBRE_MANIFIESTO)
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "formatos": sorted(formatos), "tareas": tareas}, f, ensure_ascii=False, indent=1)
+    os.replace(temporal, ruta)
+
+
+def escribir_indice(carpeta, tareas):
+    """Página índice con enlaces a todos los reportes HTML."""
+    enlaces = {"correlativo": [], "tipo": []}
+    for clave, rutas in sorted(tareas.items()):
+        clase, valor = clave.split(":", 1)
+        for r in rutas:
+            if r.endswith(".html"):
+                enlaces[clase].append(f"<li><a href='{html.escape(r)}'>{html.escape(valor)}</a></li>")
+    cuerpo = (
+        "<h2>Reportes por Correlativo</h2><ul>" + "".join(enlaces["correlativo"]) + "</ul>"
+        "<h2>Cumplimiento por Tipo de Baño</h2><ul>" + "".join(enlaces["tipo"]) + "</ul>"
+    )
+    with open(os.path.join(carpeta, "index.html"), "w", encoding="utf-8") as f:
+        f.write(_pagina_html("Reportes de Productividad - Baños", cuerpo))
+#------------------------
+# Fin de Manifiesto y Reanudación
+#------------------------
+
+
+#------------------------
+# Programa Principal
+#------------------------
+def main(argv=None):
+    global _DATOS
+
+    parser = argparse.ArgumentParser(description="Genera los reportes por correlativo y por tipo de baño.")
+    parser.add_argument("--datos", default="Datos_Banos.xlsx", help="Ruta del Excel de datos.")
+    parser.add_argument("--variantes", default="variantes_correctas.csv",
+                        help="Correlativo -> tipo de baño corregido (se omite si no existe).")
+    parser.add_argument("--salida", default="reportes", help="Carpeta de salida.")
+    parser.add_argument("--formatos", default="html", help="Formatos separados por coma: html, png, pdf.")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1, help="Número de procesos del pool.")
+    parser.add_argument("--forzar", action="store_true", help="Regenera todos los reportes, aunque ya existan.")
+    args = parser.parse_args(argv)
+
+    formatos = [f.strip().lower() for f in args.formatos.split(",") if f.strip()]
+    invalidos = [f for f in formatos if f not in FORMATOS_VALIDOS]
+    if invalidos:
+        parser.error(f"Formatos no soportados: {', '.join(invalidos)}")
+    if any(f in formatos for f in ("png", "pdf")):
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            print("Aviso: kaleido no está instalado; se omiten PNG y PDF.", file=sys.stderr)
+            formatos = [f for f in formatos if f == "html"]
+
+    os.makedirs(args.salida, exist_ok=True)
+    fuente = fuente_datos.FuenteExcel(args.datos, args.variantes)
+    version = fuente.version()
+
+    print(f"Cargando {args.datos}...")
+    _DATOS = cargar_dataset(fuente, version)
+    with open(os.path.join(args.salida, "plotly.min.js"), "w", encoding="utf-8") as f:
+        f.write(plotly.offline.get_plotlyjs())
+
+    tareas = [("correlativo", c) for c in _DATOS['rangos']] + [("tipo", t) for t in _DATOS['cumplimiento_tipo']]
+    completas = {} if args.forzar else leer_manifiesto(args.salida, version, formatos)
+    pendientes = [t for t in tareas if _clave_tarea(t) not in completas]
+    print(f"{len(tareas)} reportes, {len(tareas) - len(pendientes)} ya generados, {len(pendientes)} pendientes.")
+
+    inicio = time.perf_counter()
+    if pendientes:
+        # Con fork los workers heredan el dataset ya cargado; en otro caso lo leen una vez desde un pickle
+        metodos = multiprocessing.get_all_start_methods()
+        contexto = multiprocessing.get_context("fork" if "fork" in metodos else "spawn")
+        ruta_pickle = None
+        if contexto.get_start_method() != "fork":
+            with tempfile.NamedTemporaryFile(suffix=".pkl", delete=False) as f:
+                pickle.dump(_DATOS, f, protocol=pickle.HIGHEST_PROTOCOL)
+                ruta_pickle = f.name
+
+        try:
+            with ProcessPoolExecutor(
+                max_workers=max(1, args.procesos),
+                mp_context=contexto,
+                initializer=_inicializar_worker if ruta_pickle else None,
+                initargs=(ruta_pickle,) if ruta_pickle else ()
+            ) as pool:
+                futuros = [pool.submit(ejecutar_tarea, t, args.salida, formatos) for t in pendientes]
+                for n, futuro in enumerate(as_completed(futuros), start=1):
+                    tarea, rutas, duracion = futuro.result()
+                    completas[_clave_tarea(tarea)] = [os.path.relpath(r, args.salida) for r in rutas]
+                    print(f"[{n}/{len(pendientes)}] {tarea[0]} {tarea[1]} ({duracion:.2f}s)")
+                    # Se guarda el avance en cada tarea para poder reanudar si se interrumpe
+                    guardar_manifiesto(args.salida, version, formatos, completas)
+        finally:
+            if ruta_pickle:
+                os.remove(ruta_pickle)
+
+    escribir_indice(args.salida, completas)
+    print(f"Listo en {time.perf_counter() - inicio:.1f}s. Índice: {os.path.join(args.salida, 'index.html')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+#------------------------
+# Fin de Programa Principal
+#------------------------
@@ -0,0 +1,204 @@
+#------------------------
+# Simulación de Eventos Discretos - Takt Time
+#------------------------
+# Simula el flujo de baños a través de la secuencia de procesos de un tipo de
+# baño, muestreando los tiempos reales y de espera desde las distribuciones
+# empíricas de la tabla de hechos. Cada proceso es una estación con tantos
+# servidores como operarios asignados; las réplicas se vectorizan con NumPy y
+# se reparten en bloques entre los procesos del pool compartido de
+# agregacion_paralela.py ("forkserver", sin volver a ejecutar el dashboard en
+# cada proceso). Sin "forkserver" (Windows) los bloques se simulan aquí mismo.
+#------------------------
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+import agregacion_paralela
+
+
+#------------------------
+# Constantes de la Simulación
+#------------------------
+FRECUENCIA_MINIMA_PROCESO = 0.5   # Fracción mínima de baños del tipo en que debe aparecer un proceso
+MIN_MUESTRAS = 5                  # Bajo este número se usan las muestras de todos los tipos de baño
+UMBRAL_PARALELO = 500             # Réplicas bajo las cuales no conviene levantar el pool
+PERCENTILES_BANDA = (2.5, 50, 97.5)
+#------------------------
+# Fin de Constantes de la Simulación
+#------------------------
+
+
+#------------------------
+# Distribuciones Empíricas
+#------------------------
+def construir_distribuciones(df, tipo_bano):
+    """Obtiene la secuencia de procesos y las muestras empíricas de tiempos para un tipo de baño."""
+    d_tipo = df[(df['Tipo_bano'] == tipo_bano) & df['T_Real_min'].notna()].sort_values('Fecha', kind='mergesort')
+    if d_tipo.empty:
+        return None
+
+    # Posición relativa de cada proceso dentro de la secuencia de su baño (0 = primero, 1 = último)
+    posicion = d_tipo.groupby('Cod_bano').cumcount()
+    largo = d_tipo.groupby('Cod_bano')['Proceso'].transform('size')
+    d_tipo = d_tipo.assign(Posicion=posicion / (largo - 1).clip(lower=1))
+
+    n_banos = d_tipo['Cod_bano'].nunique()
+    resumen = d_tipo.groupby('Proceso').agg(
+        Banos=('Cod_bano', 'nunique'),
+        Posicion=('Posicion', 'mean'),
+        TT=('TT', 'median')
+    )
+    resumen = resumen[resumen['Banos'] >= FRECUENCIA_MINIMA_PROCESO * n_banos]
+    resumen = resumen.sort_values('Posicion', kind='mergesort')
+
+    muestras_real = []
+    muestras_espera = []
+    for proceso in resumen.index:
+        d_proc = d_tipo[d_tipo['Proceso'] == proceso]
+        if len(d_proc) < MIN_MUESTRAS:
+            d_proc = df[df['Proceso'] == proceso]
+        muestras_real.append(d_proc['T_Real_min'].dropna().to_numpy(dtype=float))
+        muestras_espera.append(d_proc['T_Espera_min'].fillna(0).clip(lower=0).to_numpy(dtype=float))
+
+    return {
+        'tipo_bano': tipo_bano,
+        'procesos': resumen.index.tolist(),
+        'tt': resumen['TT'].to_numpy(dtype=float),
+        'muestras_real': muestras_real,
+        'muestras_espera': muestras_espera,
+    }
+#------------------------
+# Fin de Distribuciones Empíricas
+#------------------------
+
+
+#------------------------
+# Núcleo de la Simulación
+#------------------------
+def _simular_bloque(distrib, n_banos, n_replicas, servidores, factores, semilla):
+    """Simula un bloque de réplicas; las réplicas van en la primera dimensión de cada arreglo."""
+    rng = np.random.default_rng(semilla)
+    n_procesos = len(distrib['procesos'])
+    filas = np.arange(n_replicas)
+
+    # Tiempo en que se libera cada servidor de cada estación
+    libre = [np.zeros((n_replicas, int(servidores[j]))) for j in range(n_procesos)]
+    lead_time = np.empty((n_replicas, n_banos))
+    termino = np.zeros(n_replicas)
+    cumple = np.zeros(n_replicas)
+
+    for i in range(n_banos):
+        listo = np.zeros(n_replicas)
+        inicio_bano = None
+        for j in range(n_procesos):
+            if j > 0:
+                listo = listo + rng.choice(distrib['muestras_espera'][j], size=n_replicas)
+
+            estacion = libre[j]
+            servidor = estacion.argmin(axis=1)
+            inicio = np.maximum(listo, estacion[filas, servidor])
+            duracion = rng.choice(distrib['muestras_real'][j], size=n_replicas) * factores[j]
+            fin = inicio + duracion
+            estacion[filas, servidor] = fin
+
+            cumple += duracion <= distrib['tt'][j]
+            if inicio_bano is None:
+                inicio_bano = inicio
+            listo = fin
+
+        lead_time[:, i] = listo - inicio_bano
+        termino = np.maximum(termino, listo)
+
+    return {
+        'lead_time': lead_time,
+        'makespan': termino,
+        'cumplimiento': cumple / (n_banos * n_procesos),
+    }
+
+
+def simular(distrib, n_banos=20, n_replicas=2000, operarios=None, tt=None, factores=None,
+            semilla=0, max_workers=None):
+    """
+    Ejecuta la simulación del flujo de baños.
+
+    `operarios`, `tt` y `factores` son diccionarios {proceso: valor} que modifican
+    el número de servidores, el Takt Time y el factor de tiempo de cada proceso;
+    los procesos no indicados mantienen 1 operario, su TT histórico y factor 1.
+    """
+    procesos = distrib['procesos']
+    operarios = operarios or {}
+    tt = tt or {}
+    factores = factores or {}
+
+    distrib = dict(distrib)
+    distrib['tt'] = np.array([tt.get(p, t) for p, t in zip(procesos, distrib['tt'])], dtype=float)
+    servidores = [max(1, int(operarios.get(p, 1))) for p in procesos]
+    factores_arr = [float(factores.get(p, 1.0)) for p in procesos]
+
+    # Réplicas repartidas en bloques con semillas independientes; max_workers
+    # limita los bloques y con ellos los procesos del pool en uso
+    n_bloques = 1 if n_replicas < UMBRAL_PARALELO else (max_workers or agregacion_paralela.PROCESOS)
+    tamanos = [len(b) for b in np.array_split(np.arange(n_replicas), n_bloques) if len(b) > 0]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    argumentos = [(distrib, n_banos, n, servidores, factores_arr, s) for n, s in zip(tamanos, semillas)]
+
+    bloques = None
+    if len(argumentos) > 1 and agregacion_paralela.contexto_procesos() is not None:
+        try:
+            bloques = agregacion_paralela.mapear_en_pool(_simular_bloque, argumentos)
+        except (BrokenProcessPool, OSError):
+            # Un proceso murió o no se pudo arrancar el pool: los bloques se simulan aquí
+            bloques = None
+    if bloques is None:
+        bloques = [_simular_bloque(*args) for args in argumentos]
+
+    lead_time = np.concatenate([b['lead_time'] for b in bloques])
+    makespan = np.concatenate([b['makespan'] for b in bloques])
+    cumplimiento = np.concatenate([b['cumplimiento'] for b in bloques])
+
+    return {
+        'lead_time': lead_time,
+        'throughput_hr': n_banos / (makespan / 60),
+        'cumplimiento': cumplimiento,
+    }
+#------------------------
+# Fin de Núcleo de la Simulación
+#------------------------
+
+
+#------------------------
+# Resumen de Resultados
+#------------------------
+def resumir(resultado):
+    """Resume las réplicas en media y banda de confianza para throughput, lead time y cumplimiento."""
+    lead_time_medio = resultado['lead_time'].mean(axis=1)
+    filas = []
+    for nombre, valores in (
+        ('Throughput (baños/hora)', resultado['throughput_hr']),
+        ('Lead Time Promedio (minutos)', lead_time_medio),
+        ('Cumplimiento TT (%)', resultado['cumplimiento'] * 100),
+    ):
+        bajo, mediana, alto = np.percentile(valores, PERCENTILES_BANDA)
+        filas.append({
+            'Métrica': nombre,
+            'Media': valores.mean(),
+            'Banda_Inferior': bajo,
+            'Mediana': mediana,
+            'Banda_Superior': alto,
+        })
+    return pd.DataFrame(filas)
+
+
+def bandas_lead_time(resultado):
+    """Banda de lead time por posición del baño en la secuencia de liberación."""
+    bajo, mediana, alto = np.percentile(resultado['lead_time'], PERCENTILES_BANDA, axis=0)
+    return pd.DataFrame({
+        'Bano_N': np.arange(1, resultado['lead_time'].shape[1] + 1),
+        'Banda_Inferior': bajo,
+        'Mediana': mediana,
+        'Banda_Superior': alto,
+    })
+#------------------------
+# Fin de Resumen de Resultados
+#------------------------
@@ -0,0 +1,199 @@
+#------------------------
+# Validación de Datos de Entrada
+#------------------------
+# Etapa única, por versión del dataset, entre la lectura del Excel y
+# preparar_datos(). Falla de inmediato si faltan columnas; después revisa
+# tipos, rangos e integridad referencial con operaciones vectorizadas y
+# separa las filas con problemas en una tabla de cuarentena con su motivo.
+# Las filas que pasan quedan con tipos normalizados (Fecha datetime, tiempos
+# float, TT int, Cumple_TT bool, operarios como texto sin espacios o NaN),
+# de modo que el resto del código no necesita revisar fila por fila.
+#
+# Los tiempos reales faltantes o negativos van a cuarentena; las esperas
+# negativas pasan y las marca anomalias.py (Pestaña 8).
+#
+# Inicio y Fin (fecha y hora reales de la ejecución) son opcionales: el Excel
+# exportado de AppSheet no los trae, la ingesta en vivo sí. Si vienen, deben
+# ser fechas y Fin no puede ser anterior a Inicio.
+#
+# Referencias:
+#   - Variantes del ENUM bano.variante (axis_flow_tables.sql).
+#   - variantes_correctas.csv (Correlativo -> código de baño), si se entrega.
+#   - Catálogo proceso (nom_proc, tt_proc) de axis_bd, si se entrega.
+#------------------------
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+
+#------------------------
+# Esquema Esperado
+#------------------------
+COLUMNAS_NUMERICAS = [
+    'T_Espera_min', 'T_Real_min', 'T_Real_Acumulado', 'Diferencia_TT',
+    'T_Real_horas', 'T_Espera_horas', 'T_Real_Acumulado_horas',
+]
+COLUMNAS_TEXTO = ['Cod_bano', 'Tipo_bano', 'Proceso']
+COLUMNAS_OPERARIO = ['Operario_1', 'Operario_2', 'Operario_3']
+COLUMNAS_REQUERIDAS = (
+    ['Correlativo', 'Fecha', 'TT', 'Cumple_TT'] + COLUMNAS_TEXTO + COLUMNAS_NUMERICAS + COLUMNAS_OPERARIO
+)
+COLUMNAS_INTERVALO = ['Inicio', 'Fin']
+
+# Mismos valores que el ENUM bano.variante de axis_flow_tables.sql
+VARIANTES_VALIDAS = ['B1', 'B1E', 'B2', 'B2E', 'B2b', 'B3', 'B3E', 'B4', 'B4E', 'B4b', 'B5', 'B6', 'B6E']
+PATRON_COD_BANO = r'^(\d+)-([A-Z])(\d+)-(\S+)$'
+VALORES_BOOLEANOS = {
+    True: True, False: False, 1: True, 0: False,
+    'true': True, 'false': False, 'verdadero': True, 'falso': False, '1': True, '0': False,
+}
+#------------------------
+# Fin de Esquema Esperado
+#------------------------
+
+
+class ErrorValidacion(ValueError):
+    """El archivo no tiene la forma mínima para cargarse (columnas faltantes o sin filas)."""
+
+
+class ResultadoValidacion:
+    """Filas válidas (tipos normalizados), filas en cuarentena con su Motivo y el reporte de la validación."""
+
+    def __init__(self, valido, cuarentena, reporte):
+        self.valido = valido
+        self.cuarentena = cuarentena
+        self.reporte = reporte
+
+
+def leer_variantes(ruta):
+    """Correlativo -> código de baño desde variantes_correctas.csv; None si el archivo no existe."""
+    if not os.path.exists(ruta):
+        return None
+    variantes = pd.read_csv(ruta, sep=';', encoding='utf-8-sig')
+    return variantes.set_index('Correlativo')['Tipo_bano'].astype(str).str.strip()
+
+
+#------------------------
+# Normalización de Tipos
+#------------------------
+def _texto(serie):
+    """Texto sin espacios en los extremos; lo que no es texto o queda vacío pasa a NaN."""
+    es_texto = serie.map(type).eq(str)
+    # object: una columna sin ningún texto (p. ej. un lote pequeño sin Operario_3) no admite .str con otro tipo
+    limpio = serie.astype(object).where(es_texto).str.strip()
+    return limpio.where(limpio != '')
+
+
+def _booleano(serie):
+    """Mapea valores booleanos del Excel (bool, 0/1, VERDADERO/FALSO); lo desconocido queda NaN."""
+    if pd.api.types.is_bool_dtype(serie):
+        return serie
+    claves = serie.map(lambda v: v.strip().lower() if isinstance(v, str) else v)
+    return claves.map(VALORES_BOOLEANOS)
+#------------------------
+# Fin de Normalización de Tipos
+#------------------------
+
+
+def validar(df, variantes=None, procesos=None):
+    """
+    Valida el DataFrame crudo del Excel. Lanza ErrorValidacion si faltan
+    columnas o no hay filas; el resto de los problemas se reportan por fila.
+
+    variantes: Serie Correlativo -> código de baño (leer_variantes).
+    procesos: DataFrame con nom_proc y tt_proc (catálogo proceso de axis_bd).
+    """
+    inicio = time.perf_counter()
+    faltantes = [col for col in COLUMNAS_REQUERIDAS if col not in df.columns]
+    if faltantes:
+        raise ErrorValidacion(f"Faltan columnas en los datos: {', '.join(faltantes)}")
+    if df.empty:
+        raise ErrorValidacion("El archivo de datos no tiene filas.")
+
+    datos = df.copy()
+    motivos = {}
+
+    # Tipos y rangos
+    correlativo = pd.to_numeric(datos['Correlativo'], errors='coerce')
+    motivos['Correlativo no entero'] = correlativo.isna() | (correlativo % 1 != 0)
+    datos['Correlativo'] = correlativo
+
+    fecha = pd.to_datetime(datos['Fecha'], errors='coerce')
+    motivos['Fecha inválida'] = fecha.isna()
+    datos['Fecha'] = fecha
+
+    for col in COLUMNAS_TEXTO:
+        datos[col] = _texto(datos[col])
+        motivos[f'{col} vacío o no es texto'] = datos[col].isna()
+    for col in COLUMNAS_OPERARIO:
+        datos[col] = _texto(datos[col])
+
+    for col in COLUMNAS_NUMERICAS:
+        valores = pd.to_numeric(datos[col], errors='coerce')
+        motivos[f'{col} no numérico'] = valores.isna() & datos[col].notna()
+        datos[col] = valores.astype(float)
+    motivos['T_Real_min faltante'] = datos['T_Real_min'].isna()
+    # Una espera negativa no se pone en cuarentena: es un error de registro que anomalias.puntuar marca
+    # como 'Espera negativa', sin quitar la ejecución de los demás cálculos
+    motivos['Tiempo real negativo'] = (datos[['T_Real_min', 'T_Real_Acumulado']] < 0).any(axis=1)
+
+    tt = pd.to_numeric(datos['TT'], errors='coerce')
+    motivos['TT no es entero positivo'] = tt.isna() | (tt <= 0) | (tt % 1 != 0)
+    datos['TT'] = tt
+
+    for col in COLUMNAS_INTERVALO:
+        if col in datos.columns:
+            momento = pd.to_datetime(datos[col], errors='coerce', format='mixed')
+            motivos[f'{col} no es fecha y hora'] = momento.isna() & datos[col].notna()
+            datos[col] = momento
+    if all(col in datos.columns for col in COLUMNAS_INTERVALO):
+        motivos['Fin anterior a Inicio'] = datos['Fin'] < datos['Inicio']
+
+    cumple = _booleano(datos['Cumple_TT'])
+    motivos['Cumple_TT no booleano'] = cumple.isna()
+    datos['Cumple_TT'] = cumple
+
+    # Integridad referencial
+    motivos['Variante fuera del catálogo'] = datos['Tipo_bano'].notna() & ~datos['Tipo_bano'].isin(VARIANTES_VALIDAS)
+    partes = datos['Cod_bano'].str.extract(PATRON_COD_BANO)
+    motivos['Cod_bano mal formado'] = datos['Cod_bano'].notna() & partes[0].isna()
+    motivos['Cod_bano no coincide con Correlativo/Tipo_bano'] = partes[0].notna() & (
+        (pd.to_numeric(partes[0]) != correlativo) | (partes[3] != datos['Tipo_bano'])
+    )
+
+    sin_referencia = 0
+    if variantes is not None:
+        esperado = correlativo.map(variantes)
+        sin_referencia = int(correlativo[esperado.isna()].nunique())
+        motivos['Cod_bano distinto de variantes_correctas'] = esperado.notna() & (esperado != datos['Cod_bano'])
+
+    if procesos is not None:
+        claves = pd.MultiIndex.from_arrays([procesos['nom_proc'], procesos['tt_proc'].astype(float)])
+        encontrado = claves.get_indexer(pd.MultiIndex.from_arrays([datos['Proceso'], tt])) >= 0
+        motivos['Proceso/TT fuera del catálogo'] = pd.Series(~encontrado, index=datos.index) & datos['Proceso'].notna()
+
+    # Separación en válidas y cuarentena (con el primer motivo de cada fila)
+    tabla_motivos = pd.DataFrame(motivos).fillna(False).astype(bool)
+    invalida = tabla_motivos.any(axis=1)
+    nombres = np.array(tabla_motivos.columns, dtype=object)
+    cuarentena = df[invalida.to_numpy()].copy()
+    cuarentena.insert(0, 'Motivo', nombres[tabla_motivos[invalida].to_numpy().argmax(axis=1)])
+    cuarentena.insert(1, 'Fila_Excel', cuarentena.index + 2)
+
+    valido = datos[~invalida.to_numpy()].copy()
+    valido['Correlativo'] = valido['Correlativo'].astype(int)
+    valido['TT'] = valido['TT'].astype(int)
+    valido['Cumple_TT'] = valido['Cumple_TT'].astype(bool)
+    valido = valido.reset_index(drop=True)
+
+    reporte = {
+        'filas_totales': len(df),
+        'filas_validas': len(valido),
+        'filas_cuarentena': len(cuarentena),
+        'motivos': {m: int(n) for m, n in tabla_motivos.sum().items() if n > 0},
+        'correlativos_sin_referencia': sin_referencia,
+        'segundos': time.perf_counter() - inicio,
+    }
+    return ResultadoValidacion(valido, cuarentena.reset_index(drop=True), reporte)